@@ -0,0 +1,73 @@
+"""
+Measures the per-record cost of projecting and validating articles, and the
+bytes each published record saves, against publishing raw API dicts.
+
+Run from the project root:
+    python -m benchmarks.bench_articles --records 20000 --body_size 2000
+"""
+
+import argparse
+import time
+
+from benchmarks.fake_guardian import make_article
+from src.models import DEFAULT_ARTICLE_FIELDS, ArticleProjection
+from src.serialization import get_codec
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("--records", type=int, default=20000, help="articles to process")
+parser.add_argument(
+    "--body_size", type=int, default=0, help="characters of fields.bodyText per article"
+)
+parser.add_argument("--codec", default="json", help="record codec, e.g. orjson+zstd")
+
+
+def measure(label, articles, codec, projection=None):
+    start = time.perf_counter()
+    records = articles if projection is None else [projection(a) for a in articles]
+    project_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    encoded = [codec.encode(record) for record in records]
+    encode_time = time.perf_counter() - start
+
+    return {
+        "label": label,
+        "project_us": 1e6 * project_time / len(articles),
+        "total_us": 1e6 * (project_time + encode_time) / len(articles),
+        "bytes_per_record": sum(len(data) for data in encoded) / len(articles),
+    }
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    articles = [make_article(i, args.body_size) for i in range(args.records)]
+    codec = get_codec(args.codec)
+    compact = list(DEFAULT_ARTICLE_FIELDS)
+    with_body = compact + ["fields.bodyText"]
+
+    results = [
+        measure("raw dict", articles, codec),
+        measure("projection", articles, codec, ArticleProjection(compact)),
+        measure(
+            "projection (validated)",
+            articles,
+            codec,
+            ArticleProjection(compact, validate=True),
+        ),
+        measure("projection + bodyText", articles, codec, ArticleProjection(with_body)),
+    ]
+
+    raw_bytes = results[0]["bytes_per_record"]
+    print(
+        f"{args.records} articles, bodyText {args.body_size} chars, codec {codec.name}"
+    )
+    print(
+        f"{'mode':<26}{'project us':>12}{'total us':>10}{'bytes/rec':>11}{'saved':>8}"
+    )
+    for result in results:
+        saved = 1 - result["bytes_per_record"] / raw_bytes
+        print(
+            f"{result['label']:<26}{result['project_us']:>12.2f}"
+            f"{result['total_us']:>10.2f}{result['bytes_per_record']:>11,.0f}"
+            f"{saved:>8.0%}"
+        )
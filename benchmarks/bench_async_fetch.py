@@ -0,0 +1,60 @@
+"""
+Compares wall-clock time of the sequential and concurrent page fetch paths
+against a local stub of the Guardian API.
+
+Run from the project root:
+    python -m benchmarks.bench_async_fetch --pages 20 --latency 0.05
+"""
+
+import argparse
+import time
+
+from benchmarks.fake_guardian import GuardianStubServer
+from src.api_client import GuardianClient
+from src.async_client import fetch_guardian_results_concurrently
+
+PARAMS = {"q": "benchmark", "order-by": "newest"}
+API_KEY = "bench-key"
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("--pages", type=int, default=20, help="pages in the result set")
+parser.add_argument("--page_size", type=int, default=50, help="results per page")
+parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+parser.add_argument("--concurrency", type=int, default=4, help="async window size")
+
+
+def time_call(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    total = args.pages * args.page_size
+
+    with GuardianStubServer(total_results=total, latency=args.latency) as stub:
+        client = GuardianClient()
+        sequential_time, sequential = time_call(
+            lambda: list(client.iter_results(stub.url, PARAMS, API_KEY, args.page_size))
+        )
+        client.close()
+
+        concurrent_time, concurrent = time_call(
+            lambda: fetch_guardian_results_concurrently(
+                stub.url,
+                PARAMS,
+                API_KEY,
+                page_size=args.page_size,
+                concurrency=args.concurrency,
+            )
+        )
+
+    assert sequential == concurrent, "Concurrent path changed the result order"
+
+    print(
+        f"{args.pages} pages x {args.page_size} results, {args.latency * 1000:.0f} ms latency"
+    )
+    print(f"  sequential:             {sequential_time:.3f}s")
+    print(f"  concurrent (window {args.concurrency}): {concurrent_time:.3f}s")
+    print(f"  speed-up:               {sequential_time / concurrent_time:.1f}x")
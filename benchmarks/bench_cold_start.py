@@ -0,0 +1,141 @@
+"""
+Measures Lambda cold-start cost: the import time of src.lambda_handler
+(from -X importtime) and the time to the first and a warm invocation.
+
+Every run starts a fresh interpreter, as a new Lambda container would. AWS is
+served by a local moto server and the Guardian API by a local stub, so no
+credentials are needed.
+
+Run from the project root:
+    python -m benchmarks.bench_cold_start --runs 5
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+
+import boto3
+from moto.server import ThreadedMotoServer
+
+from benchmarks.fake_guardian import GuardianStubServer
+
+REGION = "eu-west-2"
+SECRET_NAME = "bench/guardian/credentials"
+STREAM_NAME = "bench-stream"
+
+# Runs in the child interpreter. Timings start before src.lambda_handler is
+# imported, so they include the module-level init phase.
+CHILD_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import src.lambda_handler as handler
+init = time.perf_counter()
+handler.lambda_handler({"search": "benchmark"}, None)
+first = time.perf_counter()
+handler.lambda_handler({"search": "benchmark"}, None)
+warm = time.perf_counter()
+print(json.dumps({"init": init - start, "first": first - init, "warm": warm - first}))
+"""
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("--runs", type=int, default=5, help="cold starts to measure")
+parser.add_argument("--results", type=int, default=20, help="articles per search")
+parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+
+
+def import_times() -> list:
+    """Returns (cumulative microseconds, module) for src.lambda_handler's imports."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.lambda_handler"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    times = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times.append((int(cumulative), module.rstrip()))
+    return times
+
+
+def cold_start(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    times = import_times()
+    total = next(t for t, module in times if module.strip() == "src.lambda_handler")
+    # Direct imports of the handler module are indented by three spaces
+    direct = [(t, m.strip()) for t, m in times if m.startswith("   ") and m[3] != " "]
+    print(f"import src.lambda_handler: {total / 1000:.1f} ms")
+    for cumulative, module in sorted(direct, reverse=True)[: args.top]:
+        print(f"  {module:<32}{cumulative / 1000:>8.1f} ms")
+
+    # Keep the moto server's request log out of the report
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    moto_server = ThreadedMotoServer(port=0, verbose=False)
+    moto_server.start()
+    host, port = moto_server.get_host_and_port()
+    endpoint = f"http://{host}:{port}"
+    credentials = {"aws_access_key_id": "testing", "aws_secret_access_key": "testing"}
+    try:
+        with GuardianStubServer(total_results=args.results) as stub:
+            boto3.client(
+                "kinesis", region_name=REGION, endpoint_url=endpoint, **credentials
+            ).create_stream(StreamName=STREAM_NAME, ShardCount=1)
+            boto3.client(
+                "secretsmanager",
+                region_name=REGION,
+                endpoint_url=endpoint,
+                **credentials,
+            ).create_secret(
+                Name=SECRET_NAME,
+                SecretString=json.dumps(
+                    {"GUARDIAN_API_KEY": "bench-key", "GUARDIAN_URL": stub.url}
+                ),
+            )
+
+            env = dict(
+                os.environ,
+                AWS_LAMBDA_FUNCTION_NAME="bench-cold-start",
+                AWS_ENDPOINT_URL=endpoint,
+                AWS_ACCESS_KEY_ID="testing",
+                AWS_SECRET_ACCESS_KEY="testing",
+                SECRET_NAME=SECRET_NAME,
+                KINESIS_STREAM_NAME=STREAM_NAME,
+                KINESIS_REGION=REGION,
+                GUARDIAN_RATE_PER_SECOND="1000",
+                GUARDIAN_QUOTA_FILE=os.devnull,
+                GUARDIAN_CACHE="none",
+            )
+            runs = [cold_start(env) for _ in range(args.runs)]
+    finally:
+        moto_server.stop()
+
+    print(f"\n{args.runs} cold starts, median (min-max):")
+    for phase, label in (
+        ("init", "import + init"),
+        ("first", "first invocation"),
+        ("warm", "warm invocation"),
+    ):
+        values = [run[phase] * 1000 for run in runs]
+        print(
+            f"  {label:<20}{statistics.median(values):>8.1f} ms"
+            f"  ({min(values):.1f}-{max(values):.1f})"
+        )
@@ -0,0 +1,380 @@
+"""
+Measures the real CLI and Lambda handler paths end to end: articles/sec,
+p50/p95/p99 latency per stage, peak memory and bytes written to Kinesis.
+
+Each scenario runs in a fresh interpreter against a local Guardian stub (with
+the configured latency, page count and payload size) and a moto Kinesis
+server, so no credentials are needed. Stage latencies come from the
+src.metrics timers; peak memory is the child's maximum resident set size
+and, with --trace_memory, the peak of Python allocations during the run
+(tracemalloc slows the run down, so throughput is lower with it on).
+
+Results can be written as JSON and compared with an earlier run, e.g. the
+same benchmark on the previous commit:
+    python -m benchmarks.bench_end_to_end --output before.json
+    git checkout my-branch
+    python -m benchmarks.bench_end_to_end --compare before.json
+
+Run from the project root:
+    python -m benchmarks.bench_end_to_end --pages 20 --page_size 50 --latency 0.05
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import boto3
+from moto.server import ThreadedMotoServer
+
+from benchmarks.fake_guardian import GuardianStubServer
+
+REGION = "eu-west-2"
+SECRET_NAME = "bench/guardian/credentials"
+API_KEY = "bench-key"
+
+# Stage name reported for each src.metrics timer
+STAGES = {
+    "fetch": "guardian_fetch_latency_ms",
+    "parse": "guardian_parse_ms",
+    "serialize": "kinesis_serialize_ms",
+    "publish": "kinesis_put_records_latency_ms",
+}
+
+# Runs in the child interpreter. The entry point's modules are imported before
+# the clock starts, so the wall time covers fetching and publishing only.
+CHILD_SCRIPT = """
+import contextlib, io, json, resource, runpy, sys, time, tracemalloc, warnings
+spec = json.loads(sys.argv[1])
+if spec["entry"] == "cli":
+    import src.cli
+else:
+    import src.lambda_handler as handler
+from src.metrics import METRICS
+if spec["trace_memory"]:
+    tracemalloc.start()
+response = None
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    if spec["entry"] == "cli":
+        sys.argv = ["src.cli"] + spec["argv"]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            try:
+                runpy.run_module("src.cli", run_name="__main__")
+            except SystemExit:
+                pass
+    else:
+        response = handler.lambda_handler(spec["event"], None)
+elapsed = time.perf_counter() - start
+traced = tracemalloc.get_traced_memory()[1] if spec["trace_memory"] else None
+print(json.dumps({
+    "elapsed": elapsed,
+    "metrics": METRICS.snapshot(),
+    "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "peak_traced_bytes": traced,
+    "status": response["statusCode"] if response else None,
+}))
+"""
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("--pages", type=int, default=20, help="pages of results")
+parser.add_argument("--page_size", type=int, default=50, help="articles per page")
+parser.add_argument(
+    "--latency", type=float, default=0.05, help="stub response time, in seconds"
+)
+parser.add_argument(
+    "--body_size",
+    type=int,
+    default=2000,
+    help="characters of fields.bodyText per article",
+)
+parser.add_argument(
+    "--shards", type=int, default=2, help="shards of the moto Kinesis stream"
+)
+parser.add_argument("--runs", type=int, default=3, help="runs per scenario")
+parser.add_argument(
+    "--scenarios",
+    default="cli,lambda,lambda-buffered",
+    help="comma-separated scenarios: cli, lambda, lambda-buffered",
+)
+parser.add_argument(
+    "--trace_memory",
+    action="store_true",
+    help="also measure peak Python allocations with tracemalloc (slower)",
+)
+parser.add_argument("--output", default=None, help="write the results to this file")
+parser.add_argument(
+    "--compare", default=None, help="results file of an earlier run to compare with"
+)
+
+
+def scenario_spec(name: str, page_size: int) -> dict:
+    """The entry point and arguments (or Lambda event) of a scenario."""
+    if name == "cli":
+        return {
+            "entry": "cli",
+            "argv": [
+                "--search",
+                "benchmark",
+                "--date_from",
+                "2025-01-01",
+                "--page_size",
+                str(page_size),
+                "--publisher",
+                "kinesis",
+            ],
+        }
+    if name in ("lambda", "lambda-buffered"):
+        event = {"search": "benchmark", "date_from": "2025-01-01"}
+        event["page_size"] = page_size
+        if name == "lambda-buffered":
+            event["buffered"] = True
+        return {"entry": "lambda", "event": event}
+    raise ValueError(f"Unknown scenario '{name}'.")
+
+
+def percentile(values: list, q: float) -> float or None:
+    """Nearest-rank percentile (q between 0 and 100) of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def kinesis_totals(kinesis, stream_name: str) -> dict:
+    """Counts the records and bytes stored in every shard of a stream."""
+    records = 0
+    size = 0
+    shards = kinesis.list_shards(StreamName=stream_name)["Shards"]
+    for shard in shards:
+        iterator = kinesis.get_shard_iterator(
+            StreamName=stream_name,
+            ShardId=shard["ShardId"],
+            ShardIteratorType="TRIM_HORIZON",
+        )["ShardIterator"]
+        while iterator:
+            response = kinesis.get_records(ShardIterator=iterator, Limit=10000)
+            if not response["Records"]:
+                break
+            records += len(response["Records"])
+            size += sum(
+                len(r["Data"]) + len(r["PartitionKey"]) for r in response["Records"]
+            )
+            iterator = response.get("NextShardIterator")
+    return {"records": records, "bytes": size}
+
+
+def run_scenario(spec: dict, env: dict, kinesis, stream_name: str, shards: int):
+    """Runs one scenario in a child interpreter and summarizes its results."""
+    kinesis.create_stream(StreamName=stream_name, ShardCount=shards)
+    kinesis.get_waiter("stream_exists").wait(StreamName=stream_name)
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, json.dumps(spec)],
+        env=dict(env, KINESIS_STREAM_NAME=stream_name),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    child = json.loads(output.strip().splitlines()[-1])
+
+    timers = child["metrics"]["timers"]
+    articles = int(timers.get("guardian_records_per_page", {}).get("sum", 0))
+    stages = {}
+    for stage, timer_name in STAGES.items():
+        timer = timers.get(timer_name)
+        if timer is None:
+            continue
+        samples = timer["samples"]
+        stages[stage] = {
+            "count": timer["count"],
+            "total_ms": timer["sum"],
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+            "p99_ms": percentile(samples, 99),
+        }
+    return {
+        "status": child["status"],
+        "seconds": child["elapsed"],
+        "articles": articles,
+        "articles_per_sec": articles / child["elapsed"] if child["elapsed"] else 0,
+        "stages": stages,
+        "peak_rss_mb": child["peak_rss_kb"] / 1024,
+        "peak_traced_mb": (
+            child["peak_traced_bytes"] / 2**20
+            if child["peak_traced_bytes"] is not None
+            else None
+        ),
+        "kinesis": kinesis_totals(kinesis, stream_name),
+        "counters": {
+            name: counter["value"]
+            for name, counter in child["metrics"]["counters"].items()
+        },
+    }
+
+
+def summarize(runs: list) -> dict:
+    """The median run (by articles/sec) of a scenario, plus every rate seen."""
+    ordered = sorted(runs, key=lambda run: run["articles_per_sec"])
+    median = dict(ordered[len(ordered) // 2])
+    median["articles_per_sec_runs"] = [run["articles_per_sec"] for run in runs]
+    return median
+
+
+def git_commit() -> str or None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: dict):
+    for name, summary in results["scenarios"].items():
+        kinesis = summary["kinesis"]
+        print(
+            f"\n{name}: {summary['articles']} articles in {summary['seconds']:.2f} s, "
+            f"{summary['articles_per_sec']:,.0f} articles/s"
+        )
+        memory = f"  peak RSS {summary['peak_rss_mb']:.1f} MB"
+        if summary["peak_traced_mb"] is not None:
+            memory += f", peak traced {summary['peak_traced_mb']:.1f} MB"
+        print(
+            f"{memory}, Kinesis {kinesis['records']} records / "
+            f"{kinesis['bytes']:,} bytes"
+        )
+        print(f"  {'stage':<12}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for stage, timing in summary["stages"].items():
+            print(
+                f"  {stage:<12}{timing['count']:>8}{timing['p50_ms']:>10.2f}"
+                f"{timing['p95_ms']:>10.2f}{timing['p99_ms']:>10.2f}"
+            )
+
+
+def print_comparison(baseline: dict, results: dict):
+    """Prints the change in throughput and median stage latency per scenario."""
+    print(f"\nCompared with {baseline.get('commit') or 'the baseline'}:")
+    for name, summary in results["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            print(f"  {name}: not in the baseline")
+            continue
+        rows = [
+            ("articles/s", before["articles_per_sec"], summary["articles_per_sec"]),
+            ("peak RSS MB", before["peak_rss_mb"], summary["peak_rss_mb"]),
+            ("Kinesis bytes", before["kinesis"]["bytes"], summary["kinesis"]["bytes"]),
+        ]
+        for stage, timing in summary["stages"].items():
+            if stage in before["stages"]:
+                rows.append(
+                    (
+                        f"{stage} p50 ms",
+                        before["stages"][stage]["p50_ms"],
+                        timing["p50_ms"],
+                    )
+                )
+        print(f"  {name}")
+        for label, old, new in rows:
+            change = f"{(new - old) / old:+.1%}" if old else "n/a"
+            print(f"    {label:<16}{old:>14,.2f}{new:>14,.2f}{change:>10}")
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    specs = {name: scenario_spec(name, args.page_size) for name in scenarios}
+    for spec in specs.values():
+        spec["trace_memory"] = args.trace_memory
+
+    # Keep the moto server's request log out of the report
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    moto_server = ThreadedMotoServer(port=0, verbose=False)
+    moto_server.start()
+    host, port = moto_server.get_host_and_port()
+    endpoint = f"http://{host}:{port}"
+    credentials = {"aws_access_key_id": "testing", "aws_secret_access_key": "testing"}
+    results = {
+        "commit": git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {
+            "pages": args.pages,
+            "page_size": args.page_size,
+            "latency": args.latency,
+            "body_size": args.body_size,
+            "shards": args.shards,
+            "runs": args.runs,
+            "trace_memory": args.trace_memory,
+        },
+        "scenarios": {},
+    }
+    try:
+        with GuardianStubServer(
+            total_results=args.pages * args.page_size,
+            latency=args.latency,
+            body_size=args.body_size,
+        ) as stub:
+            kinesis = boto3.client(
+                "kinesis", region_name=REGION, endpoint_url=endpoint, **credentials
+            )
+            boto3.client(
+                "secretsmanager",
+                region_name=REGION,
+                endpoint_url=endpoint,
+                **credentials,
+            ).create_secret(
+                Name=SECRET_NAME,
+                SecretString=json.dumps(
+                    {"GUARDIAN_API_KEY": API_KEY, "GUARDIAN_URL": stub.url}
+                ),
+            )
+
+            env = dict(
+                os.environ,
+                AWS_ENDPOINT_URL=endpoint,
+                AWS_ACCESS_KEY_ID="testing",
+                AWS_SECRET_ACCESS_KEY="testing",
+                GUARDIAN_URL=stub.url,
+                GUARDIAN_API_KEY=API_KEY,
+                SECRET_NAME=SECRET_NAME,
+                KINESIS_REGION=REGION,
+                GUARDIAN_RATE_PER_SECOND="1000",
+                # Every run counts against the daily quota: keep it out of the way
+                GUARDIAN_DAILY_QUOTA="1000000",
+                GUARDIAN_QUOTA_FILE=os.devnull,
+                GUARDIAN_CACHE="none",
+                GUARDIAN_METRICS="none",
+            )
+            for name, spec in specs.items():
+                runs = [
+                    run_scenario(spec, env, kinesis, f"bench-{name}-{run}", args.shards)
+                    for run in range(args.runs)
+                ]
+                results["scenarios"][name] = summarize(runs)
+    finally:
+        moto_server.stop()
+
+    config = results["config"]
+    print(
+        f"{config['pages']} pages x {config['page_size']} articles, "
+        f"bodyText {config['body_size']} chars, {config['latency'] * 1000:.0f} ms "
+        f"per page, median of {config['runs']} runs"
+    )
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), results)
@@ -0,0 +1,103 @@
+"""
+Compares article enrichment (word count, language, keywords, text hash)
+done sequentially with the pipeline stage on a process pool.
+
+Bodies are random English-like text, so keyword counting and language
+detection do representative work. The process pool times include starting
+the workers and pickling articles to and from them.
+
+Run from the project root:
+    python -m benchmarks.bench_enrichment --counts 1000,10000 --body_size 5000
+"""
+
+import argparse
+import os
+import random
+import time
+
+from benchmarks.fake_guardian import make_article
+from src.enrichment import (
+    DEFAULT_ENRICH_BATCH_SIZE,
+    enrich_article,
+    enrichment_stage,
+)
+from src.pipeline import Pipeline
+
+VOCABULARY = (
+    "the of and to in is that for it was on with as he be at by this had are"
+    " government minister election climate energy prices market bank interest"
+    " rates football league season players club manager police report court"
+    " health hospital patients school teachers students city council housing"
+    " technology company data users online research scientists study water"
+).split()
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument(
+    "--counts", default="1000,10000", help="comma-separated article counts"
+)
+parser.add_argument(
+    "--body_size",
+    type=int,
+    default=5000,
+    help="characters of fields.bodyText per article",
+)
+parser.add_argument(
+    "--workers",
+    type=int,
+    default=os.cpu_count() or 1,
+    help="worker processes for the pool path",
+)
+parser.add_argument(
+    "--batch_size",
+    type=int,
+    default=DEFAULT_ENRICH_BATCH_SIZE,
+    help="articles sent to a worker at a time",
+)
+
+
+def make_articles(count: int, body_size: int) -> list:
+    rng = random.Random(count)
+    articles = []
+    for i in range(count):
+        body = " ".join(rng.choices(VOCABULARY, k=body_size // 6))[:body_size]
+        article = make_article(i)
+        article["fields"] = {"bodyText": body}
+        articles.append(article)
+    return articles
+
+
+def measure(run, articles) -> float:
+    """Returns articles/sec for one pass over the articles."""
+    start = time.perf_counter()
+    enriched = run(articles)
+    elapsed = time.perf_counter() - start
+    assert len(enriched) == len(articles)
+    return len(articles) / elapsed
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    counts = [int(c) for c in args.counts.split(",") if c.strip()]
+
+    paths = {
+        "sequential": lambda articles: [enrich_article(a) for a in articles],
+        "pipeline (1 thread)": lambda articles: list(
+            Pipeline(articles, [enrichment_stage(workers=0)])
+        ),
+        f"process pool ({args.workers})": lambda articles: list(
+            Pipeline(
+                articles,
+                [enrichment_stage(workers=args.workers, batch_size=args.batch_size)],
+            )
+        ),
+    }
+
+    print(
+        f"bodyText {args.body_size} chars, {args.workers} workers, "
+        f"batches of {args.batch_size}"
+    )
+    print(f"{'path':<24}" + "".join(f"{f'{n} articles/s':>20}" for n in counts))
+    datasets = {count: make_articles(count, args.body_size) for count in counts}
+    for name, run in paths.items():
+        rates = [measure(run, datasets[count]) for count in counts]
+        print(f"{name:<24}" + "".join(f"{rate:>20,.0f}" for rate in rates))
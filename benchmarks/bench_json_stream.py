@@ -0,0 +1,82 @@
+"""
+Compares time to first article and peak memory of response.json() and the
+streaming JSON parser on large pages from a local stub of the Guardian API.
+
+Run from the project root:
+    python -m benchmarks.bench_json_stream --page_size 200 --body_size 20000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from benchmarks.fake_guardian import GuardianStubServer, make_article
+from src.api_client import GuardianClient
+from src.json_stream import STREAM_CHUNK_SIZE, ResultStream, ijson
+
+PARAMS = {"q": "benchmark", "order-by": "newest"}
+API_KEY = "bench-key"
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("--pages", type=int, default=3, help="pages in the result set")
+parser.add_argument("--page_size", type=int, default=200, help="results per page")
+parser.add_argument(
+    "--body_size", type=int, default=20000, help="characters of fields.bodyText"
+)
+
+
+def measure_client(url, stream_json, page_size):
+    client = GuardianClient(stream_json=stream_json)
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = client.iter_results(url, PARAMS, API_KEY, page_size)
+    next(results)
+    first = time.perf_counter() - start
+    count = 1 + sum(1 for _ in results)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    client.close()
+    return {"first": first, "total": total, "peak_mb": peak / 1e6, "count": count}
+
+
+def measure_backend(backend, body):
+    chunks = [
+        body[i : i + STREAM_CHUNK_SIZE] for i in range(0, len(body), STREAM_CHUNK_SIZE)
+    ]
+    start = time.perf_counter()
+    count = sum(1 for _ in ResultStream(chunks, backend=backend))
+    return count / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    total = args.pages * args.page_size
+
+    with GuardianStubServer(total_results=total, body_size=args.body_size) as stub:
+        print(f"{total} articles, bodyText {args.body_size} chars")
+        print(f"{'mode':<16}{'first (s)':>11}{'total (s)':>11}{'peak MB':>10}")
+        for label, stream_json in (("response.json", False), ("streamed", True)):
+            result = measure_client(stub.url, stream_json, args.page_size)
+            assert result["count"] == total, f"{label} missed articles"
+            print(
+                f"{label:<16}{result['first']:>11.3f}{result['total']:>11.3f}"
+                f"{result['peak_mb']:>10.1f}"
+            )
+
+    body = json.dumps(
+        {
+            "response": {
+                "pages": 1,
+                "results": [make_article(i, args.body_size) for i in range(100)],
+            }
+        }
+    ).encode("utf-8")
+    print(f"\n{'parser':<16}{'articles/s':>12}")
+    print(f"{'json.loads':<16}", end="")
+    start = time.perf_counter()
+    json.loads(body)
+    print(f"{100 / (time.perf_counter() - start):>12,.0f}")
+    for backend in ["builtin"] + (["ijson"] if ijson is not None else []):
+        print(f"{backend:<16}{measure_backend(backend, body):>12,.0f}")
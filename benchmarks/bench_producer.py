@@ -0,0 +1,104 @@
+"""
+Compares the synchronous KinesisPublisher with the BufferedKinesisProducer when
+fetching pages from a stubbed Guardian API and publishing to a moto Kinesis
+stream.
+
+Kinesis runs in-process under moto, so a fixed delay is added to every
+put_records call to stand in for the network round trip.
+
+Run from the project root:
+    python -m benchmarks.bench_producer --pages 10 --fetch_latency 0.05
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import boto3
+from moto import mock_aws
+
+from benchmarks.fake_guardian import GuardianStubServer
+from src.api_client import GuardianClient
+from src.producer import BufferedKinesisProducer
+from src.publisher import KinesisPublisher
+
+PARAMS = {"q": "benchmark", "order-by": "newest"}
+API_KEY = "bench-key"
+STREAM_NAME = "bench-stream"
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("--pages", type=int, default=10, help="pages in the result set")
+parser.add_argument("--page_size", type=int, default=100, help="results per page")
+parser.add_argument(
+    "--fetch_latency", type=float, default=0.05, help="seconds per Guardian request"
+)
+parser.add_argument(
+    "--put_latency", type=float, default=0.05, help="seconds per put_records call"
+)
+parser.add_argument("--linger", type=float, default=0.05, help="producer linger time")
+
+
+def make_publisher(put_latency: float) -> KinesisPublisher:
+    publisher = KinesisPublisher(STREAM_NAME)
+    put_records = publisher.client.put_records
+
+    def delayed_put_records(**kwargs):
+        time.sleep(put_latency)
+        return put_records(**kwargs)
+
+    publisher.client.put_records = delayed_put_records
+    return publisher
+
+
+def run_sync(url, args):
+    client = GuardianClient()
+    publisher = make_publisher(args.put_latency)
+    published = 0
+    for page in client.iter_pages(url, PARAMS, API_KEY, args.page_size):
+        response = publisher.publish(page["response"]["results"])
+        published += len(response["Records"]) - response["FailedRecordCount"]
+    client.close()
+    return published
+
+
+def run_buffered(url, args):
+    client = GuardianClient()
+    with BufferedKinesisProducer(
+        make_publisher(args.put_latency), linger_seconds=args.linger
+    ) as producer:
+        response = producer.publish(
+            client.iter_results(url, PARAMS, API_KEY, args.page_size)
+        )
+    client.close()
+    return len(response["Records"]) - response["FailedRecordCount"]
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-2")
+    total = args.pages * args.page_size
+
+    with mock_aws(), GuardianStubServer(
+        total_results=total, latency=args.fetch_latency
+    ) as stub:
+        boto3.client("kinesis").create_stream(StreamName=STREAM_NAME, ShardCount=4)
+
+        timings = {}
+        for name, runner in (("sync", run_sync), ("buffered", run_buffered)):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                published = runner(stub.url, args)
+            timings[name] = time.perf_counter() - start
+            assert published == total, f"{name} published {published}/{total}"
+
+    print(
+        f"{total} articles over {args.pages} pages, "
+        f"fetch {args.fetch_latency * 1000:.0f} ms, put {args.put_latency * 1000:.0f} ms"
+    )
+    for name, elapsed in timings.items():
+        print(f"  {name:<9} {elapsed:.3f}s  {total / elapsed:,.0f} records/s")
+    print(f"  speed-up: {timings['sync'] / timings['buffered']:.1f}x")
@@ -0,0 +1,88 @@
+"""
+Measures serialization throughput and bytes per record for every codec on
+realistic Guardian article payloads.
+
+Run from the project root:
+    python -m benchmarks.bench_serialization --records 5000 --body_size 2000
+"""
+
+import argparse
+import time
+
+from benchmarks.fake_guardian import make_article
+from src.aggregation import aggregate
+from src.serialization import decode_records, get_codec
+
+CODECS = [
+    "json",
+    "orjson",
+    "msgpack",
+    "json+gzip",
+    "orjson+zstd",
+    "msgpack+zstd",
+]
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("--records", type=int, default=5000, help="articles to encode")
+parser.add_argument(
+    "--body_size", type=int, default=0, help="characters of fields.bodyText per article"
+)
+parser.add_argument(
+    "--aggregate_bytes",
+    type=int,
+    default=25 * 1024,
+    help="aggregate size for the aggregated rows",
+)
+
+
+def measure(spec, articles, aggregate_bytes=None):
+    codec = get_codec(spec)
+
+    start = time.perf_counter()
+    if aggregate_bytes:
+        encoded = [
+            codec.wrap(data)
+            for _, data, _ in aggregate(
+                ((str(i), codec.serializer.dumps(a)) for i, a in enumerate(articles)),
+                aggregate_bytes,
+            )
+        ]
+    else:
+        encoded = [codec.encode(article) for article in articles]
+    encode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = [article for data in encoded for article in decode_records(data)]
+    decode_time = time.perf_counter() - start
+    assert decoded == articles, f"{spec} did not round-trip"
+
+    return {
+        "encode_per_sec": len(articles) / encode_time,
+        "decode_per_sec": len(articles) / decode_time,
+        "bytes_per_record": sum(len(data) for data in encoded) / len(articles),
+        "kinesis_records": len(encoded),
+    }
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    articles = [make_article(i, args.body_size) for i in range(args.records)]
+
+    print(f"{args.records} articles, bodyText {args.body_size} chars")
+    print(
+        f"{'codec':<28}{'encode/s':>12}{'decode/s':>12}{'bytes/rec':>11}{'records':>9}"
+    )
+    for aggregate_bytes in (None, args.aggregate_bytes):
+        for spec in CODECS:
+            label = spec + (" (aggregated)" if aggregate_bytes else "")
+            try:
+                result = measure(spec, articles, aggregate_bytes)
+            except ImportError as e:
+                print(f"{label:<28}skipped: {e}")
+                continue
+            print(
+                f"{label:<28}{result['encode_per_sec']:>12,.0f}"
+                f"{result['decode_per_sec']:>12,.0f}"
+                f"{result['bytes_per_record']:>11,.0f}"
+                f"{result['kinesis_records']:>9,}"
+            )
@@ -0,0 +1,70 @@
+"""
+Compares local publishing throughput: the console LocalPublisher against the
+NDJSON (and, with pyarrow, Parquet) file sink.
+
+Run from the project root:
+    python -m benchmarks.bench_sinks --records 20000 --body_size 2000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from benchmarks.fake_guardian import make_article
+from src.publisher import LocalPublisher
+from src.sinks import FilePublisher
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("--records", type=int, default=20000, help="articles to publish")
+parser.add_argument(
+    "--body_size",
+    type=int,
+    default=2000,
+    help="characters of fields.bodyText per article",
+)
+parser.add_argument(
+    "--page_size", type=int, default=200, help="articles per publish() call"
+)
+
+
+def measure(make_publisher, articles, page_size):
+    """Publishes page by page, with stdout discarded, and returns records/sec."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        publisher = make_publisher()
+        start = time.perf_counter()
+        for i in range(0, len(articles), page_size):
+            publisher.publish(articles[i : i + page_size])
+        close = getattr(publisher, "close", None)
+        if close is not None:
+            close()
+        elapsed = time.perf_counter() - start
+    return len(articles) / elapsed, publisher
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    articles = [make_article(i, args.body_size) for i in range(args.records)]
+
+    print(f"{args.records} articles, bodyText {args.body_size} chars")
+    print(f"{'sink':<12}{'records/s':>12}{'bytes written':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        sinks = {
+            "console": lambda: LocalPublisher("bench", "local"),
+            "ndjson": lambda: FilePublisher(os.path.join(tmp, "ndjson")),
+            "parquet": lambda: FilePublisher(
+                os.path.join(tmp, "parquet"), file_format="parquet"
+            ),
+        }
+        for name, make_publisher in sinks.items():
+            try:
+                rate, publisher = measure(make_publisher, articles, args.page_size)
+            except ImportError as e:
+                print(f"{name:<12}skipped: {e}")
+                continue
+            written = sum(
+                os.path.getsize(path) for path in getattr(publisher, "files", [])
+            )
+            print(f"{name:<12}{rate:>12,.0f}{written:>16,}")
@@ -0,0 +1,94 @@
+"""
+Measures the write-ahead spool: append throughput for each fsync policy and
+replay throughput into a moto Kinesis stream.
+
+Run from the project root:
+    python -m benchmarks.bench_spool --records 20000 --body_size 2000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import boto3
+from moto import mock_aws
+
+from benchmarks.fake_guardian import make_article
+from src.publisher import KinesisPublisher
+from src.spool import DEFAULT_SPOOL_BATCH_RECORDS, Spool
+
+REGION = "eu-west-2"
+STREAM = "bench-spool"
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("--records", type=int, default=20000, help="articles to spool")
+parser.add_argument(
+    "--body_size",
+    type=int,
+    default=2000,
+    help="characters of fields.bodyText per article",
+)
+parser.add_argument(
+    "--batch_records",
+    type=int,
+    default=DEFAULT_SPOOL_BATCH_RECORDS,
+    help="articles appended (and replayed) per batch",
+)
+parser.add_argument(
+    "--shards", type=int, default=4, help="shards of the moto Kinesis stream"
+)
+
+
+def measure_append(directory, articles, fsync, batch_records):
+    """Appends every article in batches and returns records/sec."""
+    spool = Spool(directory, fsync=fsync)
+    start = time.perf_counter()
+    for i in range(0, len(articles), batch_records):
+        spool.release(spool.append(articles[i : i + batch_records]))
+    elapsed = time.perf_counter() - start
+    spool.close()
+    return len(articles) / elapsed
+
+
+def measure_replay(directory, batch_records, shards):
+    """Replays a spool directory into moto Kinesis and returns records/sec."""
+    with mock_aws():
+        kinesis = boto3.client("kinesis", region_name=REGION)
+        kinesis.create_stream(StreamName=STREAM, ShardCount=shards)
+        publisher = KinesisPublisher(STREAM, REGION)
+
+        spool = Spool(directory)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = spool.replay(publisher, batch_records)
+        elapsed = time.perf_counter() - start
+        spool.close()
+    return stats, stats["acked"] / elapsed
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    articles = [make_article(i, args.body_size) for i in range(args.records)]
+
+    print(
+        f"{args.records} articles, bodyText {args.body_size} chars, "
+        f"{args.batch_records} per batch"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for fsync in ("never", "interval", "always"):
+            directory = os.path.join(tmp, fsync)
+            rate = measure_append(directory, articles, fsync, args.batch_records)
+            print(f"append (fsync={fsync:<8}) {rate:>12,.0f} records/s")
+
+        stats, rate = measure_replay(
+            os.path.join(tmp, "always"), args.batch_records, args.shards
+        )
+        print(
+            f"replay into moto Kinesis  {rate:>12,.0f} records/s "
+            f"({stats['acked']} acknowledged, {stats['pending']} pending)"
+        )
@@ -0,0 +1,158 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def make_article(index: int, body_size: int = 0, spacing_minutes: int = 1) -> dict:
+    """
+    Builds a fake Guardian article. Higher indexes are older articles, published
+    spacing_minutes apart.
+    """
+    published = datetime(2025, 10, 1, 12, 0, 0) - timedelta(
+        minutes=index * spacing_minutes
+    )
+    article = {
+        "id": f"technology/2025/oct/01/article-{index}",
+        "type": "article",
+        "sectionId": "technology",
+        "sectionName": "Technology",
+        "webPublicationDate": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "webTitle": f"Stub article {index}",
+        "webUrl": f"https://www.theguardian.com/technology/article-{index}",
+        "apiUrl": f"https://content.guardianapis.com/technology/article-{index}",
+        "isHosted": False,
+        "pillarId": "pillar/news",
+        "pillarName": "News",
+    }
+    if body_size:
+        article["fields"] = {"bodyText": ("lorem ipsum " * body_size)[:body_size]}
+    return article
+
+
+class GuardianStubServer:
+    """
+    A local HTTP server that imitates the Guardian /search endpoint.
+
+    Results are returned newest first and split into pages according to the
+    page and page-size query parameters. Every request sleeps for `latency`
+    seconds to simulate a network round trip. With filter_dates, the from-date
+    and to-date parameters select articles by publication day, like the real
+    API; spacing_minutes spreads the articles over more days.
+
+    Usage:
+        with GuardianStubServer(total_results=120, latency=0.05) as stub:
+            fetch_guardian_content(stub.url, params, "test-key")
+    """
+
+    def __init__(
+        self,
+        total_results: int = 30,
+        latency: float = 0.0,
+        body_size: int = 0,
+        spacing_minutes: int = 1,
+        filter_dates: bool = False,
+    ):
+        self.total_results = total_results
+        self.latency = latency
+        self.body_size = body_size
+        self.spacing_minutes = spacing_minutes
+        self.filter_dates = filter_dates
+        self.requests = []
+        self.status_overrides = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/search"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = {
+                    k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()
+                }
+                stub.requests.append(query)
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                page = int(query.get("page", 1))
+                status = stub.status_overrides.get(page, 200)
+                if status != 200:
+                    self._send(status, {"message": "stubbed failure"})
+                    return
+
+                indexes = stub.matching_indexes(query)
+                page_size = int(query.get("page-size", 10))
+                pages = max(1, -(-len(indexes) // page_size))
+                start = (page - 1) * page_size
+                results = [
+                    make_article(i, stub.body_size, stub.spacing_minutes)
+                    for i in indexes[start : start + page_size]
+                ]
+                self._send(
+                    200,
+                    {
+                        "response": {
+                            "status": "ok",
+                            "userTier": "developer",
+                            "total": len(indexes),
+                            "startIndex": start + 1,
+                            "pageSize": page_size,
+                            "currentPage": page,
+                            "pages": pages,
+                            "orderBy": query.get("order-by", "relevance"),
+                            "results": results,
+                        }
+                    },
+                )
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def matching_indexes(self, query: dict) -> list:
+        """Indexes of the articles a query selects, newest first."""
+        if not self.filter_dates:
+            return list(range(self.total_results))
+        from_date = query.get("from-date", "0000-00-00")
+        to_date = query.get("to-date", "9999-99-99")
+        return [
+            i
+            for i in range(self.total_results)
+            if from_date
+            <= make_article(i, spacing_minutes=self.spacing_minutes)[
+                "webPublicationDate"
+            ][:10]
+            <= to_date
+        ]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,85 @@
+import json
+import struct
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# --- AGGREGATED RECORD FORMAT ---
+# An aggregated Kinesis record is MAGIC followed by one or more
+# (4-byte big-endian length, payload) pairs. Plain JSON records start with "{"
+# so they can never be mistaken for an aggregate.
+MAGIC = b"GA\x01"
+LENGTH_PREFIX = struct.Struct(">I")
+# Kinesis bills in 25 KB PUT payload units, so this packs one unit per record
+DEFAULT_AGGREGATE_BYTES = 25 * 1024
+# --------------------------------
+
+
+def aggregate(
+    items: Iterable[Tuple[str, bytes]], max_bytes: int = DEFAULT_AGGREGATE_BYTES
+) -> Iterator[Tuple[str, bytes, int]]:
+    """
+    Packs many small payloads into as few aggregated records as possible.
+
+    Payloads are added in order until the next one would push the aggregate
+    past max_bytes. A payload larger than max_bytes gets an aggregate of its own.
+
+    Args:
+        items: (partition_key, payload) pairs, e.g. one per article.
+        max_bytes: Maximum size of an aggregated record, including framing.
+
+    Yields:
+        (partition_key, data, count) for each aggregated record, where the
+        partition key is the first packed item's key and count is the number of
+        payloads packed into data.
+    """
+    partition_key, parts, size = None, [], len(MAGIC)
+
+    for key, payload in items:
+        framed = LENGTH_PREFIX.pack(len(payload)) + payload
+        if parts and size + len(framed) > max_bytes:
+            yield partition_key, MAGIC + b"".join(parts), len(parts)
+            partition_key, parts, size = None, [], len(MAGIC)
+
+        if partition_key is None:
+            partition_key = key
+        parts.append(framed)
+        size += len(framed)
+
+    if parts:
+        yield partition_key, MAGIC + b"".join(parts), len(parts)
+
+
+def is_aggregated(data: bytes) -> bool:
+    """Returns True if data is in the aggregated record format."""
+    return data[: len(MAGIC)] == MAGIC
+
+
+def deaggregate(data: bytes) -> List[bytes]:
+    """
+    Splits an aggregated record back into its payloads.
+
+    Records that are not aggregated are returned unchanged as a single payload,
+    so consumers can call this on every record they read.
+
+    Raises:
+        ValueError: If an aggregated record is truncated.
+    """
+    if not is_aggregated(data):
+        return [data]
+
+    payloads = []
+    offset = len(MAGIC)
+    while offset < len(data):
+        if offset + LENGTH_PREFIX.size > len(data):
+            raise ValueError("Truncated aggregated record: incomplete length prefix.")
+        (length,) = LENGTH_PREFIX.unpack_from(data, offset)
+        offset += LENGTH_PREFIX.size
+        if offset + length > len(data):
+            raise ValueError("Truncated aggregated record: incomplete payload.")
+        payloads.append(data[offset : offset + length])
+        offset += length
+    return payloads
+
+
+def deaggregate_records(data: bytes) -> List[Dict[str, Any]]:
+    """Consumer helper: returns the articles held in a Kinesis record's Data."""
+    return [json.loads(payload) for payload in deaggregate(data)]
@@ -1,6 +1,445 @@
-from typing import Any, Dict
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from src.cache import (
+    ResponseCache,
+    cache_from_env,
+    conditional_headers,
+    make_cache_key,
+)
+from src.json_stream import STREAM_CHUNK_SIZE, ResultStream
+from src.metrics import METRICS
+from src.rate_limiter import (
+    QuotaExceededError,
+    RateLimiter,
+    rate_limiter_from_env,
+    retry_after_seconds,
+)
+
+# --- CONNECTION POOL CONFIGURATION ---
+DEFAULT_POOL_SIZE = 10
+# (connect timeout, read timeout) in seconds
+DEFAULT_TIMEOUT = (3.05, 10)
+# The Guardian API caps page-size at 200 results per request
+MAX_PAGE_SIZE = 200
+# Times a 429 (Too Many Requests) response is retried before giving up
+DEFAULT_RATE_LIMIT_RETRIES = 3
+# -------------------------------------
+
+# Global client for connection reuse (runs once per container/process lifecycle)
+GUARDIAN_CLIENT = None
+
+
+class GuardianClient:
+    """
+    A reusable Guardian API client backed by a pooled requests.Session.
+
+    Keep-alive connections are held in the session's pool, so repeated fetches
+    from a warm Lambda container or a long-running CLI loop skip the TCP and
+    TLS handshake. An optional RateLimiter paces requests and enforces the
+    daily quota, and an optional ResponseCache answers repeated queries
+    without spending quota. With stream_json, iter_results parses each page
+    incrementally instead of loading the whole response first. With
+    on_unauthorized, a 401 caused by a rotated key is retried once with the
+    refreshed key.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: tuple = DEFAULT_TIMEOUT,
+        max_retries: int = 0,
+        rate_limiter: RateLimiter = None,
+        rate_limit_retries: int = DEFAULT_RATE_LIMIT_RETRIES,
+        cache: ResponseCache = None,
+        stream_json: bool = False,
+        on_unauthorized: Callable[[str], Optional[str]] = None,
+    ):
+        """
+        Initializes the HTTP session and mounts a pooled adapter on it.
+
+        Args:
+            pool_size: Maximum number of keep-alive connections kept per host.
+            timeout: A (connect, read) tuple, or a single number, in seconds.
+            max_retries: Connection-level retries performed by urllib3.
+            rate_limiter: Paces requests and tracks the daily quota. None
+                disables client-side rate limiting.
+            rate_limit_retries: Times a 429 response is retried, honouring
+                its Retry-After header.
+            cache: Serves fresh responses locally and revalidates stale ones
+                with ETag/Last-Modified. None disables caching.
+            stream_json: Yield results from iter_results while each page
+                is still downloading (see fetch_stream).
+            on_unauthorized: Called with the rejected key when the API returns
+                401. It returns a replacement key (e.g. after refreshing the
+                secret), which the request is retried with once and which
+                replaces the rejected key in later calls, or None.
+        """
+        self.timeout = timeout
+        self.stream_json = stream_json
+        self.on_unauthorized = on_unauthorized
+        # Rejected API key -> the key that replaced it after a 401
+        self.replaced_keys = {}
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.rate_limit_retries = rate_limit_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=max_retries
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch(self, api_url: str, params: dict, api_key: str) -> Dict[str, Any] or None:
+        """
+        Connects to the Guardian API using the given URL, search parameters, and API key.
+
+        Args:
+            api_url: The base URL for the Guardian API search endpoint.
+            params: Dictionary of query parameters (q, from-date, order-by, etc.).
+            api_key: The secure API key retrieved from Secrets Manager.
+
+        Returns:
+            The JSON response dictionary if status 200, otherwise None.
+        """
+        # Create a new dictionary for the request parameters, keep it pure.
+        request_params = params.copy()
+        # Add the required API key (or the key that replaced it after a 401)
+        request_params["api-key"] = self.replaced_keys.get(api_key, api_key)
+
+        # --- Cache check ---
+        cache_key, cached, request_kwargs = None, None, {}
+        if self.cache is not None:
+            cache_key = make_cache_key(api_url, params)
+            cached, fresh = self.cache.lookup(cache_key)
+            if fresh:
+                METRICS.incr("guardian_cache_hits")
+                return cached["data"]
+            headers = conditional_headers(cached)
+            if headers:
+                request_kwargs["headers"] = headers
+
+        response = self._send(api_url, request_params, **request_kwargs)
+        if response is None:
+            return None
+
+        if response.status_code == 200:
+            print("Status code:", response.status_code)
+            METRICS.incr("guardian_bytes_downloaded", len(response.content), "Bytes")
+            with METRICS.timer("guardian_parse_ms"):
+                data = response.json()
+            if cache_key is not None:
+                self.cache.store(
+                    cache_key,
+                    data,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    raw=response.content,
+                )
+            return data
+        elif response.status_code == 304 and cached is not None:
+            print("Status code: 304 (not modified, served from cache)")
+            self.cache.revalidate(cache_key)
+            return cached["data"]
+        self._report_error(response)
+        return None
+
+    def fetch_stream(
+        self, api_url: str, params: dict, api_key: str
+    ) -> ResultStream or None:
+        """
+        Like fetch, but returns the page as a ResultStream that yields each
+        result while the body is still downloading.
+
+        A fresh cache entry is served from memory, but streamed pages are not
+        written to the cache: storing them would mean holding the whole page,
+        which is what streaming avoids.
+
+        Returns:
+            A ResultStream if status 200 (or 304 with a cached copy),
+            otherwise None.
+        """
+        request_params = params.copy()
+        request_params["api-key"] = self.replaced_keys.get(api_key, api_key)
+
+        cached, request_kwargs = None, {"stream": True}
+        if self.cache is not None:
+            cache_key = make_cache_key(api_url, params)
+            cached, fresh = self.cache.lookup(cache_key)
+            if fresh:
+                METRICS.incr("guardian_cache_hits")
+                return ResultStream.from_data(cached["data"])
+            headers = conditional_headers(cached)
+            if headers:
+                request_kwargs["headers"] = headers
+
+        response = self._send(api_url, request_params, **request_kwargs)
+        if response is None:
+            return None
+
+        if response.status_code == 200:
+            print("Status code:", response.status_code)
+            return ResultStream(
+                count_bytes(response.iter_content(chunk_size=STREAM_CHUNK_SIZE)),
+                close=response.close,
+            )
+        elif response.status_code == 304 and cached is not None:
+            print("Status code: 304 (not modified, served from cache)")
+            self.cache.revalidate(cache_key)
+            response.close()
+            return ResultStream.from_data(cached["data"])
+
+        self._report_error(response)
+        response.close()
+        return None
+
+    def _send(
+        self,
+        api_url: str,
+        request_params: dict,
+        retry_unauthorized: bool = True,
+        **request_kwargs,
+    ):
+        """
+        Sends a GET through the pooled session, pacing it with the rate
+        limiter and retrying 429 responses after their Retry-After delay.
+        A 401 is retried once with the key returned by on_unauthorized.
+
+        Returns:
+            The last response, or None if the daily quota is exhausted.
+        """
+        for attempt in range(self.rate_limit_retries + 1):
+            if self.rate_limiter is not None:
+                try:
+                    self.rate_limiter.acquire()
+                except QuotaExceededError as e:
+                    print(f"Error: {e}")
+                    return None
+
+            METRICS.incr("guardian_requests")
+            with METRICS.span("guardian_fetch_latency_ms"):
+                response = self.session.get(
+                    api_url,
+                    params=request_params,
+                    timeout=self.timeout,
+                    **request_kwargs,
+                )
+
+            if response.status_code == 429:
+                METRICS.incr("guardian_throttles")
+            if response.status_code != 429 or attempt == self.rate_limit_retries:
+                break
+
+            METRICS.incr("guardian_retries")
+            delay = retry_after_seconds(response.headers, attempt)
+            print(f"Warning: Rate limited (429). Retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+        if (
+            response.status_code == 401
+            and retry_unauthorized
+            and self.on_unauthorized is not None
+        ):
+            rejected_key = request_params["api-key"]
+            new_key = self.on_unauthorized(rejected_key)
+            if new_key and new_key != rejected_key:
+                print("Warning: Unauthorized (401). Retrying with a refreshed key...")
+                METRICS.incr("guardian_retries")
+                response.close()
+                self.replaced_keys[rejected_key] = new_key
+                request_params = dict(request_params, **{"api-key": new_key})
+                return self._send(
+                    api_url, request_params, retry_unauthorized=False, **request_kwargs
+                )
+
+        return response
+
+    def _report_error(self, response):
+        """Prints why a request did not return a usable response."""
+        METRICS.incr("guardian_errors")
+        if response.status_code == 401:
+            print(
+                "Error: Unauthorized. Check your API key retrieved from Secrets Manager."
+            )
+        elif response.status_code == 429:
+            print("Error: Rate limited (429). Retries exhausted.")
+        else:
+            print(f"Error: Received status code {response.status_code}")
+            print("Response:", response.text)
+
+    def remaining_quota(self) -> int or None:
+        """Returns the requests left in today's quota, or None if unlimited."""
+        if self.rate_limiter is None:
+            return None
+        return self.rate_limiter.remaining_quota()
+
+    def iter_pages(
+        self,
+        api_url: str,
+        params: dict,
+        api_key: str,
+        page_size: int = MAX_PAGE_SIZE,
+        max_pages: int = None,
+        walk: Dict[str, Any] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Walks the result set page by page, following response.pages.
+
+        Args:
+            api_url: The base URL for the Guardian API search endpoint.
+            params: Dictionary of query parameters (q, from-date, order-by, etc.).
+            api_key: The secure API key retrieved from Secrets Manager.
+            page_size: Results requested per page, capped at MAX_PAGE_SIZE.
+            max_pages: Stop after this many pages. None walks every page.
+            walk: Optional dictionary filled in place with the pages fetched,
+                the total pages and results reported by the API, and an
+                "error" if a page failed (see start_walk).
+
+        Yields:
+            The JSON response dictionary of each page. Iteration stops early
+            if a page fails to fetch; walk["error"] tells the caller that the
+            result set is incomplete, e.g. so it does not save a checkpoint.
+        """
+        walk = start_walk(walk)
+        page_params = params.copy()
+        page_params["page-size"] = min(page_size, MAX_PAGE_SIZE)
+        page = 1
+
+        while True:
+            page_params["page"] = page
+            data = self.fetch(api_url, page_params, api_key)
+            if not data or "response" not in data:
+                fail_walk(walk, page)
+                return
+
+            results = data["response"].get("results", [])
+            METRICS.observe("guardian_records_per_page", len(results), "Count")
+            record_page(walk, data["response"], len(results))
+            yield data
+
+            total_pages = data["response"].get("pages", 1)
+            if page >= total_pages or (max_pages is not None and page >= max_pages):
+                return
+            page += 1
+
+    def iter_results(
+        self,
+        api_url: str,
+        params: dict,
+        api_key: str,
+        page_size: int = MAX_PAGE_SIZE,
+        max_pages: int = None,
+        walk: Dict[str, Any] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yields articles one at a time across every page of the result set.
+
+        Only one page is held in memory at a time; with stream_json, only one
+        article. Arguments are the same as iter_pages.
+        """
+        if not self.stream_json:
+            for data in self.iter_pages(
+                api_url, params, api_key, page_size, max_pages, walk
+            ):
+                yield from data["response"].get("results", [])
+            return
+
+        walk = start_walk(walk)
+        page_params = params.copy()
+        page_params["page-size"] = min(page_size, MAX_PAGE_SIZE)
+        page = 1
+
+        while True:
+            page_params["page"] = page
+            results = self.fetch_stream(api_url, page_params, api_key)
+            if results is None:
+                fail_walk(walk, page)
+                return
+
+            count = 0
+            for article in results:
+                count += 1
+                yield article
+            METRICS.observe("guardian_records_per_page", count, "Count")
+            record_page(walk, results.response, count)
+
+            # The page count is only known once the whole page has been read
+            total_pages = results.response.get("pages", 1)
+            if page >= total_pages or (max_pages is not None and page >= max_pages):
+                return
+            page += 1
+
+    def close(self):
+        """Closes the session and releases every pooled connection."""
+        self.session.close()
+
+
+def start_walk(walk: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Resets (or creates) the dictionary that reports how far a walk over the
+    result set got: "pages" and "results" fetched so far, the "total_pages"
+    and "total" results reported by the API, and "error", which is None
+    unless a page failed to fetch and the walk stopped before its last page.
+    """
+    if walk is None:
+        walk = {}
+    walk.update(pages=0, results=0, total_pages=None, total=None, error=None)
+    return walk
+
+
+def record_page(walk: Dict[str, Any], response: Dict[str, Any], count: int):
+    """Adds a fetched page and its `count` results to a walk."""
+    walk["pages"] += 1
+    walk["results"] += count
+    walk["total_pages"] = response.get("pages", walk["total_pages"])
+    walk["total"] = response.get("total", walk["total"])
+
+
+def fail_walk(walk: Dict[str, Any], page: int):
+    """Marks a walk as stopped early because `page` could not be fetched."""
+    METRICS.incr("guardian_incomplete_walks")
+    total_pages = walk["total_pages"] or "?"
+    walk["error"] = (
+        f"page {page} of {total_pages} failed after {walk['results']} results"
+    )
+    print(f"Warning: Stopped paginating early: {walk['error']}.")
+
+
+def count_bytes(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Passes chunks through, adding their size to guardian_bytes_downloaded."""
+    for chunk in chunks:
+        METRICS.incr("guardian_bytes_downloaded", len(chunk), "Bytes")
+        yield chunk
+
+
+def get_client() -> GuardianClient:
+    """
+    Returns the cached GuardianClient, creating it on first use.
+
+    Pool size and timeouts can be tuned with the GUARDIAN_POOL_SIZE and
+    GUARDIAN_TIMEOUT (seconds) environment variables, and
+    GUARDIAN_STREAM_JSON=true parses result pages incrementally. Rate
+    limiting and caching are configured as described in rate_limiter_from_env
+    and cache_from_env.
+    """
+    global GUARDIAN_CLIENT
+
+    if GUARDIAN_CLIENT is None:
+        pool_size = int(os.environ.get("GUARDIAN_POOL_SIZE", DEFAULT_POOL_SIZE))
+        timeout = os.environ.get("GUARDIAN_TIMEOUT")
+        GUARDIAN_CLIENT = GuardianClient(
+            pool_size=pool_size,
+            timeout=float(timeout) if timeout else DEFAULT_TIMEOUT,
+            rate_limiter=rate_limiter_from_env(),
+            cache=cache_from_env(),
+            stream_json=os.environ.get("GUARDIAN_STREAM_JSON", "").lower() == "true",
+        )
+
+    return GUARDIAN_CLIENT
 
 
 def fetch_guardian_content(
@@ -9,6 +448,8 @@ def fetch_guardian_content(
     """
     Connects to the Guardian API using the given URL, search parameters, and API key.
 
+    This is a thin wrapper over the shared, pooled GuardianClient.
+
     Args:
         api_url: The base URL for the Guardian API search endpoint.
         params: Dictionary of query parameters (q, from-date, order-by, etc.).
@@ -17,20 +458,62 @@ def fetch_guardian_content(
     Returns:
         The JSON response dictionary if status 200, otherwise None.
     """
-    # Create a new dictionary for the request parameters, keep it pure.
-    request_params = params.copy()
-    request_params["api-key"] = api_key  # Add the required API key
-
-    response = requests.get(
-        api_url, params=request_params
-    )  # Use the 'params' argument in requests.get()
-
-    if response.status_code == 200:
-        print("Status code:", response.status_code)
-        return response.json()
-    elif response.status_code == 401:
-        print("Error: Unauthorized. Check your API key retrieved from Secrets Manager.")
-    else:
-        print(f"Error: Received status code {response.status_code}")
-        print("Response:", response.text)
-    return None
+    return get_client().fetch(api_url, params, api_key)
+
+
+def get_remaining_quota() -> int or None:
+    """
+    Returns how many requests are left in today's quota, so callers can check
+    the budget before scheduling a backfill.
+    """
+    return get_client().remaining_quota()
+
+
+def get_cache_stats() -> dict or None:
+    """Returns hit/miss counters of the shared response cache, if enabled."""
+    cache = get_client().cache
+    return cache.stats() if cache is not None else None
+
+
+def iter_guardian_pages(
+    api_url: str,
+    params: dict,
+    api_key: str,
+    page_size: int = MAX_PAGE_SIZE,
+    max_pages: int = None,
+    walk: Dict[str, Any] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields each page of the result set using the shared GuardianClient.
+    walk is filled in as described in GuardianClient.iter_pages.
+    """
+    return get_client().iter_pages(api_url, params, api_key, page_size, max_pages, walk)
+
+
+def iter_guardian_results(
+    api_url: str,
+    params: dict,
+    api_key: str,
+    page_size: int = MAX_PAGE_SIZE,
+    max_pages: int = None,
+    walk: Dict[str, Any] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields articles one at a time across the full Guardian result set.
+
+    Args:
+        api_url: The base URL for the Guardian API search endpoint.
+        params: Dictionary of query parameters (q, from-date, order-by, etc.).
+        api_key: The secure API key retrieved from Secrets Manager.
+        page_size: Results requested per page, capped at MAX_PAGE_SIZE.
+        max_pages: Stop after this many pages. None walks every page.
+        walk: Optional dictionary whose "error" is set if a page failed and
+            the results are incomplete (see GuardianClient.iter_pages).
+
+    Returns:
+        A generator of article dictionaries, suitable for passing straight to
+        a publisher.
+    """
+    return get_client().iter_results(
+        api_url, params, api_key, page_size, max_pages, walk
+    )
@@ -0,0 +1,246 @@
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List
+
+import httpx
+
+from src.api_client import (
+    DEFAULT_POOL_SIZE,
+    DEFAULT_RATE_LIMIT_RETRIES,
+    MAX_PAGE_SIZE,
+    fail_walk,
+    record_page,
+    start_walk,
+)
+from src.metrics import METRICS
+from src.rate_limiter import QuotaExceededError, RateLimiter, retry_after_seconds
+
+# --- CONCURRENCY CONFIGURATION ---
+# Maximum number of pages requested (and held in memory) at the same time
+DEFAULT_CONCURRENCY = 4
+# Seconds allowed for each request
+DEFAULT_ASYNC_TIMEOUT = 10.0
+# ---------------------------------
+
+
+class AsyncGuardianClient:
+    """
+    An asyncio Guardian API client that prefetches pages concurrently.
+
+    The first page is fetched on its own to learn response.pages, then the
+    remaining pages are requested through a sliding window of at most
+    `concurrency` in-flight requests. Pages are always yielded in page order,
+    so results keep the order-by=newest ordering of the API.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_ASYNC_TIMEOUT,
+        rate_limiter: RateLimiter = None,
+        rate_limit_retries: int = DEFAULT_RATE_LIMIT_RETRIES,
+    ):
+        """
+        Args:
+            concurrency: Maximum number of page requests in flight at once.
+            pool_size: Maximum number of keep-alive connections to the API.
+            timeout: Seconds allowed for each request.
+            rate_limiter: Paces requests and tracks the daily quota. None
+                disables client-side rate limiting.
+            rate_limit_retries: Times a 429 response is retried.
+        """
+        self.concurrency = max(1, concurrency)
+        self.limits = httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        )
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.rate_limit_retries = rate_limit_retries
+
+    async def fetch(
+        self, http: httpx.AsyncClient, api_url: str, params: dict, api_key: str
+    ) -> Dict[str, Any] or None:
+        """
+        Fetches a single page. Mirrors GuardianClient.fetch.
+
+        Returns:
+            The JSON response dictionary if status 200, otherwise None.
+        """
+        request_params = params.copy()
+        request_params["api-key"] = api_key
+
+        for attempt in range(self.rate_limit_retries + 1):
+            if self.rate_limiter is not None:
+                try:
+                    # The token bucket blocks, so wait for it off the event loop
+                    await asyncio.to_thread(self.rate_limiter.acquire)
+                except QuotaExceededError as e:
+                    print(f"Error: {e}")
+                    return None
+
+            METRICS.incr("guardian_requests")
+            with METRICS.span("guardian_fetch_latency_ms"):
+                response = await http.get(api_url, params=request_params)
+
+            if response.status_code != 429:
+                break
+            METRICS.incr("guardian_throttles")
+            if attempt == self.rate_limit_retries:
+                break
+
+            METRICS.incr("guardian_retries")
+            delay = retry_after_seconds(response.headers, attempt)
+            print(f"Warning: Rate limited (429). Retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+
+        if response.status_code == 200:
+            METRICS.incr("guardian_bytes_downloaded", len(response.content), "Bytes")
+            with METRICS.timer("guardian_parse_ms"):
+                return response.json()
+
+        METRICS.incr("guardian_errors")
+        if response.status_code == 401:
+            print(
+                "Error: Unauthorized. Check your API key retrieved from Secrets Manager."
+            )
+        elif response.status_code == 429:
+            print("Error: Rate limited (429). Retries exhausted.")
+        else:
+            print(f"Error: Received status code {response.status_code}")
+            print("Response:", response.text)
+        return None
+
+    async def iter_pages(
+        self,
+        api_url: str,
+        params: dict,
+        api_key: str,
+        page_size: int = MAX_PAGE_SIZE,
+        max_pages: int = None,
+        walk: Dict[str, Any] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields the JSON response of every page, in page order.
+
+        Iteration stops at the first page that fails to fetch; requests
+        still in flight at that point are cancelled. As with
+        GuardianClient.iter_pages, the optional walk dictionary is filled in
+        place and its "error" marks a result set that stopped early.
+        """
+        walk = start_walk(walk)
+        base_params = params.copy()
+        base_params["page-size"] = min(page_size, MAX_PAGE_SIZE)
+
+        def page_params(page: int) -> dict:
+            request_params = base_params.copy()
+            request_params["page"] = page
+            return request_params
+
+        async with httpx.AsyncClient(limits=self.limits, timeout=self.timeout) as http:
+            first = await self.fetch(http, api_url, page_params(1), api_key)
+            if not first or "response" not in first:
+                fail_walk(walk, 1)
+                return
+            record_page(
+                walk, first["response"], len(first["response"].get("results", []))
+            )
+            yield first
+
+            total_pages = first["response"].get("pages", 1)
+            if max_pages is not None:
+                total_pages = min(total_pages, max_pages)
+
+            page = next_page = 2
+            in_flight = deque()
+            try:
+                while next_page <= total_pages or in_flight:
+                    # Keep the window full before waiting on the oldest page
+                    while (
+                        next_page <= total_pages and len(in_flight) < self.concurrency
+                    ):
+                        in_flight.append(
+                            asyncio.ensure_future(
+                                self.fetch(
+                                    http, api_url, page_params(next_page), api_key
+                                )
+                            )
+                        )
+                        next_page += 1
+
+                    data = await in_flight.popleft()
+                    if not data or "response" not in data:
+                        fail_walk(walk, page)
+                        return
+                    results = data["response"].get("results", [])
+                    record_page(walk, data["response"], len(results))
+                    yield data
+                    page += 1
+            finally:
+                for task in in_flight:
+                    task.cancel()
+
+    async def iter_results(
+        self,
+        api_url: str,
+        params: dict,
+        api_key: str,
+        page_size: int = MAX_PAGE_SIZE,
+        max_pages: int = None,
+        walk: Dict[str, Any] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields articles one at a time, in the order returned by the API.
+
+        See iter_pages for how a failed page is reported in walk.
+        """
+        async for data in self.iter_pages(
+            api_url, params, api_key, page_size, max_pages, walk
+        ):
+            for article in data["response"].get("results", []):
+                yield article
+
+
+def fetch_guardian_results_concurrently(
+    api_url: str,
+    params: dict,
+    api_key: str,
+    page_size: int = MAX_PAGE_SIZE,
+    max_pages: int = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate_limiter: RateLimiter = None,
+    walk: Dict[str, Any] = None,
+) -> List[Dict[str, Any]] or None:
+    """
+    Synchronous entry point that collects every article using AsyncGuardianClient.
+
+    Args:
+        api_url: The base URL for the Guardian API search endpoint.
+        params: Dictionary of query parameters (q, from-date, order-by, etc.).
+        api_key: The secure API key retrieved from Secrets Manager.
+        page_size: Results requested per page, capped at MAX_PAGE_SIZE.
+        max_pages: Stop after this many pages. None walks every page.
+        concurrency: Maximum number of page requests in flight at once.
+        rate_limiter: Optional RateLimiter shared with other clients.
+        walk: Optional dictionary filled in place with how far the walk got
+            (see start_walk in src.api_client).
+
+    Returns:
+        A list of article dictionaries in API order, or None if a page failed
+        to fetch, so a partial result set is never mistaken for a complete one.
+    """
+    client = AsyncGuardianClient(concurrency=concurrency, rate_limiter=rate_limiter)
+    walk = start_walk(walk)
+
+    async def collect():
+        return [
+            article
+            async for article in client.iter_results(
+                api_url, params, api_key, page_size, max_pages, walk
+            )
+        ]
+
+    results = asyncio.run(collect())
+    if walk["error"]:
+        return None
+    return results
@@ -0,0 +1,364 @@
+import json
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+from src.api_client import (
+    MAX_PAGE_SIZE,
+    fetch_guardian_content,
+    get_client,
+    iter_guardian_pages,
+)
+from src.utils import build_search_params
+
+# --- BACKFILL CONFIGURATION ---
+# Windows are split until each holds at most this many results
+DEFAULT_WINDOW_RESULTS = 2000
+DEFAULT_BACKFILL_WORKERS = 4
+# Pages buffered between the fetch threads and the publisher
+DEFAULT_BACKFILL_QUEUE_SIZE = 16
+# ------------------------------
+
+# Queue marker sent by a worker when its window is finished
+_WINDOW_DONE = object()
+
+
+def default_manifest_path(search_term: str, start: date, end: date) -> str:
+    """A manifest file name unique to the term and date range, in the temp dir."""
+    slug = re.sub(r"[^a-z0-9]+", "_", search_term.lower()).strip("_")
+    return os.path.join(
+        tempfile.gettempdir(), f"guardian_backfill_{slug}_{start}_{end}.json"
+    )
+
+
+def window_params(
+    search_term: str, start: date, end: date, show_fields: str = None
+) -> dict:
+    """Search parameters for one window, both dates inclusive."""
+    return build_search_params(
+        {
+            "search_term": search_term,
+            "date_from": start,
+            "date_to": end,
+            "show_fields": show_fields,
+        }
+    )
+
+
+def count_results(api_url: str, params: dict, api_key: str) -> int or None:
+    """Asks the API how many results a query has, with a one-result request."""
+    data = fetch_guardian_content(api_url, dict(params, **{"page-size": 1}), api_key)
+    if not data or "response" not in data:
+        return None
+    return data["response"].get("total", 0)
+
+
+def plan_windows(
+    api_url: str,
+    search_term: str,
+    api_key: str,
+    start: date,
+    end: date,
+    max_results: int = DEFAULT_WINDOW_RESULTS,
+) -> List[Dict[str, Any]]:
+    """
+    Splits [start, end] into date windows of at most max_results results.
+
+    Each range is probed for its result count and halved until it is small
+    enough or a single day, so busy periods get narrow windows and quiet
+    periods wide ones. Empty windows are dropped.
+
+    Raises:
+        RuntimeError: If a result count cannot be fetched.
+    """
+    windows = []
+    ranges = [(start, end)]
+    while ranges:
+        window_start, window_end = ranges.pop()
+        total = count_results(
+            api_url, window_params(search_term, window_start, window_end), api_key
+        )
+        if total is None:
+            raise RuntimeError(
+                f"Could not count results for {window_start} to {window_end}."
+            )
+        if total == 0:
+            continue
+        if total <= max_results or window_start == window_end:
+            windows.append(
+                {
+                    "from": window_start.isoformat(),
+                    "to": window_end.isoformat(),
+                    "total": total,
+                    "done": False,
+                    "published": 0,
+                }
+            )
+            continue
+        middle = window_start + (window_end - window_start) // 2
+        # The newer half is pushed last so it is planned (and run) first
+        ranges.append((window_start, middle))
+        ranges.append((middle + timedelta(days=1), window_end))
+
+    return windows
+
+
+class BackfillManifest:
+    """
+    The plan and progress of a backfill, saved as JSON after every window.
+
+    A backfill restarted with the same term and dates reloads it and skips
+    the windows already marked done. A window that was interrupted is fetched
+    again in full, so records may be published twice but never lost.
+    """
+
+    def __init__(self, path: str, search_term: str, start: date, end: date):
+        self.path = path
+        self.search_term = search_term
+        self.start = start.isoformat()
+        self.end = end.isoformat()
+        self.windows = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if (data.get("search_term"), data.get("start"), data.get("end")) == (
+            self.search_term,
+            self.start,
+            self.end,
+        ):
+            self.windows = data["windows"]
+
+    def save(self):
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(
+                    {
+                        "search_term": self.search_term,
+                        "start": self.start,
+                        "end": self.end,
+                        "windows": self.windows,
+                    },
+                    f,
+                    indent=2,
+                )
+            os.replace(tmp_path, self.path)
+
+    def pending(self) -> List[Dict[str, Any]]:
+        return [window for window in self.windows if not window["done"]]
+
+
+class ProgressReporter:
+    """Tracks published articles and prints progress, throughput and ETA."""
+
+    def __init__(self, expected: int, done: int = 0, clock=time.monotonic):
+        self.expected = expected
+        self.done = done
+        self.published = 0
+        self._clock = clock
+        self._started = clock()
+
+    def add(self, count: int):
+        self.published += count
+        self.done += count
+
+    def throughput(self) -> float:
+        """Articles published per second in this run."""
+        elapsed = self._clock() - self._started
+        return self.published / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self) -> float or None:
+        rate = self.throughput()
+        if rate <= 0:
+            return None
+        return max(0, self.expected - self.done) / rate
+
+    def report(self, windows_done: int, windows_total: int) -> str:
+        percent = 100 * self.done / self.expected if self.expected else 100.0
+        eta = self.eta_seconds()
+        line = (
+            f"Progress: {self.done}/{self.expected} articles ({percent:.1f}%), "
+            f"windows {windows_done}/{windows_total}, "
+            f"{self.throughput():.1f} articles/s, "
+            f"ETA {f'{eta:.0f}s' if eta is not None else 'unknown'}"
+        )
+        print(line)
+        return line
+
+
+def run_backfill(
+    api_url: str,
+    search_term: str,
+    api_key: str,
+    start: date,
+    end: date,
+    publisher,
+    manifest_path: str = None,
+    workers: int = DEFAULT_BACKFILL_WORKERS,
+    page_size: int = MAX_PAGE_SIZE,
+    max_window_results: int = DEFAULT_WINDOW_RESULTS,
+    show_fields: str = None,
+) -> Dict[str, Any]:
+    """
+    Loads every article for a term between two dates (inclusive).
+
+    The range is planned into windows (see plan_windows), which are fetched
+    by a thread pool on the shared GuardianClient, so the global rate limiter
+    and daily quota apply across all workers. Pages stream to the publisher
+    as they arrive. A window is marked done in the manifest once all its
+    pages are published, so a crashed or interrupted backfill resumes from
+    the windows still pending.
+
+    Args:
+        api_url: The base URL for the Guardian API search endpoint.
+        search_term: The term to backfill.
+        api_key: The Guardian API key.
+        start: First publication day to load.
+        end: Last publication day to load.
+        publisher: Anything with publish(records).
+        manifest_path: Where progress is saved. Defaults to a file in the
+            temp dir named after the term and dates.
+        workers: Windows fetched at the same time.
+        page_size: Results requested per page.
+        max_window_results: Upper bound on the results of one window.
+        show_fields: Optional show-fields parameter, e.g. "bodyText".
+
+    Returns:
+        A summary with the windows done/failed, articles published, expected
+        total, elapsed seconds and throughput.
+    """
+    manifest = BackfillManifest(
+        manifest_path or default_manifest_path(search_term, start, end),
+        search_term,
+        start,
+        end,
+    )
+    if manifest.windows is None:
+        print(f"Planning backfill of '{search_term}' from {start} to {end}...")
+        manifest.windows = plan_windows(
+            api_url, search_term, api_key, start, end, max_window_results
+        )
+        manifest.save()
+    else:
+        print(
+            f"Resuming backfill of '{search_term}': {len(manifest.pending())} of {len(manifest.windows)} windows left."
+        )
+
+    pending = manifest.pending()
+    progress = ProgressReporter(
+        expected=sum(w["total"] for w in manifest.windows),
+        done=sum(w["published"] for w in manifest.windows if w["done"]),
+    )
+    windows_done = len(manifest.windows) - len(pending)
+    failed = []
+    started = time.monotonic()
+
+    if pending:
+        # Create the shared client before the workers race to do it
+        get_client()
+        pages = queue.Queue(maxsize=DEFAULT_BACKFILL_QUEUE_SIZE)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            # Give up if the publishing loop has stopped, instead of blocking forever
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def fetch_window(index: int, window: dict):
+            params = window_params(
+                search_term,
+                datetime.strptime(window["from"], "%Y-%m-%d").date(),
+                datetime.strptime(window["to"], "%Y-%m-%d").date(),
+                show_fields,
+            )
+            error, fetched, total = None, 0, None
+            try:
+                for data in iter_guardian_pages(
+                    api_url, params, api_key, page_size=page_size
+                ):
+                    results = data["response"].get("results", [])
+                    total = data["response"].get("total", total)
+                    fetched += len(results)
+                    if not put((index, results)):
+                        return
+                # Pagination stops quietly on a failed page, so check the count
+                if total is None or fetched < total:
+                    error = f"fetched {fetched} of {total} results"
+            except Exception as e:
+                error = str(e)
+            put((index, (_WINDOW_DONE, error)))
+
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(workers, len(pending))),
+            thread_name_prefix="guardian-backfill",
+        )
+        publish_failed = set()
+        try:
+            for index, window in enumerate(pending):
+                window["published"] = 0
+                executor.submit(fetch_window, index, window)
+
+            remaining = len(pending)
+            while remaining:
+                index, item = pages.get()
+                window = pending[index]
+
+                if isinstance(item, tuple) and item[0] is _WINDOW_DONE:
+                    remaining -= 1
+                    error = item[1]
+                    if error is None and index in publish_failed:
+                        error = "some records failed to publish"
+                    if error:
+                        print(
+                            f"Warning: window {window['from']} to {window['to']} incomplete ({error}), it will be retried on resume."
+                        )
+                        failed.append(window)
+                    else:
+                        window["done"] = True
+                        windows_done += 1
+                    manifest.save()
+                    progress.report(windows_done, len(manifest.windows))
+                    continue
+
+                if not item:
+                    continue
+                response = publisher.publish(item)
+                if not response or response.get("FailedRecordCount", 0) > 0:
+                    publish_failed.add(index)
+                    continue
+                window["published"] += len(item)
+                progress.add(len(item))
+                progress.report(windows_done, len(manifest.windows))
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
+
+    elapsed = time.monotonic() - started
+    summary = {
+        "windows": len(manifest.windows),
+        "windows_done": windows_done,
+        "windows_failed": len(failed),
+        "published": progress.published,
+        "expected": progress.expected,
+        "elapsed_seconds": elapsed,
+        "articles_per_second": progress.throughput(),
+    }
+    print(f"Backfill finished: {summary}")
+    return summary
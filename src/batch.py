@@ -0,0 +1,169 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List
+
+from src.api_client import MAX_PAGE_SIZE, get_client, iter_guardian_results
+from src.checkpoint import QueryCheckpoint
+from src.utils import build_search_params
+
+# --- BATCH CONFIGURATION ---
+# Terms fetched at the same time. The shared rate limiter still caps requests.
+DEFAULT_BATCH_WORKERS = 4
+# Articles buffered between the fetch threads and the publisher
+DEFAULT_BATCH_QUEUE_SIZE = 1000
+# ---------------------------
+
+# Queue marker sent by a worker when its term is finished
+_TERM_DONE = object()
+
+
+def load_search_terms(path: str) -> List[str]:
+    """
+    Reads search terms from a file, one per line.
+
+    Blank lines and lines starting with "#" are ignored, and repeated terms
+    are only kept once.
+    """
+    terms = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            term = line.strip()
+            if term and not term.startswith("#") and term not in terms:
+                terms.append(term)
+    return terms
+
+
+def article_key(article: Dict[str, Any]) -> str:
+    """The identity used to merge the same article found by several terms."""
+    return article.get("id") or article.get("webUrl")
+
+
+def iter_batch_results(
+    api_url: str,
+    terms: Iterable[str],
+    api_key: str,
+    date_from,
+    page_size: int = MAX_PAGE_SIZE,
+    max_pages: int = None,
+    max_workers: int = DEFAULT_BATCH_WORKERS,
+    stats: Dict[str, Dict[str, Any]] = None,
+    checkpoints: Dict[str, QueryCheckpoint] = None,
+    show_fields: str = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Searches several terms concurrently and yields each distinct article once.
+
+    Every term runs in a worker thread on the shared GuardianClient, so they
+    use one HTTP session, cache and rate limiter. Articles are yielded as they
+    arrive, so the result can go straight to a publisher while the remaining
+    terms are still being fetched.
+
+    Args:
+        api_url: The base URL for the Guardian API search endpoint.
+        terms: The search terms.
+        api_key: The Guardian API key.
+        date_from: A date; only articles published since are returned. None
+            means today, or each term's checkpoint day.
+        page_size: Results requested per page, capped at MAX_PAGE_SIZE.
+        max_pages: Page limit per term. None walks every page.
+        max_workers: Terms fetched at the same time.
+        stats: Optional dictionary filled in place with, per term, the
+            articles fetched, the duplicates dropped (already found by another
+            term), the unique articles yielded, and any error, including a
+            page that failed and left the term's results incomplete.
+        checkpoints: Optional QueryCheckpoint per term. Those terms only fetch
+            articles newer than their checkpoint; the caller saves the
+            checkpoints of the terms without an error once the articles are
+            published.
+        show_fields: Optional show-fields parameter, e.g. "bodyText".
+
+    Yields:
+        Article dictionaries, without duplicates across terms.
+    """
+    terms = list(dict.fromkeys(terms))
+    if stats is None:
+        stats = {}
+    for term in terms:
+        stats[term] = {"fetched": 0, "duplicates": 0, "unique": 0, "error": None}
+    if not terms:
+        return
+
+    # Create the shared client before the workers race to do it
+    get_client()
+    articles = queue.Queue(maxsize=DEFAULT_BATCH_QUEUE_SIZE)
+    stop = threading.Event()
+
+    def put(item):
+        # Give up if the consumer stopped reading, instead of blocking forever
+        while not stop.is_set():
+            try:
+                articles.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch_term(term: str):
+        checkpoint = (checkpoints or {}).get(term)
+        params = build_search_params(
+            {
+                "search_term": term,
+                "date_from": date_from,
+                "checkpoint": checkpoint.previous if checkpoint else None,
+                "show_fields": show_fields,
+            }
+        )
+        walk = {}
+        try:
+            results = iter_guardian_results(
+                api_url,
+                params,
+                api_key,
+                page_size=page_size,
+                max_pages=max_pages,
+                walk=walk,
+            )
+            if checkpoint is not None:
+                results = checkpoint.filter(results)
+            for article in results:
+                if not put((term, article)):
+                    return
+            # A failed page ends the walk quietly, leaving the term incomplete
+            if walk.get("error"):
+                print(f"Error: search for '{term}' stopped early: {walk['error']}")
+                stats[term]["error"] = walk["error"]
+        except Exception as e:
+            print(f"Error: search for '{term}' failed: {e}")
+            stats[term]["error"] = str(e)
+        finally:
+            put((term, _TERM_DONE))
+
+    seen = set()
+    pending = len(terms)
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(terms))),
+        thread_name_prefix="guardian-batch",
+    )
+    try:
+        for term in terms:
+            executor.submit(fetch_term, term)
+
+        while pending:
+            term, article = articles.get()
+            if article is _TERM_DONE:
+                pending -= 1
+                continue
+
+            stats[term]["fetched"] += 1
+            key = article_key(article)
+            if key is not None and key in seen:
+                stats[term]["duplicates"] += 1
+                continue
+            if key is not None:
+                seen.add(key)
+            stats[term]["unique"] += 1
+            yield article
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
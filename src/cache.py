@@ -0,0 +1,332 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+# --- CACHE CONFIGURATION ---
+DEFAULT_CACHE_TTL = 300  # seconds an entry is served without asking the API
+DEFAULT_CACHE_MAX_ENTRIES = 256
+# Encoded JSON kept in the cache, so cached pages (up to 200 results each,
+# bodies included) stay within a Lambda's memory
+DEFAULT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "guardian_cache.sqlite3")
+# ---------------------------------
+
+
+def make_cache_key(api_url: str, params: dict) -> str:
+    """
+    Builds a stable cache key from the endpoint and query parameters.
+
+    The api-key is left out so that rotating the key does not empty the cache.
+    """
+    cacheable = {k: v for k, v in params.items() if k != "api-key"}
+    raw = json.dumps([api_url, cacheable], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def conditional_headers(entry: Dict[str, Any] or None) -> dict:
+    """Returns If-None-Match / If-Modified-Since headers for a cached entry."""
+    if not entry:
+        return {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+class ResponseCache:
+    """
+    Base class for response caches.
+
+    Looked-up entries are dictionaries holding the parsed JSON "data", the "etag" and
+    "last_modified" validators and the "stored_at" time. Fresh entries (younger
+    than ttl) are served directly. Stale entries are kept until evicted so they
+    can be revalidated with a conditional request.
+
+    Entries are capped both in number (max_entries) and in encoded JSON
+    bytes (max_bytes); the least recently used ones are evicted first, and a
+    response larger than max_bytes is not cached at all.
+
+    Subclasses implement _get, _set (which receives the encoded "raw" JSON),
+    _touch and size_bytes, and track size/evictions.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        ttl: float = DEFAULT_CACHE_TTL,
+        clock=time.time,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def lookup(self, key: str) -> Tuple[Dict[str, Any] or None, bool]:
+        """
+        Looks up a key and records a hit or a miss.
+
+        Returns:
+            (entry, fresh) where entry is None if the key is not cached.
+        """
+        entry = self._get(key)
+        if entry is not None and self._clock() - entry["stored_at"] < self.ttl:
+            self.hits += 1
+            return entry, True
+        self.misses += 1
+        return entry, False
+
+    def store(
+        self,
+        key: str,
+        data: dict,
+        etag: str = None,
+        last_modified: str = None,
+        raw: bytes = None,
+    ):
+        """
+        Caches a successful response together with its validators.
+
+        raw is the response body data was parsed from; passing it saves
+        encoding data again. Responses over max_bytes are not cached.
+        """
+        if raw is None:
+            raw = json.dumps(data).encode("utf-8")
+        if len(raw) > self.max_bytes:
+            return
+        self._set(
+            key,
+            {
+                "raw": raw,
+                "etag": etag,
+                "last_modified": last_modified,
+                "stored_at": self._clock(),
+            },
+        )
+
+    def revalidate(self, key: str):
+        """Marks a stale entry as fresh again after a 304 Not Modified."""
+        self.revalidations += 1
+        self._touch(key, self._clock())
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the current number of entries."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": len(self),
+            "bytes": self.size_bytes(),
+        }
+
+
+class MemoryCache(ResponseCache):
+    """
+    An in-process LRU cache, kept for the lifetime of a warm container.
+
+    Responses are kept as their encoded JSON, which is several times smaller
+    than the parsed objects and makes max_bytes an actual memory bound. Each
+    lookup decodes a fresh copy, so callers can modify what they get.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        ttl: float = DEFAULT_CACHE_TTL,
+        clock=time.time,
+    ):
+        super().__init__(
+            max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, clock=clock
+        )
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            entry = dict(entry)
+        entry["data"] = json.loads(entry.pop("raw"))
+        return entry
+
+    def _set(self, key, entry):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous["raw"])
+            self._entries[key] = entry
+            self._bytes += len(entry["raw"])
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted["raw"])
+                self.evictions += 1
+
+    def _touch(self, key, stored_at):
+        with self._lock:
+            if key in self._entries:
+                self._entries[key]["stored_at"] = stored_at
+
+
+class SQLiteCache(ResponseCache):
+    """
+    An on-disk LRU cache that survives across CLI runs.
+
+    Point it at /tmp to reuse responses across invocations of a warm Lambda
+    container.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        ttl: float = DEFAULT_CACHE_TTL,
+        clock=time.time,
+    ):
+        super().__init__(
+            max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, clock=clock
+        )
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """)
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(CAST(data AS BLOB))), 0) FROM responses"
+            ).fetchone()[0]
+
+    def _get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                (self._clock(), key),
+            )
+            self._conn.commit()
+        return {
+            "data": json.loads(row[0]),
+            "etag": row[1],
+            "last_modified": row[2],
+            "stored_at": row[3],
+        }
+
+    def _set(self, key, entry):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry["raw"].decode("utf-8"),
+                    entry["etag"],
+                    entry["last_modified"],
+                    entry["stored_at"],
+                    self._clock(),
+                ),
+            )
+            # Keep the most recently used entries within both limits
+            evicted = self._conn.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM (
+                        SELECT
+                            key,
+                            ROW_NUMBER() OVER recent AS position,
+                            SUM(LENGTH(CAST(data AS BLOB))) OVER recent AS total_bytes
+                        FROM responses
+                        WINDOW recent AS (
+                            ORDER BY accessed_at DESC ROWS UNBOUNDED PRECEDING
+                        )
+                    )
+                    WHERE position > ? OR total_bytes > ?
+                )
+                """,
+                (self.max_entries, self.max_bytes),
+            ).rowcount
+            self._conn.commit()
+            self.evictions += max(evicted, 0)
+
+    def _touch(self, key, stored_at):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                (stored_at, stored_at, key),
+            )
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+def cache_from_env() -> ResponseCache or None:
+    """
+    Builds a response cache from environment variables.
+
+    GUARDIAN_CACHE selects the backend: "none" (default), "memory" or "sqlite".
+    Caching is opt-in because a cached first page hides articles published
+    within the TTL from incremental and paginated runs.
+    GUARDIAN_CACHE_TTL, GUARDIAN_CACHE_MAX_ENTRIES and GUARDIAN_CACHE_MAX_BYTES
+    (encoded JSON kept, default 16 MiB) tune it, and
+    GUARDIAN_CACHE_PATH sets the SQLite file (default in the temp dir, /tmp on
+    Lambda).
+    """
+    backend = os.environ.get("GUARDIAN_CACHE", "none").lower()
+    ttl = float(os.environ.get("GUARDIAN_CACHE_TTL", DEFAULT_CACHE_TTL))
+    max_entries = int(
+        os.environ.get("GUARDIAN_CACHE_MAX_ENTRIES", DEFAULT_CACHE_MAX_ENTRIES)
+    )
+    max_bytes = int(os.environ.get("GUARDIAN_CACHE_MAX_BYTES", DEFAULT_CACHE_MAX_BYTES))
+
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        path = os.environ.get("GUARDIAN_CACHE_PATH", DEFAULT_CACHE_PATH)
+        return SQLiteCache(
+            path=path, max_entries=max_entries, max_bytes=max_bytes, ttl=ttl
+        )
+    return MemoryCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
@@ -0,0 +1,237 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, Iterator
+
+import boto3
+
+# --- CHECKPOINT CONFIGURATION ---
+DEFAULT_CHECKPOINT_FILE = os.path.join(
+    tempfile.gettempdir(), "guardian_checkpoints.json"
+)
+DEFAULT_CHECKPOINT_DB = os.path.join(
+    tempfile.gettempdir(), "guardian_checkpoints.sqlite3"
+)
+# --------------------------------
+
+# A checkpoint is the newest article already published for a query:
+# {"webPublicationDate": "2025-10-01T12:00:00Z", "id": "technology/2025/..."}
+
+
+def checkpoint_key(search_term: str) -> str:
+    """The key a query's checkpoint is stored under (the Guardian q is case-insensitive)."""
+    return " ".join(search_term.lower().split())
+
+
+# --- CHECKPOINT STORES ---
+class MemoryCheckpointStore:
+    """Keeps checkpoints for the life of the process, e.g. in the stream daemon."""
+
+    def __init__(self):
+        self._checkpoints = {}
+
+    def get(self, query: str) -> Dict[str, str] or None:
+        return self._checkpoints.get(query)
+
+    def put(self, query: str, checkpoint: Dict[str, str]):
+        self._checkpoints[query] = checkpoint
+
+
+class FileCheckpointStore:
+    """
+    Keeps checkpoints in a local JSON file, keyed by query.
+
+    The file is shared between threads but not locked between processes.
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def get(self, query: str) -> Dict[str, str] or None:
+        with self._lock:
+            return self._read().get(query)
+
+    def put(self, query: str, checkpoint: Dict[str, str]):
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints[query] = checkpoint
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(checkpoints, f)
+            os.replace(tmp_path, self.path)
+
+
+class SQLiteCheckpointStore:
+    """Keeps checkpoints in a local SQLite database, keyed by query."""
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "query TEXT PRIMARY KEY, published TEXT NOT NULL, article_id TEXT)"
+            )
+
+    def get(self, query: str) -> Dict[str, str] or None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT published, article_id FROM checkpoints WHERE query = ?",
+                (query,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"webPublicationDate": row[0], "id": row[1]}
+
+    def put(self, query: str, checkpoint: Dict[str, str]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (query, published, article_id) "
+                "VALUES (?, ?, ?)",
+                (query, checkpoint["webPublicationDate"], checkpoint.get("id")),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class DynamoCheckpointStore:
+    """
+    Keeps checkpoints in a DynamoDB table, shared by every container.
+
+    The table needs a string partition key named "query".
+    """
+
+    def __init__(self, table_name: str, client=None, region_name: str = None):
+        self.table_name = table_name
+        self.client = client or boto3.client("dynamodb", region_name=region_name)
+
+    def get(self, query: str) -> Dict[str, str] or None:
+        response = self.client.get_item(
+            TableName=self.table_name, Key={"query": {"S": query}}
+        )
+        item = response.get("Item")
+        if not item:
+            return None
+        return {
+            "webPublicationDate": item["published"]["S"],
+            "id": item.get("article_id", {}).get("S"),
+        }
+
+    def put(self, query: str, checkpoint: Dict[str, str]):
+        item = {
+            "query": {"S": query},
+            "published": {"S": checkpoint["webPublicationDate"]},
+        }
+        if checkpoint.get("id"):
+            item["article_id"] = {"S": checkpoint["id"]}
+        self.client.put_item(TableName=self.table_name, Item=item)
+
+
+# --- QUERY CHECKPOINT ---
+class QueryCheckpoint:
+    """
+    Tracks one query's checkpoint through a run.
+
+    Pass `previous` to build_search_params so only newer content is requested,
+    wrap the newest-first article stream with filter(), and call save() once
+    the articles have been published. Nothing is saved if the run fails, so
+    the next run fetches the same delta again.
+    """
+
+    def __init__(self, store, search_term: str):
+        self.store = store
+        self.query = checkpoint_key(search_term)
+        self.previous = store.get(self.query)
+        self.newest = None
+        self.new_count = 0
+        # Set once filter() meets an article that was already published
+        self.reached = False
+
+    def is_seen(self, article: Dict[str, Any]) -> bool:
+        """True if the article is at or before the previous checkpoint."""
+        if self.previous is None:
+            return False
+        if article.get("id") and article.get("id") == self.previous.get("id"):
+            return True
+        published = article.get("webPublicationDate", "")
+        # ISO 8601 UTC timestamps compare correctly as strings
+        return published < self.previous["webPublicationDate"]
+
+    def filter(self, articles: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yields articles until the previous checkpoint is reached.
+
+        Articles must be ordered newest first (order-by=newest). Iteration
+        stops at the first article already seen, so no further pages are
+        requested.
+        """
+        articles = iter(articles)
+        try:
+            for article in articles:
+                if self.is_seen(article):
+                    self.reached = True
+                    print(
+                        f"Checkpoint reached for '{self.query}' after {self.new_count} new articles."
+                    )
+                    return
+                if self.newest is None:
+                    self.newest = {
+                        "webPublicationDate": article.get("webPublicationDate"),
+                        "id": article.get("id"),
+                    }
+                self.new_count += 1
+                yield article
+        finally:
+            # Stop the page generator so it does not fetch any further pages
+            close = getattr(articles, "close", None)
+            if close is not None:
+                close()
+
+    def save(self) -> bool:
+        """
+        Stores the newest article seen as the query's checkpoint.
+
+        Returns:
+            True if the checkpoint moved forward.
+        """
+        if self.newest is None or not self.newest.get("webPublicationDate"):
+            return False
+        self.store.put(self.query, self.newest)
+        return True
+
+
+def checkpoint_store_from_env():
+    """
+    Builds a checkpoint store from environment variables, or returns None.
+
+    GUARDIAN_CHECKPOINT selects the backend: "none" (default, every run starts
+    from date_from), "file", "sqlite" or "dynamodb". GUARDIAN_CHECKPOINT_PATH
+    sets the file or database path (default in the temp dir, /tmp on Lambda)
+    and GUARDIAN_CHECKPOINT_TABLE the DynamoDB table.
+    """
+    backend = os.environ.get("GUARDIAN_CHECKPOINT", "none").lower()
+    path = os.environ.get("GUARDIAN_CHECKPOINT_PATH")
+
+    if backend == "file":
+        return FileCheckpointStore(path or DEFAULT_CHECKPOINT_FILE)
+    if backend == "sqlite":
+        return SQLiteCheckpointStore(path or DEFAULT_CHECKPOINT_DB)
+    if backend == "dynamodb":
+        return DynamoCheckpointStore(
+            os.environ["GUARDIAN_CHECKPOINT_TABLE"],
+            region_name=os.environ.get("KINESIS_REGION"),
+        )
+    return None
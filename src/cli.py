@@ -1,10 +1,31 @@
 import argparse
+import atexit
 import os
 
 from dotenv import load_dotenv
 
-from src.api_client import fetch_guardian_content
-from src.publisher import LocalPublisher
+from src.api_client import MAX_PAGE_SIZE, iter_guardian_pages
+from src.backfill import (
+    DEFAULT_BACKFILL_WORKERS,
+    DEFAULT_WINDOW_RESULTS,
+    run_backfill,
+)
+from src.batch import DEFAULT_BATCH_WORKERS, iter_batch_results, load_search_terms
+from src.checkpoint import (
+    FileCheckpointStore,
+    QueryCheckpoint,
+    checkpoint_store_from_env,
+)
+from src.dedup import deduplicator_from_env
+from src.enrichment import enrichment_stage_from_env, has_body_text, with_body_text
+from src.metrics import configure_metrics_from_env, emit_metrics
+from src.models import projection_from_env, projection_from_spec
+from src.pipeline import DEFAULT_PIPELINE_QUEUE_SIZE, Pipeline, Stage
+from src.producer import BufferedKinesisProducer
+from src.publisher import KinesisPublisher
+from src.sinks import publisher_from_env
+from src.spool import SpooledPublisher, spool_from_env
+from src.stream import DEFAULT_MAX_INTERVAL, DEFAULT_MIN_INTERVAL, StreamDaemon
 from src.utils import build_search_params, process_and_print_results
 
 # --- LOCAL CREDENTIAL LOADING ---
@@ -20,12 +41,147 @@ KINESIS_REGION = os.getenv("KINESIS_REGION")
 
 parser = argparse.ArgumentParser(
     prog="GuardianArticleStreamer",
-    description="Fetches articles from the Guardian API based on search terms and publishes up to 10 of the most recent results.",
+    description="Fetches articles from the Guardian API based on search terms and publishes the most recent results.",
 )
 parser.add_argument("--search", help="term you'd like to search for")
 parser.add_argument(
     "--date_from",
-    help="date you'd like to search articles from (YYYY-MM-DD). Defaults to today.",
+    help="date you'd like to search articles from (YYYY-MM-DD). Defaults to today, or to the checkpoint's day for incremental runs.",
+    default=None,
+)
+parser.add_argument(
+    "--page_size",
+    help=f"results requested per page (max {MAX_PAGE_SIZE}).",
+    type=int,
+    default=MAX_PAGE_SIZE,
+)
+parser.add_argument(
+    "--max_pages",
+    help="stop after this many pages. Defaults to every page of results.",
+    type=int,
+    default=None,
+)
+parser.add_argument(
+    "--terms_file",
+    help="file with one search term per line; searches them all in one run instead of --search.",
+    default=None,
+)
+parser.add_argument(
+    "--workers",
+    help=f"terms searched at the same time with --terms_file (default {DEFAULT_BATCH_WORKERS}).",
+    type=int,
+    default=DEFAULT_BATCH_WORKERS,
+)
+parser.add_argument(
+    "--queue_size",
+    help=f"articles buffered between two pipeline stages (fetch, parse, dedup, enrich, serialize, publish; default {DEFAULT_PIPELINE_QUEUE_SIZE}).",
+    type=int,
+    default=DEFAULT_PIPELINE_QUEUE_SIZE,
+)
+parser.add_argument(
+    "--incremental",
+    help="only fetch articles newer than the previous run (checkpoints in GUARDIAN_CHECKPOINT, or a local file).",
+    action="store_true",
+)
+parser.add_argument(
+    "--publisher",
+    help="where records go: local (print, default), kinesis, firehose, sqs, kafka or file (NDJSON/Parquet). Defaults to GUARDIAN_PUBLISHER.",
+    choices=["local", "kinesis", "firehose", "sqs", "kafka", "file"],
+    default=None,
+)
+parser.add_argument(
+    "--fields",
+    help="comma-separated article fields to publish, e.g. id,webTitle,fields.bodyText ('default' for a compact set). Defaults to GUARDIAN_FIELDS, or whole articles.",
+    default=None,
+)
+
+# --- STREAM SUBCOMMAND (long-running daemon) ---
+subparsers = parser.add_subparsers(dest="command")
+stream_parser = subparsers.add_parser(
+    "stream",
+    help="poll the search terms continuously and publish new articles until stopped (SIGTERM/Ctrl+C).",
+)
+stream_parser.add_argument(
+    "--search",
+    help="term to poll; repeat for several terms.",
+    action="append",
+    default=[],
+)
+stream_parser.add_argument(
+    "--terms_file", help="file with one search term per line.", default=None
+)
+stream_parser.add_argument(
+    "--page_size",
+    help=f"results requested per page (max {MAX_PAGE_SIZE}).",
+    type=int,
+    default=MAX_PAGE_SIZE,
+)
+stream_parser.add_argument(
+    "--min_interval",
+    help=f"shortest time between polls of a term, in seconds (default {DEFAULT_MIN_INTERVAL:.0f}).",
+    type=float,
+    default=DEFAULT_MIN_INTERVAL,
+)
+stream_parser.add_argument(
+    "--max_interval",
+    help=f"longest time between polls of a term, in seconds (default {DEFAULT_MAX_INTERVAL:.0f}).",
+    type=float,
+    default=DEFAULT_MAX_INTERVAL,
+)
+stream_parser.add_argument(
+    "--kinesis",
+    help="publish to KINESIS_STREAM_NAME through a buffered producer instead of printing locally.",
+    action="store_true",
+)
+stream_parser.add_argument(
+    "--fields",
+    help="comma-separated article fields to publish, e.g. id,webTitle,fields.bodyText ('default' for a compact set). Defaults to GUARDIAN_FIELDS, or whole articles.",
+    default=None,
+)
+
+# --- BACKFILL SUBCOMMAND (historical date range) ---
+backfill_parser = subparsers.add_parser(
+    "backfill",
+    help="load every article for a term between two dates, resumable after a crash.",
+)
+backfill_parser.add_argument("--search", help="term to backfill.", required=True)
+backfill_parser.add_argument(
+    "--start", help="first publication day (YYYY-MM-DD).", required=True
+)
+backfill_parser.add_argument(
+    "--end", help="last publication day (YYYY-MM-DD). Defaults to today.", default=None
+)
+backfill_parser.add_argument(
+    "--workers",
+    help=f"date windows fetched at the same time (default {DEFAULT_BACKFILL_WORKERS}).",
+    type=int,
+    default=DEFAULT_BACKFILL_WORKERS,
+)
+backfill_parser.add_argument(
+    "--page_size",
+    help=f"results requested per page (max {MAX_PAGE_SIZE}).",
+    type=int,
+    default=MAX_PAGE_SIZE,
+)
+backfill_parser.add_argument(
+    "--window_results",
+    help=f"split date windows until each has at most this many results (default {DEFAULT_WINDOW_RESULTS}).",
+    type=int,
+    default=DEFAULT_WINDOW_RESULTS,
+)
+backfill_parser.add_argument(
+    "--manifest",
+    help="progress file used to resume. Defaults to a file in the temp dir named after the term and dates.",
+    default=None,
+)
+backfill_parser.add_argument(
+    "--kinesis",
+    help="publish to KINESIS_STREAM_NAME instead of printing locally.",
+    action="store_true",
+)
+backfill_parser.add_argument(
+    "--fields",
+    help="comma-separated article fields to publish, e.g. id,webTitle,fields.bodyText ('default' for a compact set). Defaults to GUARDIAN_FIELDS, or whole articles.",
     default=None,
 )
 
@@ -34,9 +190,152 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
+    # Optional: GUARDIAN_METRICS=emf, prometheus or otel reports fetch and
+    # publish metrics, written once the command exits
+    configure_metrics_from_env()
+    atexit.register(emit_metrics)
+
+    # Optional: publish only the article fields consumers need
+    projection = (
+        projection_from_spec(args.fields) if args.fields else projection_from_env()
+    )
+    show_fields = projection.show_fields if projection else None
+
+    def make_publisher(publisher=None):
+        """
+        Builds the --publisher (or GUARDIAN_PUBLISHER) backend, unless one is
+        given, and closes it at exit.
+
+        With GUARDIAN_SPOOL set, records go through a write-ahead log first and
+        failed publishes are replayed (every GUARDIAN_SPOOL_REPLAY_INTERVAL
+        seconds in the background, and before each publish).
+        """
+        if publisher is None:
+            publisher = publisher_from_env(
+                KINESIS_STREAM_NAME,
+                KINESIS_REGION,
+                projection=projection,
+                backend=args.publisher,
+            )
+        spool = spool_from_env()
+        if spool is not None:
+            replay_interval = os.getenv("GUARDIAN_SPOOL_REPLAY_INTERVAL")
+            publisher = SpooledPublisher(
+                publisher,
+                spool,
+                replay_interval=float(replay_interval) if replay_interval else None,
+            )
+        close = getattr(publisher, "close", None)
+        if close is not None:
+            atexit.register(close)
+        return publisher
+
+    def save_progress(pipeline, response, checkpoints) -> bool:
+        """
+        Moves checkpoints and dedup state forward once every record was
+        published. After a failed or partial publish both stay where they
+        were, so the next run fetches those articles again.
+
+        Returns:
+            True if there was nothing to publish or everything was published.
+        """
+        if pipeline.records and not (
+            response and response.get("FailedRecordCount", 0) == 0
+        ):
+            if deduplicator is not None:
+                deduplicator.rollback()
+            print(
+                "\nError: Publish failed or was partial. Checkpoints were not moved forward."
+            )
+            return False
+        for checkpoint in checkpoints:
+            checkpoint.save()
+        if deduplicator is not None:
+            deduplicator.commit()
+            print(f"Dedup: {deduplicator.stats()}")
+        return True
+
+    if args.command == "backfill":
+        try:
+            start = datetime.strptime(args.start, "%Y-%m-%d").date()
+            end = (
+                datetime.strptime(args.end, "%Y-%m-%d").date()
+                if args.end
+                else date.today()
+            )
+        except ValueError:
+            print("\nError: Invalid date format. Please use YYYY-MM-DD.")
+            exit(1)
+        if end < start:
+            print("\nError: --end must not be before --start.")
+            exit(1)
+
+        if args.kinesis:
+            backfill_publisher = make_publisher(
+                KinesisPublisher(
+                    stream_name=KINESIS_STREAM_NAME,
+                    region_name=KINESIS_REGION,
+                    projection=projection,
+                )
+            )
+        else:
+            backfill_publisher = make_publisher()
+
+        summary = run_backfill(
+            API_URL_LOCAL,
+            args.search,
+            API_KEY_LOCAL,
+            start,
+            end,
+            backfill_publisher,
+            manifest_path=args.manifest,
+            workers=args.workers,
+            page_size=args.page_size,
+            max_window_results=args.window_results,
+            show_fields=show_fields,
+        )
+        exit(1 if summary["windows_failed"] else 0)
+
+    if args.command == "stream":
+        terms = list(args.search)
+        if args.terms_file:
+            terms += load_search_terms(args.terms_file)
+        if not terms:
+            print("\nError: stream needs --search or --terms_file.")
+            exit(1)
+
+        if args.kinesis:
+            stream_publisher = make_publisher(
+                BufferedKinesisProducer(
+                    KinesisPublisher(
+                        stream_name=KINESIS_STREAM_NAME,
+                        region_name=KINESIS_REGION,
+                        projection=projection,
+                    )
+                )
+            )
+        else:
+            stream_publisher = make_publisher()
+
+        print(f"--- Streaming Guardian articles for {len(terms)} terms ---")
+        StreamDaemon(
+            terms,
+            API_URL_LOCAL,
+            API_KEY_LOCAL,
+            stream_publisher,
+            checkpoint_store=checkpoint_store_from_env(),
+            deduplicator=deduplicator_from_env(),
+            page_size=args.page_size,
+            min_interval=args.min_interval,
+            max_interval=args.max_interval,
+            show_fields=show_fields,
+        ).run_forever()
+        exit(0)
+
     # Convert Arguments to Criteria (Handling Optional Date)
     if args.date_from is None or args.date_from.strip() == "":
-        date_obj = date.today()
+        # Today, or the checkpoint's day for incremental runs
+        date_obj = None
         date_used_str = "today"
     else:
         try:
@@ -48,13 +347,85 @@ if __name__ == "__main__":
             )
             exit(1)
 
+    # Checkpoints: remember the newest article published per search term
+    checkpoint_store = checkpoint_store_from_env()
+    if checkpoint_store is None and args.incremental:
+        checkpoint_store = FileCheckpointStore()
+
+    # Optional: drop articles an earlier run already published
+    deduplicator = deduplicator_from_env()
+
+    # Optional: GUARDIAN_ENRICH adds word count, language, keywords and a text
+    # hash computed from each article's body text, which is only published
+    # if the projection asks for it
+    enrich_stage = enrichment_stage_from_env(keep_body=has_body_text(show_fields))
+    if enrich_stage is not None:
+        show_fields = with_body_text(show_fields)
+
+    # Batch mode: many terms, one session and one publisher
+    if args.terms_file:
+        terms = load_search_terms(args.terms_file)
+        if not terms:
+            print(f"\nError: No search terms found in '{args.terms_file}'.")
+            exit(1)
+
+        print(f"--- Searching Guardian for {len(terms)} terms from {date_used_str} ---")
+        term_stats = {}
+        checkpoints = {}
+        if checkpoint_store is not None:
+            checkpoints = {t: QueryCheckpoint(checkpoint_store, t) for t in terms}
+        publisher = make_publisher()
+        articles = iter_batch_results(
+            API_URL_LOCAL,
+            terms,
+            API_KEY_LOCAL,
+            date_obj,
+            page_size=args.page_size,
+            max_pages=args.max_pages,
+            max_workers=args.workers,
+            stats=term_stats,
+            checkpoints=checkpoints,
+            show_fields=show_fields,
+        )
+        stages = []
+        if deduplicator is not None:
+            stages.append(Stage("dedup", deduplicator.filter, stream=True))
+        if enrich_stage is not None:
+            stages.append(enrich_stage)
+        pipeline = Pipeline(articles, stages, queue_size=args.queue_size)
+        response = pipeline.publish(publisher)
+        # A term whose fetch stopped at a failed page keeps its checkpoint
+        published = save_progress(
+            pipeline,
+            response,
+            [c for t, c in checkpoints.items() if not term_stats[t]["error"]],
+        )
+
+        print("\n--- Per-term Results ---")
+        for term, counts in term_stats.items():
+            status = f"error: {counts['error']}" if counts["error"] else "ok"
+            print(
+                f"{term}: {counts['fetched']} fetched, {counts['unique']} unique, {counts['duplicates']} duplicates ({status})"
+            )
+        failed_terms = any(counts["error"] for counts in term_stats.values())
+        exit(0 if published and not failed_terms else 1)
+
     # Final check for search term
     if args.search is None:
         print("\nError: The --search term is mandatory. Please provide a query.")
         exit(1)
 
+    checkpoint = None
+    if checkpoint_store is not None:
+        checkpoint = QueryCheckpoint(checkpoint_store, args.search)
+
     # Create the dictionary for build_search_params
-    user_criteria = {"search_term": args.search, "date_from": date_obj}
+    user_criteria = {
+        "search_term": args.search,
+        "date_from": date_obj,
+        "checkpoint": checkpoint.previous if checkpoint else None,
+        "show_fields": show_fields,
+    }
 
     # Format Parameters for API
     api_params = build_search_params(user_criteria)
@@ -63,19 +434,57 @@ if __name__ == "__main__":
     print(
         f"--- Searching Guardian for '{user_criteria['search_term']}' from {date_used_str} ---"
     )
-    data = fetch_guardian_content(API_URL_LOCAL, api_params, API_KEY_LOCAL)
+    walk = {}
+    pages = iter_guardian_pages(
+        API_URL_LOCAL,
+        api_params,
+        API_KEY_LOCAL,
+        page_size=args.page_size,
+        max_pages=args.max_pages,
+        walk=walk,
+    )
 
-    # Process, Print, and Publish Results
-    if data:
-        records_to_publish = data["response"].get("results", [])
+    def parse(pages):
+        """Splits pages into articles, printing each page for confirmation."""
+        for data in pages:
+            records = data["response"].get("results", [])
+            if checkpoint is not None:
+                # Drop articles published by an earlier run
+                records = list(checkpoint.filter(records))
+                data["response"]["results"] = records
+            process_and_print_results(data)
+            yield from records
 
-        publisher = LocalPublisher(
-            stream_name=KINESIS_STREAM_NAME, region_name=KINESIS_REGION
-        )
+            # Stop paginating once the previous run's newest article is reached
+            if checkpoint is not None and checkpoint.reached:
+                return
 
-        publisher.publish(records_to_publish)
+    # Fetch, parse, dedup, enrich, serialize and publish run concurrently, with at
+    # most --queue_size articles buffered between two stages
+    stages = [Stage("parse", parse, stream=True)]
+    if deduplicator is not None:
+        stages.append(Stage("dedup", deduplicator.filter, stream=True))
+    if enrich_stage is not None:
+        stages.append(enrich_stage)
+    pipeline = Pipeline(
+        pages,
+        stages,
+        queue_size=args.queue_size,
+        # Pages hold up to --page_size articles each: prefetch only a few
+        source_queue_size=2,
+    )
+    response = pipeline.publish(make_publisher())
+    # After a failed page the checkpoint stays put, so the next run fetches
+    # the pages this one never reached
+    published = save_progress(
+        pipeline,
+        response,
+        [checkpoint] if checkpoint is not None and not walk.get("error") else [],
+    )
 
-        # Print locally for confirmation
-        process_and_print_results(data)
-    else:
+    if pipeline.stats()["fetch"]["out"] == 0:
         print("Search failed or returned no data.")
+    elif walk.get("error"):
+        print(f"\nError: Search stopped early ({walk['error']}).")
+    if not published or walk.get("error"):
+        exit(1)
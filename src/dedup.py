@@ -0,0 +1,372 @@
+import hashlib
+import json
+import math
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator
+
+import boto3
+
+from src.publisher import DEFAULT_MAX_ATTEMPTS, backoff_delay
+
+# --- DEDUP CONFIGURATION ---
+DEFAULT_DEDUP_MAX_ENTRIES = 10_000
+DEFAULT_BLOOM_CAPACITY = 1_000_000
+DEFAULT_BLOOM_ERROR_RATE = 0.001
+DEFAULT_BLOOM_PATH = os.path.join(tempfile.gettempdir(), "guardian_seen.bloom")
+# Seen keys expire from the shared DynamoDB store after this many seconds
+DEFAULT_SEEN_TTL = 30 * 24 * 3600
+# ---------------------------
+
+# Bloom filter file: MAGIC, then bit count, hash count and items added
+BLOOM_MAGIC = b"GBF1"
+BLOOM_HEADER = struct.Struct(">QQQ")
+
+
+def dedup_key(article: Dict[str, Any]) -> str:
+    """
+    Returns the key an article is deduplicated on: its id plus a hash of its
+    content.
+
+    The same article fetched again has the same key. If its webTitle, fields
+    or any other value changed, the key changes and it goes through as an
+    update.
+    """
+    canonical = json.dumps(article, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{article.get('id') or article.get('webUrl', '')}#{digest}"
+
+
+# --- SEEN-SET BACKENDS ---
+class LRUSeenSet:
+    """An exact, bounded set of recently seen keys; the oldest are evicted first."""
+
+    def __init__(self, max_entries: int = DEFAULT_DEDUP_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._keys = OrderedDict()
+
+    def __contains__(self, key: str) -> bool:
+        if key not in self._keys:
+            return False
+        self._keys.move_to_end(key)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: str):
+        self._keys[key] = None
+        self._keys.move_to_end(key)
+        while len(self._keys) > self.max_entries:
+            self._keys.popitem(last=False)
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._keys) + sum(sys.getsizeof(k) for k in self._keys)
+
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter for remembering keys over long horizons.
+
+    It never forgets a key and may report an unseen key as seen, with a
+    probability that grows as it fills (see false_positive_rate()). With a
+    path, save() writes it to disk and it is reloaded on the next run.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_BLOOM_CAPACITY,
+        error_rate: float = DEFAULT_BLOOM_ERROR_RATE,
+        path: str = None,
+    ):
+        """
+        Args:
+            capacity: Keys the filter is sized for.
+            error_rate: Target false-positive rate once capacity keys are added.
+            path: File the filter is loaded from and saved to. None keeps it
+                in memory only.
+        """
+        self.path = path
+        self.num_bits = max(
+            8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        if path:
+            self._load()
+
+    def _positions(self, key: str) -> Iterator[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.sha256(key.encode("utf-8")).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key: str):
+        for p in self._positions(key):
+            self._bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def false_positive_rate(self) -> float:
+        """Estimated probability that an unseen key is reported as seen."""
+        return (
+            1 - math.exp(-self.num_hashes * self.count / self.num_bits)
+        ) ** self.num_hashes
+
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        header_end = len(BLOOM_MAGIC) + BLOOM_HEADER.size
+        if data[: len(BLOOM_MAGIC)] != BLOOM_MAGIC or len(data) < header_end:
+            print(f"Warning: ignoring unreadable Bloom filter file '{self.path}'.")
+            return
+        num_bits, num_hashes, count = BLOOM_HEADER.unpack_from(data, len(BLOOM_MAGIC))
+        if (num_bits, num_hashes) != (self.num_bits, self.num_hashes):
+            # A filter sized differently cannot be reused, start a new one
+            print(f"Warning: Bloom filter '{self.path}' has other settings, resetting.")
+            return
+        self._bits = bytearray(data[header_end:])
+        self.count = count
+
+    def save(self):
+        """Writes the filter to its path atomically."""
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(BLOOM_MAGIC)
+            f.write(BLOOM_HEADER.pack(self.num_bits, self.num_hashes, self.count))
+            f.write(self._bits)
+        os.replace(tmp_path, self.path)
+
+
+class DynamoSeenStore:
+    """
+    An exact seen-set in a DynamoDB table, shared by every container and run.
+
+    The table needs a string partition key named "key". Items carry an
+    "expires_at" epoch attribute; enable DynamoDB TTL on it to bound the table.
+    UnprocessedItems are resubmitted with exponential backoff, up to
+    max_attempts requests per 25 keys.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        client=None,
+        region_name: str = None,
+        ttl_seconds: int = DEFAULT_SEEN_TTL,
+        clock=time.time,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        sleep=time.sleep,
+    ):
+        self.table_name = table_name
+        self.client = client or boto3.client("dynamodb", region_name=region_name)
+        self.ttl_seconds = ttl_seconds
+        self.max_attempts = max_attempts
+        self._clock = clock
+        self._sleep = sleep
+
+    def __contains__(self, key: str) -> bool:
+        response = self.client.get_item(
+            TableName=self.table_name,
+            Key={"key": {"S": key}},
+            ProjectionExpression="#k",
+            ExpressionAttributeNames={"#k": "key"},
+        )
+        return "Item" in response
+
+    def add_many(self, keys: Iterable[str]):
+        expires_at = str(int(self._clock() + self.ttl_seconds))
+        keys = list(keys)
+        # BatchWriteItem takes at most 25 items per request
+        for start in range(0, len(keys), 25):
+            requests = [
+                {
+                    "PutRequest": {
+                        "Item": {"key": {"S": key}, "expires_at": {"N": expires_at}}
+                    }
+                }
+                for key in keys[start : start + 25]
+            ]
+            for attempt in range(self.max_attempts):
+                if attempt:
+                    self._sleep(backoff_delay(attempt - 1))
+                response = self.client.batch_write_item(
+                    RequestItems={self.table_name: requests}
+                )
+                requests = response.get("UnprocessedItems", {}).get(self.table_name, [])
+                if not requests:
+                    break
+            else:
+                # They are still in the local LRU and Bloom filter
+                print(
+                    f"Warning: {len(requests)} seen keys were not written to "
+                    f"'{self.table_name}' after {self.max_attempts} attempts."
+                )
+
+
+# --- DEDUPLICATOR ---
+class Deduplicator:
+    """
+    Drops articles that were already published, between fetch and publish.
+
+    Keys (see dedup_key) are checked against an in-memory LRU, then against a
+    Bloom filter and/or a shared store. With a shared store the answer is
+    exact, and Bloom filter hits the store disproves are counted as false
+    positives. Without one, a Bloom filter hit is treated as a duplicate.
+
+    Keys that pass are only remembered once commit() is called, after the
+    publish succeeded. rollback() forgets them, so a failed publish is
+    retried in full on the next run.
+    """
+
+    def __init__(
+        self,
+        lru: LRUSeenSet = None,
+        bloom: BloomFilter = None,
+        store: DynamoSeenStore = None,
+    ):
+        self.lru = lru if lru is not None else LRUSeenSet()
+        self.bloom = bloom
+        self.store = store
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self._checked = 0
+        self._duplicates = 0
+        self._bloom_hits = 0
+        self._false_positives = 0
+
+    def is_duplicate(self, article: Dict[str, Any]) -> bool:
+        """Checks one article, remembering it (until commit) if it is new."""
+        key = dedup_key(article)
+        with self._lock:
+            self._checked += 1
+            if key in self._pending or key in self.lru:
+                self._duplicates += 1
+                return True
+
+            bloom_hit = self.bloom is not None and key in self.bloom
+            if bloom_hit:
+                self._bloom_hits += 1
+            if self.store is not None:
+                duplicate = key in self.store
+                if bloom_hit and not duplicate:
+                    self._false_positives += 1
+            else:
+                duplicate = bloom_hit
+
+            if duplicate:
+                self._duplicates += 1
+            else:
+                self._pending[key] = None
+            return duplicate
+
+    def filter(self, articles: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yields only the articles that were not published before."""
+        for article in articles:
+            if not self.is_duplicate(article):
+                yield article
+
+    def commit(self):
+        """Remembers every article passed since the last commit and saves the Bloom filter."""
+        with self._lock:
+            keys = list(self._pending)
+            self._pending.clear()
+            for key in keys:
+                self.lru.add(key)
+                if self.bloom is not None:
+                    self.bloom.add(key)
+        if self.store is not None and keys:
+            self.store.add_many(keys)
+        if self.bloom is not None:
+            self.bloom.save()
+
+    def rollback(self):
+        """Forgets the articles passed since the last commit."""
+        with self._lock:
+            self._pending.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns counters for the dedup stage.
+
+        hit_ratio is the share of checked articles dropped as duplicates.
+        memory_bytes covers the LRU and Bloom filter. bloom_false_positive_rate
+        is the Bloom filter's estimated rate; bloom_false_positives counts
+        hits that the shared store proved wrong.
+        """
+        with self._lock:
+            memory = self.lru.memory_bytes()
+            if self.bloom is not None:
+                memory += self.bloom.memory_bytes()
+            return {
+                "checked": self._checked,
+                "duplicates": self._duplicates,
+                "hit_ratio": (
+                    self._duplicates / self._checked if self._checked else 0.0
+                ),
+                "memory_bytes": memory,
+                "lru_size": len(self.lru),
+                "bloom_false_positive_rate": (
+                    self.bloom.false_positive_rate() if self.bloom is not None else None
+                ),
+                "bloom_hits": self._bloom_hits,
+                "bloom_false_positives": self._false_positives,
+            }
+
+
+def deduplicator_from_env() -> Deduplicator or None:
+    """
+    Builds a Deduplicator from environment variables, or returns None.
+
+    GUARDIAN_DEDUP selects the seen-set: "none" (default), "memory" (LRU of
+    GUARDIAN_DEDUP_MAX_ENTRIES keys) or "bloom" (the LRU plus a Bloom filter
+    persisted at GUARDIAN_DEDUP_BLOOM_PATH, sized by
+    GUARDIAN_DEDUP_BLOOM_CAPACITY and GUARDIAN_DEDUP_ERROR_RATE). Setting
+    GUARDIAN_DEDUP_TABLE adds a shared DynamoDB seen-store.
+    """
+    backend = os.environ.get("GUARDIAN_DEDUP", "none").lower()
+    if backend == "none":
+        return None
+
+    lru = LRUSeenSet(
+        int(os.environ.get("GUARDIAN_DEDUP_MAX_ENTRIES", DEFAULT_DEDUP_MAX_ENTRIES))
+    )
+    bloom = None
+    if backend == "bloom":
+        bloom = BloomFilter(
+            capacity=int(
+                os.environ.get("GUARDIAN_DEDUP_BLOOM_CAPACITY", DEFAULT_BLOOM_CAPACITY)
+            ),
+            error_rate=float(
+                os.environ.get("GUARDIAN_DEDUP_ERROR_RATE", DEFAULT_BLOOM_ERROR_RATE)
+            ),
+            path=os.environ.get("GUARDIAN_DEDUP_BLOOM_PATH", DEFAULT_BLOOM_PATH),
+        )
+
+    store = None
+    table_name = os.environ.get("GUARDIAN_DEDUP_TABLE")
+    if table_name:
+        store = DynamoSeenStore(
+            table_name, region_name=os.environ.get("KINESIS_REGION")
+        )
+
+    return Deduplicator(lru=lru, bloom=bloom, store=store)
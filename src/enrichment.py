@@ -0,0 +1,237 @@
+import hashlib
+import heapq
+import os
+import re
+from collections import Counter
+from functools import partial
+from typing import Any, Dict, Iterable, List
+
+from src.models import ENRICHMENT_KEY
+from src.pipeline import Stage
+
+# --- ENRICHMENT CONFIGURATION ---
+# Features computed from fields.bodyText, published as wordCount, language,
+# keywords and textHash
+ENRICHMENT_FEATURES = ("word_count", "language", "keywords", "text_hash")
+DEFAULT_KEYWORD_COUNT = 10
+# Articles sent to a worker process at a time
+DEFAULT_ENRICH_BATCH_SIZE = 200
+# Share of words that must be stopwords of the winning language
+MIN_LANGUAGE_SCORE = 0.05
+# Reported when no language scores high enough (BCP 47 "undetermined")
+UNDETERMINED_LANGUAGE = "und"
+# --------------------------------
+
+# The most frequent words of each language: enough to tell them apart
+STOPWORDS = {
+    "en": frozenset(
+        "the of and to in is that for it was on with as he be at by this had"
+        " are but from or have an they which were her his not has been their"
+        " will would there who said".split()
+    ),
+    "fr": frozenset(
+        "le la les de des du et est un une que qui dans pour pas sur au avec"
+        " ce il elle sont ont par plus mais son sa ses nous vous leur été".split()
+    ),
+    "de": frozenset(
+        "der die das und ist nicht ein eine zu den von mit sich des auf für"
+        " im dem auch es an als wird bei sind hat aus nach wie oder".split()
+    ),
+    "es": frozenset(
+        "el la los las de del y que en un una es por con para se su al lo"
+        " como más pero sus ha fue este esta son entre cuando muy".split()
+    ),
+    "it": frozenset(
+        "il lo la gli le di del della che e è un una per non con sono si da"
+        " in al nel come più ma anche ha questo questa dei delle".split()
+    ),
+    "pt": frozenset(
+        "o a os as de do da dos das e que em um uma para com não por se na"
+        " no mais como mas foi ao ele ela são tem".split()
+    ),
+    "nl": frozenset(
+        "de het een en van is dat niet in op te zijn met voor er die maar"
+        " ook als aan om dan bij nog wordt door naar heeft".split()
+    ),
+}
+# Words never reported as keywords
+_ALL_STOPWORDS = frozenset().union(*STOPWORDS.values())
+
+# Plain \w+ is the fastest tokenizer; numbers are never picked as keywords
+_WORD = re.compile(r"\w+")
+
+
+def words(text: str) -> List[str]:
+    """Lower-cased runs of letters and digits of a text."""
+    return _WORD.findall(text.lower())
+
+
+def detect_language(counts: Counter) -> str:
+    """
+    Guesses the language of a text from its word counts, by the share of its
+    words that are common stopwords of each language. Returns an ISO 639-1
+    code, or UNDETERMINED_LANGUAGE if no language scores MIN_LANGUAGE_SCORE.
+    """
+    total = sum(counts.values())
+    if not total:
+        return UNDETERMINED_LANGUAGE
+    scores = {
+        language: sum(counts[word] for word in stopwords if word in counts)
+        for language, stopwords in STOPWORDS.items()
+    }
+    language = max(scores, key=scores.get)
+    if scores[language] / total < MIN_LANGUAGE_SCORE:
+        return UNDETERMINED_LANGUAGE
+    return language
+
+
+def extract_keywords(counts: Counter, count: int = DEFAULT_KEYWORD_COUNT) -> List[str]:
+    """The `count` most frequent words that are not stopwords, most frequent first."""
+    candidates = (
+        (frequency, word)
+        for word, frequency in counts.items()
+        if len(word) > 2 and word not in _ALL_STOPWORDS and word.isalpha()
+    )
+    # Ties go to the word that appears first in the text
+    return [word for _, word in heapq.nlargest(count, candidates, key=lambda c: c[0])]
+
+
+def text_hash(text: str) -> str:
+    """A SHA-256 of the text, so consumers can spot unchanged bodies."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def enrich_article(
+    article: Dict[str, Any],
+    features: Iterable[str] = ENRICHMENT_FEATURES,
+    keyword_count: int = DEFAULT_KEYWORD_COUNT,
+    keep_body: bool = True,
+) -> Dict[str, Any]:
+    """
+    Adds the selected features of an article's fields.bodyText under
+    ENRICHMENT_KEY, e.g. {"wordCount": 812, "language": "en", ...}.
+
+    With keep_body=False the body is dropped once enriched (and fields too,
+    if nothing else is left in it), for when it was only fetched for
+    enrichment. Articles without a body are otherwise returned unchanged. A
+    module-level function, so it can run in a worker process.
+    """
+    fields = article.get("fields") or {}
+    body = fields.get("bodyText")
+    if not keep_body and "bodyText" in fields:
+        del fields["bodyText"]
+        if not fields:
+            del article["fields"]
+    if not body:
+        return article
+
+    features = set(features)
+    counts = Counter(words(body)) if features & {"language", "keywords"} else None
+    enrichment = {}
+    if "word_count" in features:
+        enrichment["wordCount"] = len(body.split())
+    if "language" in features:
+        enrichment["language"] = detect_language(counts)
+    if "keywords" in features:
+        enrichment["keywords"] = extract_keywords(counts, keyword_count)
+    if "text_hash" in features:
+        enrichment["textHash"] = text_hash(body)
+
+    article[ENRICHMENT_KEY] = enrichment
+    return article
+
+
+def parse_features(spec: str) -> List[str]:
+    """
+    Parses a comma-separated feature list, e.g. "word_count,text_hash".
+    "all" selects every feature; an empty spec or "none" selects none.
+    """
+    spec = (spec or "").strip().lower()
+    if not spec or spec == "none":
+        return []
+    if spec == "all":
+        return list(ENRICHMENT_FEATURES)
+    features = [f.strip() for f in spec.split(",") if f.strip()]
+    unknown = [f for f in features if f not in ENRICHMENT_FEATURES]
+    if unknown:
+        raise ValueError(
+            f"Unknown enrichment features {unknown}. "
+            f"Choose from {', '.join(ENRICHMENT_FEATURES)} or 'all'."
+        )
+    return features
+
+
+def enrichment_stage(
+    features: Iterable[str] = ENRICHMENT_FEATURES,
+    workers: int = 0,
+    batch_size: int = DEFAULT_ENRICH_BATCH_SIZE,
+    keyword_count: int = DEFAULT_KEYWORD_COUNT,
+    keep_body: bool = True,
+) -> Stage:
+    """
+    Builds the pipeline stage that enriches articles, dropping their body
+    text afterwards unless keep_body.
+
+    With workers > 0, articles are enriched in batches of batch_size on a
+    pool of that many processes, so the text processing is not limited by
+    the GIL. With 0 they are enriched on the stage's own thread, which is
+    faster for small bodies, where pickling costs more than the work.
+    """
+    fn = partial(
+        enrich_article,
+        features=tuple(features),
+        keyword_count=keyword_count,
+        keep_body=keep_body,
+    )
+    if workers <= 0:
+        return Stage("enrich", fn)
+    return Stage("enrich", fn, workers=workers, processes=True, batch_size=batch_size)
+
+
+def has_body_text(show_fields: str or None) -> bool:
+    """Whether a show-fields parameter already requests bodyText."""
+    return "bodyText" in (show_fields or "").split(",")
+
+
+def with_body_text(show_fields: str or None) -> str:
+    """Adds bodyText to a show-fields parameter, as enrichment needs it."""
+    fields = [f for f in (show_fields or "").split(",") if f]
+    if "bodyText" not in fields:
+        fields.append("bodyText")
+    return ",".join(fields)
+
+
+def enrichment_stage_from_env(keep_body: bool = True) -> Stage or None:
+    """
+    Builds the enrichment stage from environment variables, or returns None.
+    With keep_body=False, the stage drops the body text it enriched from.
+
+    GUARDIAN_ENRICH lists the features to compute ("all", or some of
+    word_count, language, keywords and text_hash); unset disables
+    enrichment. GUARDIAN_ENRICH_WORKERS sets the worker processes (0 enriches
+    in the pipeline thread); it defaults to the CPU count, except in Lambda,
+    which has no /dev/shm for multiprocessing. GUARDIAN_ENRICH_BATCH_SIZE and
+    GUARDIAN_ENRICH_KEYWORDS set the articles per worker task and the
+    keywords kept.
+    """
+    features = parse_features(os.environ.get("GUARDIAN_ENRICH"))
+    if not features:
+        return None
+
+    workers = os.environ.get("GUARDIAN_ENRICH_WORKERS")
+    if workers is None:
+        # Lambda has no /dev/shm, which multiprocessing needs
+        in_lambda = bool(os.environ.get("AWS_LAMBDA_FUNCTION_NAME"))
+        workers = 0 if in_lambda else os.cpu_count() or 1
+
+    return enrichment_stage(
+        features,
+        workers=int(workers),
+        batch_size=int(
+            os.environ.get("GUARDIAN_ENRICH_BATCH_SIZE", DEFAULT_ENRICH_BATCH_SIZE)
+        ),
+        keyword_count=int(
+            os.environ.get("GUARDIAN_ENRICH_KEYWORDS", DEFAULT_KEYWORD_COUNT)
+        ),
+        keep_body=keep_body,
+    )
@@ -0,0 +1,295 @@
+import codecs
+import json
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+# Optional C-accelerated incremental parser. Without it the built-in decoder
+# below is used, which needs nothing beyond the standard library.
+try:
+    import ijson
+except ImportError:  # pragma: no cover - depends on the environment
+    ijson = None
+
+# --- STREAMING CONFIGURATION ---
+# Bytes read from the socket at a time
+STREAM_CHUNK_SIZE = 64 * 1024
+# The array whose elements are yielded as soon as each one has been read
+RESULTS_PATH = ("response", "results")
+# -------------------------------
+
+# Characters that change the structure of the document outside strings
+_STRUCTURAL = re.compile(r'[{}\[\]",:]')
+# The rest of an open string up to its closing quote (or a trailing backslash
+# whose escaped character is still to arrive)
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*')
+# The first character of the next result, or the end of the results array
+_NEXT_RESULT = re.compile(r"[^\s,]")
+# The end of a number, true, false or null result
+_SCALAR_END = re.compile(r"[\s,\]]")
+# Keys are only decoded while this short, so long strings are never copied
+_MAX_KEY_LENGTH = 64
+
+
+class TruncatedResponseError(ValueError):
+    """The response body ended before the JSON document was complete."""
+
+
+class _ChunkReader:
+    """A minimal file-like object over an iterable of byte chunks, for ijson."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+
+    def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            # ijson probes the stream type with read(0)
+            return b""
+        for chunk in self._chunks:
+            if chunk:
+                return chunk
+        return b""
+
+
+class ResultStream:
+    """
+    Iterates the response.results of one Guardian response while it downloads.
+
+    Each article is yielded as soon as its closing brace has been read, so
+    the first article can be published before the rest of a multi-megabyte
+    page arrives, and only one article (plus one chunk) is held in memory
+    instead of the whole response text and its parsed tree.
+
+    Everything else in the response (status, total, pages, ...) is collected
+    into `response` and is complete once iteration has finished. Closing
+    the iterator early (e.g. a checkpoint was reached) calls `close`, which
+    releases the HTTP connection.
+
+    Usage:
+        results = ResultStream(response.iter_content(STREAM_CHUNK_SIZE))
+        for article in results:
+            ...
+        total_pages = results.response.get("pages", 1)
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        close: Callable[[], None] = None,
+        backend: str = None,
+    ):
+        """
+        Args:
+            chunks: The response body, e.g. response.iter_content().
+            close: Called once iteration stops, finished or not.
+            backend: "ijson" or "builtin". None picks ijson when installed.
+        """
+        if backend is None:
+            backend = "ijson" if ijson is not None else "builtin"
+        if backend not in ("ijson", "builtin"):
+            raise ValueError(f"Unknown JSON stream backend: {backend!r}")
+        if backend == "ijson" and ijson is None:
+            raise ImportError("The 'ijson' backend requires: pip install ijson")
+
+        self.backend = backend
+        self.data = None
+        self._chunks = chunks
+        self._close = close
+        self._results = None
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "ResultStream":
+        """Wraps an already parsed response, e.g. one served from the cache."""
+        stream = cls((), backend="builtin")
+        stream.data = data
+        stream._results = data.get("response", {}).get("results", [])
+        return stream
+
+    @property
+    def response(self) -> Dict[str, Any]:
+        """The response object without its results. Empty until iterated."""
+        if not self.data:
+            return {}
+        response = self.data.get("response", {})
+        return {key: value for key, value in response.items() if key != "results"}
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._results is not None:
+            yield from self._results
+            return
+        try:
+            if self.backend == "ijson":
+                yield from self._iter_ijson()
+            else:
+                yield from self._iter_builtin()
+        finally:
+            if self._close is not None:
+                self._close()
+
+    def _iter_ijson(self) -> Iterator[Any]:
+        """Yields results from ijson events, building the rest into self.data."""
+        results_prefix = ".".join(RESULTS_PATH)
+        item_prefix = results_prefix + ".item"
+        parent_prefix = ".".join(RESULTS_PATH[:-1])
+        document = ijson.ObjectBuilder()
+        item = None
+
+        events = ijson.parse(_ChunkReader(self._chunks), use_float=True)
+        for prefix, event, value in events:
+            if prefix == item_prefix or prefix.startswith(item_prefix + "."):
+                if item is None:
+                    if event not in ("start_map", "start_array"):
+                        yield value
+                        continue
+                    item = ijson.ObjectBuilder()
+                item.event(event, value)
+                if prefix == item_prefix and event in ("end_map", "end_array"):
+                    yield item.value
+                    item = None
+            elif prefix == results_prefix or (
+                prefix == parent_prefix
+                and event == "map_key"
+                and value == RESULTS_PATH[-1]
+            ):
+                continue
+            else:
+                document.event(event, value)
+
+        self.data = document.value
+
+    def _iter_builtin(self) -> Iterator[Any]:
+        """
+        Yields results using a structural scanner over the decoded text.
+
+        Strings are skipped with regex searches rather than character by
+        character, so long article bodies are crossed at C speed. Each
+        result's exact span is handed to json.loads once its closing bracket
+        is seen; the text outside the results array is kept and parsed at
+        the end, with the array left empty.
+        """
+        chunks = iter(self._chunks)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        skeleton = []  # Document text outside the results array
+        buf = ""
+        pos = 0
+        stack = []  # "{" or "[" for every open container
+        keys = []  # The current key of every open container (None in arrays)
+        last_string = None
+        string_start = None  # Index of the opening quote of an open string
+        in_results = False
+        item_start = None  # Index where the result being read starts
+        depth_results = len(RESULTS_PATH) + 1
+        eof = False
+
+        while True:
+            match = None
+            if string_start is not None:
+                pos = _STRING_BODY.match(buf, pos).end()
+                if pos < len(buf) and buf[pos] == '"':
+                    pos += 1
+                    if len(stack) < depth_results and (
+                        pos - string_start <= _MAX_KEY_LENGTH
+                    ):
+                        last_string = json.loads(buf[string_start:pos])
+                    else:
+                        last_string = None
+                    if item_start is not None and len(stack) == depth_results:
+                        # A string result
+                        yield json.loads(buf[item_start:pos])
+                        item_start = None
+                    string_start = None
+                    continue
+            elif in_results and item_start is None:
+                match = _NEXT_RESULT.search(buf, pos)
+                if match is not None:
+                    if match.group() == "]":
+                        # End of the results array, back into the skeleton
+                        in_results = False
+                        buf, pos = buf[match.start() :], 0
+                    else:
+                        item_start = pos = match.start()
+                        if match.group() not in '{["':
+                            scalar_end = _SCALAR_END.search(buf, pos)
+                            if scalar_end is None and not eof:
+                                # Rescan once more of the number has arrived
+                                item_start, match = None, None
+                            else:
+                                end = scalar_end.start() if scalar_end else len(buf)
+                                yield json.loads(buf[item_start:end])
+                                item_start, pos = None, end
+                    if match is not None:
+                        continue
+            else:
+                match = _STRUCTURAL.search(buf, pos)
+                if match is not None:
+                    char = match.group()
+                    pos = match.end()
+                    if char == '"':
+                        string_start = match.start()
+                    elif char == ":":
+                        if stack and stack[-1] == "{":
+                            keys[-1] = last_string
+                    elif char in "{[":
+                        stack.append(char)
+                        keys.append(None)
+                        if (
+                            char == "["
+                            and not in_results
+                            and tuple(keys[:-1]) == RESULTS_PATH
+                            and all(c == "{" for c in stack[:-1])
+                        ):
+                            # Entering the results array
+                            in_results = True
+                            skeleton.append(buf[:pos])
+                            buf, pos = buf[pos:], 0
+                    elif char in "}]":
+                        if not stack:
+                            raise json.JSONDecodeError("Unexpected bracket", buf, pos)
+                        stack.pop()
+                        keys.pop()
+                        if item_start is not None and len(stack) == depth_results:
+                            yield json.loads(buf[item_start:pos])
+                            item_start = None
+                            buf, pos = buf[pos:], 0
+                    continue
+
+            # --- Nothing left to scan: drop consumed text and read more ---
+            keep = pos
+            if item_start is not None:
+                keep = item_start
+            elif string_start is not None:
+                keep = string_start
+            if not in_results:
+                skeleton.append(buf[:keep])
+            buf, pos = buf[keep:], pos - keep
+            if item_start is not None:
+                item_start -= keep
+            if string_start is not None:
+                string_start -= keep
+
+            if eof:
+                break
+            chunk = next(chunks, None)
+            if chunk is None:
+                eof = True
+                buf += decoder.decode(b"", final=True)
+            else:
+                buf += decoder.decode(chunk)
+
+        if stack or string_start is not None or in_results:
+            raise TruncatedResponseError(
+                "The response ended before the JSON document was complete."
+            )
+        skeleton.append(buf)
+        self.data = json.loads("".join(skeleton))
+
+
+def iter_results(
+    chunks: Iterable[bytes], backend: str = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields each element of response.results from a raw JSON byte stream.
+
+    A convenience wrapper over ResultStream for callers that do not need the
+    rest of the response.
+    """
+    return iter(ResultStream(chunks, backend=backend))
@@ -5,61 +5,255 @@ from datetime import date, datetime
 import boto3
 from botocore.exceptions import ClientError
 
-from src.api_client import fetch_guardian_content
+from src.api_client import MAX_PAGE_SIZE, get_client, iter_guardian_results
+from src.metrics import emits_metrics
+from src.partitioning import DEFAULT_PARTITION_STRATEGY
+from src.pipeline import DEFAULT_PIPELINE_QUEUE_SIZE, Pipeline, Stage
 from src.publisher import KinesisPublisher
+from src.secret_cache import DEFAULT_REFRESH_AHEAD, DEFAULT_SECRET_TTL, SecretCache
+from src.serialization import DEFAULT_CODEC, get_codec
 from src.utils import build_search_params
 
+# Optional features (checkpoints, dedup, enrichment, field projection and the
+# spool) are imported where they are used, and only once their environment
+# variable is set, so cold starts without them skip those modules.
+
 # --- CONFIGURATION (Read from Environment Variables) ---
 # These variables will be set in the Lambda console
 SECRET_NAME = os.environ.get("SECRET_NAME")
 KINESIS_STREAM_NAME = os.environ.get("KINESIS_STREAM_NAME")
 KINESIS_REGION = os.environ.get("KINESIS_REGION")
+# Optional: pack articles into aggregated Kinesis records of up to this many bytes
+KINESIS_AGGREGATE_BYTES = os.environ.get("KINESIS_AGGREGATE_BYTES")
+# Optional: record codec, e.g. "orjson", "orjson+zstd" or "msgpack+gzip"
+KINESIS_CODEC = os.environ.get("KINESIS_CODEC", DEFAULT_CODEC)
+# Optional: "webUrl" (default), "id", "section", "random" or "explicit"
+KINESIS_PARTITION_STRATEGY = os.environ.get(
+    "KINESIS_PARTITION_STRATEGY", DEFAULT_PARTITION_STRATEGY
+)
+# Optional: "kinesis" (default), "firehose", "sqs", "kafka" or "file"
+GUARDIAN_PUBLISHER = os.environ.get("GUARDIAN_PUBLISHER", "kinesis").lower()
+# Optional: seconds the secret is cached, and seconds before expiry at which a
+# background refresh starts (0 refreshes on demand only)
+SECRET_CACHE_TTL = float(os.environ.get("SECRET_CACHE_TTL", DEFAULT_SECRET_TTL))
+SECRET_REFRESH_AHEAD = float(
+    os.environ.get("SECRET_REFRESH_AHEAD", DEFAULT_REFRESH_AHEAD)
+)
+# Optional: articles buffered between two pipeline stages
+PIPELINE_QUEUE_SIZE = int(
+    os.environ.get("GUARDIAN_PIPELINE_QUEUE_SIZE", DEFAULT_PIPELINE_QUEUE_SIZE)
+)
 # ---------------------------------------------
 
 # Global variables for caching (runs once per container lifecycle)
-CACHED_SECRETS = None
+SECRET_CACHE = None
 SECRETS_CLIENT = None
+# Reused on warm invocations, so its boto3 client (and connection pool) and
+# shard map are only built once per container
+KINESIS_PUBLISHER = None
+# Kept across warm invocations so its LRU remembers recently published articles
+DEDUPLICATOR = None
+# Write-ahead log of records not yet acknowledged by the destination
+SPOOL = None
 
 
-def get_secret():
-    """
-    Retrieves and caches the secret value (a JSON string) from AWS Secrets Manager.
-
-    The JSON string is parsed into a dictionary containing the API_KEY and API_URL.
-    """
-    global CACHED_SECRETS, SECRETS_CLIENT
-
-    # --- Caching Check ---
-    if CACHED_SECRETS is not None:
-        return CACHED_SECRETS
+def get_secrets_client():
+    """Returns the cached Secrets Manager client, creating it on first use."""
+    global SECRETS_CLIENT
 
-    # --- Client Setup ---
     if SECRETS_CLIENT is None:
         session = boto3.session.Session()
         SECRETS_CLIENT = session.client(
             service_name="secretsmanager", region_name=KINESIS_REGION
         )
 
-    # --- Retrieval ---
+    return SECRETS_CLIENT
+
+
+def feature_enabled(*names: str) -> bool:
+    """
+    True if any of the environment variables is set to something other than
+    "none". Unset variables disable their feature, so its module need not be
+    imported; the feature's *_from_env function still reads the value.
+    """
+    return any(
+        os.environ.get(name, "").strip().lower() not in ("", "none") for name in names
+    )
+
+
+def get_projection():
+    """Returns the GUARDIAN_FIELDS projection, or None to publish whole articles."""
+    if not feature_enabled("GUARDIAN_FIELDS"):
+        return None
+    from src.models import projection_from_env
+
+    return projection_from_env()
+
+
+def get_publisher():
+    """
+    Returns the cached publisher, creating it on first use.
+
+    Its settings come from environment variables, which do not change for
+    the lifetime of a container. GUARDIAN_PUBLISHER picks another backend
+    (firehose, sqs, kafka or file, see src.sinks) instead of Kinesis.
+    """
+    global KINESIS_PUBLISHER
+
+    if KINESIS_PUBLISHER is None and GUARDIAN_PUBLISHER == "kinesis":
+        KINESIS_PUBLISHER = KinesisPublisher(
+            stream_name=KINESIS_STREAM_NAME,
+            region_name=KINESIS_REGION,
+            aggregate_max_bytes=(
+                int(KINESIS_AGGREGATE_BYTES) if KINESIS_AGGREGATE_BYTES else None
+            ),
+            codec=get_codec(KINESIS_CODEC),
+            partition_strategy=KINESIS_PARTITION_STRATEGY,
+            projection=get_projection(),
+        )
+    elif KINESIS_PUBLISHER is None:
+        # Only loaded for the other backends, to keep cold starts short
+        from src.sinks import publisher_from_env
+
+        KINESIS_PUBLISHER = publisher_from_env(
+            KINESIS_STREAM_NAME,
+            KINESIS_REGION,
+            codec=get_codec(KINESIS_CODEC),
+            projection=get_projection(),
+            backend=GUARDIAN_PUBLISHER,
+        )
+
+    return KINESIS_PUBLISHER
+
+
+def init_clients():
+    """
+    Builds the secret cache (and its Secrets Manager client), the Kinesis
+    publisher and the Guardian client ahead of the first invocation.
+
+    Failures are only logged: the same error is raised again, and reported,
+    by the invocation that needs the client.
+    """
     try:
-        get_secret_value_response = SECRETS_CLIENT.get_secret_value(
-            SecretId=SECRET_NAME
+        get_secret_cache()
+        get_publisher()
+        get_client()
+    except Exception as e:
+        print(f"WARNING: Could not pre-initialize clients: {e}")
+
+
+def get_secret_cache() -> SecretCache:
+    """Returns the cached SecretCache, creating it on first use."""
+    global SECRET_CACHE
+
+    if SECRET_CACHE is None:
+        SECRET_CACHE = SecretCache(
+            get_secrets_client(),
+            SECRET_NAME,
+            ttl=SECRET_CACHE_TTL,
+            refresh_ahead=SECRET_REFRESH_AHEAD,
         )
+
+    return SECRET_CACHE
+
+
+def get_secret():
+    """
+    Retrieves the secret value (a JSON string) from AWS Secrets Manager.
+
+    The JSON string is parsed into a dictionary containing the API_KEY and
+    API_URL. It is cached for SECRET_CACHE_TTL seconds, so a warm container
+    picks up a rotated key without calling Secrets Manager on every
+    invocation.
+    """
+    try:
+        return get_secret_cache().get()
     except ClientError as e:
         print(f"ERROR: Failed to retrieve secret '{SECRET_NAME}': {e}")
         raise e
 
-    # --- Parsing and Caching ---
-    secret_json_string = get_secret_value_response["SecretString"]
 
-    CACHED_SECRETS = json.loads(secret_json_string)
+def refresh_api_key(rejected_key: str) -> str or None:
+    """
+    Called by the Guardian client on a 401. Re-reads the secret, in case the
+    key was rotated, and returns the new key if it differs from the rejected
+    one.
+    """
+    secrets = get_secret()
+    if secrets.get("GUARDIAN_API_KEY") == rejected_key:
+        print("API key rejected (401). Refreshing the secret...")
+        try:
+            secrets = get_secret_cache().refresh()
+        except ClientError as e:
+            print(f"ERROR: Failed to refresh secret '{SECRET_NAME}': {e}")
+            return None
+    new_key = secrets.get("GUARDIAN_API_KEY")
+    return new_key if new_key != rejected_key else None
 
-    return CACHED_SECRETS
 
+def get_deduplicator():
+    """
+    Returns the cached Deduplicator, or None when GUARDIAN_DEDUP is not set.
+    """
+    global DEDUPLICATOR
 
+    if DEDUPLICATOR is None and feature_enabled("GUARDIAN_DEDUP"):
+        from src.dedup import deduplicator_from_env
+
+        DEDUPLICATOR = deduplicator_from_env()
+
+    return DEDUPLICATOR
+
+
+def get_spool():
+    """
+    Returns the cached Spool, or None when GUARDIAN_SPOOL is not set.
+    """
+    global SPOOL
+
+    if SPOOL is None and feature_enabled("GUARDIAN_SPOOL", "GUARDIAN_SPOOL_DIR"):
+        from src.spool import spool_from_env
+
+        SPOOL = spool_from_env()
+
+    return SPOOL
+
+
+def with_spool(publisher):
+    """Routes a publisher through the spool, when one is configured."""
+    spool = get_spool()
+    if spool is None:
+        return publisher
+    from src.spool import SpooledPublisher
+
+    return SpooledPublisher(publisher, spool)
+
+
+@emits_metrics
 def lambda_handler(event: dict, context: object):
     """
     AWS Lambda entry point. Orchestrates secret retrieval, data fetch, and Kinesis publish.
+
+    Fetching, filtering, serialization and publishing run as concurrent
+    stages of a src.pipeline.Pipeline, so the next pages are fetched while
+    earlier batches are sent.
+
+    The event holds a single "search" term, or a "terms" list to search
+    several terms in one invocation (batch mode). Batch mode fetches terms
+    concurrently, publishes each distinct article once and reports per-term
+    stats in the response.
+
+    With a checkpoint store configured (GUARDIAN_CHECKPOINT), each term only
+    fetches articles newer than the last ones published, and its checkpoint
+    moves forward once the publish succeeds. With GUARDIAN_DEDUP set, articles
+    already published (same id and content) are dropped before publishing.
+    With GUARDIAN_FIELDS set, only those article fields are requested and
+    published. With GUARDIAN_ENRICH set, each article also carries features of
+    its body text (word count, language, keywords, text hash). With
+    GUARDIAN_SPOOL set, records are written to a local write-ahead log before
+    publishing, and whatever a failed publish left behind is replayed on the
+    next invocation. With GUARDIAN_METRICS=emf, the invocation's fetch and
+    publish metrics are printed as one CloudWatch Embedded Metric Format line.
     """
     print("--- Lambda Invocation Started ---")
 
@@ -68,15 +262,20 @@ def lambda_handler(event: dict, context: object):
         secrets = get_secret()
         API_KEY = secrets.get("GUARDIAN_API_KEY")
         API_URL = secrets.get("GUARDIAN_URL")
+        # A 401 after a rotation refreshes the secret and retries once
+        get_client().on_unauthorized = refresh_api_key
     except Exception as e:
         print(f"FATAL: Could not initialize secrets: {e}")
         return {"statusCode": 500, "body": "Failed to load credentials for execution."}
 
     # --- EXTRACT ARGUMENTS FROM EVENT ---
     search_term = event.get("search")
+    terms = event.get("terms")
     date_from_str = event.get("date_from")
+    page_size = int(event.get("page_size", MAX_PAGE_SIZE))
+    max_pages = event.get("max_pages")
 
-    if not search_term:
+    if not search_term and not terms:
         print("ERROR: 'search' term is missing from the event payload.")
         return {"statusCode": 400, "body": "Missing required search parameter"}
 
@@ -88,47 +287,158 @@ def lambda_handler(event: dict, context: object):
             print(f"WARNING: Invalid date format: {date_from_str}. Using today's date.")
             date_obj = date.today()
     else:
-        date_obj = date.today()
+        # Today, or the checkpoint's day for incremental runs
+        date_obj = None
 
-    # --- BUILD API PARAMETERS ---
-    user_criteria = {"search_term": search_term, "date_from": date_obj}
-    api_params = build_search_params(user_criteria)
+    # --- FIELD PROJECTION (what each record carries) ---
+    projection = get_projection()
+    show_fields = projection.show_fields if projection else None
 
-    # --- FETCH CONTENT ---
-    print(f"Fetching data for '{search_term}' from {date_obj}...")
-    data = fetch_guardian_content(API_URL, api_params, API_KEY)
+    # --- ENRICHMENT (features computed from the body text) ---
+    enrich_stage = None
+    if feature_enabled("GUARDIAN_ENRICH"):
+        from src.enrichment import (
+            enrichment_stage_from_env,
+            has_body_text,
+            with_body_text,
+        )
 
-    if not data or "response" not in data or "results" not in data["response"]:
-        print("Fetch failed or no data found in response.")
-        return {
-            "statusCode": 200,
-            "body": "No articles found or API structure was missing.",
+        # The body is only published if the projection asks for it
+        enrich_stage = enrichment_stage_from_env(keep_body=has_body_text(show_fields))
+        if enrich_stage is not None:
+            show_fields = with_body_text(show_fields)
+
+    # --- LOAD CHECKPOINTS (incremental runs) ---
+    checkpoints = {}
+    if feature_enabled("GUARDIAN_CHECKPOINT"):
+        from src.checkpoint import QueryCheckpoint, checkpoint_store_from_env
+
+        checkpoint_store = checkpoint_store_from_env()
+        if checkpoint_store is not None:
+            for term in terms or [search_term]:
+                checkpoints[term] = QueryCheckpoint(checkpoint_store, term)
+
+    # Stages between the fetch and the publisher
+    stages = []
+    term_stats = None
+    # How far the single-term walk got, so a failed page is not checkpointed
+    walk = {}
+    if terms:
+        # Only loaded for batch invocations, to keep cold starts short
+        from src.batch import DEFAULT_BATCH_WORKERS, iter_batch_results
+
+        # --- FETCH CONTENT (several terms, concurrently) ---
+        term_stats = {}
+        print(f"Fetching data for {len(terms)} terms from {date_obj or 'today'}...")
+        articles = iter_batch_results(
+            API_URL,
+            terms,
+            API_KEY,
+            date_obj,
+            page_size=page_size,
+            max_pages=int(max_pages) if max_pages else None,
+            max_workers=int(event.get("workers", DEFAULT_BATCH_WORKERS)),
+            stats=term_stats,
+            checkpoints=checkpoints,
+            show_fields=show_fields,
+        )
+    else:
+        # --- BUILD API PARAMETERS ---
+        checkpoint = checkpoints.get(search_term)
+        user_criteria = {
+            "search_term": search_term,
+            "date_from": date_obj,
+            "checkpoint": checkpoint.previous if checkpoint else None,
+            "show_fields": show_fields,
         }
+        api_params = build_search_params(user_criteria)
+
+        # --- FETCH CONTENT (streamed page by page) ---
+        print(f"Fetching data for '{search_term}' from {date_obj or 'today'}...")
+        articles = iter_guardian_results(
+            API_URL,
+            api_params,
+            API_KEY,
+            page_size=page_size,
+            max_pages=int(max_pages) if max_pages else None,
+            walk=walk,
+        )
+        if checkpoint is not None:
+            stages.append(Stage("checkpoint", checkpoint.filter, stream=True))
 
-    records_to_publish = data["response"]["results"]
+    # --- DROP ARTICLES ALREADY PUBLISHED ---
+    deduplicator = get_deduplicator()
+    if deduplicator is not None:
+        stages.append(Stage("dedup", deduplicator.filter, stream=True))
+    # After dedup, so only new articles are enriched
+    if enrich_stage is not None:
+        stages.append(enrich_stage)
 
-    # --- INITIALIZE & PUBLISH ---
-    print(f"Found {len(records_to_publish)} records. Publishing to Kinesis...")
+    # --- PUBLISH (stages run concurrently, connected by bounded queues) ---
+    print(f"Publishing records to {GUARDIAN_PUBLISHER}...")
+    publisher = get_publisher()
+    pipeline = Pipeline(articles, stages, queue_size=PIPELINE_QUEUE_SIZE)
 
-    publisher = KinesisPublisher(
-        stream_name=KINESIS_STREAM_NAME, region_name=KINESIS_REGION
-    )
+    if event.get("buffered") and isinstance(publisher, KinesisPublisher):
+        from src.producer import BufferedKinesisProducer
 
-    publish_response = publisher.publish(records_to_publish)
+        # Publish from a background thread so the next page is fetched while
+        # earlier batches are in flight.
+        with BufferedKinesisProducer(publisher) as producer:
+            publish_response = pipeline.publish(with_spool(producer))
+    else:
+        # Through the spool, records are logged before they are serialized
+        publish_response = pipeline.publish(with_spool(publisher))
 
-    if publish_response and publish_response.get("FailedRecordCount", 0) == 0:
+    if pipeline.records == 0:
+        # A spooled publisher has already replayed earlier invocations' records
+        print("Fetch failed or no data found in response.")
         return {
             "statusCode": 200,
-            "body": json.dumps(
-                {
-                    "message": f"Successfully published {len(records_to_publish)} records.",
-                    "kinesis_response_summary": {
-                        "FailedRecordCount": publish_response.get("FailedRecordCount")
-                    },
-                }
-            ),
+            "body": "No articles found or API structure was missing.",
         }
+
+    if publish_response and publish_response.get("FailedRecordCount", 0) == 0:
+        # Aggregated publishes pack several articles into each Kinesis record
+        published_count = publish_response.get(
+            "UserRecordCount", len(publish_response["Records"])
+        )
+        # Only move checkpoints forward once everything is safely published,
+        # and only for terms whose walk was not cut short by a failed page
+        errors = (
+            {term: stats["error"] for term, stats in term_stats.items()}
+            if term_stats is not None
+            else {search_term: walk.get("error")}
+        )
+        for term, checkpoint in checkpoints.items():
+            if errors.get(term):
+                print(
+                    f"Warning: checkpoint for '{term}' kept, its fetch stopped early."
+                )
+            else:
+                checkpoint.save()
+        if deduplicator is not None:
+            deduplicator.commit()
+        body = {
+            "message": f"Successfully published {published_count} records.",
+            "kinesis_response_summary": {
+                "FailedRecordCount": publish_response.get("FailedRecordCount")
+            },
+        }
+        if term_stats is not None:
+            body["terms"] = term_stats
+        elif walk.get("error"):
+            body["incomplete"] = walk["error"]
+        # Items and seconds waiting/blocked per stage show the bottleneck
+        body["pipeline"] = pipeline.stats()
+        if deduplicator is not None:
+            body["dedup"] = deduplicator.stats()
+        if get_spool() is not None:
+            body["spool"] = get_spool().stats()
+        return {"statusCode": 200, "body": json.dumps(body)}
     else:
+        if deduplicator is not None:
+            deduplicator.rollback()
         return {
             "statusCode": 500,
             "body": json.dumps(
@@ -137,3 +447,10 @@ def lambda_handler(event: dict, context: object):
                 }
             ),
         }
+
+
+# --- INIT PHASE ---
+# Inside Lambda, build the clients while the container initializes, so the
+# first invocation does not pay for them and warm invocations reuse them.
+if os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    init_clients()
@@ -0,0 +1,301 @@
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator
+
+# Optional OpenTelemetry API. Only required when GUARDIAN_METRICS=otel.
+try:
+    from opentelemetry import metrics as otel_metrics
+    from opentelemetry import trace as otel_trace
+except ImportError:  # pragma: no cover - depends on the environment
+    otel_metrics = None
+    otel_trace = None
+
+# --- METRICS CONFIGURATION ---
+# Output format: none (default), emf, prometheus or otel
+DEFAULT_METRICS_FORMAT = "none"
+# CloudWatch namespace and dimension used for Embedded Metric Format output
+DEFAULT_NAMESPACE = "GuardianArticleStreamer"
+DEFAULT_SERVICE = "guardian-article-streamer"
+# Observations kept per timer for EMF (CloudWatch accepts at most 100 values)
+MAX_SAMPLES = 100
+# Prefix of every Prometheus metric name
+PROMETHEUS_PREFIX = "guardian_streamer_"
+# -----------------------------
+
+_INVALID_PROMETHEUS_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+class OpenTelemetrySink:
+    """
+    Forwards counters and timings to OpenTelemetry instruments and opens a
+    span for every MetricsRegistry.span().
+
+    Only the OpenTelemetry API is used: providers and exporters are set up by
+    the application, e.g. with opentelemetry-instrument or the OTEL_*
+    environment variables.
+    """
+
+    def __init__(self, name: str = DEFAULT_SERVICE):
+        if otel_metrics is None:
+            raise ImportError(
+                "GUARDIAN_METRICS=otel requires: pip install opentelemetry-api"
+            )
+        self.meter = otel_metrics.get_meter(name)
+        self.tracer = otel_trace.get_tracer(name)
+        self._counters = {}
+        self._histograms = {}
+
+    def incr(self, name: str, value: float, unit: str):
+        if name not in self._counters:
+            self._counters[name] = self.meter.create_counter(name, unit=unit)
+        self._counters[name].add(value)
+
+    def observe(self, name: str, value: float, unit: str):
+        if name not in self._histograms:
+            self._histograms[name] = self.meter.create_histogram(name, unit=unit)
+        self._histograms[name].record(value)
+
+    def span(self, name: str):
+        return self.tracer.start_as_current_span(name)
+
+
+class MetricsRegistry:
+    """
+    A thread-safe collection of counters and timers.
+
+    Counters add up values such as requests, bytes or failed records. Timers
+    (and any other observe() call) keep the exact count, sum, min and max,
+    plus a random sample of at most MAX_SAMPLES observations for EMF.
+    span() times a stage like timer() and, with an OpenTelemetry sink, also
+    records it as a trace span.
+
+    Usage:
+        with METRICS.span("guardian_fetch_latency_ms"):
+            response = session.get(...)
+        METRICS.incr("guardian_bytes_downloaded", len(body), "Bytes")
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timers = {}
+        self.sinks = []
+
+    def incr(self, name: str, value: float = 1, unit: str = "Count"):
+        """Adds value to a counter."""
+        with self._lock:
+            counter = self._counters.setdefault(name, {"value": 0, "unit": unit})
+            counter["value"] += value
+        for sink in self.sinks:
+            sink.incr(name, value, unit)
+
+    def observe(self, name: str, value: float, unit: str = "Milliseconds"):
+        """Records one observation, e.g. a latency or a page size."""
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = {
+                    "unit": unit,
+                    "count": 0,
+                    "sum": 0.0,
+                    "min": value,
+                    "max": value,
+                    "samples": [],
+                }
+            timer["count"] += 1
+            timer["sum"] += value
+            timer["min"] = min(timer["min"], value)
+            timer["max"] = max(timer["max"], value)
+            # Reservoir sampling keeps an unbiased sample of every observation
+            if len(timer["samples"]) < MAX_SAMPLES:
+                timer["samples"].append(value)
+            else:
+                slot = random.randrange(timer["count"])
+                if slot < MAX_SAMPLES:
+                    timer["samples"][slot] = value
+        for sink in self.sinks:
+            sink.observe(name, value, unit)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Records the time spent in the block, in milliseconds."""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.observe(name, (self._clock() - start) * 1000)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Like timer(), and also a trace span in OpenTelemetry sinks."""
+        with ExitStack() as spans:
+            for sink in self.sinks:
+                if hasattr(sink, "span"):
+                    spans.enter_context(sink.span(name))
+            with self.timer(name):
+                yield
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns a copy of every counter and timer."""
+        with self._lock:
+            return {
+                "counters": {k: dict(v) for k, v in self._counters.items()},
+                "timers": {
+                    k: dict(v, samples=list(v["samples"]))
+                    for k, v in self._timers.items()
+                },
+            }
+
+    def reset(self):
+        """Clears every counter and timer, e.g. after an EMF flush."""
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+
+def to_emf(
+    snapshot: Dict[str, Any],
+    namespace: str = DEFAULT_NAMESPACE,
+    dimensions: Dict[str, str] = None,
+) -> Dict[str, Any] or None:
+    """
+    Formats a snapshot as one CloudWatch Embedded Metric Format document.
+
+    Printed to stdout from Lambda, CloudWatch Logs turns it into metrics
+    without any PutMetricData calls. Timers are published as their sampled
+    values, so CloudWatch can compute percentiles. Returns None if there is
+    nothing to report.
+    """
+    dimensions = dimensions or {"Service": DEFAULT_SERVICE}
+    document = dict(dimensions)
+    definitions = []
+    for name, counter in snapshot["counters"].items():
+        document[name] = counter["value"]
+        definitions.append({"Name": name, "Unit": counter["unit"]})
+    for name, timer in snapshot["timers"].items():
+        document[name] = timer["samples"]
+        definitions.append({"Name": name, "Unit": timer["unit"]})
+    if not definitions:
+        return None
+
+    document["_aws"] = {
+        "Timestamp": int(time.time() * 1000),
+        "CloudWatchMetrics": [
+            {
+                "Namespace": namespace,
+                "Dimensions": [list(dimensions)],
+                "Metrics": definitions,
+            }
+        ],
+    }
+    return document
+
+
+def to_prometheus(snapshot: Dict[str, Any], prefix: str = PROMETHEUS_PREFIX) -> str:
+    """
+    Formats a snapshot in the Prometheus text exposition format.
+
+    Counters become counters (with a _total suffix) and timers become
+    summaries with _count and _sum, plus _min and _max gauges.
+    """
+
+    def metric_name(name: str) -> str:
+        return _INVALID_PROMETHEUS_CHARS.sub("_", prefix + name)
+
+    lines = []
+    for name, counter in sorted(snapshot["counters"].items()):
+        name = metric_name(name) + "_total"
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {counter['value']}")
+    for name, timer in sorted(snapshot["timers"].items()):
+        name = metric_name(name)
+        lines.append(f"# TYPE {name} summary")
+        lines.append(f"{name}_count {timer['count']}")
+        lines.append(f"{name}_sum {timer['sum']}")
+        for stat in ("min", "max"):
+            lines.append(f"# TYPE {name}_{stat} gauge")
+            lines.append(f"{name}_{stat} {timer[stat]}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def write_atomically(path: str, text: str):
+    """Replaces path with text, so a scraper never reads a half-written file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(
+        "w", dir=directory, delete=False, suffix=".tmp"
+    ) as tmp:
+        tmp.write(text)
+    os.replace(tmp.name, path)
+
+
+# Process-wide registry used by the fetch and publish code
+METRICS = MetricsRegistry()
+
+
+def configure_metrics_from_env(registry: MetricsRegistry = METRICS):
+    """
+    Attaches an OpenTelemetry sink when GUARDIAN_METRICS=otel. Other formats
+    need no setup: they are rendered by emit_metrics.
+    """
+    metrics_format = os.environ.get("GUARDIAN_METRICS", DEFAULT_METRICS_FORMAT)
+    if metrics_format.lower() == "otel" and not any(
+        isinstance(sink, OpenTelemetrySink) for sink in registry.sinks
+    ):
+        registry.sinks.append(OpenTelemetrySink())
+
+
+def emit_metrics(registry: MetricsRegistry = METRICS):
+    """
+    Writes the collected metrics in the format chosen by GUARDIAN_METRICS.
+
+    emf: prints one Embedded Metric Format line (namespace from
+    GUARDIAN_METRICS_NAMESPACE) and resets the registry, so every Lambda
+    invocation reports its own values.
+    prometheus: writes the text format to GUARDIAN_METRICS_FILE (e.g. for
+    the node_exporter textfile collector), or prints it. Values keep
+    accumulating, as Prometheus expects.
+    otel and none: nothing to do, OpenTelemetry instruments are fed live.
+    """
+    metrics_format = os.environ.get("GUARDIAN_METRICS", DEFAULT_METRICS_FORMAT)
+    metrics_format = metrics_format.lower()
+
+    if metrics_format == "emf":
+        document = to_emf(
+            registry.snapshot(),
+            namespace=os.environ.get("GUARDIAN_METRICS_NAMESPACE", DEFAULT_NAMESPACE),
+        )
+        registry.reset()
+        if document is not None:
+            print(json.dumps(document))
+    elif metrics_format == "prometheus":
+        text = to_prometheus(registry.snapshot())
+        path = os.environ.get("GUARDIAN_METRICS_FILE")
+        if path:
+            write_atomically(path, text)
+        else:
+            print(text, end="")
+
+
+def emits_metrics(handler: Callable) -> Callable:
+    """
+    Decorates a Lambda handler so the metrics of every invocation are
+    emitted when it returns or raises.
+    """
+
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        configure_metrics_from_env()
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            emit_metrics()
+
+    return wrapper
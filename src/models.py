@@ -0,0 +1,163 @@
+import os
+from typing import Any, Dict, Iterable, Optional
+
+# --- PROJECTION CONFIGURATION ---
+# What consumers need from each article. apiUrl, isHosted, pillarId and the
+# rest of the search result are dropped before publishing.
+DEFAULT_ARTICLE_FIELDS = (
+    "id",
+    "sectionId",
+    "webPublicationDate",
+    "webTitle",
+    "webUrl",
+)
+# Projected names with this prefix are requested through show-fields,
+# e.g. "fields.bodyText" or "fields.trailText"
+SHOW_FIELDS_PREFIX = "fields."
+# Features computed by src.enrichment; every projection keeps them
+ENRICHMENT_KEY = "enrichment"
+# --------------------------------
+
+# The pydantic Article model, built by get_article_model()
+_ARTICLE_MODEL = None
+
+
+def get_article_model():
+    """
+    Returns the Article model, defining it on first use.
+
+    pydantic is only imported here, so loading this module (e.g. in a Lambda
+    cold start) stays cheap unless validation is enabled. `Article` can also
+    be imported from this module as usual.
+    """
+    global _ARTICLE_MODEL
+
+    if _ARTICLE_MODEL is None:
+        from pydantic import BaseModel, ConfigDict
+
+        class Article(BaseModel):
+            """
+            One Guardian search result.
+
+            Only id is required. Unknown keys are ignored, so new API fields do not
+            break parsing, and webPublicationDate stays the API's ISO 8601 string so
+            checkpoints and records keep the exact format.
+            """
+
+            model_config = ConfigDict(extra="ignore")
+
+            id: str
+            type: Optional[str] = None
+            sectionId: Optional[str] = None
+            sectionName: Optional[str] = None
+            webPublicationDate: Optional[str] = None
+            webTitle: Optional[str] = None
+            webUrl: Optional[str] = None
+            apiUrl: Optional[str] = None
+            isHosted: Optional[bool] = None
+            pillarId: Optional[str] = None
+            pillarName: Optional[str] = None
+            # The show-fields values, e.g. {"bodyText": "...", "wordcount": "812"}
+            fields: Optional[Dict[str, Any]] = None
+            # Added by src.enrichment, e.g. {"wordCount": 812, "language": "en"}
+            enrichment: Optional[Dict[str, Any]] = None
+
+        _ARTICLE_MODEL = Article
+
+    return _ARTICLE_MODEL
+
+
+def __getattr__(name: str):
+    # Builds Article on attribute access, e.g. `from src.models import Article`
+    if name == "Article":
+        return get_article_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class ArticleProjection:
+    """
+    Reduces articles to the fields consumers need before they are published.
+
+    Names are top-level result keys ("webTitle") or show-fields values
+    prefixed with "fields." ("fields.bodyText"); show_fields lists the
+    latter for the search request, so the API only returns what is kept.
+    Missing fields are left out of the record rather than set to null.
+    Features added by src.enrichment are always kept.
+
+    By default records are projected as plain dicts, which is cheap. With
+    validate=True every article is first parsed into an Article, so records
+    with the wrong types raise a pydantic ValidationError (a ValueError)
+    instead of reaching consumers.
+
+    Usage:
+        projection = ArticleProjection(["id", "webTitle", "fields.bodyText"])
+        params["show-fields"] = projection.show_fields
+        record = projection(article)
+    """
+
+    def __init__(
+        self, fields: Iterable[str] = DEFAULT_ARTICLE_FIELDS, validate: bool = False
+    ):
+        self.fields = list(dict.fromkeys(f.strip() for f in fields if f.strip()))
+        self.validate = validate
+        self._top_level = [
+            f for f in self.fields if not f.startswith(SHOW_FIELDS_PREFIX)
+        ]
+        if ENRICHMENT_KEY not in self._top_level:
+            self._top_level.append(ENRICHMENT_KEY)
+        self._show_fields = [
+            f[len(SHOW_FIELDS_PREFIX) :]
+            for f in self.fields
+            if f.startswith(SHOW_FIELDS_PREFIX)
+        ]
+
+    @property
+    def show_fields(self) -> str or None:
+        """The show-fields parameter for the projected fields, or None."""
+        return ",".join(self._show_fields) or None
+
+    def __call__(self, article: Dict[str, Any]) -> Dict[str, Any]:
+        if self.validate:
+            article = (
+                get_article_model()
+                .model_validate(article)
+                .model_dump(exclude_none=True)
+            )
+
+        record = {key: article[key] for key in self._top_level if key in article}
+        body = article.get("fields")
+        if self._show_fields and body:
+            kept = {key: body[key] for key in self._show_fields if key in body}
+            if kept:
+                record["fields"] = kept
+        return record
+
+
+def projection_from_spec(
+    spec: str, validate: bool = False
+) -> ArticleProjection or None:
+    """
+    Builds a projection from a comma-separated field list such as
+    "id,webTitle,fields.bodyText". "default" selects DEFAULT_ARTICLE_FIELDS;
+    an empty spec or "all" returns None, which publishes whole articles.
+    """
+    spec = (spec or "").strip()
+    if not spec or spec.lower() == "all":
+        return None
+    if spec.lower() == "default":
+        return ArticleProjection(validate=validate)
+    return ArticleProjection(spec.split(","), validate=validate)
+
+
+def projection_from_env() -> ArticleProjection or None:
+    """
+    Builds the article projection from environment variables, or returns None.
+
+    GUARDIAN_FIELDS is a field list for projection_from_spec, e.g.
+    "id,webTitle,webUrl,fields.bodyText"; unset publishes whole articles.
+    GUARDIAN_VALIDATE_ARTICLES=true parses each article into an Article first.
+    """
+    return projection_from_spec(
+        os.environ.get("GUARDIAN_FIELDS"),
+        validate=os.environ.get("GUARDIAN_VALIDATE_ARTICLES", "").lower() == "true",
+    )
@@ -0,0 +1,140 @@
+import hashlib
+import itertools
+import threading
+import uuid
+from typing import Any, Dict
+
+# Kinesis partition keys are limited to 256 characters
+MAX_PARTITION_KEY_LENGTH = 256
+DEFAULT_PARTITION_STRATEGY = "webUrl"
+
+
+def _md5_hex(value: str) -> str:
+    return hashlib.md5(value.encode("utf-8")).hexdigest()
+
+
+class WebUrlStrategy:
+    """
+    The original strategy: the article webUrl is the partition key.
+
+    URLs longer than the Kinesis limit are replaced by their MD5 hash. Articles
+    without a webUrl fall back to their id, then to a random key, so they do
+    not all land on the same shard.
+    """
+
+    name = "webUrl"
+
+    def __call__(self, record: Dict[str, Any], index: int) -> Dict[str, str]:
+        key = record.get("webUrl") or record.get("id") or uuid.uuid4().hex
+        if len(key) > MAX_PARTITION_KEY_LENGTH:
+            key = _md5_hex(key)
+        return {"PartitionKey": key}
+
+
+class IdHashStrategy:
+    """
+    A 32-character MD5 of the article id: short keys that spread evenly and
+    always send the same article to the same shard.
+    """
+
+    name = "id"
+
+    def __call__(self, record: Dict[str, Any], index: int) -> Dict[str, str]:
+        article_id = record.get("id") or record.get("webUrl")
+        return {
+            "PartitionKey": _md5_hex(article_id) if article_id else uuid.uuid4().hex
+        }
+
+
+class SectionStrategy:
+    """
+    Groups articles by sectionId, keeping each section ordered on one shard.
+
+    Busy sections can make their shard hot, so prefer "id" unless consumers
+    need per-section ordering.
+    """
+
+    name = "section"
+
+    def __call__(self, record: Dict[str, Any], index: int) -> Dict[str, str]:
+        return {"PartitionKey": record.get("sectionId") or "unknown"}
+
+
+class RandomStrategy:
+    """A random key per record: the most even spread, with no ordering at all."""
+
+    name = "random"
+
+    def __call__(self, record: Dict[str, Any], index: int) -> Dict[str, str]:
+        return {"PartitionKey": uuid.uuid4().hex}
+
+
+class ExplicitHashKeyStrategy:
+    """
+    Assigns records to open shards round-robin with ExplicitHashKey.
+
+    Shard hash key ranges come from ListShards on first use (and after
+    refresh()), so every shard receives the same number of records however
+    the keys would have hashed.
+    """
+
+    name = "explicit"
+
+    def __init__(self, client, stream_name: str):
+        self.client = client
+        self.stream_name = stream_name
+        self._hash_keys = None
+        self._cycle = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Reloads the open shards, e.g. after resharding."""
+        hash_keys = []
+        kwargs = {"StreamName": self.stream_name}
+        while True:
+            response = self.client.list_shards(**kwargs)
+            for shard in response["Shards"]:
+                # Closed shards (after a split or merge) have an EndingSequenceNumber
+                if "EndingSequenceNumber" in shard.get("SequenceNumberRange", {}):
+                    continue
+                hash_keys.append(shard["HashKeyRange"]["StartingHashKey"])
+            if not response.get("NextToken"):
+                break
+            kwargs = {"NextToken": response["NextToken"]}
+
+        with self._lock:
+            self._hash_keys = hash_keys
+            self._cycle = itertools.cycle(hash_keys)
+
+    def __call__(self, record: Dict[str, Any], index: int) -> Dict[str, str]:
+        if self._cycle is None:
+            self.refresh()
+        with self._lock:
+            hash_key = next(self._cycle)
+        # The partition key is still required but no longer decides the shard
+        return {"PartitionKey": "explicit", "ExplicitHashKey": hash_key}
+
+
+STRATEGIES = {
+    "webUrl": WebUrlStrategy,
+    "id": IdHashStrategy,
+    "section": SectionStrategy,
+    "random": RandomStrategy,
+}
+
+
+def get_partition_strategy(
+    name: str = DEFAULT_PARTITION_STRATEGY, client=None, stream_name: str = None
+):
+    """
+    Builds a partition strategy by name: "webUrl", "id", "section", "random" or
+    "explicit". The explicit strategy needs the Kinesis client and stream name.
+
+    Raises:
+        ValueError: For an unknown strategy name.
+    """
+    if name == "explicit":
+        return ExplicitHashKeyStrategy(client, stream_name)
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown partition strategy '{name}'.")
+    return STRATEGIES[name]()
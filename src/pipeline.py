@@ -0,0 +1,331 @@
+import queue
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+# --- PIPELINE CONFIGURATION ---
+# Items buffered between two stages before the upstream one blocks (backpressure)
+DEFAULT_PIPELINE_QUEUE_SIZE = 1000
+# Seconds between checks for a stopped pipeline while waiting on a queue
+POLL_SECONDS = 0.1
+# ------------------------------
+
+# Queue marker sent by a stage when it has no more items
+_DONE = object()
+# Returned by a queue read that gave up because the pipeline stopped
+_STOPPED = object()
+
+
+def _apply(fn: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+    """Runs fn over a batch of items (in a worker thread or process)."""
+    return [fn(item) for item in items]
+
+
+class Stage:
+    """
+    One step of a Pipeline, running on its own thread.
+
+    A map stage calls fn(item) for every item and passes the result on; None
+    drops the item. With workers > 1 the calls run on a thread pool, or on a
+    process pool with processes=True, for CPU-heavy functions that the GIL
+    would otherwise serialize. Process stages need a module-level fn and
+    picklable items, and send items in batches of batch_size to keep the
+    inter-process overhead down. Results keep their input order either way.
+
+    A stream stage (stream=True) calls fn(items) once with an iterator over its
+    input and passes on everything it yields. Use it for stateful steps that
+    must see items in order, such as Deduplicator.filter or
+    QueryCheckpoint.filter.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        workers: int = 1,
+        processes: bool = False,
+        batch_size: int = 1,
+        stream: bool = False,
+    ):
+        """
+        Args:
+            name: Name used in the pipeline stats.
+            fn: fn(item) for a map stage, fn(items) for a stream stage.
+            workers: Items processed at the same time (map stages only).
+            processes: Use a process pool instead of a thread pool.
+            batch_size: Items sent to a pool worker at a time.
+            stream: Call fn once with the whole input instead of per item.
+        """
+        if stream and (workers > 1 or processes):
+            raise ValueError(f"Stream stage '{name}' runs on a single thread.")
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.processes = processes
+        self.batch_size = max(1, batch_size)
+        self.stream = stream
+
+    def run(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Applies the stage to its input, yielding its output."""
+        if self.stream:
+            yield from self.fn(items)
+            return
+        if self.workers == 1 and not self.processes:
+            for item in items:
+                result = self.fn(item)
+                if result is not None:
+                    yield result
+            return
+
+        # Imported here: multiprocessing adds to Lambda cold starts
+        if self.processes:
+            from concurrent.futures import ProcessPoolExecutor as Executor
+        else:
+            from concurrent.futures import ThreadPoolExecutor as Executor
+        executor = Executor(max_workers=self.workers)
+        # Two batches per worker keep the pool busy without reading far ahead
+        in_flight = deque()
+        items = iter(items)
+        try:
+            while True:
+                batch = list(islice(items, self.batch_size))
+                if batch:
+                    in_flight.append(executor.submit(_apply, self.fn, batch))
+                if in_flight and (not batch or len(in_flight) >= self.workers * 2):
+                    for result in in_flight.popleft().result():
+                        if result is not None:
+                            yield result
+                elif not batch:
+                    return
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+class _Channel:
+    """A bounded queue between two stages that the reading side can close."""
+
+    def __init__(self, maxsize: int, stop: threading.Event):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.stop = stop
+        # Set when the reader no longer wants items, e.g. a checkpoint was reached
+        self.closed = threading.Event()
+
+    def put(self, item: Any, stats: Dict[str, Any]) -> bool:
+        """Blocks while the queue is full. Returns False if nobody will read it."""
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        start = time.perf_counter()
+        try:
+            while not (self.stop.is_set() or self.closed.is_set()):
+                try:
+                    self.queue.put(item, timeout=POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stats["seconds_blocked"] += time.perf_counter() - start
+
+    def items(self, stats: Dict[str, Any]) -> Iterator[Any]:
+        """Yields items until the writer is done or the pipeline stops."""
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                start = time.perf_counter()
+                item = _STOPPED
+                while item is _STOPPED and not self.stop.is_set():
+                    try:
+                        item = self.queue.get(timeout=POLL_SECONDS)
+                    except queue.Empty:
+                        continue
+                stats["seconds_waiting"] += time.perf_counter() - start
+            if item is _DONE or item is _STOPPED:
+                return
+            stats["in"] += 1
+            yield item
+
+
+class Pipeline:
+    """
+    Runs a source and a chain of stages concurrently, connected by bounded
+    queues.
+
+    The source (typically the fetch, e.g. iter_guardian_results) and every
+    stage run on their own thread, so network I/O, filtering, serialization
+    and publishing overlap and the wall time approaches that of the slowest
+    stage. A full queue blocks the stage writing to it, so a slow publisher
+    slows the fetch down instead of buffering the whole result set
+    (backpressure). If any stage raises, the pipeline stops and the error is
+    raised to the consumer.
+
+    stats() reports, per stage, the items in and out, the seconds spent
+    waiting for input and the seconds blocked on a full queue: the slowest
+    stage is the one that neither waits nor blocks.
+
+    Usage:
+        pipeline = Pipeline(
+            iter_guardian_results(...),
+            [Stage("dedup", deduplicator.filter, stream=True)],
+        )
+        response = pipeline.publish(publisher)
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Any],
+        stages: Iterable[Stage] = (),
+        queue_size: int = DEFAULT_PIPELINE_QUEUE_SIZE,
+        source_name: str = "fetch",
+        source_queue_size: int = None,
+    ):
+        """
+        Args:
+            source: The items fed into the first stage.
+            stages: Stages applied in order.
+            queue_size: Items buffered between two stages.
+            source_name: Name of the source in the stats.
+            source_queue_size: Items buffered after the source, if different,
+                e.g. a few pages when the source yields whole pages.
+        """
+        self.source = source
+        self.stages = list(stages)
+        self.queue_size = max(1, queue_size)
+        self.source_name = source_name
+        self.source_queue_size = max(1, source_queue_size or queue_size)
+        self._stop = threading.Event()
+        self._threads = []
+        self._errors = []
+        self._stats = {}
+        self._records_stage = None
+        self._started = False
+
+    # --- Public API ---
+    def __iter__(self) -> Iterator[Any]:
+        """Starts the pipeline and yields the last stage's output."""
+        if self._started:
+            raise RuntimeError("A pipeline can only be run once.")
+        self._started = True
+        if self._records_stage is None:
+            self._records_stage = self.output_name
+
+        channel = self._start(
+            self.source_name, lambda _: self.source, None, self.source_queue_size
+        )
+        for stage in self.stages:
+            channel = self._start(stage.name, stage.run, channel, self.queue_size)
+
+        stats = self._new_stats("output")
+        try:
+            yield from channel.items(stats)
+        finally:
+            channel.closed.set()
+            self.close()
+        if self._errors:
+            raise self._errors[0]
+
+    def publish(self, publisher):
+        """
+        Runs the pipeline into a publisher and returns its response.
+
+        A publisher whose class has publish_entries (every BatchPublisher) gets an
+        extra "serialize" stage, so records are encoded on their own thread
+        while the publisher sends earlier batches. Other publishers, including
+        a SpooledPublisher that must log records before they are encoded,
+        receive the records.
+        """
+        self._records_stage = self.output_name
+        if callable(getattr(type(publisher), "publish_entries", None)):
+            self.stages.append(Stage("serialize", publisher.to_entries, stream=True))
+            return publisher.publish_entries(self)
+        return publisher.publish(self)
+
+    @property
+    def output_name(self) -> str:
+        """Name of the stage whose output the pipeline yields."""
+        return self.stages[-1].name if self.stages else self.source_name
+
+    @property
+    def records(self) -> int:
+        """
+        Records handed to the publisher (before serialization), or yielded
+        to the consumer.
+        """
+        stats = self._stats.get(self._records_stage or self.output_name)
+        return stats["out"] if stats else 0
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Items and seconds waiting/blocked per stage, in pipeline order."""
+        return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def close(self):
+        """Stops every stage and waits for their threads."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Stage threads ---
+    def _new_stats(self, name: str) -> Dict[str, Any]:
+        stats = {"in": 0, "out": 0, "seconds_waiting": 0.0, "seconds_blocked": 0.0}
+        self._stats[name] = stats
+        return stats
+
+    def _start(
+        self,
+        name: str,
+        run: Callable[[Iterator[Any]], Iterable[Any]],
+        upstream: _Channel or None,
+        queue_size: int,
+    ) -> _Channel:
+        stats = self._new_stats(name)
+        downstream = _Channel(queue_size, self._stop)
+        thread = threading.Thread(
+            target=self._run,
+            args=(name, run, upstream, downstream, stats),
+            name=f"pipeline-{name}",
+            daemon=True,
+        )
+        self._threads.append(thread)
+        thread.start()
+        return downstream
+
+    def _run(
+        self,
+        name: str,
+        run: Callable[[Iterator[Any]], Iterable[Any]],
+        upstream: _Channel or None,
+        downstream: _Channel,
+        stats: Dict[str, Any],
+    ):
+        items = upstream.items(stats) if upstream is not None else None
+        output = None
+        try:
+            output = iter(run(items))
+            for item in output:
+                stats["out"] += 1
+                if not downstream.put(item, stats):
+                    break
+            else:
+                downstream.put(_DONE, stats)
+        except Exception as e:
+            print(f"Error: pipeline stage '{name}' failed: {e}")
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            # Stop generators early (e.g. the page fetch) when nobody reads on
+            close = getattr(output, "close", None)
+            if close is not None:
+                close()
+            if upstream is not None:
+                upstream.closed.set()
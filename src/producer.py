@@ -0,0 +1,357 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from src.aggregation import LENGTH_PREFIX
+from src.publisher import (
+    MAX_BYTES_PER_REQUEST,
+    MAX_RECORDS_PER_REQUEST,
+    KinesisPublisher,
+    format_shard_stats,
+)
+
+# --- PRODUCER CONFIGURATION ---
+# Seconds the first record of a batch may wait for more records to join it
+DEFAULT_LINGER_SECONDS = 0.1
+# Records buffered before put() blocks the caller (backpressure)
+DEFAULT_MAX_QUEUE_SIZE = 10_000
+# Seconds between checks that the background thread is still running, while
+# waiting on a full queue or a flush
+POLL_SECONDS = 0.1
+# ------------------------------
+
+# Queue markers understood by the background thread
+_CLOSE = object()
+
+
+def _routing(entry: Dict[str, Any]) -> Dict[str, str]:
+    """The PartitionKey (and ExplicitHashKey) of a PutRecords entry."""
+    return {key: value for key, value in entry.items() if key != "Data"}
+
+
+class _FlushRequest:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class BufferedKinesisProducer:
+    """
+    A KPL-style producer that publishes to Kinesis from a background thread.
+
+    put() returns a Future immediately. The background thread collects records
+    into batches and sends one when the oldest record has waited
+    `linger_seconds`, or the batch reaches `max_batch_records` records or
+    `max_batch_bytes` bytes. Batches go through KinesisPublisher.put_batch, so
+    PutRecords limits and retries behave exactly as in the synchronous path.
+    With the publisher's aggregate_max_bytes set, each batch is packed into
+    aggregated records before it is sent, and every record of an aggregate
+    resolves to that aggregate's result.
+
+    Each Future resolves to the per-record Kinesis result (a dict with
+    SequenceNumber/ShardId, or ErrorCode/ErrorMessage), or raises if the batch
+    could not be sent at all.
+
+    Usage:
+        with BufferedKinesisProducer(KinesisPublisher("stream")) as producer:
+            for article in iter_guardian_results(...):
+                producer.put(article)
+    """
+
+    def __init__(
+        self,
+        publisher: KinesisPublisher,
+        linger_seconds: float = DEFAULT_LINGER_SECONDS,
+        max_batch_records: int = MAX_RECORDS_PER_REQUEST,
+        max_batch_bytes: int = MAX_BYTES_PER_REQUEST,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+    ):
+        """
+        Args:
+            publisher: The KinesisPublisher whose client and retry policy are used.
+            linger_seconds: Maximum time a record waits in a partial batch.
+            max_batch_records: Record count that triggers a flush (max 500).
+            max_batch_bytes: Byte size that triggers a flush (max 5 MiB).
+            max_queue_size: Records buffered before put() blocks.
+        """
+        self.publisher = publisher
+        self.linger_seconds = linger_seconds
+        self.max_batch_records = min(max_batch_records, MAX_RECORDS_PER_REQUEST)
+        self.max_batch_bytes = min(max_batch_bytes, MAX_BYTES_PER_REQUEST)
+        self.stats = {
+            "records_sent": 0,
+            "records_failed": 0,
+            "records_retried": 0,
+            "batches": 0,
+            "flush_reasons": {"linger": 0, "records": 0, "bytes": 0, "flush": 0},
+            # Records and bytes per shard, in total and for the latest flush
+            "shards": {},
+            "last_flush_shards": {},
+        }
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._index = 0
+        self._closed = False
+        # Set if the background thread dies, and raised to callers
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._run, name="kinesis-producer", daemon=True
+        )
+        self._thread.start()
+
+    # --- Public API ---
+    def put(
+        self, record: Dict[str, Any], callback: Callable[[Future], Any] = None
+    ) -> Future:
+        """
+        Queues one record for publishing and returns a Future for its result.
+
+        Blocks only when the queue is full, which slows the caller down to the
+        rate Kinesis can absorb. Raises the background thread's error if it
+        has stopped.
+
+        Args:
+            record: The article dictionary to publish.
+            callback: Optional function called with the Future once it resolves.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot put records on a closed producer.")
+
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+
+        if self.publisher.aggregate_max_bytes:
+            # Serialized now, packed with the rest of its batch when sent
+            entry = {
+                "Data": self.publisher.to_payload(record),
+                **self.publisher.routing(record, self._index),
+            }
+        else:
+            entry = self.publisher.to_entry(record, self._index)
+        self._index += 1
+        self._enqueue((entry, future))
+        return future
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Sends every record queued so far and waits for the results.
+
+        Returns:
+            True if the flush completed within the timeout.
+
+        Raises:
+            The background thread's error, or RuntimeError if it is not
+            running (e.g. after close), instead of waiting for a flush that
+            can never happen.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        request = _FlushRequest()
+        if not self._enqueue(request, deadline):
+            return False
+        while True:
+            wait = POLL_SECONDS
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+            if request.done.wait(max(0.0, wait)):
+                return True
+            self._check_thread()
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self, timeout: float = None):
+        """Flushes outstanding records and stops the background thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._enqueue(_CLOSE)
+        self._thread.join(timeout)
+
+    def publish(self, records: Iterable[Dict[str, Any]]):
+        """
+        Drop-in replacement for KinesisPublisher.publish.
+
+        Records are queued as they are read from the iterable, so a generator
+        that fetches pages keeps fetching while earlier batches are in flight.
+
+        Returns:
+            An aggregated response with FailedRecordCount and per-record
+            Records in input order, or None if no records were given.
+        """
+        futures = [self.put(record) for record in records]
+        if not futures:
+            print("No records provided to publish.")
+            return None
+
+        self.flush()
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"ErrorCode": "PublishError", "ErrorMessage": str(e)})
+
+        failed_count = sum(1 for result in results if result.get("ErrorCode"))
+        if failed_count > 0:
+            print(f"Warning: {failed_count} records failed to publish.")
+        else:
+            print("Success: All records published.")
+
+        return {"FailedRecordCount": failed_count, "Records": results}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _enqueue(self, item, deadline: float = None) -> bool:
+        """
+        Puts an item on the queue, waiting while it is full, as long as the
+        background thread runs. Returns False if the deadline passed.
+        """
+        while True:
+            self._check_thread()
+            wait = POLL_SECONDS
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    return False
+            try:
+                self._queue.put(item, timeout=wait)
+                return True
+            except queue.Full:
+                continue
+
+    def _check_thread(self):
+        """Raises if the background thread has stopped."""
+        if self._error is not None:
+            raise self._error
+        if not self._thread.is_alive():
+            raise RuntimeError("The Kinesis producer's background thread has stopped.")
+
+    # --- Background thread ---
+    def _run(self):
+        try:
+            self._loop()
+        except Exception as e:
+            print(f"Error: Kinesis producer thread failed: {e}")
+            self._error = e
+            # Nothing will send the queued records now
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    return
+                if isinstance(item, tuple):
+                    item[1].set_exception(e)
+
+    def _loop(self):
+        max_bytes_per_record = self.publisher.max_bytes_per_record
+        # Aggregated records add a length prefix per article
+        framing = LENGTH_PREFIX.size if self.publisher.aggregate_max_bytes else 0
+        batch, batch_bytes, deadline = [], 0, None
+
+        while True:
+            timeout = None if not batch else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._send(batch, "linger")
+                batch, batch_bytes, deadline = [], 0, None
+                continue
+
+            if item is _CLOSE:
+                self._send(batch, "flush")
+                return
+
+            if isinstance(item, _FlushRequest):
+                self._send(batch, "flush")
+                batch, batch_bytes, deadline = [], 0, None
+                item.done.set()
+                continue
+
+            entry, future = item
+            size = self.publisher.entry_size(entry) + framing
+            if size > max_bytes_per_record:
+                self.stats["records_failed"] += 1
+                future.set_result(
+                    {
+                        "ErrorCode": "RecordTooLarge",
+                        "ErrorMessage": f"{size} bytes exceeds {max_bytes_per_record}",
+                    }
+                )
+                continue
+
+            if batch and batch_bytes + size > self.max_batch_bytes:
+                self._send(batch, "bytes")
+                batch, batch_bytes, deadline = [], 0, None
+
+            if not batch:
+                deadline = time.monotonic() + self.linger_seconds
+            batch.append((entry, future))
+            batch_bytes += size
+
+            if len(batch) >= self.max_batch_records:
+                self._send(batch, "records")
+                batch, batch_bytes, deadline = [], 0, None
+
+    def _entries(self, batch: List[tuple]) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """
+        The PutRecords entries of a batch, aggregated if enabled, and the
+        position of each record's entry among them.
+        """
+        entries = [entry for entry, _ in batch]
+        if not self.publisher.aggregate_max_bytes:
+            return entries, list(range(len(entries)))
+
+        packed = self.publisher.pack(
+            ((_routing(entry), entry["Data"]) for entry in entries)
+        )
+        entries, positions = [], []
+        for entry, count in packed:
+            positions += [len(entries)] * count
+            entries.append(entry)
+        return entries, positions
+
+    def _send(self, batch: List[tuple], reason: str):
+        if not batch:
+            return
+
+        self.stats["batches"] += 1
+        self.stats["flush_reasons"][reason] += 1
+        flush_shards = {}
+        try:
+            entries, positions = self._entries(batch)
+            results = [None] * len(entries)
+            retried = self.publisher.put_batch(
+                list(enumerate(entries)), results, flush_shards
+            )
+        except Exception as e:
+            print(
+                f"Error publishing to Kinesis stream '{self.publisher.stream_name}': {e}"
+            )
+            self.stats["records_failed"] += len(batch)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.stats["records_retried"] += retried
+        self.stats["last_flush_shards"] = flush_shards
+        for shard_id, counts in flush_shards.items():
+            totals = self.stats["shards"].setdefault(
+                shard_id, {"records": 0, "bytes": 0}
+            )
+            totals["records"] += counts["records"]
+            totals["bytes"] += counts["bytes"]
+        if flush_shards:
+            print(f"Flush ({reason}): {format_shard_stats(flush_shards)}")
+        for (_, future), position in zip(batch, positions):
+            result = results[position]
+            if result.get("ErrorCode"):
+                self.stats["records_failed"] += 1
+            else:
+                self.stats["records_sent"] += 1
+            future.set_result(result)
@@ -1,107 +1,598 @@
 import json
-from typing import Any, Dict, List
+import random
+import time
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
 import boto3
+from botocore.exceptions import ClientError
+
+from src.aggregation import aggregate
+from src.metrics import METRICS
+from src.partitioning import DEFAULT_PARTITION_STRATEGY, get_partition_strategy
+from src.serialization import Codec
+
+# --- PUTRECORDS LIMITS ---
+MAX_RECORDS_PER_REQUEST = 500
+MAX_BYTES_PER_REQUEST = 5 * 1024 * 1024
+# Data blob plus partition key
+MAX_BYTES_PER_RECORD = 1024 * 1024
+# -------------------------
+
+# --- RETRY CONFIGURATION ---
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 0.1
+BACKOFF_MAX_SECONDS = 5.0
+# Per-record ErrorCodes and request-level error codes worth resubmitting
+RETRYABLE_ERROR_CODES = {
+    "ProvisionedThroughputExceededException",
+    "InternalFailure",
+    "ServiceUnavailable",
+    "ThrottlingException",
+    "KMSThrottlingException",
+    "LimitExceededException",
+}
+# The subset that means the stream (or its KMS key) is over its limits
+THROTTLING_ERROR_CODES = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "KMSThrottlingException",
+    "LimitExceededException",
+}
+# ---------------------------
+
+
+def chunked(records: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Splits any iterable (list or generator) into lists of at most size items.
+
+    Only one chunk is materialized at a time, so generators are consumed lazily.
+    """
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def entry_size(entry: Dict[str, Any]) -> int:
+    """Returns the bytes a PutRecords entry counts against the Kinesis limits."""
+    return len(entry["Data"]) + len(entry["PartitionKey"].encode("utf-8"))
+
+
+def add_shard_stats(
+    shard_stats: Dict[str, Dict[str, int]],
+    entries: Iterable[Dict[str, Any]],
+    results: Iterable[Dict[str, Any]],
+):
+    """Adds successful records to per-shard record and byte counts, in place."""
+    for entry, result in zip(entries, results):
+        shard_id = result.get("ShardId")
+        if not shard_id or result.get("ErrorCode"):
+            continue
+        counts = shard_stats.setdefault(shard_id, {"records": 0, "bytes": 0})
+        counts["records"] += 1
+        counts["bytes"] += entry_size(entry)
+
+
+def format_shard_stats(shard_stats: Dict[str, Dict[str, int]]) -> str:
+    """Formats per-shard counts as one line, e.g. for a flush summary."""
+    return ", ".join(
+        f"{shard_id}: {counts['records']} records / {counts['bytes']} bytes"
+        for shard_id, counts in sorted(shard_stats.items())
+    )
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given zero-based attempt."""
+    return random.uniform(
+        0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt)
+    )
 
 
 # --- LOCAL PUBLISHER ---
 class LocalPublisher:
     """This function simulates publishing by printing JSON records to the console."""
 
-    def __init__(self, stream_name: str, region_name: str):
+    def __init__(
+        self,
+        stream_name: str,
+        region_name: str,
+        codec: Codec = None,
+        projection=None,
+    ):
         self.stream_name = stream_name
+        # Used to report the size each record would have on the wire
+        self.codec = codec or Codec()
+        # Optional ArticleProjection applied to each record before printing
+        self.projection = projection
         print(
             f"Warning: Falling back to LocalPublisher for stream '{stream_name}' in region '{region_name}'."
         )
 
-    def publish(self, records: List[Dict[str, Any]]):
-        if not records:
+    def publish(self, records: Iterable[Dict[str, Any]]):
+        records = iter(records)
+        first = next(records, None)
+        if first is None:
             print("No records provided to publish locally.")
             return None
 
-        print(
-            f"\n--- LOCAL SIMULATION: Published {len(records)} records to {self.stream_name} ---"
-        )
-        for i, record in enumerate(records):
+        print(f"\n--- LOCAL SIMULATION: Publishing records to {self.stream_name} ---")
+        count = 0
+        for i, record in enumerate(chain([first], records)):
+            partition_key = record.get("webUrl", f"record-{i}")
+            if self.projection is not None:
+                record = self.projection(record)
             # Print the data as a string to simulate payload transmission
+            payload_size = len(self.codec.encode(record))
             print(
-                f"Record {i+1} | PartitionKey: {record.get('webUrl', f'record-{i}')[:30]}..."
+                f"Record {i+1} | PartitionKey: {partition_key[:30]}... | {payload_size} bytes ({self.codec.name})"
             )
             print(json.dumps(record, indent=2))
-        print("--- END LOCAL SIMULATION ---\n")
+            count += 1
+        print(f"--- END LOCAL SIMULATION: Published {count} records ---\n")
 
         # Simulate a successful Kinesis response structure for testing purposes
         return {
             "FailedRecordCount": 0,
-            "Records": [{"SequenceNumber": "local"}] * len(records),
+            "Records": [{"SequenceNumber": "local"}] * count,
         }
 
 
+# --- BATCHING PUBLISHERS ---
+class BatchPublisher:
+    """
+    Base class for publishers that send records in size-limited batches.
+
+    Each backend declares its own limits (records and bytes per request,
+    bytes per record) and implements send_batch(). publish() does the rest:
+    records are serialized with the codec, grouped into batches within the
+    limits without collecting a generator, records over the record limit are
+    skipped, and entries the backend rejects with a retryable error are
+    resubmitted with exponential backoff and jitter. Every backend returns
+    the same response shape, so callers can swap them freely.
+
+    Subclasses implement send_batch(entries) and return one result per
+    entry: {} on success, or a dict with an ErrorCode.
+    """
+
+    name = "batch"
+    # Used in error messages, e.g. "Kinesis stream"
+    label = "batch"
+    max_records_per_batch = 500
+    max_bytes_per_batch = 5 * 1024 * 1024
+    max_bytes_per_record = 1024 * 1024
+    # Request-level and per-record error codes worth resubmitting
+    retryable_error_codes = frozenset()
+    # The subset reported as throttles
+    throttling_error_codes = frozenset()
+
+    def __init__(
+        self,
+        destination: str,
+        codec: Codec = None,
+        projection=None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        """
+        Args:
+            destination: Where records go, e.g. a stream, queue or topic name.
+            codec: Serializer and compression for record data. Defaults to
+                plain JSON.
+            projection: Optional callable (e.g. an ArticleProjection) that
+                reduces each article to the fields that are published.
+            max_attempts: Times a batch (or its failed records) is sent before
+                the remaining failures are reported.
+        """
+        self.destination = destination
+        self.codec = codec or Codec()
+        self.projection = projection
+        self.max_attempts = max(1, max_attempts)
+
+    # --- Serialization ---
+    def project(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns the part of an article that is published."""
+        if self.projection is None:
+            return record
+        return self.projection(record)
+
+    def to_entry(self, record: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """Converts an article into an entry with its Data bytes and Key."""
+        data = self.codec.encode(self.project(record))
+        key = record.get("id") or record.get("webUrl") or f"record-{index}"
+        return {"Data": data, "Key": key}
+
+    def to_entries(
+        self, records: Iterable[Dict[str, Any]]
+    ) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """
+        Converts articles into entries.
+
+        Yields:
+            (entry, count) pairs, where count is the number of articles in the entry.
+        """
+        # Serialization is timed per batch: a timer per record would cost
+        # about as much as encoding a small record
+        seconds, timed = 0.0, 0
+        for i, record in enumerate(records):
+            start = time.perf_counter()
+            entry = self.to_entry(record, i)
+            seconds += time.perf_counter() - start
+            timed += 1
+            if timed == self.max_records_per_batch:
+                METRICS.observe(f"{self.name}_serialize_ms", seconds * 1000)
+                seconds, timed = 0.0, 0
+            yield entry, 1
+        if timed:
+            METRICS.observe(f"{self.name}_serialize_ms", seconds * 1000)
+
+    def entry_size(self, entry: Dict[str, Any]) -> int:
+        """Returns the bytes an entry counts against the backend's limits."""
+        return len(entry["Data"])
+
+    # --- Sending ---
+    @property
+    def put_latency_metric(self) -> str:
+        """Timer of every send_batch call."""
+        return f"{self.name}_put_latency_ms"
+
+    def send_batch(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Sends one batch and returns a result per entry, in order."""
+        raise NotImplementedError
+
+    def is_retryable(self, result: Dict[str, Any]) -> bool:
+        return result.get("ErrorCode") in self.retryable_error_codes
+
+    def record_results(
+        self,
+        entries: List[Dict[str, Any]],
+        results: List[Dict[str, Any]],
+        stats: Dict[str, Any],
+    ):
+        """Called with every attempt's results, to add to the publish stats."""
+
+    def flush(self):
+        """Called at the end of every publish(). Buffering backends override it."""
+
+    def close(self):
+        """Releases the backend's resources."""
+        self.flush()
+
+    def put_batch(
+        self, batch: List[tuple], results: List[Any], stats: Dict[str, Any] = None
+    ) -> int:
+        """
+        Sends one batch, resubmitting only the entries that failed.
+
+        Args:
+            batch: (position, entry) pairs, where position indexes results.
+            results: Per-record results, filled in place at each position.
+            stats: Optional backend stats (e.g. per-shard counts), updated in
+                place by record_results.
+
+        Returns:
+            The number of records that were resubmitted.
+        """
+        pending = batch
+        retried = 0
+
+        for attempt in range(self.max_attempts):
+            try:
+                with METRICS.span(self.put_latency_metric):
+                    per_record = self.send_batch([entry for _, entry in pending])
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code in self.throttling_error_codes:
+                    METRICS.incr(f"{self.name}_throttles")
+                if (
+                    code not in self.retryable_error_codes
+                    or attempt == self.max_attempts - 1
+                ):
+                    METRICS.incr(f"{self.name}_failed_records", len(batch))
+                    raise
+                time.sleep(backoff_delay(attempt))
+                retried += len(pending)
+                METRICS.incr(f"{self.name}_retried_records", len(pending))
+                continue
+
+            if stats is not None:
+                self.record_results([entry for _, entry in pending], per_record, stats)
+            throttled = sum(
+                1
+                for result in per_record
+                if result.get("ErrorCode") in self.throttling_error_codes
+            )
+            if throttled:
+                METRICS.incr(f"{self.name}_throttles", throttled)
+
+            retry = []
+            for (position, entry), result in zip(pending, per_record):
+                results[position] = result
+                if self.is_retryable(result):
+                    retry.append((position, entry))
+
+            if not retry or attempt == self.max_attempts - 1:
+                break
+
+            print(f"Retrying {len(retry)} failed records...")
+            time.sleep(backoff_delay(attempt))
+            retried += len(retry)
+            METRICS.incr(f"{self.name}_retried_records", len(retry))
+            pending = retry
+
+        failed = sum(1 for position, _ in batch if results[position].get("ErrorCode"))
+        METRICS.incr(f"{self.name}_records_sent", len(batch) - failed)
+        METRICS.incr(f"{self.name}_failed_records", failed)
+        return retried
+
+    def publish(self, records: Iterable[Dict[str, Any]]):
+        """
+        Publishes records (articles) in batches within the backend's limits.
+
+        The records argument can be a list of article dictionaries, or a
+        generator such as iter_guardian_results: batches are built as records
+        arrive, so a generator is never collected into one list. Records over
+        max_bytes_per_record are skipped and reported as failed.
+
+        Returns:
+            FailedRecordCount, the per-record Records results in input order,
+            RetriedRecordCount, BatchCount and UserRecordCount (articles
+            published, which differs from the number of records when they
+            are aggregated), plus any backend stats, or None on failure.
+        """
+        return self.publish_entries(self.to_entries(records))
+
+    def publish_entries(self, entries: Iterable[Tuple[Dict[str, Any], int]]):
+        """
+        Publishes the (entry, count) pairs made by to_entries.
+
+        Lets the records be serialized on another thread while earlier
+        batches are sent (see src.pipeline). Returns the same response as
+        publish, which is the same as publish_entries(to_entries(records)).
+        """
+        results = []
+        stats = {}
+        retried = 0
+        batch_count = 0
+        user_record_count = 0
+        batch, batch_bytes = [], 0
+
+        try:
+            for entry, count in entries:
+                user_record_count += count
+                size = self.entry_size(entry)
+
+                if size > self.max_bytes_per_record:
+                    print(
+                        f"Warning: record {len(results)} is {size} bytes, over the {self.name} record limit. Skipping."
+                    )
+                    results.append(
+                        {
+                            "ErrorCode": "RecordTooLarge",
+                            "ErrorMessage": f"{size} bytes exceeds {self.max_bytes_per_record}",
+                        }
+                    )
+                    continue
+
+                if batch and (
+                    len(batch) == self.max_records_per_batch
+                    or batch_bytes + size > self.max_bytes_per_batch
+                ):
+                    retried += self.put_batch(batch, results, stats)
+                    batch_count += 1
+                    batch, batch_bytes = [], 0
+
+                batch.append((len(results), entry))
+                batch_bytes += size
+                results.append(None)
+
+            if batch:
+                retried += self.put_batch(batch, results, stats)
+                batch_count += 1
+            self.flush()
+
+        except Exception as e:
+            print(f"Error publishing to {self.label} '{self.destination}': {e}")
+            return None
+
+        if not results:
+            print("No records provided to publish.")
+            return None
+
+        failed_count = sum(1 for result in results if result.get("ErrorCode"))
+        if failed_count > 0:
+            print(f"Warning: {failed_count} records failed to publish.")
+        else:
+            print("Success: All records published.")
+
+        response = {
+            "FailedRecordCount": failed_count,
+            "Records": results,
+            "RetriedRecordCount": retried,
+            "BatchCount": batch_count,
+            "UserRecordCount": user_record_count,
+        }
+        response.update(self.report(stats))
+        return response
+
+    def report(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Turns the stats gathered by record_results into response fields."""
+        return {}
+
+
 # --- AWS KINESIS PUBLISHER ---
-class KinesisPublisher:
+class KinesisPublisher(BatchPublisher):
     """
     A class responsible for publishing records to an AWS Kinesis Data Stream.
 
     It uses the boto3 client and the put_records API call for batch publishing.
+    Input is split into batches that respect the PutRecords limits, and records
+    that Kinesis rejects with a retryable ErrorCode are resubmitted with
+    exponential backoff and jitter (see BatchPublisher).
+
+    With aggregate_max_bytes set, several articles are packed into each Kinesis
+    record (see src.aggregation). The codec chooses the serializer and
+    compression; consumers decode any record with
+    src.serialization.decode_records. The partition strategy decides how
+    records spread across shards (see src.partitioning). With a projection,
+    only the selected article fields are published (see src.models); records
+    are still routed by the full article.
     """
 
-    def __init__(self, stream_name: str, region_name: str = "eu-west-2"):
+    name = "kinesis"
+    label = "Kinesis stream"
+    max_records_per_batch = MAX_RECORDS_PER_REQUEST
+    max_bytes_per_batch = MAX_BYTES_PER_REQUEST
+    max_bytes_per_record = MAX_BYTES_PER_RECORD
+    retryable_error_codes = frozenset(RETRYABLE_ERROR_CODES)
+    throttling_error_codes = frozenset(THROTTLING_ERROR_CODES)
+    put_latency_metric = "kinesis_put_records_latency_ms"
+
+    def __init__(
+        self,
+        stream_name: str,
+        region_name: str = "eu-west-2",
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        aggregate_max_bytes: int = None,
+        codec: Codec = None,
+        partition_strategy=DEFAULT_PARTITION_STRATEGY,
+        projection=None,
+    ):
         """
         Initializes the Kinesis client.
 
         Args:
             stream_name: The name of the Kinesis Stream to publish to.
             region_name: The AWS region where the Kinesis stream resides.
+            max_attempts: Times a batch (or its failed records) is sent before
+                the remaining failures are reported.
+            aggregate_max_bytes: Pack articles into aggregated records of up to
+                this many bytes. None publishes one record per article.
+            codec: Serializer and compression for record data. Defaults to
+                plain JSON.
+            partition_strategy: A strategy name ("webUrl", "id", "section",
+                "random" or "explicit") or a callable taking (record, index)
+                and returning the entry's PartitionKey/ExplicitHashKey.
+            projection: Optional callable (e.g. an ArticleProjection) that
+                reduces each article to the fields that are published.
         """
+        super().__init__(
+            stream_name, codec=codec, projection=projection, max_attempts=max_attempts
+        )
         self.stream_name = stream_name
+        self.aggregate_max_bytes = (
+            min(aggregate_max_bytes, MAX_BYTES_PER_RECORD)
+            if aggregate_max_bytes
+            else None
+        )
         # Initialize the client immediately for reuse across publish calls
         self.client = boto3.client("kinesis", region_name=region_name)
+        if isinstance(partition_strategy, str):
+            partition_strategy = get_partition_strategy(
+                partition_strategy, self.client, stream_name
+            )
+        self.partition_strategy = partition_strategy
+
+    def routing(self, record: Dict[str, Any], index: int) -> Dict[str, str]:
+        """Returns the PartitionKey (and ExplicitHashKey) that picks the shard."""
+        return self.partition_strategy(record, index)
 
-    def publish(self, records: List[Dict[str, Any]]):
+    def to_entry(self, record: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """Converts an article into a PutRecords entry."""
+        # Serialize (and optionally compress) the dictionary record to bytes.
+        data_bytes = self.codec.encode(self.project(record))
+        return {"Data": data_bytes, **self.routing(record, index)}
+
+    def to_entries(
+        self, records: Iterable[Dict[str, Any]]
+    ) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """
+        Converts articles into PutRecords entries, aggregating them if enabled.
+
+        Yields:
+            (entry, count) pairs, where count is the number of articles in the entry.
         """
-        Publishes a list of records (articles) to the configured Kinesis stream.
+        if not self.aggregate_max_bytes:
+            yield from super().to_entries(records)
+            return
+
+        # Timed once per batch of articles, like BatchPublisher.to_entries
+        timing = {"seconds": 0.0, "records": 0}
 
-        The records argument should be the clean list of article dictionaries
-        extracted from the Guardian API response.
+        def payloads():
+            for i, record in enumerate(records):
+                start = time.perf_counter()
+                payload = self.to_payload(record)
+                timing["seconds"] += time.perf_counter() - start
+                yield self.routing(record, i), payload
 
-        args:
-            records: A list of dictionaries, where each dictionary is an article.
-        return:
-            The response from the Kinesis service, or None on failure.
+        for entry, count in self.pack(payloads(), timing):
+            timing["records"] += count
+            if timing["records"] >= self.max_records_per_batch:
+                METRICS.observe(f"{self.name}_serialize_ms", timing["seconds"] * 1000)
+                timing.update(seconds=0.0, records=0)
+            yield entry, count
+        if timing["records"]:
+            METRICS.observe(f"{self.name}_serialize_ms", timing["seconds"] * 1000)
+
+    def to_payload(self, record: Dict[str, Any]) -> bytes:
         """
-        if not records:
-            print("No records provided to publish.")
-            return None
+        Serializes an article for an aggregated record. Articles are
+        serialized one by one, then the whole aggregate is wrapped (and
+        compressed) once by pack.
+        """
+        return self.codec.serializer.dumps(self.project(record))
 
-        kinesis_records = []
-        for i, record in enumerate(records):
-            # Convert dictionary record to a JSON string, then encode to bytes.
-            data_bytes = json.dumps(record).encode("utf-8")
+    def pack(
+        self,
+        payloads: Iterable[Tuple[Dict[str, str], bytes]],
+        timing: Dict[str, float] = None,
+    ) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """
+        Packs (routing, payload) pairs into aggregated PutRecords entries of
+        up to aggregate_max_bytes.
 
-            # The PartitionKey is for shard distribution
-            partition_key = record.get("webUrl", f"record-{i}")
+        Args:
+            payloads: (routing, payload) pairs made with routing and to_payload.
+            timing: Optional dictionary whose "seconds" the time spent
+                wrapping (and compressing) the aggregates is added to.
+
+        Yields:
+            (entry, count) pairs, where count is the number of articles in the entry.
+        """
+        # Each aggregate is routed by its first article
+        for routing, data, count in aggregate(payloads, self.aggregate_max_bytes):
+            start = time.perf_counter()
+            data = self.codec.wrap(data)
+            if timing is not None:
+                timing["seconds"] += time.perf_counter() - start
+            yield {"Data": data, **routing}, count
 
-            kinesis_records.append({"Data": data_bytes, "PartitionKey": partition_key})
+    def entry_size(self, entry: Dict[str, Any]) -> int:
+        return entry_size(entry)
 
+    def send_batch(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         print(
-            f"Attempting to publish {len(kinesis_records)} records to stream '{self.stream_name}'..."
+            f"Attempting to publish {len(entries)} records to stream '{self.stream_name}'..."
         )
+        response = self.client.put_records(Records=entries, StreamName=self.stream_name)
+        per_record = response.get("Records")
+        if per_record is None or len(per_record) != len(entries):
+            # Without per-record results there is no way to tell which
+            # entries failed, so report the count as given (not retried).
+            failed = response.get("FailedRecordCount", 0)
+            return [
+                {"ErrorCode": "Unknown"} if i < failed else {}
+                for i in range(len(entries))
+            ]
+        return per_record
 
-        try:
-            # The API call for batch publishing
-            response = self.client.put_records(
-                Records=kinesis_records, StreamName=self.stream_name
-            )
-
-            # Check for failed records
-            failed_count = response.get("FailedRecordCount", 0)
-            if failed_count > 0:
-                print(f"Warning: {failed_count} records failed to publish.")
-            else:
-                print("Success: All records published.")
+    def record_results(self, entries, results, stats):
+        # Records and bytes per shard, e.g. to spot a hot shard
+        add_shard_stats(stats, entries, results)
 
-            return response
-
-        except Exception as e:
-            print(f"Error publishing to Kinesis stream '{self.stream_name}': {e}")
-            return None
+    def report(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        if stats:
+            print(f"Shard distribution: {format_shard_stats(stats)}")
+        return {"ShardStats": stats}
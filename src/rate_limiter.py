@@ -0,0 +1,267 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import boto3
+from botocore.exceptions import ClientError
+
+# --- RATE LIMIT CONFIGURATION ---
+# The Guardian developer tier allows one call per second
+DEFAULT_RATE_PER_SECOND = 1.0
+# Daily request budget (see README)
+DEFAULT_DAILY_QUOTA = 50
+DEFAULT_QUOTA_FILE = os.path.join(tempfile.gettempdir(), "guardian_quota.json")
+# Backoff used on 429 responses without a Retry-After header
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+# --------------------------------
+
+
+class QuotaExceededError(Exception):
+    """Raised when the daily request quota has been used up."""
+
+
+def retry_after_seconds(headers: dict, attempt: int) -> float:
+    """
+    Works out how long to wait before retrying a 429 response.
+
+    Honours a Retry-After header given either in seconds or as an HTTP date.
+    Without one, falls back to exponential backoff with full jitter.
+
+    Args:
+        headers: The response headers.
+        attempt: Zero-based retry attempt number.
+
+    Returns:
+        The number of seconds to sleep.
+    """
+    retry_after = headers.get("Retry-After") if headers else None
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), BACKOFF_MAX_SECONDS)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+                return min(max(delay, 0.0), BACKOFF_MAX_SECONDS)
+            except (TypeError, ValueError):
+                pass
+
+    return random.uniform(
+        0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt)
+    )
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket that spaces out requests to `rate` per second.
+
+    Up to `capacity` tokens can accumulate, allowing short bursts.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE_PER_SECOND,
+        capacity: float = 1.0,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def acquire(self):
+        """Blocks until a token is available, then consumes it."""
+        with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                self._sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+# --- QUOTA STORES ---
+class FileQuotaStore:
+    """
+    Persists daily request counts in a local JSON file.
+
+    Counts survive across CLI runs and warm Lambda invocations. The file is
+    shared between threads but not locked between processes.
+    """
+
+    def __init__(self, path: str = DEFAULT_QUOTA_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def get(self, day: str) -> int:
+        with self._lock:
+            return self._read().get(day, 0)
+
+    def increment(self, day: str, limit: int = None) -> int:
+        """
+        Counts one request for the day, unless that would take it past limit.
+
+        Returns:
+            The count including this request. Above limit, nothing was stored.
+        """
+        with self._lock:
+            # Only the current day is kept, older days are dropped
+            count = self._read().get(day, 0) + 1
+            if limit is not None and count > limit:
+                return count
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({day: count}, f)
+            os.replace(tmp_path, self.path)
+            return count
+
+
+class DynamoQuotaStore:
+    """
+    Persists daily request counts in a DynamoDB table, shared by every container.
+
+    The table needs a string partition key named "day".
+    """
+
+    def __init__(self, table_name: str, client=None, region_name: str = None):
+        self.table_name = table_name
+        self.client = client or boto3.client("dynamodb", region_name=region_name)
+
+    def get(self, day: str) -> int:
+        response = self.client.get_item(
+            TableName=self.table_name, Key={"day": {"S": day}}
+        )
+        return int(response.get("Item", {}).get("count", {}).get("N", 0))
+
+    def increment(self, day: str, limit: int = None) -> int:
+        """
+        Counts one request for the day, unless that would take it past limit.
+
+        The limit is checked by a conditional update, so containers racing for
+        the last requests of the day cannot overshoot it together.
+
+        Returns:
+            The count including this request. Above limit, nothing was stored.
+        """
+        update = {
+            "TableName": self.table_name,
+            "Key": {"day": {"S": day}},
+            "UpdateExpression": "ADD #c :one",
+            "ExpressionAttributeNames": {"#c": "count"},
+            "ExpressionAttributeValues": {":one": {"N": "1"}},
+            "ReturnValues": "UPDATED_NEW",
+        }
+        if limit is not None:
+            update["ConditionExpression"] = "attribute_not_exists(#c) OR #c < :limit"
+            update["ExpressionAttributeValues"][":limit"] = {"N": str(limit)}
+        try:
+            response = self.client.update_item(**update)
+        except ClientError as e:
+            if (
+                e.response.get("Error", {}).get("Code")
+                != "ConditionalCheckFailedException"
+            ):
+                raise
+            return max(limit, self.get(day)) + 1
+        return int(response["Attributes"]["count"]["N"])
+
+
+# --- RATE LIMITER ---
+class RateLimiter:
+    """
+    Combines a per-second token bucket with a persistent daily quota counter.
+
+    Call acquire() before every API request. It waits for a token and records
+    the request against today's quota, raising QuotaExceededError once the
+    daily budget is spent.
+    """
+
+    def __init__(
+        self,
+        bucket: TokenBucket = None,
+        store=None,
+        daily_quota: int = DEFAULT_DAILY_QUOTA,
+        today=date.today,
+    ):
+        self.bucket = bucket or TokenBucket()
+        self.store = store or FileQuotaStore()
+        self.daily_quota = daily_quota
+        self._today = today
+
+    def _day(self) -> str:
+        return self._today().isoformat()
+
+    def used_quota(self) -> int:
+        """Returns the number of requests already made today."""
+        return self.store.get(self._day())
+
+    def remaining_quota(self) -> int:
+        """Returns how many requests are left in today's budget."""
+        return max(0, self.daily_quota - self.used_quota())
+
+    def acquire(self):
+        """
+        Waits for a token and records one request against today's quota.
+
+        Raises:
+            QuotaExceededError: If today's quota is already spent.
+        """
+        # Checking and counting in one store call, so that concurrent
+        # callers cannot all pass the check for the last request
+        count = self.store.increment(self._day(), limit=self.daily_quota)
+        if count > self.daily_quota:
+            raise QuotaExceededError(
+                f"Daily quota of {self.daily_quota} requests has been used up."
+            )
+        self.bucket.acquire()
+
+
+def rate_limiter_from_env() -> RateLimiter:
+    """
+    Builds a RateLimiter from environment variables.
+
+    GUARDIAN_RATE_PER_SECOND and GUARDIAN_DAILY_QUOTA set the limits. Quota is
+    stored in the DynamoDB table named by GUARDIAN_QUOTA_TABLE when set,
+    otherwise in the file at GUARDIAN_QUOTA_FILE (default in the temp dir).
+    """
+    rate = float(os.environ.get("GUARDIAN_RATE_PER_SECOND", DEFAULT_RATE_PER_SECOND))
+    daily_quota = int(os.environ.get("GUARDIAN_DAILY_QUOTA", DEFAULT_DAILY_QUOTA))
+
+    table_name = os.environ.get("GUARDIAN_QUOTA_TABLE")
+    if table_name:
+        store = DynamoQuotaStore(
+            table_name, region_name=os.environ.get("KINESIS_REGION")
+        )
+    else:
+        store = FileQuotaStore(
+            os.environ.get("GUARDIAN_QUOTA_FILE", DEFAULT_QUOTA_FILE)
+        )
+
+    return RateLimiter(
+        bucket=TokenBucket(rate=rate, capacity=max(1.0, rate)),
+        store=store,
+        daily_quota=daily_quota,
+    )
@@ -0,0 +1,175 @@
+import json
+import threading
+import time
+from typing import Any, Dict
+
+# --- SECRET CACHE CONFIGURATION ---
+# Seconds a retrieved secret is served before it is fetched again
+DEFAULT_SECRET_TTL = 3600.0
+# Seconds before expiry at which a background refresh starts (0 disables it)
+DEFAULT_REFRESH_AHEAD = 0.0
+# Minimum seconds between two forced refreshes (and between retries after a
+# failed one), so a key that is rejected for another reason does not turn
+# every request into a Secrets Manager call
+DEFAULT_MIN_REFRESH_INTERVAL = 30.0
+# ----------------------------------
+
+
+class SecretCache:
+    """
+    Caches a JSON secret from AWS Secrets Manager for `ttl` seconds.
+
+    Reads within the TTL are served from memory. Once it expires, the next
+    get() fetches the secret again (on-demand refresh). With refresh_ahead,
+    a get() in the last refresh_ahead seconds before expiry starts a
+    background refresh and still returns the cached value, so callers never
+    wait on Secrets Manager. refresh() forces a fetch, e.g. after the API
+    rejects a key that has been rotated.
+
+    If a refresh fails while a value is cached, the cached value keeps being
+    served and the refresh is retried after min_refresh_interval, so a
+    Secrets Manager outage does not become an outage of the caller. The
+    secret's VersionId is tracked and a rotation is logged.
+
+    Usage:
+        cache = SecretCache(boto3.client("secretsmanager"), "my/secret")
+        api_key = cache.get()["GUARDIAN_API_KEY"]
+    """
+
+    def __init__(
+        self,
+        client,
+        secret_id: str,
+        ttl: float = DEFAULT_SECRET_TTL,
+        refresh_ahead: float = DEFAULT_REFRESH_AHEAD,
+        min_refresh_interval: float = DEFAULT_MIN_REFRESH_INTERVAL,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            client: A boto3 Secrets Manager client.
+            secret_id: The name or ARN of the secret.
+            ttl: Seconds a fetched secret is served from memory.
+            refresh_ahead: Seconds before expiry at which reads trigger a
+                background refresh. 0 refreshes on demand only.
+            min_refresh_interval: Minimum seconds between forced refreshes,
+                and between retries after a failed refresh.
+            clock: Monotonic time source, injectable for tests.
+        """
+        self.client = client
+        self.secret_id = secret_id
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, ttl)
+        self.min_refresh_interval = min_refresh_interval
+        self.version_id = None
+        self._clock = clock
+        self._value = None
+        self._expires_at = 0.0
+        self._fetched_at = None
+        self._forced_at = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "fetches": 0, "rotations": 0, "errors": 0}
+
+    def get(self) -> Dict[str, Any]:
+        """
+        Returns the secret, fetching it if it is missing or expired.
+
+        Raises:
+            botocore.exceptions.ClientError: If the secret cannot be fetched
+                and no earlier value is cached.
+        """
+        with self._lock:
+            now = self._clock()
+            if self._value is not None and now < self._expires_at:
+                self._stats["hits"] += 1
+                if (
+                    self.refresh_ahead
+                    and not self._refreshing
+                    and now >= self._expires_at - self.refresh_ahead
+                    and now - self._fetched_at >= self.min_refresh_interval
+                ):
+                    self._refreshing = True
+                    threading.Thread(
+                        target=self._background_refresh,
+                        name="secret-refresh",
+                        daemon=True,
+                    ).start()
+                return self._value
+            return self._fetch()
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        Fetches the secret now, unless a forced refresh already ran less than
+        min_refresh_interval seconds ago (e.g. for a concurrent caller that
+        hit the same rejected key).
+        """
+        with self._lock:
+            now = self._clock()
+            if (
+                self._forced_at is not None
+                and now - self._forced_at < self.min_refresh_interval
+            ):
+                return self._value
+            self._forced_at = now
+            return self._fetch()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns cache hits, Secrets Manager fetches, rotations and errors."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _background_refresh(self):
+        """Fetches the secret without holding the lock, so reads never wait."""
+        now = self._clock()
+        try:
+            response = self.client.get_secret_value(SecretId=self.secret_id)
+        except Exception as e:
+            with self._lock:
+                self._stats["fetches"] += 1
+                self._fetched_at = now
+                self._fetch_failed(e, now)
+        else:
+            with self._lock:
+                self._stats["fetches"] += 1
+                self._fetched_at = now
+                self._store(response, now)
+        finally:
+            self._refreshing = False
+
+    def _fetch(self) -> Dict[str, Any]:
+        """Fetches the secret from Secrets Manager. Call with the lock held."""
+        now = self._clock()
+        self._fetched_at = now
+        self._stats["fetches"] += 1
+        try:
+            response = self.client.get_secret_value(SecretId=self.secret_id)
+        except Exception as e:
+            return self._fetch_failed(e, now)
+        return self._store(response, now)
+
+    def _fetch_failed(self, error: Exception, now: float) -> Dict[str, Any]:
+        """Keeps serving the cached value after a failed fetch, if there is one."""
+        self._stats["errors"] += 1
+        if self._value is None:
+            raise error
+        print(
+            f"WARNING: Failed to refresh secret '{self.secret_id}', "
+            f"serving the cached value: {error}"
+        )
+        self._expires_at = max(self._expires_at, now + self.min_refresh_interval)
+        return self._value
+
+    def _store(self, response: Dict[str, Any], now: float) -> Dict[str, Any]:
+        """Caches a get_secret_value response and logs a rotation."""
+        version_id = response.get("VersionId")
+        if self.version_id is not None and version_id != self.version_id:
+            self._stats["rotations"] += 1
+            print(
+                f"Secret '{self.secret_id}' was rotated "
+                f"(version {self.version_id} -> {version_id})."
+            )
+        self.version_id = version_id
+        self._value = json.loads(response["SecretString"])
+        self._expires_at = now + self.ttl
+        return self._value
@@ -0,0 +1,242 @@
+import importlib
+import json
+from typing import Any, Dict, List
+
+from src.aggregation import deaggregate
+
+# --- ENVELOPE FORMAT ---
+# Records produced by any codec other than plain JSON start with
+# MAGIC + format byte + compression byte. Plain JSON records have no header,
+# so they stay byte-for-byte identical to what earlier versions published.
+MAGIC = b"GS"
+HEADER_SIZE = len(MAGIC) + 2
+FORMAT_IDS = {"json": 0, "msgpack": 1}
+COMPRESSION_IDS = {"none": 0, "gzip": 1, "zstd": 2}
+DEFAULT_CODEC = "json"
+# -----------------------
+
+
+def optional_backend(module: str, codec: str):
+    """
+    Imports the optional backend of a codec (orjson, msgpack, zstandard).
+
+    Backends are only imported once their codec is selected, so the default
+    JSON codec does not pay for them at start-up.
+
+    Raises:
+        ImportError: If the backend is not installed.
+    """
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ImportError(
+            f"The '{codec}' codec requires: pip install {module}"
+        ) from None
+
+
+# --- SERIALIZERS ---
+class JsonSerializer:
+    """The standard library json module (compact output)."""
+
+    name = "json"
+    format = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    """orjson: JSON-compatible output, several times faster than json."""
+
+    name = "orjson"
+    format = "json"
+
+    def __init__(self):
+        self._orjson = optional_backend("orjson", self.name)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgpackSerializer:
+    """MessagePack: a compact binary format."""
+
+    name = "msgpack"
+    format = "msgpack"
+
+    def __init__(self):
+        self._msgpack = optional_backend("msgpack", self.name)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._msgpack.packb(obj, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, raw=False)
+
+
+SERIALIZERS = {
+    "json": JsonSerializer,
+    "orjson": OrjsonSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+
+# --- COMPRESSORS ---
+class NoCompression:
+    name = "none"
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+
+class GzipCompression:
+    name = "gzip"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+        # Standard library, but only needed by this codec
+        import gzip
+
+        self._gzip = gzip
+
+    def compress(self, data: bytes) -> bytes:
+        return self._gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._gzip.decompress(data)
+
+
+class ZstdCompression:
+    name = "zstd"
+
+    def __init__(self, level: int = 3):
+        zstandard = optional_backend("zstandard", self.name)
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+COMPRESSORS = {
+    "none": NoCompression,
+    "gzip": GzipCompression,
+    "zstd": ZstdCompression,
+}
+
+
+# --- CODEC ---
+class Codec:
+    """
+    A serializer plus an optional compression layer.
+
+    encode() turns an article into record bytes. wrap() frames bytes that were
+    already serialized with this codec's serializer (e.g. an aggregated
+    record), so compression applies to the whole aggregate.
+    """
+
+    def __init__(self, serializer=None, compression=None):
+        self.serializer = serializer or JsonSerializer()
+        self.compression = compression or NoCompression()
+        self.header = (
+            MAGIC
+            + bytes([FORMAT_IDS[self.serializer.format]])
+            + bytes([COMPRESSION_IDS[self.compression.name]])
+        )
+
+    @property
+    def name(self) -> str:
+        if self.compression.name == "none":
+            return self.serializer.name
+        return f"{self.serializer.name}+{self.compression.name}"
+
+    @property
+    def is_plain_json(self) -> bool:
+        """Plain JSON records are published without a header."""
+        return self.serializer.format == "json" and self.compression.name == "none"
+
+    def wrap(self, body: bytes) -> bytes:
+        if self.is_plain_json:
+            return body
+        return self.header + self.compression.compress(body)
+
+    def encode(self, obj: Any) -> bytes:
+        return self.wrap(self.serializer.dumps(obj))
+
+
+def get_codec(spec: str = DEFAULT_CODEC) -> Codec:
+    """
+    Builds a Codec from a spec such as "json", "orjson+zstd" or "msgpack+gzip".
+
+    Raises:
+        ValueError: For an unknown serializer or compression name.
+        ImportError: If the selected backend is not installed.
+    """
+    serializer_name, _, compression_name = (spec or DEFAULT_CODEC).partition("+")
+    serializer_name = serializer_name.strip().lower()
+    compression_name = (compression_name or "none").strip().lower()
+
+    if serializer_name not in SERIALIZERS:
+        raise ValueError(f"Unknown serializer '{serializer_name}'.")
+    if compression_name not in COMPRESSORS:
+        raise ValueError(f"Unknown compression '{compression_name}'.")
+
+    return Codec(SERIALIZERS[serializer_name](), COMPRESSORS[compression_name]())
+
+
+def _loader(format_id: int):
+    if format_id == FORMAT_IDS["msgpack"]:
+        return MsgpackSerializer().loads
+    # JSON records decode with orjson when it is available
+    try:
+        return OrjsonSerializer().loads
+    except ImportError:
+        return json.loads
+
+
+# Decompressors are reused across records, zstd contexts are costly to build
+_DECOMPRESSORS = {}
+
+
+def _decompressor(compression_id: int):
+    if compression_id not in _DECOMPRESSORS:
+        names = {known_id: name for name, known_id in COMPRESSION_IDS.items()}
+        if compression_id not in names:
+            raise ValueError(
+                f"Unknown compression id {compression_id} in record header."
+            )
+        _DECOMPRESSORS[compression_id] = COMPRESSORS[names[compression_id]]()
+    return _DECOMPRESSORS[compression_id].decompress
+
+
+def decode_records(data: bytes) -> List[Dict[str, Any]]:
+    """
+    Consumer helper: decodes any record this project publishes into articles.
+
+    Handles plain JSON, enveloped records of any codec, and aggregated records
+    with or without an envelope.
+
+    Raises:
+        ValueError: If the header names an unknown format or compression.
+    """
+    loads = json.loads
+    if data[: len(MAGIC)] == MAGIC:
+        format_id, compression_id = data[len(MAGIC)], data[len(MAGIC) + 1]
+        if format_id not in FORMAT_IDS.values():
+            raise ValueError(f"Unknown format id {format_id} in record header.")
+        loads = _loader(format_id)
+        data = _decompressor(compression_id)(data[HEADER_SIZE:])
+
+    return [loads(payload) for payload in deaggregate(data)]
@@ -0,0 +1,421 @@
+import base64
+import os
+import tempfile
+import time
+from functools import partial
+from typing import Any, Dict, List
+
+import boto3
+
+from src.publisher import BatchPublisher, KinesisPublisher, LocalPublisher
+from src.serialization import Codec
+
+# Optional Kafka client. Only required for GUARDIAN_PUBLISHER=kafka.
+try:
+    from confluent_kafka import Producer as KafkaProducer
+except ImportError:  # pragma: no cover - depends on the environment
+    KafkaProducer = None
+
+# Optional Parquet writer. Only required for GUARDIAN_OUTPUT_FORMAT=parquet.
+try:
+    import pyarrow
+    import pyarrow.parquet as parquet
+except ImportError:  # pragma: no cover - depends on the environment
+    pyarrow = None
+    parquet = None
+
+# --- PUBLISHER BACKEND CONFIGURATION ---
+# Backend used when GUARDIAN_PUBLISHER is not set
+DEFAULT_PUBLISHER = "local"
+# Seconds a Kafka batch may take to be acknowledged before it counts as failed
+DEFAULT_KAFKA_FLUSH_TIMEOUT = 30.0
+# Local file sink: directory, rotation size and write buffer
+DEFAULT_OUTPUT_DIR = os.path.join(tempfile.gettempdir(), "guardian-articles")
+DEFAULT_OUTPUT_FORMAT = "ndjson"
+DEFAULT_MAX_FILE_BYTES = 128 * 1024 * 1024
+DEFAULT_FILE_BUFFER_SIZE = 1024 * 1024
+# ---------------------------------------
+
+
+# --- AMAZON DATA FIREHOSE ---
+class FirehosePublisher(BatchPublisher):
+    """
+    Publishes to a Firehose delivery stream with PutRecordBatch.
+
+    Firehose concatenates records as they are delivered (e.g. to S3), so
+    plain JSON records are newline-terminated by default.
+    """
+
+    name = "firehose"
+    max_records_per_batch = 500
+    max_bytes_per_batch = 4 * 1024 * 1024
+    max_bytes_per_record = 1000 * 1024
+    retryable_error_codes = frozenset(
+        {
+            "ServiceUnavailableException",
+            "InternalFailure",
+            "ThrottlingException",
+            "LimitExceededException",
+        }
+    )
+
+    def __init__(
+        self,
+        delivery_stream_name: str,
+        region_name: str = "eu-west-2",
+        delimiter: bytes = b"\n",
+        **kwargs,
+    ):
+        """
+        Args:
+            delivery_stream_name: The Firehose delivery stream to publish to.
+            region_name: The AWS region of the delivery stream.
+            delimiter: Appended to every plain JSON record.
+            **kwargs: codec, projection and max_attempts, see BatchPublisher.
+        """
+        super().__init__(delivery_stream_name, **kwargs)
+        self.client = boto3.client("firehose", region_name=region_name)
+        self.delimiter = delimiter if self.codec.is_plain_json else b""
+
+    def to_entry(self, record: Dict[str, Any], index: int) -> Dict[str, Any]:
+        entry = super().to_entry(record, index)
+        entry["Data"] += self.delimiter
+        return entry
+
+    def send_batch(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        response = self.client.put_record_batch(
+            DeliveryStreamName=self.destination,
+            Records=[{"Data": entry["Data"]} for entry in entries],
+        )
+        return response["RequestResponses"]
+
+
+# --- AMAZON SQS ---
+class SQSPublisher(BatchPublisher):
+    """
+    Publishes to an SQS queue with SendMessageBatch.
+
+    Message bodies must be text: plain JSON records are sent as is, other
+    codecs are base64-encoded and name the codec in a "codec" message
+    attribute. On a FIFO queue each article's key is its MessageGroupId
+    (the queue needs content-based deduplication enabled).
+    """
+
+    name = "sqs"
+    max_records_per_batch = 10
+    max_bytes_per_batch = 256 * 1024
+    max_bytes_per_record = 256 * 1024
+    retryable_error_codes = frozenset(
+        {
+            "InternalError",
+            "ServiceUnavailable",
+            "ThrottlingException",
+            "RequestThrottled",
+        }
+    )
+
+    def __init__(self, queue: str, region_name: str = "eu-west-2", **kwargs):
+        """
+        Args:
+            queue: The queue URL, or its name (looked up once).
+            region_name: The AWS region of the queue.
+            **kwargs: codec, projection and max_attempts, see BatchPublisher.
+        """
+        super().__init__(queue, **kwargs)
+        self.client = boto3.client("sqs", region_name=region_name)
+        if queue.startswith("https://"):
+            self.queue_url = queue
+        else:
+            self.queue_url = self.client.get_queue_url(QueueName=queue)["QueueUrl"]
+        self.fifo = self.queue_url.endswith(".fifo")
+
+    def to_entry(self, record: Dict[str, Any], index: int) -> Dict[str, Any]:
+        entry = super().to_entry(record, index)
+        if not self.codec.is_plain_json:
+            entry["Data"] = base64.b64encode(entry["Data"])
+        return entry
+
+    def send_batch(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        messages = []
+        for i, entry in enumerate(entries):
+            message = {"Id": str(i), "MessageBody": entry["Data"].decode("utf-8")}
+            if not self.codec.is_plain_json:
+                message["MessageAttributes"] = {
+                    "codec": {"DataType": "String", "StringValue": self.codec.name}
+                }
+            if self.fifo:
+                message["MessageGroupId"] = entry["Key"]
+            messages.append(message)
+
+        response = self.client.send_message_batch(
+            QueueUrl=self.queue_url, Entries=messages
+        )
+        results = [{} for _ in entries]
+        for failure in response.get("Failed", []):
+            results[int(failure["Id"])] = {
+                "ErrorCode": failure.get("Code"),
+                "ErrorMessage": failure.get("Message"),
+                "SenderFault": failure.get("SenderFault", False),
+            }
+        return results
+
+    def is_retryable(self, result: Dict[str, Any]) -> bool:
+        # SQS marks the entries it failed through no fault of the request
+        return bool(result.get("ErrorCode")) and not result.get("SenderFault")
+
+
+# --- APACHE KAFKA ---
+class KafkaPublisher(BatchPublisher):
+    """
+    Publishes to a Kafka topic with confluent-kafka, keyed by article id.
+
+    Records are handed to the producer's own queue (which batches and
+    compresses them per partition) and every batch is flushed, so publish()
+    reports the delivery result of each record like the other backends.
+    """
+
+    name = "kafka"
+    max_records_per_batch = 10_000
+    max_bytes_per_batch = 32 * 1024 * 1024
+    # The broker's default message.max.bytes
+    max_bytes_per_record = 1_000_000
+
+    def __init__(
+        self,
+        topic: str,
+        bootstrap_servers: str,
+        config: Dict[str, Any] = None,
+        flush_timeout: float = DEFAULT_KAFKA_FLUSH_TIMEOUT,
+        **kwargs,
+    ):
+        """
+        Args:
+            topic: The topic to publish to.
+            bootstrap_servers: Comma-separated host:port list of brokers.
+            config: Extra librdkafka settings, e.g. {"linger.ms": 20,
+                "compression.type": "zstd"}.
+            flush_timeout: Seconds a batch may take to be acknowledged.
+            **kwargs: codec, projection and max_attempts, see BatchPublisher.
+        """
+        if KafkaProducer is None:
+            raise ImportError(
+                "GUARDIAN_PUBLISHER=kafka requires: pip install confluent-kafka"
+            )
+        super().__init__(topic, **kwargs)
+        self.flush_timeout = flush_timeout
+        self.producer = KafkaProducer(
+            {"bootstrap.servers": bootstrap_servers, **(config or {})}
+        )
+
+    def send_batch(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = [None] * len(entries)
+
+        def delivered(index, error, message):
+            if error is None:
+                results[index] = {}
+            else:
+                results[index] = {
+                    "ErrorCode": error.name(),
+                    "ErrorMessage": error.str(),
+                    "Retriable": error.retriable(),
+                }
+
+        for i, entry in enumerate(entries):
+            while True:
+                try:
+                    self.producer.produce(
+                        self.destination,
+                        entry["Data"],
+                        key=entry["Key"],
+                        on_delivery=partial(delivered, i),
+                    )
+                    break
+                except BufferError:
+                    # The local queue is full: serve deliveries to make room
+                    self.producer.poll(0.1)
+        self.producer.flush(self.flush_timeout)
+
+        return [
+            (
+                result
+                if result is not None
+                else {
+                    "ErrorCode": "Timeout",
+                    "ErrorMessage": "Not acknowledged in time",
+                }
+            )
+            for result in results
+        ]
+
+    def is_retryable(self, result: Dict[str, Any]) -> bool:
+        return result.get("ErrorCode") == "Timeout" or bool(result.get("Retriable"))
+
+
+# --- LOCAL FILES ---
+class FilePublisher(BatchPublisher):
+    """
+    Appends records to local newline-delimited JSON or Parquet files.
+
+    A fast replacement for the console LocalPublisher when testing against
+    large result sets: each batch is one buffered write (or one Parquet row
+    group), and files are rotated once they reach max_file_bytes. A file
+    is written as <name>.part and renamed when it is rotated or closed, so
+    readers only ever pick up complete files.
+
+    NDJSON needs a plain JSON codec (json or orjson). Parquet requires
+    pyarrow and starts a new file when the projected fields change type
+    between batches.
+    """
+
+    name = "file"
+    max_records_per_batch = 10_000
+    max_bytes_per_batch = 8 * 1024 * 1024
+    max_bytes_per_record = 64 * 1024 * 1024
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_OUTPUT_DIR,
+        file_format: str = DEFAULT_OUTPUT_FORMAT,
+        max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+        buffer_size: int = DEFAULT_FILE_BUFFER_SIZE,
+        prefix: str = "articles",
+        **kwargs,
+    ):
+        """
+        Args:
+            directory: Directory the files are written to (created if needed).
+            file_format: "ndjson" or "parquet".
+            max_file_bytes: Serialized bytes written to a file before the next
+                batch starts a new one.
+            buffer_size: Write buffer of NDJSON files.
+            prefix: Start of every file name.
+            **kwargs: codec and projection, see BatchPublisher.
+        """
+        super().__init__(directory, **kwargs)
+        if file_format not in ("ndjson", "parquet"):
+            raise ValueError(f"Unknown output format: {file_format!r}")
+        if file_format == "ndjson" and not self.codec.is_plain_json:
+            raise ValueError(f"NDJSON output needs a JSON codec, not {self.codec.name}")
+        if file_format == "parquet" and pyarrow is None:
+            raise ImportError("Parquet output requires: pip install pyarrow")
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.file_format = file_format
+        self.max_file_bytes = max_file_bytes
+        self.buffer_size = buffer_size
+        self.prefix = prefix
+        self.files = []  # Every completed file, in order
+        self._file = None  # Open NDJSON file or ParquetWriter
+        self._path = None
+        self._file_bytes = 0
+        self._sequence = 0
+
+    def to_entry(self, record: Dict[str, Any], index: int) -> Dict[str, Any]:
+        entry = super().to_entry(record, index)
+        if self.file_format == "parquet":
+            entry["Record"] = self.project(record)
+        return entry
+
+    def send_batch(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.file_format == "parquet":
+            self._write_parquet([entry["Record"] for entry in entries])
+        else:
+            if self._file is None:
+                self._open()
+            self._file.write(b"\n".join(entry["Data"] for entry in entries) + b"\n")
+        self._file_bytes += sum(len(entry["Data"]) for entry in entries)
+        if self._file_bytes >= self.max_file_bytes:
+            self._rotate()
+        return [{} for _ in entries]
+
+    def flush(self):
+        if self._file is not None and self.file_format == "ndjson":
+            self._file.flush()
+
+    def close(self):
+        """Closes the current file and gives it its final name."""
+        self._rotate()
+
+    def _write_parquet(self, records: List[Dict[str, Any]]):
+        table = pyarrow.Table.from_pylist(records)
+        if self._file is not None and not table.schema.equals(self._file.schema):
+            self._rotate()
+        if self._file is None:
+            self._open(table.schema)
+        self._file.write_table(table)
+
+    def _open(self, schema=None):
+        self._sequence += 1
+        name = f"{self.prefix}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{self._sequence:04d}.{self.file_format}"
+        self._path = os.path.join(self.directory, name)
+        if self.file_format == "parquet":
+            self._file = parquet.ParquetWriter(self._path + ".part", schema)
+        else:
+            self._file = open(self._path + ".part", "ab", buffering=self.buffer_size)
+        self._file_bytes = 0
+
+    def _rotate(self):
+        if self._file is None:
+            return
+        self._file.close()
+        os.replace(self._path + ".part", self._path)
+        self.files.append(self._path)
+        print(f"Wrote {self._path} ({self._file_bytes} bytes)")
+        self._file = None
+
+
+def publisher_from_env(
+    stream_name: str,
+    region_name: str,
+    codec: Codec = None,
+    projection=None,
+    default: str = DEFAULT_PUBLISHER,
+    backend: str = None,
+):
+    """
+    Builds the publisher selected by `backend`, or by GUARDIAN_PUBLISHER.
+
+    "local" prints records to the console, "kinesis" publishes to
+    stream_name, "firehose" to FIREHOSE_STREAM_NAME (default stream_name),
+    "sqs" to SQS_QUEUE (a name or URL), "kafka" to KAFKA_TOPIC (default
+    stream_name) on KAFKA_BOOTSTRAP_SERVERS, and "file" writes
+    GUARDIAN_OUTPUT_FORMAT (ndjson or parquet) files to GUARDIAN_OUTPUT_DIR,
+    rotated every GUARDIAN_OUTPUT_MAX_BYTES.
+
+    Raises:
+        ValueError: For an unknown backend name.
+    """
+    backend = (backend or os.environ.get("GUARDIAN_PUBLISHER", default)).lower()
+    options = {"codec": codec, "projection": projection}
+
+    if backend == "local":
+        return LocalPublisher(stream_name, region_name, **options)
+    if backend == "kinesis":
+        return KinesisPublisher(stream_name, region_name, **options)
+    if backend == "firehose":
+        return FirehosePublisher(
+            os.environ.get("FIREHOSE_STREAM_NAME", stream_name),
+            region_name,
+            **options,
+        )
+    if backend == "sqs":
+        return SQSPublisher(os.environ["SQS_QUEUE"], region_name, **options)
+    if backend == "kafka":
+        return KafkaPublisher(
+            os.environ.get("KAFKA_TOPIC", stream_name),
+            os.environ["KAFKA_BOOTSTRAP_SERVERS"],
+            **options,
+        )
+    if backend == "file":
+        return FilePublisher(
+            os.environ.get("GUARDIAN_OUTPUT_DIR", DEFAULT_OUTPUT_DIR),
+            file_format=os.environ.get(
+                "GUARDIAN_OUTPUT_FORMAT", DEFAULT_OUTPUT_FORMAT
+            ).lower(),
+            max_file_bytes=int(
+                os.environ.get("GUARDIAN_OUTPUT_MAX_BYTES", DEFAULT_MAX_FILE_BYTES)
+            ),
+            **options,
+        )
+    raise ValueError(f"Unknown publisher backend '{backend}'.")
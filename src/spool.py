@@ -0,0 +1,490 @@
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from src.metrics import METRICS
+from src.publisher import chunked
+
+# --- SPOOL CONFIGURATION ---
+DEFAULT_SPOOL_DIR = os.path.join(tempfile.gettempdir(), "guardian-spool")
+# A segment is closed once it holds this many bytes, and deleted once every
+# record in it has been acknowledged
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+# When appended records reach the disk: "always" (every append batch),
+# "interval" (at most every DEFAULT_FSYNC_INTERVAL seconds) or "never" (left
+# to the OS)
+DEFAULT_FSYNC_POLICY = "always"
+DEFAULT_FSYNC_INTERVAL = 1.0
+# Articles written (and fsynced) together before they are handed to the
+# publisher, and replayed per publish() call
+DEFAULT_SPOOL_BATCH_RECORDS = 500
+# Publish errors that a replay cannot fix: these records are dropped
+PERMANENT_ERROR_CODES = {"RecordTooLarge"}
+# ---------------------------
+
+# Every record is framed as payload length + CRC32, so a write torn by a
+# crash is detected and ignored on the next start
+_FRAME = struct.Struct(">II")
+# Acknowledgements are the offsets of acknowledged records in a segment
+_ACK = struct.Struct(">Q")
+_SEGMENT_SUFFIX = ".log"
+_ACK_SUFFIX = ".ack"
+
+# (segment name, byte offset of the record in the segment)
+Position = Tuple[str, int]
+
+
+def _read_frames(path: str) -> Iterator[Tuple[int, bytes]]:
+    """Yields (offset, payload) for every intact record of a segment."""
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset + _FRAME.size <= len(data):
+        length, crc = _FRAME.unpack_from(data, offset)
+        start = offset + _FRAME.size
+        payload = data[start : start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return  # Torn tail of an interrupted write
+        yield offset, payload
+        offset = start + length
+
+
+class Spool:
+    """
+    A disk-backed write-ahead log of records waiting to be published.
+
+    Records are appended to segment files before they are sent and
+    acknowledged once the destination accepted them; whatever is left
+    unacknowledged (a publish that failed, or a process that died) is
+    returned by pending() and replayed on the next run. Delivery is
+    at least once: a record whose acknowledgement was lost is sent again.
+
+    Segments are append-only. Each process writes to new segments, a
+    segment is closed at segment_bytes, and deleted (with its .ack file)
+    once every record in it is acknowledged. Only one process should use a
+    spool directory at a time.
+
+    Usage:
+        spool = Spool("/mnt/efs/guardian-spool")
+        positions = spool.append(articles)
+        response = publisher.publish(articles)
+        spool.ack(positions)
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_SPOOL_DIR,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        fsync: str = DEFAULT_FSYNC_POLICY,
+        fsync_interval: float = DEFAULT_FSYNC_INTERVAL,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            directory: Where segments are kept (created if needed). In
+                Lambda, /tmp only survives while the container is warm; mount
+                EFS for a spool that outlives it.
+            segment_bytes: Size at which the current segment is closed.
+            fsync: "always", "interval" or "never", see DEFAULT_FSYNC_POLICY.
+            fsync_interval: Seconds between fsyncs with fsync="interval".
+            clock: Monotonic time source, injectable for tests.
+        """
+        if fsync not in ("always", "interval", "never"):
+            raise ValueError(f"Unknown fsync policy: {fsync!r}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        # segment name -> {"records": offsets written, "acked": offsets acknowledged}
+        self._segments = {}
+        self._in_flight = set()
+        self._file = None  # The segment this process appends to
+        self._name = None
+        self._synced_at = clock()
+        self._ack_files = {}
+        self._stats = {"appended": 0, "acked": 0, "dropped": 0, "replayed": 0}
+        self._load()
+
+    # --- Writing ---
+    def append(self, records: Iterable[Dict[str, Any]]) -> List[Position]:
+        """
+        Writes records to the log with one write (and at most one fsync).
+
+        The records count as in flight until they are acked or released.
+        """
+        payloads = [json.dumps(record).encode("utf-8") for record in records]
+        if not payloads:
+            return []
+
+        with self._lock:
+            if self._file is None or self._file.tell() >= self.segment_bytes:
+                self._open_segment()
+            segment = self._segments[self._name]
+            positions = []
+            frames = []
+            offset = self._file.tell()
+            for payload in payloads:
+                frames.append(_FRAME.pack(len(payload), zlib.crc32(payload)))
+                frames.append(payload)
+                positions.append((self._name, offset))
+                segment["records"].add(offset)
+                offset += _FRAME.size + len(payload)
+            self._file.write(b"".join(frames))
+            self._file.flush()
+            self._sync(self._file)
+            self._in_flight.update(positions)
+            self._stats["appended"] += len(positions)
+        METRICS.incr("spool_appended_records", len(positions))
+        return positions
+
+    def ack(self, positions: Iterable[Position]):
+        """Marks records as published; fully acknowledged segments are deleted."""
+        by_segment = {}
+        for name, offset in positions:
+            by_segment.setdefault(name, []).append(offset)
+
+        with self._lock:
+            for name, offsets in by_segment.items():
+                segment = self._segments.get(name)
+                if segment is None:
+                    continue
+                self._in_flight.difference_update((name, o) for o in offsets)
+                offsets = [o for o in offsets if o not in segment["acked"]]
+                if not offsets:
+                    continue
+                segment["acked"].update(offsets)
+                ack_file = self._ack_file(name)
+                ack_file.write(b"".join(_ACK.pack(o) for o in offsets))
+                ack_file.flush()
+                if self.fsync == "always":
+                    os.fsync(ack_file.fileno())
+                self._stats["acked"] += len(offsets)
+                if name != self._name and segment["acked"] >= segment["records"]:
+                    self._delete_segment(name)
+        METRICS.incr("spool_acked_records", sum(len(o) for o in by_segment.values()))
+
+    def release(self, positions: Iterable[Position]):
+        """Returns unpublished in-flight records to pending(), for a replay."""
+        with self._lock:
+            self._in_flight.difference_update(positions)
+
+    # --- Reading ---
+    def pending_count(self) -> int:
+        """Records neither acknowledged nor in flight."""
+        with self._lock:
+            in_flight = len(self._in_flight)
+            return (
+                sum(
+                    len(segment["records"]) - len(segment["acked"])
+                    for segment in self._segments.values()
+                )
+                - in_flight
+            )
+
+    def pending(self) -> Iterator[Tuple[Position, Dict[str, Any]]]:
+        """Yields (position, record) for every record waiting to be published."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            # Offsets to skip in each segment with something left to publish
+            skip = {
+                name: segment["acked"] | {o for n, o in self._in_flight if n == name}
+                for name, segment in sorted(self._segments.items())
+                if segment["acked"] < segment["records"]
+            }
+        for name, offsets in skip.items():
+            for offset, payload in _read_frames(self._path(name)):
+                if offset not in offsets:
+                    yield (name, offset), json.loads(payload)
+
+    def replay(
+        self, publisher, batch_records: int = DEFAULT_SPOOL_BATCH_RECORDS
+    ) -> Dict[str, int]:
+        """
+        Publishes every pending record again, in batches, acknowledging the
+        ones that are accepted.
+
+        Returns:
+            The records replayed, acknowledged and still pending.
+        """
+        replayed = acked = 0
+        for batch in chunked(self.pending(), batch_records):
+            positions = [position for position, _ in batch]
+            with self._lock:
+                self._in_flight.update(positions)
+            response = publisher.publish([record for _, record in batch])
+            done = self.resolve(positions, response)
+            replayed += len(batch)
+            acked += done
+            if done < len(batch):
+                # The destination is still failing: try again next time
+                break
+
+        with self._lock:
+            self._stats["replayed"] += replayed
+        METRICS.incr("spool_replayed_records", replayed)
+        if replayed:
+            print(f"Spool: replayed {replayed} records, {acked} acknowledged.")
+        return {"replayed": replayed, "acked": acked, "pending": self.pending_count()}
+
+    def resolve(self, positions: List[Position], response) -> int:
+        """
+        Acknowledges the records a publish response reports as accepted (and
+        those that can never succeed) and releases the rest for a replay.
+
+        Returns:
+            The number of records acknowledged (including dropped ones).
+        """
+        if not response:
+            self.release(positions)
+            return 0
+
+        results = response.get("Records", [])
+        if len(results) != len(positions):
+            # Aggregated records do not map to articles one to one
+            if response.get("FailedRecordCount", 0) == 0:
+                self.ack(positions)
+                return len(positions)
+            self.release(positions)
+            return 0
+
+        done, failed, dropped = [], [], 0
+        for position, result in zip(positions, results):
+            code = (result or {}).get("ErrorCode")
+            if code in PERMANENT_ERROR_CODES:
+                dropped += 1
+                done.append(position)
+            elif code:
+                failed.append(position)
+            else:
+                done.append(position)
+        if dropped:
+            print(f"Spool: dropping {dropped} records that can never be published.")
+            with self._lock:
+                self._stats["dropped"] += dropped
+        self.ack(done)
+        self.release(failed)
+        return len(done)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns appended, acked, dropped, replayed and pending record counts."""
+        pending = self.pending_count()
+        with self._lock:
+            return dict(self._stats, pending=pending, segments=len(self._segments))
+
+    def close(self):
+        """Closes the current segment (deleting it if fully acknowledged)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                if self.fsync != "never":
+                    os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+                name, self._name = self._name, None
+                segment = self._segments[name]
+                if segment["acked"] >= segment["records"]:
+                    self._delete_segment(name)
+            for ack_file in self._ack_files.values():
+                ack_file.close()
+            self._ack_files.clear()
+
+    # --- Internals (call with the lock held) ---
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name + _SEGMENT_SUFFIX)
+
+    def _load(self):
+        """Rebuilds segment state from the files of earlier runs."""
+        for filename in sorted(os.listdir(self.directory)):
+            if not filename.endswith(_SEGMENT_SUFFIX):
+                continue
+            name = filename[: -len(_SEGMENT_SUFFIX)]
+            records = {offset for offset, _ in _read_frames(self._path(name))}
+            acked = set()
+            ack_path = os.path.join(self.directory, name + _ACK_SUFFIX)
+            if os.path.exists(ack_path):
+                with open(ack_path, "rb") as f:
+                    data = f.read()
+                usable = len(data) - len(data) % _ACK.size
+                acked = {o for (o,) in _ACK.iter_unpack(data[:usable])}
+            self._segments[name] = {"records": records, "acked": acked & records}
+            if acked >= records:
+                self._delete_segment(name)
+
+    def _open_segment(self):
+        if self._file is not None:
+            previous = self._name
+            self._file.flush()
+            if self.fsync != "never":
+                os.fsync(self._file.fileno())
+            self._file.close()
+            segment = self._segments[previous]
+            if segment["acked"] >= segment["records"]:
+                self._delete_segment(previous)
+        # Names sort in creation order across runs
+        self._name = f"segment-{time.time_ns():020d}-{os.getpid()}"
+        self._file = open(self._path(self._name), "ab")
+        self._segments[self._name] = {"records": set(), "acked": set()}
+
+    def _ack_file(self, name: str):
+        if name not in self._ack_files:
+            self._ack_files[name] = open(
+                os.path.join(self.directory, name + _ACK_SUFFIX), "ab"
+            )
+        return self._ack_files[name]
+
+    def _delete_segment(self, name: str):
+        ack_file = self._ack_files.pop(name, None)
+        if ack_file is not None:
+            ack_file.close()
+        for suffix in (_SEGMENT_SUFFIX, _ACK_SUFFIX):
+            try:
+                os.remove(os.path.join(self.directory, name + suffix))
+            except FileNotFoundError:
+                pass
+        self._segments.pop(name, None)
+
+    def _sync(self, f):
+        if self.fsync == "always":
+            os.fsync(f.fileno())
+        elif self.fsync == "interval":
+            now = self._clock()
+            if now - self._synced_at >= self.fsync_interval:
+                os.fsync(f.fileno())
+                self._synced_at = now
+
+
+class SpooledPublisher:
+    """
+    Wraps any publisher so every record is written to a Spool before it is
+    sent, and only acknowledged once the publish response says it was
+    accepted. Records from failed publishes (or earlier runs) are replayed
+    at the start of the next publish(), or every replay_interval seconds
+    from a background thread.
+
+    Records are read from the input in batches of batch_records, appended
+    with one write and fsync per batch, and then passed on, so a generator
+    is still consumed lazily and the wrapped publisher keeps batching.
+
+    Publishers are not thread-safe (a FilePublisher rotates its file while
+    writing), so the background replay and publish() take turns: every call
+    to the wrapped publisher holds one lock.
+    """
+
+    def __init__(
+        self,
+        publisher,
+        spool: Spool,
+        batch_records: int = DEFAULT_SPOOL_BATCH_RECORDS,
+        replay_interval: float = None,
+    ):
+        """
+        Args:
+            publisher: Anything with publish(records), e.g. a KinesisPublisher.
+            spool: The write-ahead log.
+            batch_records: Records written to the spool together.
+            replay_interval: Seconds between background replays. None only
+                replays at the start of publish().
+        """
+        self.publisher = publisher
+        self.spool = spool
+        self.batch_records = batch_records
+        self._stop = threading.Event()
+        # Held around every call to the wrapped publisher
+        self._publish_lock = threading.Lock()
+        self._thread = None
+        if replay_interval:
+            self._thread = threading.Thread(
+                target=self._replay_loop,
+                args=(replay_interval,),
+                name="spool-replay",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def __getattr__(self, name):
+        # Expose the wrapped publisher's attributes (stream_name, codec, ...)
+        if name == "publisher":
+            raise AttributeError(name)
+        return getattr(self.publisher, name)
+
+    def replay(self) -> Dict[str, int]:
+        """Republishes the records left unacknowledged by earlier publishes."""
+        with self._publish_lock:
+            return self._replay()
+
+    def publish(self, records: Iterable[Dict[str, Any]]):
+        """
+        Replays pending records, then publishes these through the spool.
+
+        Returns:
+            The wrapped publisher's response for these records.
+        """
+        positions = []
+
+        def write_ahead(records):
+            for batch in chunked(records, self.batch_records):
+                positions.extend(self.spool.append(batch))
+                yield from batch
+
+        with self._publish_lock:
+            self._replay()
+            try:
+                response = self.publisher.publish(write_ahead(records))
+            except Exception:
+                self.spool.release(positions)
+                raise
+        self.spool.resolve(positions, response)
+        return response
+
+    def close(self):
+        """Stops the background replay and closes the publisher and spool."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        close = getattr(self.publisher, "close", None)
+        if close is not None:
+            close()
+        self.spool.close()
+
+    def _replay(self) -> Dict[str, int]:
+        # Call with the publish lock held
+        if self.spool.pending_count() <= 0:
+            return {"replayed": 0, "acked": 0, "pending": 0}
+        return self.spool.replay(self.publisher, self.batch_records)
+
+    def _replay_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.replay()
+            except Exception as e:
+                print(f"Warning: spool replay failed: {e}")
+
+
+def spool_from_env() -> Spool or None:
+    """
+    Builds a Spool from environment variables, or returns None.
+
+    GUARDIAN_SPOOL=true (or GUARDIAN_SPOOL_DIR) enables it. GUARDIAN_SPOOL_DIR
+    sets the directory (default in the temp dir), GUARDIAN_SPOOL_FSYNC the
+    fsync policy ("always", "interval" or "never") and
+    GUARDIAN_SPOOL_SEGMENT_BYTES the segment size.
+    """
+    directory = os.environ.get("GUARDIAN_SPOOL_DIR")
+    if os.environ.get("GUARDIAN_SPOOL", "").lower() != "true" and not directory:
+        return None
+    return Spool(
+        directory or DEFAULT_SPOOL_DIR,
+        segment_bytes=int(
+            os.environ.get("GUARDIAN_SPOOL_SEGMENT_BYTES", DEFAULT_SEGMENT_BYTES)
+        ),
+        fsync=os.environ.get("GUARDIAN_SPOOL_FSYNC", DEFAULT_FSYNC_POLICY).lower(),
+    )
@@ -0,0 +1,310 @@
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from src.api_client import MAX_PAGE_SIZE, GuardianClient, get_client
+from src.checkpoint import MemoryCheckpointStore, QueryCheckpoint
+from src.metrics import emit_metrics
+from src.utils import build_search_params
+
+# --- STREAM CONFIGURATION ---
+DEFAULT_MIN_INTERVAL = 30.0
+DEFAULT_MAX_INTERVAL = 900.0
+# Poll often enough to pick up about this many new articles each time
+DEFAULT_TARGET_PER_POLL = 5
+# Weight of the latest observation in the arrival rate average
+DEFAULT_RATE_SMOOTHING = 0.3
+# ----------------------------
+
+
+class AdaptiveInterval:
+    """
+    Picks the next poll interval for one query from its article arrival rate.
+
+    The rate is an exponentially weighted average of new articles per second.
+    The interval aims at target_per_poll articles per poll, and doubles while
+    polls come back empty, always within [min_interval, max_interval].
+    """
+
+    def __init__(
+        self,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        target_per_poll: float = DEFAULT_TARGET_PER_POLL,
+        smoothing: float = DEFAULT_RATE_SMOOTHING,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_per_poll = target_per_poll
+        self.smoothing = smoothing
+        self.interval = min_interval
+        self.rate = None
+
+    def update(self, new_articles: int, elapsed: float) -> float:
+        """
+        Records a poll's result and returns the interval until the next poll.
+
+        Args:
+            new_articles: Articles the poll found that were not seen before.
+            elapsed: Seconds since the previous poll of this query.
+        """
+        observed = new_articles / elapsed if elapsed > 0 else 0.0
+        if self.rate is None:
+            self.rate = observed
+        else:
+            self.rate = self.smoothing * observed + (1 - self.smoothing) * self.rate
+
+        if new_articles == 0:
+            interval = self.interval * 2
+        else:
+            interval = self.target_per_poll / self.rate
+
+        self.interval = min(self.max_interval, max(self.min_interval, interval))
+        return self.interval
+
+
+def seconds_until_quota_reset(now: datetime = None) -> float:
+    """Seconds until the daily quota resets at local midnight."""
+    now = now or datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return (midnight - now).total_seconds()
+
+
+def quota_interval(remaining_quota: int, queries: int, seconds_left: float) -> float:
+    """
+    The shortest interval that spreads the remaining quota over the day.
+
+    Every query costs at least one request per poll, so polling each one
+    every seconds_left * queries / remaining_quota seconds uses the budget up
+    just as it resets. With no quota left, it waits for the reset.
+    """
+    if remaining_quota <= 0:
+        return seconds_left
+    return seconds_left * queries / remaining_quota
+
+
+def polling_client() -> GuardianClient:
+    """
+    A GuardianClient for polling: the shared client's settings and rate
+    limiter (so the daily quota is still tracked), but no response cache. A
+    cached page would answer every poll within the cache TTL, hiding new
+    articles and making a busy query look quiet.
+    """
+    shared = get_client()
+    return GuardianClient(
+        timeout=shared.timeout,
+        rate_limiter=shared.rate_limiter,
+        rate_limit_retries=shared.rate_limit_retries,
+        stream_json=shared.stream_json,
+        on_unauthorized=shared.on_unauthorized,
+    )
+
+
+class StreamDaemon:
+    """
+    Polls a set of queries continuously and publishes new articles.
+
+    One GuardianClient (HTTP session, rate limiter) and one publisher stay
+    open for the whole run. Polls bypass the response cache, which would
+    otherwise serve the previous page instead of new articles. Each query is
+    polled incrementally from its checkpoint, on an interval that adapts to
+    how often new articles arrive and to the remaining daily quota. stop(),
+    or SIGTERM/SIGINT during run_forever(), ends the loop after the current
+    poll; the publisher is then closed, which flushes any buffered records.
+
+    Usage:
+        daemon = StreamDaemon(["bitcoin", "ethereum"], api_url, api_key, publisher)
+        daemon.run_forever()
+    """
+
+    def __init__(
+        self,
+        queries: List[str],
+        api_url: str,
+        api_key: str,
+        publisher,
+        checkpoint_store=None,
+        deduplicator=None,
+        page_size: int = MAX_PAGE_SIZE,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        target_per_poll: float = DEFAULT_TARGET_PER_POLL,
+        show_fields: str = None,
+        client: GuardianClient = None,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            queries: Search terms to poll.
+            api_url: The base URL for the Guardian API search endpoint.
+            api_key: The Guardian API key.
+            publisher: Anything with publish(records); a BufferedKinesisProducer
+                keeps its batching thread warm between polls. close() is called
+                on shutdown if it has one.
+            checkpoint_store: Where checkpoints are kept. Defaults to memory,
+                so a restart begins from today.
+            deduplicator: Optional Deduplicator applied before publishing.
+            page_size: Results requested per page.
+            min_interval: Shortest time between polls of one query (seconds).
+            max_interval: Longest time between polls of one query (seconds).
+            target_per_poll: New articles each poll should pick up on average.
+            show_fields: Optional show-fields parameter, e.g. "bodyText".
+            client: The GuardianClient to poll with. Defaults to
+                polling_client(), which has no response cache.
+        """
+        self.queries = list(dict.fromkeys(queries))
+        self.api_url = api_url
+        self.api_key = api_key
+        self.publisher = publisher
+        self.checkpoint_store = checkpoint_store or MemoryCheckpointStore()
+        self.deduplicator = deduplicator
+        self.page_size = page_size
+        self.min_interval = min_interval
+        self.show_fields = show_fields
+        self.client = client or polling_client()
+        self._clock = clock
+        self._stop = threading.Event()
+        self.intervals = {
+            query: AdaptiveInterval(min_interval, max_interval, target_per_poll)
+            for query in self.queries
+        }
+        self.stats = {
+            query: {"polls": 0, "published": 0, "failed_polls": 0, "interval": None}
+            for query in self.queries
+        }
+
+    # --- Control ---
+    def stop(self, *_):
+        """Asks the loop to stop after the current poll. Usable as a signal handler."""
+        if not self._stop.is_set():
+            print("Stopping: finishing the current poll and flushing records...")
+        self._stop.set()
+
+    # --- Polling ---
+    def poll(self, query: str) -> int:
+        """
+        Fetches and publishes the articles newer than the query's checkpoint.
+
+        The checkpoint and dedup state only move forward if every record was
+        published, and the checkpoint only if every page was fetched: after a
+        failed page, the next poll fetches the pages this one never reached.
+
+        Returns:
+            The number of new articles published.
+        """
+        checkpoint = QueryCheckpoint(self.checkpoint_store, query)
+        params = build_search_params(
+            {
+                "search_term": query,
+                # From the checkpoint's day, or today for a new query
+                "date_from": None,
+                "checkpoint": checkpoint.previous,
+                "show_fields": self.show_fields,
+            }
+        )
+        walk = {}
+        articles = checkpoint.filter(
+            self.client.iter_results(
+                self.api_url, params, self.api_key, page_size=self.page_size, walk=walk
+            )
+        )
+        if self.deduplicator is not None:
+            articles = self.deduplicator.filter(articles)
+        articles = list(articles)
+
+        self.stats[query]["polls"] += 1
+        if walk.get("error"):
+            self.stats[query]["failed_polls"] += 1
+            print(f"Warning: fetch for '{query}' stopped early, will resume next poll.")
+        if not articles:
+            # Nothing new, but the checkpoint may still have been established
+            if not walk.get("error"):
+                checkpoint.save()
+            return 0
+
+        response = self.publisher.publish(articles)
+        if not response or response.get("FailedRecordCount", 0) > 0:
+            self.stats[query]["failed_polls"] += 1
+            if self.deduplicator is not None:
+                self.deduplicator.rollback()
+            print(f"Warning: publish for '{query}' failed, will retry next poll.")
+            return 0
+
+        if not walk.get("error"):
+            checkpoint.save()
+        if self.deduplicator is not None:
+            self.deduplicator.commit()
+        self.stats[query]["published"] += len(articles)
+        return len(articles)
+
+    def next_interval(self, query: str, new_articles: int, elapsed: float) -> float:
+        """Combines the adaptive interval with what the daily quota allows."""
+        interval = self.intervals[query].update(new_articles, elapsed)
+        remaining = self.client.remaining_quota()
+        if remaining is not None:
+            interval = max(
+                interval,
+                quota_interval(
+                    remaining, len(self.queries), seconds_until_quota_reset()
+                ),
+            )
+        self.stats[query]["interval"] = interval
+        return interval
+
+    def run(self):
+        """
+        Polls until stop() is called, then closes the publisher.
+
+        Every query is polled once at start-up, then whenever its interval
+        has passed. The wait between polls wakes up immediately on stop().
+        """
+        now = self._clock()
+        next_due = {query: now for query in self.queries}
+        last_poll = {query: None for query in self.queries}
+
+        try:
+            while not self._stop.is_set() and self.queries:
+                query = min(next_due, key=next_due.get)
+                wait = next_due[query] - self._clock()
+                if wait > 0 and self._stop.wait(wait):
+                    break
+
+                started = self._clock()
+                try:
+                    new_articles = self.poll(query)
+                except Exception as e:
+                    print(f"Error polling '{query}': {e}")
+                    self.stats[query]["failed_polls"] += 1
+                    new_articles = 0
+
+                elapsed = (
+                    started - last_poll[query]
+                    if last_poll[query] is not None
+                    else self.min_interval
+                )
+                last_poll[query] = started
+                interval = self.next_interval(query, new_articles, elapsed)
+                next_due[query] = started + interval
+                print(
+                    f"Polled '{query}': {new_articles} new articles, next poll in {interval:.0f}s."
+                )
+                emit_metrics()
+        finally:
+            close = getattr(self.publisher, "close", None)
+            if close is not None:
+                close()
+            print(f"Stream stopped. Stats: {self.stats}")
+
+    def run_forever(self):
+        """Runs until SIGTERM or SIGINT, which stop the loop gracefully."""
+        previous = {
+            sig: signal.signal(sig, self.stop)
+            for sig in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            self.run()
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
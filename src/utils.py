@@ -35,10 +35,33 @@ def build_search_params(criteria: dict):
     """
     Transforms user input for search_term and date_from to a dictionary of
     parameters suitable for the Guardian API fetching.
+
+    If criteria holds a "checkpoint" (see src.checkpoint), results are requested
+    from the checkpoint's publication day, or from date_from if that is later,
+    so an incremental run only asks for content it has not published yet. A
+    date_from of None means the checkpoint day, or today without a
+    checkpoint. An optional "date_to" date adds the to-date parameter, and an
+    optional "show_fields" string (e.g. "bodyText,wordcount") the show-fields
+    parameter.
     """
-    date_from_object = criteria["date_from"]
-    date_str = date_from_object.strftime("%Y-%m-%d")
-    return {"q": criteria["search_term"], "from-date": date_str, "order-by": "newest"}
+    date_from_object = criteria.get("date_from")
+    date_str = date_from_object.strftime("%Y-%m-%d") if date_from_object else None
+    checkpoint = criteria.get("checkpoint")
+    if checkpoint and checkpoint.get("webPublicationDate"):
+        # The Guardian from-date filter is day-granular: "2025-10-01T12:00:00Z"
+        checkpoint_day = checkpoint["webPublicationDate"][:10]
+        # YYYY-MM-DD strings compare like the dates they hold
+        date_str = max(date_str, checkpoint_day) if date_str else checkpoint_day
+    if date_str is None:
+        date_str = date.today().strftime("%Y-%m-%d")
+    params = {"q": criteria["search_term"], "from-date": date_str, "order-by": "newest"}
+    # Optional upper bound (inclusive), e.g. for backfilling a date range
+    if criteria.get("date_to"):
+        params["to-date"] = criteria["date_to"].strftime("%Y-%m-%d")
+    # Extra article fields, e.g. from src.models.ArticleProjection.show_fields
+    if criteria.get("show_fields"):
+        params["show-fields"] = criteria["show_fields"]
+    return params
 
 
 def process_and_print_results(data: dict):
@@ -0,0 +1,28 @@
+"""Test doubles shared by the test modules."""
+
+
+class FakeClock:
+    """
+    A manually advanced clock: set or add to `now`, or let every read move
+    it forward by `step` seconds. sleep() moves it forward and records the
+    sleeps.
+    """
+
+    def __init__(self, now=0.0, step=0.0):
+        self.now = now
+        self.step = step
+        self.sleeps = []
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def ok_response(records):
+    """A publish response that accepts every record."""
+    records = list(records)
+    return {"FailedRecordCount": 0, "Records": [{}] * len(records)}
@@ -0,0 +1,100 @@
+import json
+import unittest
+
+from src.aggregation import (
+    MAGIC,
+    aggregate,
+    deaggregate,
+    deaggregate_records,
+    is_aggregated,
+)
+
+
+def payloads(count, size=100):
+    return [
+        (f"key-{i}", json.dumps({"id": i, "pad": "x" * size}).encode())
+        for i in range(count)
+    ]
+
+
+class TestAggregate(unittest.TestCase):
+
+    def test_round_trip_preserves_payloads_and_order(self):
+        """
+        Tests that deaggregating every aggregate gives back the original payloads.
+        """
+        items = payloads(50)
+
+        packed = list(aggregate(items, max_bytes=1000))
+        unpacked = [p for _, data, _ in packed for p in deaggregate(data)]
+
+        self.assertEqual(unpacked, [payload for _, payload in items])
+        self.assertEqual(sum(count for _, _, count in packed), 50)
+
+    def test_respects_max_bytes(self):
+        """
+        Tests that no aggregate exceeds max_bytes and several are produced.
+        """
+        packed = list(aggregate(payloads(50), max_bytes=1000))
+
+        self.assertGreater(len(packed), 1)
+        self.assertTrue(all(len(data) <= 1000 for _, data, _ in packed))
+
+    def test_uses_first_partition_key(self):
+        """
+        Tests that each aggregate takes the partition key of its first payload.
+        """
+        packed = list(aggregate(payloads(3), max_bytes=10_000))
+
+        self.assertEqual(len(packed), 1)
+        self.assertEqual(packed[0][0], "key-0")
+
+    def test_oversized_payload_gets_its_own_record(self):
+        """
+        Tests that a payload over max_bytes is emitted alone rather than dropped.
+        """
+        items = [("a", b"x" * 50), ("b", b"y" * 500), ("c", b"z" * 50)]
+
+        packed = list(aggregate(items, max_bytes=200))
+
+        self.assertEqual([count for _, _, count in packed], [1, 1, 1])
+        self.assertEqual(deaggregate(packed[1][1]), [b"y" * 500])
+
+    def test_empty_input_yields_nothing(self):
+        self.assertEqual(list(aggregate([])), [])
+
+
+class TestDeaggregate(unittest.TestCase):
+
+    def test_plain_records_pass_through(self):
+        """
+        Tests that non-aggregated records are returned as a single payload.
+        """
+        data = json.dumps({"id": 1}).encode()
+
+        self.assertFalse(is_aggregated(data))
+        self.assertEqual(deaggregate(data), [data])
+        self.assertEqual(deaggregate_records(data), [{"id": 1}])
+
+    def test_truncated_record_raises(self):
+        """
+        Tests that a corrupted aggregate raises ValueError instead of guessing.
+        """
+        _, data, _ = next(aggregate(payloads(2)))
+
+        with self.assertRaises(ValueError):
+            deaggregate(data[:-5])
+        with self.assertRaises(ValueError):
+            deaggregate(MAGIC + b"\x00\x00")
+
+    def test_deaggregate_records_decodes_json(self):
+        """
+        Tests that the consumer helper returns article dictionaries.
+        """
+        _, data, _ = next(aggregate(payloads(3, size=1)))
+
+        self.assertEqual([r["id"] for r in deaggregate_records(data)], [0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
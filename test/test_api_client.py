@@ -1,10 +1,24 @@
+import json
 import os
+import tempfile
 import unittest
 from unittest.mock import Mock, call, patch
 
 from dotenv import load_dotenv
 
-from src.api_client import fetch_guardian_content
+import src.api_client as api_client
+from benchmarks.fake_guardian import GuardianStubServer
+from src.api_client import (
+    DEFAULT_TIMEOUT,
+    MAX_PAGE_SIZE,
+    GuardianClient,
+    fetch_guardian_content,
+    get_client,
+    get_remaining_quota,
+    iter_guardian_results,
+)
+from src.cache import MemoryCache, make_cache_key
+from src.rate_limiter import FileQuotaStore, RateLimiter, TokenBucket
 
 load_dotenv()
 API_KEY = os.getenv("GUARDIAN_API_KEY")
@@ -13,20 +27,28 @@ API_URL = os.getenv("GUARDIAN_URL")
 
 class TestFetchGuardianContent(unittest.TestCase):
 
-    @patch("requests.get")
+    def setUp(self):
+        # A client without rate limiting keeps these tests fast and offline
+        api_client.GUARDIAN_CLIENT = GuardianClient()
+
+    def tearDown(self):
+        api_client.GUARDIAN_CLIENT = None
+
+    @patch("requests.Session.get")
     def test_succesful_api_call(self, mock_get):
         """
         Tests if function returns status_code 200 for a successful response,
         and returns the parsed JSON data"""
         mock_response = Mock()
         mock_response.status_code = 200
+        mock_response.content = b"{}"
         expected_data = {
             "response": {"status": "ok", "userTier": "developer", "total": 10}
         }
         mock_response.json.return_value = expected_data
         mock_get.return_value = mock_response
         test_params = {"q": "test_search", "order-by": "newest"}
-        result = fetch_guardian_content(API_URL, test_params)
+        result = fetch_guardian_content(API_URL, test_params, API_KEY)
         self.assertEqual(
             result, expected_data, "Function did not return the expected JSON data."
         )
@@ -38,10 +60,12 @@ class TestFetchGuardianContent(unittest.TestCase):
             "order-by": "newest",
             "api-key": API_KEY,
         }
-        mock_get.assert_called_with(API_URL, params=expected_call_params)
+        mock_get.assert_called_with(
+            API_URL, params=expected_call_params, timeout=DEFAULT_TIMEOUT
+        )
 
     @patch("builtins.print")
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_unauthorized_error_401(self, mock_get, mock_print):
         """
         Tests that the function handles a 401 Unauthorized response by
@@ -51,14 +75,16 @@ class TestFetchGuardianContent(unittest.TestCase):
         mock_response.status_code = 401
         mock_get.return_value = mock_response
         test_params = {"q": "error_test"}
-        result = fetch_guardian_content(API_URL, test_params)
+        result = fetch_guardian_content(API_URL, test_params, API_KEY)
 
         self.assertIsNone(result, "Function returns None on 401 error.")
 
-        mock_print.assert_any_call("Error: Unauthorized. Check your API key.")
+        mock_print.assert_any_call(
+            "Error: Unauthorized. Check your API key retrieved from Secrets Manager."
+        )
 
     @patch("builtins.print")
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_generic_error_500(self, mock_get, mock_print):
         """
         Tests that the function handles a generic non-200/non-401 error
@@ -69,7 +95,7 @@ class TestFetchGuardianContent(unittest.TestCase):
         mock_response.text = "Internal Server Error HTML"
         mock_get.return_value = mock_response
         test_params = {"q": "server_test"}
-        result = fetch_guardian_content(API_URL, test_params)
+        result = fetch_guardian_content(API_URL, test_params, API_KEY)
         expected_calls = [
             call("Error: Received status code 500"),
             call("Response:", "Internal Server Error HTML"),
@@ -78,14 +104,15 @@ class TestFetchGuardianContent(unittest.TestCase):
         self.assertIsNone(result, "Function should return None on a non-401 failure.")
         mock_print.assert_has_calls(expected_calls, any_order=False)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_parameter_merging_includes_api_key(self, mock_get):
         """
         Tests that the function correctly merges user parameters
-        with the mandatory API_KEY and calls requests.get.
+        with the mandatory API_KEY and calls the pooled session.
         """
         mock_response = Mock()
         mock_response.status_code = 200
+        mock_response.content = b"{}"
         mock_response.json.return_value = {}
         mock_get.return_value = mock_response
         expected_call_params = {
@@ -95,9 +122,471 @@ class TestFetchGuardianContent(unittest.TestCase):
         }
 
         test_params = {"q": "economy", "from-date": "2020-01-01"}
-        fetch_guardian_content(API_URL, test_params)
+        fetch_guardian_content(API_URL, test_params, API_KEY)
+
+        mock_get.assert_called_with(
+            API_URL, params=expected_call_params, timeout=DEFAULT_TIMEOUT
+        )
+
+
+class TestGuardianClient(unittest.TestCase):
+
+    def setUp(self):
+        api_client.GUARDIAN_CLIENT = None
+        # Keep the quota file of get_client() out of the real temp directory
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(
+            "os.environ",
+            {
+                "GUARDIAN_QUOTA_FILE": os.path.join(self.tmp_dir.name, "quota.json"),
+                "GUARDIAN_RATE_PER_SECOND": "1000",
+            },
+        )
+        self.env.start()
+
+    def tearDown(self):
+        api_client.GUARDIAN_CLIENT = None
+        self.env.stop()
+        self.tmp_dir.cleanup()
+
+    def test_mounts_pooled_adapter(self):
+        """
+        Tests that the client mounts an adapter sized by pool_size on the session.
+        """
+        client = GuardianClient(pool_size=4, timeout=5)
+        adapter = client.session.get_adapter("https://content.guardianapis.com")
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(client.timeout, 5)
+        client.close()
+
+    def test_get_client_is_cached(self):
+        """
+        Tests that get_client creates the client once and reuses it afterwards.
+        """
+        first = get_client()
+        second = get_client()
+        self.assertIs(first, second)
+
+    @patch.dict("os.environ", {"GUARDIAN_POOL_SIZE": "3", "GUARDIAN_TIMEOUT": "2.5"})
+    def test_get_client_reads_environment(self):
+        """
+        Tests that pool size and timeout can be configured from the environment.
+        """
+        client = get_client()
+        adapter = client.session.get_adapter("https://content.guardianapis.com")
+        self.assertEqual(adapter._pool_maxsize, 3)
+        self.assertEqual(client.timeout, 2.5)
+
+    @patch("requests.Session.get")
+    def test_fetch_reuses_same_session(self, mock_get):
+        """
+        Tests that consecutive fetches go through the same cached session.
+        """
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = b"{}"
+        mock_response.json.return_value = {}
+        mock_get.return_value = mock_response
+
+        fetch_guardian_content(API_URL, {"q": "a"}, API_KEY)
+        session = api_client.GUARDIAN_CLIENT.session
+        fetch_guardian_content(API_URL, {"q": "b"}, API_KEY)
+
+        self.assertIs(api_client.GUARDIAN_CLIENT.session, session)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("requests.Session.get")
+    def test_fetches_count_against_daily_quota(self, mock_get):
+        """
+        Tests that the cached client records each request against the quota
+        and reports what is left.
+        """
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = b"{}"
+        mock_response.json.return_value = {}
+        mock_get.return_value = mock_response
+
+        before = get_remaining_quota()
+        fetch_guardian_content(API_URL, {"q": "a"}, API_KEY)
+
+        self.assertEqual(get_remaining_quota(), before - 1)
+
+
+class TestRateLimitHandling(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = FileQuotaStore(os.path.join(self.tmp_dir.name, "quota.json"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def make_response(status_code, headers=None):
+        mock_response = Mock()
+        mock_response.status_code = status_code
+        mock_response.content = b"{}"
+        mock_response.headers = headers or {}
+        mock_response.json.return_value = {"response": {"results": []}}
+        return mock_response
+
+    @patch("builtins.print")
+    @patch("src.api_client.time.sleep")
+    @patch("requests.Session.get")
+    def test_retries_429_after_retry_after(self, mock_get, mock_sleep, mock_print):
+        """
+        Tests that a 429 response is retried after sleeping for Retry-After
+        seconds instead of being dropped.
+        """
+        mock_get.side_effect = [
+            self.make_response(429, {"Retry-After": "2"}),
+            self.make_response(200),
+        ]
+        client = GuardianClient()
+
+        result = client.fetch(API_URL, {"q": "a"}, API_KEY)
+
+        self.assertEqual(result, {"response": {"results": []}})
+        mock_sleep.assert_called_once_with(2.0)
+        mock_print.assert_any_call("Warning: Rate limited (429). Retrying in 2.0s...")
+
+    @patch("builtins.print")
+    @patch("src.api_client.time.sleep")
+    @patch("requests.Session.get")
+    def test_gives_up_after_rate_limit_retries(self, mock_get, mock_sleep, mock_print):
+        """
+        Tests that repeated 429 responses end with None and a clear message.
+        """
+        mock_get.return_value = self.make_response(429, {"Retry-After": "1"})
+        client = GuardianClient(rate_limit_retries=2)
+
+        result = client.fetch(API_URL, {"q": "a"}, API_KEY)
+
+        self.assertIsNone(result)
+        self.assertEqual(mock_get.call_count, 3)
+        mock_print.assert_any_call("Error: Rate limited (429). Retries exhausted.")
+
+    @patch("builtins.print")
+    @patch("requests.Session.get")
+    def test_stops_when_quota_is_spent(self, mock_get, mock_print):
+        """
+        Tests that no request is sent once the daily quota is used up.
+        """
+        mock_get.return_value = self.make_response(200)
+        limiter = RateLimiter(
+            bucket=TokenBucket(rate=1000, capacity=1000),
+            store=self.store,
+            daily_quota=2,
+        )
+        client = GuardianClient(rate_limiter=limiter)
+
+        client.fetch(API_URL, {"q": "a"}, API_KEY)
+        client.fetch(API_URL, {"q": "b"}, API_KEY)
+        result = client.fetch(API_URL, {"q": "c"}, API_KEY)
+
+        self.assertIsNone(result)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(client.remaining_quota(), 0)
+        mock_print.assert_any_call("Error: Daily quota of 2 requests has been used up.")
+
 
-        mock_get.assert_called_with(API_URL, params=expected_call_params)
+class TestUnauthorizedRetry(unittest.TestCase):
+
+    @staticmethod
+    def make_response(status_code, data=None):
+        mock_response = Mock()
+        mock_response.status_code = status_code
+        mock_response.content = b"{}"
+        mock_response.json.return_value = data
+        return mock_response
+
+    @patch("builtins.print")
+    @patch("requests.Session.get")
+    def test_401_is_retried_once_with_refreshed_key(self, mock_get, mock_print):
+        """
+        Tests that a rejected key is replaced through on_unauthorized, the
+        request is retried with it, and later calls use the new key directly.
+        """
+        data = {"response": {"status": "ok"}}
+        mock_get.side_effect = [
+            self.make_response(401),
+            self.make_response(200, data),
+            self.make_response(200, data),
+        ]
+        on_unauthorized = Mock(return_value="new-key")
+        client = GuardianClient(on_unauthorized=on_unauthorized)
+
+        first = client.fetch(API_URL, {"q": "a"}, "old-key")
+        second = client.fetch(API_URL, {"q": "b"}, "old-key")
+
+        self.assertEqual(first, data)
+        self.assertEqual(second, data)
+        on_unauthorized.assert_called_once_with("old-key")
+        used_keys = [c.kwargs["params"]["api-key"] for c in mock_get.call_args_list]
+        self.assertEqual(used_keys, ["old-key", "new-key", "new-key"])
+
+    @patch("builtins.print")
+    @patch("requests.Session.get")
+    def test_401_without_new_key_is_not_retried(self, mock_get, mock_print):
+        """
+        Tests that the request fails as before when no replacement key exists.
+        """
+        mock_get.return_value = self.make_response(401)
+        client = GuardianClient(on_unauthorized=Mock(return_value=None))
+
+        self.assertIsNone(client.fetch(API_URL, {"q": "a"}, "old-key"))
+        mock_get.assert_called_once()
+
+
+class TestIterGuardianResults(unittest.TestCase):
+
+    def setUp(self):
+        api_client.GUARDIAN_CLIENT = GuardianClient()
+
+    def tearDown(self):
+        api_client.GUARDIAN_CLIENT = None
+
+    @staticmethod
+    def make_page(page, pages, results):
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = b"{}"
+        mock_response.json.return_value = {
+            "response": {
+                "status": "ok",
+                "currentPage": page,
+                "pages": pages,
+                "results": results,
+            }
+        }
+        return mock_response
+
+    @patch("requests.Session.get")
+    def test_walks_every_page_in_order(self, mock_get):
+        """
+        Tests that the generator follows response.pages and yields every
+        article one at a time, requesting page 1, 2, 3 in turn.
+        """
+        mock_get.side_effect = [
+            self.make_page(1, 3, [{"id": "a"}, {"id": "b"}]),
+            self.make_page(2, 3, [{"id": "c"}]),
+            self.make_page(3, 3, [{"id": "d"}]),
+        ]
+
+        results = iter_guardian_results(API_URL, {"q": "economy"}, API_KEY, 2)
+
+        self.assertEqual([r["id"] for r in results], ["a", "b", "c", "d"])
+        requested_pages = [c.kwargs["params"]["page"] for c in mock_get.call_args_list]
+        self.assertEqual(requested_pages, [1, 2, 3])
+        self.assertEqual(mock_get.call_args.kwargs["params"]["page-size"], 2)
+
+    @patch("requests.Session.get")
+    def test_is_lazy(self, mock_get):
+        """
+        Tests that pages are only fetched as the consumer reaches them.
+        """
+        mock_get.side_effect = [
+            self.make_page(1, 2, [{"id": "a"}]),
+            self.make_page(2, 2, [{"id": "b"}]),
+        ]
+
+        results = iter_guardian_results(API_URL, {"q": "economy"}, API_KEY)
+        self.assertEqual(next(results)["id"], "a")
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch("requests.Session.get")
+    def test_stops_at_max_pages(self, mock_get):
+        """
+        Tests that max_pages caps the number of requests made.
+        """
+        mock_get.side_effect = [
+            self.make_page(1, 5, [{"id": "a"}]),
+            self.make_page(2, 5, [{"id": "b"}]),
+        ]
+
+        results = list(
+            iter_guardian_results(API_URL, {"q": "economy"}, API_KEY, max_pages=2)
+        )
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("builtins.print")
+    @patch("requests.Session.get")
+    def test_stops_when_a_page_fails(self, mock_get, mock_print):
+        """
+        Tests that a failed page ends the iteration instead of raising, and
+        that the walk reports the results as incomplete.
+        """
+        failed = Mock()
+        failed.status_code = 500
+        failed.text = "Internal Server Error"
+        mock_get.side_effect = [self.make_page(1, 3, [{"id": "a"}]), failed]
+        walk = {}
+
+        results = list(
+            iter_guardian_results(API_URL, {"q": "economy"}, API_KEY, walk=walk)
+        )
+
+        self.assertEqual(results, [{"id": "a"}])
+        self.assertEqual(walk["pages"], 1)
+        self.assertEqual(walk["error"], "page 2 of 3 failed after 1 results")
+
+    def test_complete_walk_has_no_error(self):
+        walk = {}
+
+        with GuardianStubServer(total_results=25) as stub:
+            results = list(
+                iter_guardian_results(
+                    stub.url, {"q": "economy"}, API_KEY, 10, walk=walk
+                )
+            )
+
+        self.assertEqual(len(results), 25)
+        self.assertEqual(
+            walk,
+            {"pages": 3, "results": 25, "total_pages": 3, "total": 25, "error": None},
+        )
+
+    @patch("requests.Session.get")
+    def test_page_size_is_capped(self, mock_get):
+        """
+        Tests that page-size never exceeds the Guardian API maximum and that
+        the caller's params are not mutated.
+        """
+        mock_get.return_value = self.make_page(1, 1, [])
+        params = {"q": "economy"}
+
+        list(iter_guardian_results(API_URL, params, API_KEY, page_size=1000))
+
+        self.assertEqual(
+            mock_get.call_args.kwargs["params"]["page-size"], MAX_PAGE_SIZE
+        )
+        self.assertEqual(params, {"q": "economy"})
+
+
+class TestStreamedResults(unittest.TestCase):
+
+    @staticmethod
+    def make_page(page, pages, results):
+        body = json.dumps(
+            {"response": {"currentPage": page, "pages": pages, "results": results}}
+        ).encode("utf-8")
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = b"{}"
+        mock_response.iter_content.return_value = [body[:10], body[10:]]
+        return mock_response
+
+    @patch("builtins.print")
+    @patch("requests.Session.get")
+    def test_streams_every_page_without_json(self, mock_get, mock_print):
+        """
+        Tests that with stream_json the body is parsed from iter_content,
+        pagination still follows response.pages and every response is closed.
+        """
+        pages = [
+            self.make_page(1, 2, [{"id": "a"}, {"id": "b"}]),
+            self.make_page(2, 2, [{"id": "c"}]),
+        ]
+        mock_get.side_effect = pages
+        client = GuardianClient(stream_json=True)
+
+        results = list(client.iter_results(API_URL, {"q": "economy"}, API_KEY))
+
+        self.assertEqual([r["id"] for r in results], ["a", "b", "c"])
+        self.assertTrue(mock_get.call_args.kwargs["stream"])
+        for page in pages:
+            page.json.assert_not_called()
+            page.close.assert_called_once()
+
+    @patch("builtins.print")
+    @patch("requests.Session.get")
+    def test_stopping_early_skips_later_pages(self, mock_get, mock_print):
+        """
+        Tests that abandoning the generator closes the open response and
+        requests no further pages.
+        """
+        page = self.make_page(1, 5, [{"id": "a"}, {"id": "b"}])
+        mock_get.return_value = page
+        client = GuardianClient(stream_json=True)
+
+        results = client.iter_results(API_URL, {"q": "economy"}, API_KEY)
+        next(results)
+        results.close()
+
+        mock_get.assert_called_once()
+        page.close.assert_called_once()
+
+    @patch("builtins.print")
+    @patch("requests.Session.get")
+    def test_fresh_cache_entry_is_streamed_from_memory(self, mock_get, mock_print):
+        """
+        Tests that a page cached by fetch is served without a request.
+        """
+        client = GuardianClient(cache=MemoryCache(), stream_json=True)
+        params = {"q": "economy", "page-size": MAX_PAGE_SIZE, "page": 1}
+        client.cache.store(
+            make_cache_key(API_URL, params),
+            {"response": {"pages": 1, "results": [{"id": "a"}]}},
+        )
+
+        results = list(client.iter_results(API_URL, {"q": "economy"}, API_KEY))
+
+        self.assertEqual(results, [{"id": "a"}])
+        mock_get.assert_not_called()
+
+
+class TestResponseCaching(unittest.TestCase):
+
+    @staticmethod
+    def make_response(status_code, data=None, headers=None):
+        mock_response = Mock()
+        mock_response.status_code = status_code
+        mock_response.content = json.dumps(data).encode("utf-8")
+        mock_response.headers = headers or {}
+        mock_response.json.return_value = data
+        return mock_response
+
+    @patch("builtins.print")
+    @patch("requests.Session.get")
+    def test_fresh_cache_hit_skips_request(self, mock_get, mock_print):
+        """
+        Tests that a repeated query is answered from the cache.
+        """
+        mock_get.return_value = self.make_response(200, {"response": {"total": 1}})
+        client = GuardianClient(cache=MemoryCache())
+
+        first = client.fetch(API_URL, {"q": "a"}, API_KEY)
+        second = client.fetch(API_URL, {"q": "a"}, API_KEY)
+
+        self.assertEqual(first, second)
+        mock_get.assert_called_once()
+        self.assertEqual(client.cache.stats()["hits"], 1)
+
+    @patch("builtins.print")
+    @patch("requests.Session.get")
+    def test_stale_entry_is_revalidated_with_etag(self, mock_get, mock_print):
+        """
+        Tests that a stale entry sends If-None-Match and a 304 reuses the
+        cached data.
+        """
+        data = {"response": {"total": 1}}
+        mock_get.side_effect = [
+            self.make_response(200, data, {"ETag": '"v1"'}),
+            self.make_response(304),
+        ]
+        client = GuardianClient(cache=MemoryCache(ttl=0))
+
+        client.fetch(API_URL, {"q": "a"}, API_KEY)
+        result = client.fetch(API_URL, {"q": "a"}, API_KEY)
+
+        self.assertEqual(result, data)
+        self.assertEqual(
+            mock_get.call_args.kwargs["headers"], {"If-None-Match": '"v1"'}
+        )
+        self.assertEqual(client.cache.stats()["revalidations"], 1)
 
 
 if __name__ == "__main__":
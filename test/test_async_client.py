@@ -0,0 +1,149 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+from benchmarks.fake_guardian import GuardianStubServer
+from src.async_client import AsyncGuardianClient, fetch_guardian_results_concurrently
+
+API_KEY = "test-key"
+PARAMS = {"q": "economy", "order-by": "newest"}
+
+
+class TestAsyncGuardianClient(unittest.TestCase):
+
+    def test_fetches_every_page_in_newest_order(self):
+        """
+        Tests that all pages are fetched and articles keep the API's
+        newest-first ordering even though pages complete out of order.
+        """
+        with GuardianStubServer(total_results=45, latency=0.01) as stub:
+            results = fetch_guardian_results_concurrently(
+                stub.url, PARAMS, API_KEY, page_size=10, concurrency=4
+            )
+
+        self.assertEqual(len(results), 45)
+        dates = [article["webPublicationDate"] for article in results]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+        self.assertEqual(sorted(int(r["page"]) for r in stub.requests), [1, 2, 3, 4, 5])
+        self.assertTrue(all(r["api-key"] == API_KEY for r in stub.requests))
+
+    def test_remaining_pages_are_fetched_concurrently(self):
+        """
+        Tests that pages after the first overlap: 1 + 8 pages at 0.1s latency
+        with a window of 8 should take roughly two round trips, not nine.
+        """
+        with GuardianStubServer(total_results=90, latency=0.1) as stub:
+            start = time.perf_counter()
+            results = fetch_guardian_results_concurrently(
+                stub.url, PARAMS, API_KEY, page_size=10, concurrency=8
+            )
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(results), 90)
+        self.assertLess(elapsed, 0.6)
+
+    def test_respects_max_pages(self):
+        """
+        Tests that max_pages limits how many pages are requested.
+        """
+        with GuardianStubServer(total_results=100) as stub:
+            results = fetch_guardian_results_concurrently(
+                stub.url, PARAMS, API_KEY, page_size=10, max_pages=3
+            )
+
+        self.assertEqual(len(results), 30)
+        self.assertEqual(len(stub.requests), 3)
+
+    def test_complete_walk_has_no_error(self):
+        """
+        Tests that a walk over every page is filled in and has no error.
+        """
+        walk = {}
+        with GuardianStubServer(total_results=45) as stub:
+            fetch_guardian_results_concurrently(
+                stub.url, PARAMS, API_KEY, page_size=10, walk=walk
+            )
+
+        self.assertEqual(
+            walk,
+            {"pages": 5, "results": 45, "total_pages": 5, "total": 45, "error": None},
+        )
+
+    @patch("builtins.print")
+    def test_failed_page_returns_none(self, mock_print):
+        """
+        Tests that a failed middle page is reported instead of returning the
+        articles before it as if they were the whole result set.
+        """
+        walk = {}
+        with GuardianStubServer(total_results=50) as stub:
+            stub.status_overrides[3] = 500
+            results = fetch_guardian_results_concurrently(
+                stub.url, PARAMS, API_KEY, page_size=10, concurrency=2, walk=walk
+            )
+
+        self.assertIsNone(results)
+        self.assertEqual(walk["results"], 20)
+        self.assertEqual(walk["error"], "page 3 of 5 failed after 20 results")
+        mock_print.assert_any_call("Error: Received status code 500")
+
+    @patch("builtins.print")
+    def test_iter_pages_stops_at_first_failed_page(self, mock_print):
+        """
+        Tests that the async iterator ends at the last good page and marks
+        the walk as incomplete.
+        """
+
+        async def collect(url, walk):
+            client = AsyncGuardianClient(concurrency=2)
+            return [
+                page
+                async for page in client.iter_pages(url, PARAMS, API_KEY, 10, walk=walk)
+            ]
+
+        walk = {}
+        with GuardianStubServer(total_results=50) as stub:
+            stub.status_overrides[3] = 500
+            pages = asyncio.run(collect(stub.url, walk))
+
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(walk["pages"], 2)
+        self.assertIsNotNone(walk["error"])
+
+    @patch("builtins.print")
+    def test_unauthorized_returns_nothing(self, mock_print):
+        """
+        Tests that a 401 on the first page returns no results.
+        """
+        with GuardianStubServer(total_results=50) as stub:
+            stub.status_overrides[1] = 401
+            results = fetch_guardian_results_concurrently(stub.url, PARAMS, API_KEY)
+
+        self.assertIsNone(results)
+        mock_print.assert_any_call(
+            "Error: Unauthorized. Check your API key retrieved from Secrets Manager."
+        )
+
+    def test_iter_results_is_an_async_generator(self):
+        """
+        Tests that iter_results can be consumed incrementally with async for.
+        """
+
+        async def first_two(url):
+            client = AsyncGuardianClient(concurrency=2)
+            collected = []
+            async for article in client.iter_results(url, PARAMS, API_KEY, 10):
+                collected.append(article)
+                if len(collected) == 2:
+                    break
+            return collected
+
+        with GuardianStubServer(total_results=30) as stub:
+            results = asyncio.run(first_two(stub.url))
+
+        self.assertEqual(len(results), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
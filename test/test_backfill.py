@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from benchmarks.fake_guardian import GuardianStubServer
+from src import api_client
+from src.api_client import GuardianClient
+from src.backfill import ProgressReporter, plan_windows, run_backfill
+from test.helpers import ok_response
+
+API_KEY = "test-key"
+# 120 articles, 6 hours apart: 4 per day from 2025-10-01 back to 2025-09-02
+STUB = dict(total_results=120, spacing_minutes=360, filter_dates=True)
+START, END = date(2025, 9, 1), date(2025, 10, 1)
+
+
+@patch("builtins.print")
+class TestBackfill(unittest.TestCase):
+
+    def setUp(self):
+        # A client without rate limiting keeps these tests fast and offline
+        api_client.GUARDIAN_CLIENT = GuardianClient()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.manifest = os.path.join(self.tmp_dir.name, "manifest.json")
+
+    def tearDown(self):
+        api_client.GUARDIAN_CLIENT = None
+        self.tmp_dir.cleanup()
+
+    def test_plan_splits_busy_ranges_into_small_windows(self, mock_print):
+        with GuardianStubServer(**STUB) as stub:
+            windows = plan_windows(stub.url, "bitcoin", API_KEY, START, END, 20)
+
+        self.assertEqual(sum(w["total"] for w in windows), 120)
+        self.assertTrue(all(w["total"] <= 20 for w in windows))
+        # Newest window first, and windows never overlap
+        self.assertEqual(windows[0]["to"], "2025-10-01")
+        self.assertTrue(all(a["from"] > b["to"] for a, b in zip(windows, windows[1:])))
+
+    def test_publishes_every_article_once(self, mock_print):
+        publisher = MagicMock()
+        publisher.publish.side_effect = ok_response
+
+        with GuardianStubServer(**STUB) as stub:
+            summary = run_backfill(
+                stub.url,
+                "bitcoin",
+                API_KEY,
+                START,
+                END,
+                publisher,
+                manifest_path=self.manifest,
+                workers=3,
+                page_size=10,
+                max_window_results=20,
+            )
+
+        published = [
+            article["id"]
+            for c in publisher.publish.call_args_list
+            for article in c.args[0]
+        ]
+        self.assertEqual(len(published), 120)
+        self.assertEqual(len(set(published)), 120)
+        self.assertEqual(summary["windows_failed"], 0)
+        self.assertEqual(summary["published"], 120)
+        with open(self.manifest) as f:
+            self.assertTrue(all(w["done"] for w in json.load(f)["windows"]))
+
+    def test_resumes_only_unfinished_windows(self, mock_print):
+        """
+        Tests that a window whose publish failed is retried on the next run,
+        while finished windows are not fetched again.
+        """
+        failing = MagicMock()
+        failing.publish.side_effect = lambda records: (
+            None
+            if records[0]["webPublicationDate"] < "2025-09-10"
+            else ok_response(records)
+        )
+        retry = MagicMock()
+        retry.publish.side_effect = ok_response
+
+        with GuardianStubServer(**STUB) as stub:
+            args = (stub.url, "bitcoin", API_KEY, START, END)
+            kwargs = dict(
+                manifest_path=self.manifest, page_size=10, max_window_results=20
+            )
+            first = run_backfill(*args, failing, **kwargs)
+            requests_before = len(stub.requests)
+            second = run_backfill(*args, retry, **kwargs)
+
+        self.assertGreater(first["windows_failed"], 0)
+        self.assertEqual(second["windows_failed"], 0)
+        self.assertEqual(first["published"] + second["published"], 120)
+        retried = [a for c in retry.publish.call_args_list for a in c.args[0]]
+        self.assertTrue(all(a["webPublicationDate"] < "2025-09-17" for a in retried))
+        # No re-planning: the resumed run only pages through pending windows
+        self.assertLess(len(stub.requests) - requests_before, requests_before / 2)
+
+
+class TestProgressReporter(unittest.TestCase):
+
+    @patch("builtins.print")
+    def test_reports_throughput_and_eta(self, mock_print):
+        now = [0.0]
+        progress = ProgressReporter(expected=1000, done=200, clock=lambda: now[0])
+        now[0] = 10.0
+        progress.add(100)
+
+        line = progress.report(windows_done=3, windows_total=10)
+
+        self.assertAlmostEqual(progress.throughput(), 10.0)
+        self.assertAlmostEqual(progress.eta_seconds(), 70.0)
+        self.assertIn("300/1000 articles (30.0%)", line)
+        self.assertIn("ETA 70s", line)
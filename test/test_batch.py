@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from benchmarks.fake_guardian import GuardianStubServer, make_article
+from src import api_client
+from src.api_client import GuardianClient
+from src.batch import iter_batch_results, load_search_terms
+
+API_KEY = "test-key"
+DATE_FROM = date(2025, 10, 1)
+
+
+class TestIterBatchResults(unittest.TestCase):
+
+    def setUp(self):
+        # A client without rate limiting keeps these tests fast and offline
+        api_client.GUARDIAN_CLIENT = GuardianClient()
+
+    def tearDown(self):
+        api_client.GUARDIAN_CLIENT = None
+
+    def test_merges_duplicate_articles_across_terms(self):
+        """
+        Tests that every term is searched and an article found by several
+        terms is only yielded once.
+        """
+        stats = {}
+        with GuardianStubServer(total_results=25) as stub:
+            articles = list(
+                iter_batch_results(
+                    stub.url,
+                    ["bitcoin", "ethereum", "bitcoin", "stocks"],
+                    API_KEY,
+                    DATE_FROM,
+                    page_size=10,
+                    stats=stats,
+                )
+            )
+
+        # The stub returns the same 25 articles for every term
+        self.assertEqual(len(articles), 25)
+        self.assertEqual(len({a["id"] for a in articles}), 25)
+        self.assertEqual(
+            {r["q"] for r in stub.requests}, {"bitcoin", "ethereum", "stocks"}
+        )
+        self.assertEqual(list(stats), ["bitcoin", "ethereum", "stocks"])
+        self.assertTrue(all(s["fetched"] == 25 for s in stats.values()))
+        self.assertEqual(sum(s["unique"] for s in stats.values()), 25)
+        self.assertEqual(sum(s["duplicates"] for s in stats.values()), 50)
+
+    def test_terms_share_one_session(self):
+        """
+        Tests that the workers all use the cached client's HTTP session.
+        """
+        session = api_client.GUARDIAN_CLIENT.session
+        with GuardianStubServer(total_results=5) as stub:
+            list(iter_batch_results(stub.url, ["a", "b", "c"], API_KEY, DATE_FROM))
+
+        self.assertIs(api_client.GUARDIAN_CLIENT.session, session)
+        self.assertEqual(len(stub.requests), 3)
+
+    @patch("builtins.print")
+    @patch("src.batch.iter_guardian_results")
+    def test_failing_term_is_reported_without_stopping_others(
+        self, mock_results, mock_print
+    ):
+        """
+        Tests that an error in one term is recorded in its stats while the
+        other terms are still published.
+        """
+
+        def results(api_url, params, api_key, page_size, max_pages, walk):
+            if params["q"] == "broken":
+                raise RuntimeError("boom")
+            return iter([make_article(1), make_article(2)])
+
+        mock_results.side_effect = results
+        stats = {}
+
+        articles = list(
+            iter_batch_results(
+                "url", ["broken", "fine"], API_KEY, DATE_FROM, stats=stats
+            )
+        )
+
+        self.assertEqual(len(articles), 2)
+        self.assertEqual(stats["broken"]["error"], "boom")
+        self.assertEqual(stats["fine"]["unique"], 2)
+
+    @patch("builtins.print")
+    def test_failed_page_is_reported_as_a_term_error(self, mock_print):
+        """
+        Tests that a term whose pagination stopped at a failed page has an
+        error, so its checkpoint is not saved.
+        """
+        stats = {}
+
+        with GuardianStubServer(total_results=30) as stub:
+            stub.status_overrides[2] = 500
+            articles = list(
+                iter_batch_results(
+                    stub.url, ["a"], API_KEY, DATE_FROM, page_size=10, stats=stats
+                )
+            )
+
+        self.assertEqual(len(articles), 10)
+        self.assertEqual(stats["a"]["error"], "page 2 of 3 failed after 10 results")
+
+    def test_consumer_can_stop_early(self):
+        """
+        Tests that closing the generator early stops the workers instead of
+        leaving them blocked on a full queue.
+        """
+        with GuardianStubServer(total_results=50) as stub:
+            articles = iter_batch_results(
+                stub.url, ["a", "b"], API_KEY, DATE_FROM, page_size=10
+            )
+            first = next(articles)
+            articles.close()
+
+        self.assertIn("id", first)
+
+
+class TestLoadSearchTerms(unittest.TestCase):
+
+    def test_skips_blank_lines_comments_and_repeats(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "terms.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("bitcoin\n\n# crypto\n  ethereum  \nbitcoin\n")
+
+            self.assertEqual(load_search_terms(path), ["bitcoin", "ethereum"])
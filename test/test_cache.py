@@ -0,0 +1,210 @@
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+import pytest
+
+from src.cache import (
+    DEFAULT_CACHE_MAX_BYTES,
+    MemoryCache,
+    SQLiteCache,
+    cache_from_env,
+    conditional_headers,
+    make_cache_key,
+)
+from test.helpers import FakeClock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    """Builds either cache backend with a controllable clock."""
+    created = []
+
+    def factory(max_entries=3, ttl=60, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        clock = FakeClock(now=1000.0)
+        if request.param == "memory":
+            cache = MemoryCache(
+                max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, clock=clock
+            )
+        else:
+            cache = SQLiteCache(
+                path=str(tmp_path / "cache.sqlite3"),
+                max_entries=max_entries,
+                max_bytes=max_bytes,
+                ttl=ttl,
+                clock=clock,
+            )
+            created.append(cache)
+        return cache, clock
+
+    yield factory
+    for cache in created:
+        cache.close()
+
+
+class TestResponseCache:
+
+    def test_fresh_entry_is_a_hit(self, make_cache):
+        """
+        Tests that a stored response is served while younger than the TTL.
+        """
+        cache, clock = make_cache()
+        cache.store("k", {"response": {"results": [1]}}, etag='"abc"')
+
+        entry, fresh = cache.lookup("k")
+
+        assert fresh
+        assert entry["data"] == {"response": {"results": [1]}}
+        assert cache.stats()["hits"] == 1
+
+    def test_missing_entry_is_a_miss(self, make_cache):
+        """
+        Tests that an unknown key counts as a miss.
+        """
+        cache, _ = make_cache()
+
+        entry, fresh = cache.lookup("missing")
+
+        assert entry is None and not fresh
+        assert cache.stats()["misses"] == 1
+
+    def test_stale_entry_is_kept_for_revalidation(self, make_cache):
+        """
+        Tests that an expired entry is returned as stale, and becomes fresh
+        again after revalidate().
+        """
+        cache, clock = make_cache(ttl=60)
+        cache.store("k", {"v": 1}, etag='"abc"')
+        clock.now += 61
+
+        entry, fresh = cache.lookup("k")
+        assert entry["etag"] == '"abc"' and not fresh
+
+        cache.revalidate("k")
+        _, fresh = cache.lookup("k")
+        assert fresh
+        assert cache.stats()["revalidations"] == 1
+
+    def test_evicts_least_recently_used(self, make_cache):
+        """
+        Tests that the size cap evicts the entry used longest ago.
+        """
+        cache, clock = make_cache(max_entries=2)
+        cache.store("a", {"v": "a"})
+        clock.now += 1
+        cache.store("b", {"v": "b"})
+        clock.now += 1
+        cache.lookup("a")  # "a" is now more recently used than "b"
+        clock.now += 1
+        cache.store("c", {"v": "c"})
+
+        assert cache.lookup("b")[0] is None
+        assert cache.lookup("a")[0] is not None
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["size"] == 2
+
+    def test_byte_cap_evicts_least_recently_used(self, make_cache):
+        """
+        Tests that entries are evicted once their encoded size passes
+        max_bytes, and that a response over the cap is not cached.
+        """
+        page = {"results": ["x" * 400]}  # about 420 bytes of JSON
+        cache, clock = make_cache(max_entries=100, max_bytes=1000)
+        for key in "abc":
+            cache.store(key, page)
+            clock.now += 1
+
+        assert cache.lookup("a")[0] is None
+        assert cache.lookup("c")[0]["data"] == page
+        assert cache.stats()["size"] == 2
+        assert cache.stats()["bytes"] <= 1000
+
+        cache.store("huge", {"results": ["x" * 2000]})
+        assert cache.lookup("huge")[0] is None
+        assert cache.stats()["size"] == 2
+
+    def test_lookups_return_independent_copies(self, make_cache):
+        """
+        Tests that changing a looked-up response does not change the cache.
+        """
+        cache, _ = make_cache()
+        cache.store("k", {"results": [1, 2]})
+
+        cache.lookup("k")[0]["data"]["results"].clear()
+
+        assert cache.lookup("k")[0]["data"] == {"results": [1, 2]}
+
+
+def test_sqlite_cache_survives_reopen(tmp_path):
+    """
+    Tests that the on-disk cache is readable by a new instance (a later run).
+    """
+    path = str(tmp_path / "cache.sqlite3")
+    first = SQLiteCache(path=path)
+    first.store("k", {"v": 1})
+    first.close()
+
+    second = SQLiteCache(path=path)
+    entry, fresh = second.lookup("k")
+    second.close()
+
+    assert entry["data"] == {"v": 1} and fresh
+
+
+class TestCacheHelpers(unittest.TestCase):
+
+    def test_cache_key_ignores_api_key_and_order(self):
+        """
+        Tests that the key is stable across param ordering and api-key changes.
+        """
+        first = make_cache_key("url", {"q": "a", "page": 1, "api-key": "one"})
+        second = make_cache_key("url", {"page": 1, "q": "a", "api-key": "two"})
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, make_cache_key("url", {"q": "a", "page": 2}))
+
+    def test_conditional_headers(self):
+        """
+        Tests that cached validators become conditional request headers.
+        """
+        entry = {"etag": '"abc"', "last_modified": "Wed, 01 Oct 2025 10:00:00 GMT"}
+        self.assertEqual(
+            conditional_headers(entry),
+            {
+                "If-None-Match": '"abc"',
+                "If-Modified-Since": "Wed, 01 Oct 2025 10:00:00 GMT",
+            },
+        )
+        self.assertEqual(conditional_headers(None), {})
+
+    def test_cache_from_env_selects_backend(self):
+        """
+        Tests that GUARDIAN_CACHE picks the backend, and that caching is off
+        unless it is set.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            env = {
+                "GUARDIAN_CACHE": "sqlite",
+                "GUARDIAN_CACHE_PATH": os.path.join(tmp_dir, "c.sqlite3"),
+                "GUARDIAN_CACHE_TTL": "30",
+            }
+            with unittest.mock.patch.dict("os.environ", env):
+                cache = cache_from_env()
+                self.assertIsInstance(cache, SQLiteCache)
+                self.assertEqual(cache.ttl, 30)
+                self.assertEqual(cache.max_bytes, DEFAULT_CACHE_MAX_BYTES)
+                cache.close()
+
+        with unittest.mock.patch.dict("os.environ", {"GUARDIAN_CACHE": "none"}):
+            self.assertIsNone(cache_from_env())
+
+        # Caching is opt-in
+        with unittest.mock.patch.dict("os.environ", clear=True):
+            self.assertIsNone(cache_from_env())
+
+        with unittest.mock.patch.dict("os.environ", {"GUARDIAN_CACHE": "memory"}):
+            self.assertIsInstance(cache_from_env(), MemoryCache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from benchmarks.fake_guardian import GuardianStubServer, make_article
+from src import api_client
+from src.api_client import GuardianClient, iter_guardian_results
+from src.checkpoint import (
+    DynamoCheckpointStore,
+    FileCheckpointStore,
+    QueryCheckpoint,
+    SQLiteCheckpointStore,
+    checkpoint_store_from_env,
+)
+
+CHECKPOINT = {
+    "webPublicationDate": "2025-10-01T11:50:00Z",
+    "id": "technology/2025/oct/01/article-10",
+}
+
+
+@pytest.fixture(params=["file", "sqlite", "dynamodb"])
+def store(request, tmp_path, monkeypatch):
+    if request.param == "file":
+        yield FileCheckpointStore(str(tmp_path / "checkpoints.json"))
+    elif request.param == "sqlite":
+        sqlite_store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+        yield sqlite_store
+        sqlite_store.close()
+    else:
+        monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+        monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+        with mock_aws():
+            client = boto3.client("dynamodb", region_name="eu-west-2")
+            client.create_table(
+                TableName="checkpoints",
+                KeySchema=[{"AttributeName": "query", "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": "query", "AttributeType": "S"}],
+                BillingMode="PAY_PER_REQUEST",
+            )
+            yield DynamoCheckpointStore("checkpoints", client=client)
+
+
+class TestCheckpointStores:
+
+    def test_missing_query_has_no_checkpoint(self, store):
+        assert store.get("bitcoin") is None
+
+    def test_round_trips_checkpoints_per_query(self, store):
+        store.put("bitcoin", CHECKPOINT)
+        store.put("ethereum", {"webPublicationDate": "2025-09-01T00:00:00Z", "id": "e"})
+        store.put("bitcoin", {"webPublicationDate": "2025-10-02T00:00:00Z", "id": "b"})
+
+        assert store.get("bitcoin") == {
+            "webPublicationDate": "2025-10-02T00:00:00Z",
+            "id": "b",
+        }
+        assert store.get("ethereum")["id"] == "e"
+
+
+class TestQueryCheckpoint:
+
+    @pytest.fixture(autouse=True)
+    def quiet(self, mocker):
+        mocker.patch("builtins.print")
+
+    def test_first_run_yields_everything_and_saves_newest(self, tmp_path):
+        store = FileCheckpointStore(str(tmp_path / "checkpoints.json"))
+        checkpoint = QueryCheckpoint(store, "Bitcoin")
+
+        articles = list(checkpoint.filter(make_article(i) for i in range(5)))
+
+        assert len(articles) == 5
+        assert checkpoint.save() is True
+        assert store.get("bitcoin") == {
+            "webPublicationDate": make_article(0)["webPublicationDate"],
+            "id": make_article(0)["id"],
+        }
+
+    def test_stops_at_previous_checkpoint(self, tmp_path):
+        store = FileCheckpointStore(str(tmp_path / "checkpoints.json"))
+        store.put("bitcoin", CHECKPOINT)
+        checkpoint = QueryCheckpoint(store, "bitcoin")
+
+        articles = list(checkpoint.filter(make_article(i) for i in range(30)))
+
+        # Articles 0-9 are newer than the checkpointed article 10
+        assert [a["id"] for a in articles] == [make_article(i)["id"] for i in range(10)]
+        assert checkpoint.reached is True
+
+    def test_nothing_new_keeps_checkpoint(self, tmp_path):
+        store = FileCheckpointStore(str(tmp_path / "checkpoints.json"))
+        store.put("bitcoin", CHECKPOINT)
+        checkpoint = QueryCheckpoint(store, "bitcoin")
+
+        articles = list(checkpoint.filter(make_article(i) for i in range(10, 20)))
+
+        assert articles == []
+        assert checkpoint.save() is False
+        assert store.get("bitcoin") == CHECKPOINT
+
+
+class TestIncrementalPagination(unittest.TestCase):
+
+    def setUp(self):
+        # A client without rate limiting keeps these tests fast and offline
+        api_client.GUARDIAN_CLIENT = GuardianClient()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = FileCheckpointStore(
+            os.path.join(self.tmp_dir.name, "checkpoints.json")
+        )
+
+    def tearDown(self):
+        api_client.GUARDIAN_CLIENT = None
+        self.tmp_dir.cleanup()
+
+    @patch("builtins.print")
+    def test_stops_requesting_pages_at_checkpoint(self, mock_print):
+        """
+        Tests that pagination stops on the page holding the checkpoint instead
+        of walking the whole result set.
+        """
+        self.store.put("bitcoin", CHECKPOINT)
+        checkpoint = QueryCheckpoint(self.store, "bitcoin")
+
+        with GuardianStubServer(total_results=100) as stub:
+            articles = list(
+                checkpoint.filter(
+                    iter_guardian_results(stub.url, {"q": "bitcoin"}, "key", 5)
+                )
+            )
+
+        self.assertEqual(len(articles), 10)
+        # Pages 1-2 hold the new articles, page 3 starts with the checkpoint
+        self.assertEqual([r["page"] for r in stub.requests], ["1", "2", "3"])
+
+
+class TestCheckpointStoreFromEnv(unittest.TestCase):
+
+    @patch.dict("os.environ", {}, clear=True)
+    def test_disabled_by_default(self):
+        self.assertIsNone(checkpoint_store_from_env())
+
+    def test_builds_sqlite_store(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "checkpoints.sqlite3")
+            with patch.dict(
+                "os.environ",
+                {"GUARDIAN_CHECKPOINT": "sqlite", "GUARDIAN_CHECKPOINT_PATH": path},
+            ):
+                store = checkpoint_store_from_env()
+
+            self.assertIsInstance(store, SQLiteCheckpointStore)
+            store.close()
@@ -0,0 +1,243 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import boto3
+from moto import mock_aws
+
+from benchmarks.fake_guardian import make_article
+from src.dedup import (
+    BloomFilter,
+    Deduplicator,
+    DynamoSeenStore,
+    LRUSeenSet,
+    dedup_key,
+    deduplicator_from_env,
+)
+from test.helpers import FakeClock
+
+
+class TestDedupKey(unittest.TestCase):
+
+    def test_same_article_has_same_key(self):
+        self.assertEqual(dedup_key(make_article(1)), dedup_key(make_article(1)))
+
+    def test_changed_content_changes_key(self):
+        """
+        Tests that an edited article (same id, new title) gets a new key, so
+        it is published as an update.
+        """
+        edited = dict(make_article(1), webTitle="Corrected title")
+
+        self.assertNotEqual(dedup_key(make_article(1)), dedup_key(edited))
+        self.assertTrue(dedup_key(edited).startswith(make_article(1)["id"]))
+
+
+class TestLRUSeenSet(unittest.TestCase):
+
+    def test_evicts_least_recently_seen(self):
+        seen = LRUSeenSet(max_entries=2)
+        seen.add("a")
+        seen.add("b")
+        self.assertIn("a", seen)  # a is now the most recent
+        seen.add("c")
+
+        self.assertIn("a", seen)
+        self.assertNotIn("b", seen)
+        self.assertEqual(len(seen), 2)
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(capacity=5000, error_rate=0.01)
+        for i in range(5000):
+            bloom.add(f"seen-{i}")
+
+        self.assertTrue(all(f"seen-{i}" in bloom for i in range(5000)))
+        false_positives = sum(f"unseen-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives / 10000, 0.03)
+        self.assertAlmostEqual(bloom.false_positive_rate(), 0.01, delta=0.005)
+
+    def test_persists_across_runs(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "seen.bloom")
+            bloom = BloomFilter(capacity=1000, path=path)
+            bloom.add("article-1")
+            bloom.save()
+
+            reloaded = BloomFilter(capacity=1000, path=path)
+
+            self.assertIn("article-1", reloaded)
+            self.assertEqual(reloaded.count, 1)
+
+    @patch("builtins.print")
+    def test_resets_when_settings_change(self, mock_print):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "seen.bloom")
+            bloom = BloomFilter(capacity=1000, path=path)
+            bloom.add("article-1")
+            bloom.save()
+
+            resized = BloomFilter(capacity=50_000, path=path)
+
+            self.assertNotIn("article-1", resized)
+            self.assertEqual(resized.count, 0)
+
+
+class TestDeduplicator(unittest.TestCase):
+
+    def test_drops_articles_published_before(self):
+        dedup = Deduplicator()
+        first_run = list(dedup.filter(make_article(i) for i in range(5)))
+        dedup.commit()
+
+        second_run = list(dedup.filter(make_article(i) for i in range(3, 8)))
+
+        self.assertEqual(len(first_run), 5)
+        self.assertEqual(
+            [a["id"] for a in second_run], [make_article(i)["id"] for i in range(5, 8)]
+        )
+        stats = dedup.stats()
+        self.assertEqual(stats["checked"], 10)
+        self.assertEqual(stats["duplicates"], 2)
+        self.assertAlmostEqual(stats["hit_ratio"], 0.2)
+        self.assertGreater(stats["memory_bytes"], 0)
+
+    def test_updated_article_goes_through(self):
+        dedup = Deduplicator()
+        list(dedup.filter([make_article(1)]))
+        dedup.commit()
+
+        updated = dict(make_article(1), webTitle="Updated")
+
+        self.assertEqual(list(dedup.filter([make_article(1), updated])), [updated])
+
+    def test_duplicates_within_a_run_are_dropped(self):
+        dedup = Deduplicator()
+
+        self.assertEqual(len(list(dedup.filter([make_article(1)] * 3))), 1)
+
+    def test_rollback_forgets_unpublished_articles(self):
+        """
+        Tests that articles from a failed publish are not remembered, so the
+        next run publishes them again.
+        """
+        dedup = Deduplicator()
+        list(dedup.filter(make_article(i) for i in range(3)))
+        dedup.rollback()
+
+        self.assertEqual(len(list(dedup.filter(make_article(i) for i in range(3)))), 3)
+
+    def test_bloom_filter_remembers_beyond_lru(self):
+        dedup = Deduplicator(lru=LRUSeenSet(max_entries=2), bloom=BloomFilter(1000))
+        list(dedup.filter(make_article(i) for i in range(10)))
+        dedup.commit()
+
+        again = list(dedup.filter(make_article(i) for i in range(10)))
+
+        self.assertEqual(again, [])
+        self.assertEqual(dedup.stats()["bloom_hits"], 8)
+
+
+@mock_aws
+class TestDynamoSeenStore(unittest.TestCase):
+
+    @patch.dict(
+        "os.environ",
+        {
+            "AWS_ACCESS_KEY_ID": "testing",
+            "AWS_SECRET_ACCESS_KEY": "testing",
+            "AWS_DEFAULT_REGION": "eu-west-2",
+        },
+    )
+    def test_shared_store_measures_bloom_false_positives(self):
+        """
+        Tests that the exact shared store overrides Bloom filter false
+        positives and that they are counted.
+        """
+        client = boto3.client("dynamodb", region_name="eu-west-2")
+        client.create_table(
+            TableName="seen",
+            KeySchema=[{"AttributeName": "key", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "key", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        store = DynamoSeenStore("seen", client=client)
+        # A tiny, overfilled Bloom filter reports almost everything as seen
+        bloom = BloomFilter(capacity=10, error_rate=0.5)
+        for i in range(200):
+            bloom.add(f"noise-{i}")
+        dedup = Deduplicator(lru=LRUSeenSet(max_entries=1), bloom=bloom, store=store)
+
+        published = list(dedup.filter(make_article(i) for i in range(30)))
+        dedup.commit()
+        # A fresh container: empty LRU, only the shared store remembers
+        other = Deduplicator(store=store)
+        again = list(other.filter(make_article(i) for i in range(30)))
+
+        self.assertEqual(len(published), 30)
+        self.assertGreater(dedup.stats()["bloom_false_positives"], 0)
+        self.assertEqual(again, [])
+
+
+def leave_first_unprocessed(RequestItems):
+    """A batch_write_item response that leaves the first item unprocessed."""
+    return {"UnprocessedItems": {"seen": RequestItems["seen"][:1]}}
+
+
+class TestDynamoSeenStoreRetries(unittest.TestCase):
+
+    def test_unprocessed_items_are_retried_with_backoff(self):
+        """Tests that UnprocessedItems are resubmitted after growing sleeps."""
+        client = MagicMock()
+        client.batch_write_item.side_effect = [
+            leave_first_unprocessed({"seen": ["a", "b", "c"]}),
+            leave_first_unprocessed({"seen": ["a"]}),
+            {"UnprocessedItems": {}},
+        ]
+        clock = FakeClock()
+        store = DynamoSeenStore("seen", client=client, sleep=clock.sleep)
+
+        with patch("src.publisher.random.uniform", side_effect=lambda low, high: high):
+            store.add_many(["a", "b", "c"])
+
+        self.assertEqual(client.batch_write_item.call_count, 3)
+        self.assertEqual(clock.sleeps, [0.1, 0.2])
+
+    @patch("builtins.print")
+    def test_attempts_are_capped(self, mock_print):
+        """Tests that a table that keeps throttling does not loop forever."""
+        client = MagicMock()
+        client.batch_write_item.side_effect = leave_first_unprocessed
+        clock = FakeClock()
+        store = DynamoSeenStore(
+            "seen", client=client, max_attempts=3, sleep=clock.sleep
+        )
+
+        store.add_many(["a", "b"])
+
+        self.assertEqual(client.batch_write_item.call_count, 3)
+        self.assertEqual(len(clock.sleeps), 2)
+        self.assertIn("after 3 attempts", mock_print.call_args[0][0])
+
+
+class TestDeduplicatorFromEnv(unittest.TestCase):
+
+    @patch.dict("os.environ", {}, clear=True)
+    def test_disabled_by_default(self):
+        self.assertIsNone(deduplicator_from_env())
+
+    def test_bloom_backend(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            env = {
+                "GUARDIAN_DEDUP": "bloom",
+                "GUARDIAN_DEDUP_BLOOM_PATH": os.path.join(tmp_dir, "seen.bloom"),
+                "GUARDIAN_DEDUP_BLOOM_CAPACITY": "1000",
+            }
+            with patch.dict("os.environ", env, clear=True):
+                dedup = deduplicator_from_env()
+
+            self.assertIsInstance(dedup.bloom, BloomFilter)
+            self.assertIsNone(dedup.store)
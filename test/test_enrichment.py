@@ -0,0 +1,168 @@
+import unittest
+from collections import Counter
+from unittest.mock import patch
+
+from benchmarks.fake_guardian import make_article
+from src.enrichment import (
+    detect_language,
+    enrich_article,
+    enrichment_stage,
+    enrichment_stage_from_env,
+    extract_keywords,
+    has_body_text,
+    parse_features,
+    with_body_text,
+    words,
+)
+from src.models import projection_from_spec
+from src.pipeline import Pipeline
+
+ENGLISH = (
+    "The minister said that the energy prices would fall, and the bank agreed."
+    " Energy companies were told that prices had to come down by the winter."
+)
+FRENCH = (
+    "Le ministre a dit que les prix de l'énergie vont baisser et que la banque"
+    " est d'accord avec les entreprises pour une baisse des prix."
+)
+
+
+def with_body(i, body):
+    article = make_article(i)
+    article["fields"] = {"bodyText": body}
+    return article
+
+
+class TestEnrichArticle(unittest.TestCase):
+
+    def test_computes_every_feature(self):
+        article = enrich_article(with_body(1, ENGLISH))
+
+        enrichment = article["enrichment"]
+        self.assertEqual(enrichment["wordCount"], len(ENGLISH.split()))
+        self.assertEqual(enrichment["language"], "en")
+        self.assertEqual(enrichment["keywords"][:2], ["energy", "prices"])
+        self.assertEqual(len(enrichment["textHash"]), 64)
+
+    def test_computes_only_the_selected_features(self):
+        article = enrich_article(with_body(1, ENGLISH), ["word_count", "text_hash"])
+
+        self.assertEqual(sorted(article["enrichment"]), ["textHash", "wordCount"])
+
+    def test_articles_without_a_body_are_unchanged(self):
+        article = make_article(1)
+
+        self.assertEqual(enrich_article(dict(article)), article)
+
+    def test_drops_the_body_unless_kept(self):
+        article = with_body(1, ENGLISH)
+        article["fields"]["headline"] = "Prices"
+
+        enriched = enrich_article(article, keep_body=False)
+        bare = enrich_article(with_body(2, ENGLISH), keep_body=False)
+
+        self.assertEqual(enriched["fields"], {"headline": "Prices"})
+        self.assertEqual(enriched["enrichment"]["wordCount"], len(ENGLISH.split()))
+        self.assertNotIn("fields", bare)
+        self.assertIn("enrichment", bare)
+
+    def test_text_hash_only_changes_with_the_body(self):
+        first = enrich_article(with_body(1, ENGLISH))["enrichment"]["textHash"]
+        same = enrich_article(with_body(2, ENGLISH))["enrichment"]["textHash"]
+        edited = enrich_article(with_body(1, ENGLISH + "!"))["enrichment"]
+
+        self.assertEqual(first, same)
+        self.assertNotEqual(first, edited["textHash"])
+
+
+class TestTextFeatures(unittest.TestCase):
+
+    def test_words_are_lower_cased_and_keep_accents(self):
+        self.assertEqual(words("Café NAÏVE, déjà-vu"), ["café", "naïve", "déjà", "vu"])
+
+    def test_detects_the_language(self):
+        self.assertEqual(detect_language(Counter(words(ENGLISH))), "en")
+        self.assertEqual(detect_language(Counter(words(FRENCH))), "fr")
+        self.assertEqual(detect_language(Counter(words("xyzzy plugh"))), "und")
+        self.assertEqual(detect_language(Counter()), "und")
+
+    def test_keywords_skip_stopwords_short_words_and_numbers(self):
+        counts = Counter(words("the the the 2024 2024 2024 of of ok ok vote vote poll"))
+
+        self.assertEqual(extract_keywords(counts, 5), ["vote", "poll"])
+
+
+class TestEnrichmentStage(unittest.TestCase):
+
+    def test_process_pool_matches_inline_enrichment(self):
+        articles = [with_body(i, ENGLISH if i % 2 else FRENCH) for i in range(50)]
+        expected = [enrich_article(dict(a)) for a in articles]
+
+        stage = enrichment_stage(workers=2, batch_size=8)
+
+        self.assertEqual(list(Pipeline(articles, [stage])), expected)
+
+    def test_parse_features(self):
+        self.assertEqual(parse_features(None), [])
+        self.assertEqual(parse_features("none"), [])
+        self.assertEqual(len(parse_features("all")), 4)
+        self.assertEqual(parse_features("language, keywords"), ["language", "keywords"])
+        with self.assertRaises(ValueError):
+            parse_features("language,sentiment")
+
+    def test_process_pool_drops_the_body(self):
+        articles = [with_body(i, ENGLISH) for i in range(10)]
+
+        stage = enrichment_stage(workers=2, batch_size=4, keep_body=False)
+
+        for article in Pipeline(articles, [stage]):
+            self.assertNotIn("fields", article)
+            self.assertIn("enrichment", article)
+
+    def test_has_body_text(self):
+        self.assertFalse(has_body_text(None))
+        self.assertFalse(has_body_text("headline,bodyTextSummary"))
+        self.assertTrue(has_body_text("headline,bodyText"))
+
+    def test_with_body_text(self):
+        self.assertEqual(with_body_text(None), "bodyText")
+        self.assertEqual(with_body_text("headline"), "headline,bodyText")
+        self.assertEqual(with_body_text("bodyText"), "bodyText")
+
+    @patch.dict("os.environ", {}, clear=True)
+    def test_from_env_is_off_by_default(self):
+        self.assertIsNone(enrichment_stage_from_env())
+
+    @patch.dict(
+        "os.environ",
+        {"GUARDIAN_ENRICH": "all", "AWS_LAMBDA_FUNCTION_NAME": "streamer"},
+        clear=True,
+    )
+    def test_from_env_enriches_inline_in_lambda(self):
+        stage = enrichment_stage_from_env()
+
+        self.assertEqual(stage.name, "enrich")
+        self.assertFalse(stage.processes)
+
+    @patch.dict(
+        "os.environ",
+        {"GUARDIAN_ENRICH": "keywords", "GUARDIAN_ENRICH_WORKERS": "3"},
+        clear=True,
+    )
+    def test_from_env_reads_the_workers(self):
+        stage = enrichment_stage_from_env()
+
+        self.assertTrue(stage.processes)
+        self.assertEqual(stage.workers, 3)
+
+    def test_projections_keep_the_enrichment(self):
+        article = enrich_article(with_body(1, ENGLISH))
+
+        projected = projection_from_spec("id,webTitle")(article)
+
+        self.assertEqual(projected["enrichment"], article["enrichment"])
+        self.assertNotIn("fields", projected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from benchmarks.fake_guardian import make_article
+from src.json_stream import ResultStream, TruncatedResponseError, ijson
+
+BACKENDS = ["builtin"] + (["ijson"] if ijson is not None else [])
+
+
+def to_chunks(data, size):
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_yields_every_result_and_keeps_the_rest(backend, chunk_size):
+    """
+    Tests that results are yielded in order whatever the chunk boundaries,
+    including escapes and multi-byte characters split across chunks, and
+    that the rest of the response is collected.
+    """
+    articles = [make_article(i, body_size=300) for i in range(3)]
+    articles[1]["webTitle"] = 'Quotes "inside", a \\ backslash and ünïcødé ✓'
+    data = {
+        "response": {
+            "status": "ok",
+            "results": articles,
+            "currentPage": 1,
+            "pages": 4,
+        }
+    }
+
+    stream = ResultStream(to_chunks(data, chunk_size), backend=backend)
+
+    assert list(stream) == articles
+    assert stream.response == {"status": "ok", "currentPage": 1, "pages": 4}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_first_result_is_yielded_before_the_body_is_read(backend):
+    """
+    Tests that the first article is available while later chunks are unread.
+    """
+    data = {"response": {"results": [make_article(i) for i in range(50)]}}
+    chunks = to_chunks(data, 256)
+    read = []
+
+    def body():
+        for chunk in chunks:
+            read.append(chunk)
+            yield chunk
+
+    first = next(iter(ResultStream(body(), backend=backend)))
+
+    assert first == data["response"]["results"][0]
+    assert len(read) < len(chunks)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_closing_early_releases_the_response(backend):
+    """
+    Tests that close is called when the consumer stops iterating.
+    """
+    closed = []
+    data = {"response": {"results": [{"id": "a"}, {"id": "b"}]}}
+    results = iter(
+        ResultStream(
+            to_chunks(data, 8), close=lambda: closed.append(True), backend=backend
+        )
+    )
+
+    next(results)
+    results.close()
+
+    assert closed == [True]
+
+
+def test_truncated_body_raises():
+    """
+    Tests that a body cut off mid-document raises a ValueError subclass.
+    """
+    chunks = to_chunks({"response": {"results": [{"id": "a"}]}}, 1000)
+
+    with pytest.raises(TruncatedResponseError):
+        list(ResultStream([chunks[0][:-5]], backend="builtin"))
+
+
+def test_from_data_wraps_a_parsed_response():
+    """
+    Tests that cached responses can be iterated like streamed ones.
+    """
+    stream = ResultStream.from_data({"response": {"pages": 2, "results": [1, 2]}})
+
+    assert list(stream) == [1, 2]
+    assert stream.response == {"pages": 2}
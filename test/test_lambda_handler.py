@@ -0,0 +1,181 @@
+import json
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import src.lambda_handler as handler
+from benchmarks.fake_guardian import GuardianStubServer
+from src import api_client
+from src.api_client import GuardianClient
+from src.spool import Spool
+from test.helpers import ok_response
+
+
+def secret_response(api_key, url="https://guardian.test/search", version="v1"):
+    return {
+        "SecretString": json.dumps({"GUARDIAN_API_KEY": api_key, "GUARDIAN_URL": url}),
+        "VersionId": version,
+    }
+
+
+@patch("builtins.print")
+class TestWarmInvocations(unittest.TestCase):
+
+    def setUp(self):
+        # A client without rate limiting keeps these tests fast and offline
+        api_client.GUARDIAN_CLIENT = GuardianClient()
+        handler.KINESIS_PUBLISHER = None
+        handler.SECRETS_CLIENT = MagicMock()
+        handler.SECRET_CACHE = None
+
+    def tearDown(self):
+        api_client.GUARDIAN_CLIENT = None
+        handler.KINESIS_PUBLISHER = None
+        handler.SECRETS_CLIENT = None
+        handler.SECRET_CACHE = None
+
+    @patch("src.lambda_handler.KinesisPublisher")
+    def test_publisher_is_built_once_per_container(self, mock_publisher, mock_print):
+        """
+        Tests that warm invocations reuse the publisher (and its boto3 client).
+        """
+        mock_publisher.return_value.publish.side_effect = ok_response
+
+        with GuardianStubServer(total_results=3) as stub:
+            handler.SECRETS_CLIENT.get_secret_value.return_value = secret_response(
+                "test-key", stub.url
+            )
+            first = handler.lambda_handler({"search": "bitcoin"}, None)
+            second = handler.lambda_handler({"search": "bitcoin"}, None)
+
+        self.assertEqual(first["statusCode"], 200)
+        self.assertEqual(second["statusCode"], 200)
+        mock_publisher.assert_called_once()
+        self.assertEqual(mock_publisher.return_value.publish.call_count, 2)
+        # The secret is cached between invocations too
+        handler.SECRETS_CLIENT.get_secret_value.assert_called_once()
+
+    @patch("src.lambda_handler.KinesisPublisher")
+    def test_failed_publish_is_replayed_from_the_spool(
+        self, mock_publisher, mock_print
+    ):
+        """
+        Tests that articles from a failed publish stay in the spool and are
+        published by the next invocation.
+        """
+        outcomes = iter([None, "ok", "ok"])
+
+        def publish(records):
+            records = list(records)
+            return ok_response(records) if next(outcomes) else None
+
+        mock_publisher.return_value.publish.side_effect = publish
+
+        with tempfile.TemporaryDirectory() as tmp:
+            handler.SPOOL = Spool(tmp)
+            try:
+                with GuardianStubServer(total_results=3) as stub:
+                    handler.SECRETS_CLIENT.get_secret_value.return_value = (
+                        secret_response("test-key", stub.url)
+                    )
+                    failed = handler.lambda_handler({"search": "bitcoin"}, None)
+                    self.assertEqual(handler.SPOOL.pending_count(), 3)
+                    handler.lambda_handler({"search": "bitcoin"}, None)
+                    self.assertEqual(handler.SPOOL.pending_count(), 0)
+            finally:
+                handler.SPOOL.close()
+                handler.SPOOL = None
+
+        self.assertEqual(failed["statusCode"], 500)
+        # The second invocation replays the spooled articles before its own
+        self.assertEqual(mock_publisher.return_value.publish.call_count, 3)
+
+    @patch("src.lambda_handler.KinesisPublisher")
+    def test_failed_page_does_not_move_the_checkpoint(self, mock_publisher, mock_print):
+        """
+        Tests that a walk cut short by a failed page leaves the checkpoint
+        where it was, so the next invocation fetches the pages it missed.
+        """
+        published = []
+
+        def publish(records):
+            records = list(records)
+            published.extend(record["id"] for record in records)
+            return ok_response(records)
+
+        mock_publisher.return_value.publish.side_effect = publish
+        event = {"search": "bitcoin", "page_size": 10}
+
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(
+            "os.environ",
+            {
+                "GUARDIAN_CHECKPOINT": "file",
+                "GUARDIAN_CHECKPOINT_PATH": f"{tmp}/checkpoints.json",
+            },
+        ), GuardianStubServer(total_results=30) as stub:
+            handler.SECRETS_CLIENT.get_secret_value.return_value = secret_response(
+                "test-key", stub.url
+            )
+            stub.status_overrides[2] = 500
+            partial = handler.lambda_handler(event, None)
+            self.assertEqual(len(published), 10)
+
+            stub.status_overrides.clear()
+            handler.lambda_handler(event, None)
+
+        self.assertIn("page 2 of 3 failed", json.loads(partial["body"])["incomplete"])
+        self.assertEqual(len(set(published)), 30)
+
+    def test_rejected_key_is_refreshed_after_rotation(self, mock_print):
+        """
+        Tests that a 401 with the cached key re-reads the secret and hands
+        the rotated key to the Guardian client.
+        """
+        handler.SECRETS_CLIENT.get_secret_value.side_effect = [
+            secret_response("old-key", version="v1"),
+            secret_response("new-key", version="v2"),
+        ]
+        handler.get_secret()
+
+        self.assertEqual(handler.refresh_api_key("old-key"), "new-key")
+        self.assertEqual(handler.get_secret()["GUARDIAN_API_KEY"], "new-key")
+        self.assertEqual(handler.get_secret_cache().stats()["rotations"], 1)
+
+    def test_unrotated_key_is_not_retried(self, mock_print):
+        """
+        Tests that a 401 for a key that is still current returns None, so the
+        request is not retried with the same key.
+        """
+        handler.SECRETS_CLIENT.get_secret_value.return_value = secret_response(
+            "test-key"
+        )
+        handler.get_secret()
+
+        self.assertIsNone(handler.refresh_api_key("test-key"))
+
+    @patch("src.lambda_handler.boto3.session.Session")
+    def test_secrets_client_is_built_once(self, mock_session, mock_print):
+        """
+        Tests that the Secrets Manager client is cached between calls.
+        """
+        handler.SECRETS_CLIENT = None
+        self.assertIs(handler.get_secrets_client(), handler.get_secrets_client())
+        mock_session.return_value.client.assert_called_once()
+
+    @patch("src.lambda_handler.KinesisPublisher", side_effect=RuntimeError("boom"))
+    def test_init_failures_are_deferred_to_the_invocation(
+        self, mock_publisher, mock_print
+    ):
+        """
+        Tests that init_clients logs instead of raising, so the container
+        still starts and the invocation reports the error.
+        """
+        with patch("src.lambda_handler.boto3.session.Session", MagicMock()):
+            handler.init_clients()
+
+        mock_print.assert_called_with("WARNING: Could not pre-initialize clients: boom")
+        self.assertIsNone(handler.KINESIS_PUBLISHER)
+
+
+if __name__ == "__main__":
+    unittest.main()
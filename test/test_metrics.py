@@ -0,0 +1,192 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.metrics import (
+    MAX_SAMPLES,
+    MetricsRegistry,
+    emit_metrics,
+    emits_metrics,
+    to_emf,
+    to_prometheus,
+)
+from src.publisher import KinesisPublisher
+from test.helpers import FakeClock
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_counters_add_up(self):
+        registry = MetricsRegistry()
+        registry.incr("guardian_requests")
+        registry.incr("guardian_requests")
+        registry.incr("guardian_bytes_downloaded", 512, "Bytes")
+
+        counters = registry.snapshot()["counters"]
+        self.assertEqual(counters["guardian_requests"], {"value": 2, "unit": "Count"})
+        self.assertEqual(
+            counters["guardian_bytes_downloaded"], {"value": 512, "unit": "Bytes"}
+        )
+
+    def test_timer_records_milliseconds(self):
+        registry = MetricsRegistry(clock=FakeClock(step=0.25))
+        with registry.timer("guardian_parse_ms"):
+            pass
+
+        timer = registry.snapshot()["timers"]["guardian_parse_ms"]
+        self.assertEqual(timer["count"], 1)
+        self.assertEqual(timer["sum"], 250.0)
+        self.assertEqual(timer["samples"], [250.0])
+
+    def test_timer_records_when_the_block_raises(self):
+        registry = MetricsRegistry()
+        with self.assertRaises(RuntimeError):
+            with registry.span("kinesis_put_records_latency_ms"):
+                raise RuntimeError("boom")
+
+        self.assertIn("kinesis_put_records_latency_ms", registry.snapshot()["timers"])
+
+    def test_samples_are_capped_but_stats_are_exact(self):
+        registry = MetricsRegistry()
+        for value in range(1, 1001):
+            registry.observe("guardian_records_per_page", value, "Count")
+
+        timer = registry.snapshot()["timers"]["guardian_records_per_page"]
+        self.assertEqual(len(timer["samples"]), MAX_SAMPLES)
+        self.assertEqual(timer["count"], 1000)
+        self.assertEqual(timer["sum"], 500500)
+        self.assertEqual((timer["min"], timer["max"]), (1, 1000))
+
+    def test_sinks_receive_counters_timings_and_spans(self):
+        registry = MetricsRegistry()
+        sink = MagicMock()
+        registry.sinks.append(sink)
+
+        registry.incr("guardian_requests")
+        with registry.span("guardian_fetch_latency_ms"):
+            pass
+
+        sink.incr.assert_called_once_with("guardian_requests", 1, "Count")
+        sink.span.assert_called_once_with("guardian_fetch_latency_ms")
+        self.assertEqual(sink.observe.call_args[0][0], "guardian_fetch_latency_ms")
+
+    def test_reset_clears_everything(self):
+        registry = MetricsRegistry()
+        registry.incr("guardian_requests")
+        registry.observe("guardian_parse_ms", 1.0)
+        registry.reset()
+        self.assertEqual(registry.snapshot(), {"counters": {}, "timers": {}})
+
+
+class TestFormats(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.registry.incr("kinesis_records_sent", 3)
+        self.registry.observe("kinesis_put_records_latency_ms", 12.5)
+        self.registry.observe("kinesis_put_records_latency_ms", 7.5)
+
+    def test_emf_document(self):
+        document = to_emf(self.registry.snapshot(), namespace="Test")
+
+        self.assertEqual(document["kinesis_records_sent"], 3)
+        self.assertEqual(document["kinesis_put_records_latency_ms"], [12.5, 7.5])
+        directive = document["_aws"]["CloudWatchMetrics"][0]
+        self.assertEqual(directive["Namespace"], "Test")
+        self.assertEqual(directive["Dimensions"], [["Service"]])
+        self.assertIn(
+            {"Name": "kinesis_put_records_latency_ms", "Unit": "Milliseconds"},
+            directive["Metrics"],
+        )
+
+    def test_emf_is_none_without_metrics(self):
+        self.assertIsNone(to_emf(MetricsRegistry().snapshot()))
+
+    def test_prometheus_text(self):
+        text = to_prometheus(self.registry.snapshot())
+
+        self.assertIn(
+            "# TYPE guardian_streamer_kinesis_records_sent_total counter", text
+        )
+        self.assertIn("guardian_streamer_kinesis_records_sent_total 3", text)
+        self.assertIn("guardian_streamer_kinesis_put_records_latency_ms_count 2", text)
+        self.assertIn("guardian_streamer_kinesis_put_records_latency_ms_sum 20.0", text)
+        self.assertIn("guardian_streamer_kinesis_put_records_latency_ms_max 12.5", text)
+
+
+@patch("builtins.print")
+class TestEmitMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.registry.incr("guardian_requests")
+
+    def test_emf_prints_one_line_and_resets(self, mock_print):
+        with patch.dict(os.environ, {"GUARDIAN_METRICS": "emf"}):
+            emit_metrics(self.registry)
+
+        document = json.loads(mock_print.call_args[0][0])
+        self.assertEqual(document["guardian_requests"], 1)
+        self.assertEqual(self.registry.snapshot()["counters"], {})
+
+    def test_prometheus_writes_the_file_and_keeps_values(self, mock_print):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "guardian.prom")
+            env = {"GUARDIAN_METRICS": "prometheus", "GUARDIAN_METRICS_FILE": path}
+            with patch.dict(os.environ, env):
+                emit_metrics(self.registry)
+            with open(path) as f:
+                self.assertIn("guardian_streamer_guardian_requests_total 1", f.read())
+
+        self.assertIn("guardian_requests", self.registry.snapshot()["counters"])
+        mock_print.assert_not_called()
+
+    def test_disabled_by_default(self, mock_print):
+        with patch.dict(os.environ, {}, clear=True):
+            emit_metrics(self.registry)
+        mock_print.assert_not_called()
+
+    def test_decorated_handler_emits_even_when_it_raises(self, mock_print):
+        @emits_metrics
+        def handler(event, context):
+            raise ValueError("bad event")
+
+        with patch.dict(os.environ, {"GUARDIAN_METRICS": "emf"}):
+            with patch("src.metrics.emit_metrics") as mock_emit:
+                with self.assertRaises(ValueError):
+                    handler({}, None)
+        mock_emit.assert_called_once()
+
+
+@patch("builtins.print")
+class TestPublisherMetrics(unittest.TestCase):
+
+    def test_counts_sent_failed_and_throttled_records(self, mock_print):
+        client = MagicMock()
+        client.put_records.return_value = {
+            "FailedRecordCount": 1,
+            "Records": [
+                {"SequenceNumber": "1", "ShardId": "shardId-0"},
+                {"ErrorCode": "ProvisionedThroughputExceededException"},
+            ],
+        }
+        with patch("boto3.client", return_value=client):
+            publisher = KinesisPublisher("stream", "eu-west-1", max_attempts=1)
+
+        with patch("src.publisher.METRICS", MetricsRegistry()) as registry:
+            publisher.publish([{"webUrl": "a"}, {"webUrl": "b"}])
+            counters = registry.snapshot()["counters"]
+            timers = registry.snapshot()["timers"]
+
+        self.assertEqual(counters["kinesis_records_sent"]["value"], 1)
+        self.assertEqual(counters["kinesis_failed_records"]["value"], 1)
+        self.assertEqual(counters["kinesis_throttles"]["value"], 1)
+        self.assertEqual(timers["kinesis_put_records_latency_ms"]["count"], 1)
+        # Serialization is timed once per batch, not per record
+        self.assertEqual(timers["kinesis_serialize_ms"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import patch
+
+from pydantic import ValidationError
+
+from benchmarks.fake_guardian import make_article
+from src.models import (
+    DEFAULT_ARTICLE_FIELDS,
+    Article,
+    ArticleProjection,
+    projection_from_env,
+    projection_from_spec,
+)
+
+
+class TestArticle(unittest.TestCase):
+
+    def test_parses_search_result_and_ignores_unknown_keys(self):
+        article = Article.model_validate(dict(make_article(1), newApiField="x"))
+
+        self.assertEqual(article.id, make_article(1)["id"])
+        self.assertEqual(article.webPublicationDate, "2025-10-01T11:59:00Z")
+        self.assertFalse(hasattr(article, "newApiField"))
+
+    def test_missing_id_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            Article.model_validate({"webTitle": "No id"})
+
+
+class TestArticleProjection(unittest.TestCase):
+
+    def test_default_fields_drop_the_rest(self):
+        record = ArticleProjection()(make_article(1, body_size=100))
+
+        self.assertEqual(list(record), list(DEFAULT_ARTICLE_FIELDS))
+        self.assertNotIn("fields", record)
+
+    def test_body_fields_are_requested_and_kept(self):
+        projection = ArticleProjection(["id", "fields.bodyText", "fields.wordcount"])
+        article = make_article(1, body_size=20)
+
+        record = projection(article)
+
+        self.assertEqual(projection.show_fields, "bodyText,wordcount")
+        self.assertEqual(record, {"id": article["id"], "fields": article["fields"]})
+
+    def test_validated_projection_matches_plain_projection(self):
+        article = make_article(1, body_size=20)
+        fields = ["id", "webTitle", "isHosted", "fields.bodyText"]
+
+        self.assertEqual(
+            ArticleProjection(fields, validate=True)(article),
+            ArticleProjection(fields)(article),
+        )
+
+    def test_validation_rejects_wrong_types(self):
+        projection = ArticleProjection(validate=True)
+
+        with self.assertRaises(ValueError):
+            projection(dict(make_article(1), isHosted="sometimes"))
+
+
+class TestProjectionConfig(unittest.TestCase):
+
+    def test_spec_keywords(self):
+        self.assertIsNone(projection_from_spec("all"))
+        self.assertIsNone(projection_from_spec(""))
+        self.assertEqual(
+            projection_from_spec("default").fields, list(DEFAULT_ARTICLE_FIELDS)
+        )
+        self.assertEqual(projection_from_spec(" id , webUrl ").fields, ["id", "webUrl"])
+
+    @patch.dict(
+        "os.environ",
+        {"GUARDIAN_FIELDS": "id,fields.bodyText", "GUARDIAN_VALIDATE_ARTICLES": "true"},
+        clear=True,
+    )
+    def test_from_env(self):
+        projection = projection_from_env()
+
+        self.assertTrue(projection.validate)
+        self.assertEqual(projection.show_fields, "bodyText")
+
+    @patch.dict("os.environ", {}, clear=True)
+    def test_whole_articles_by_default(self):
+        self.assertIsNone(projection_from_env())
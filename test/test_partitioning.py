@@ -0,0 +1,82 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.partitioning import (
+    MAX_PARTITION_KEY_LENGTH,
+    ExplicitHashKeyStrategy,
+    get_partition_strategy,
+)
+
+
+class TestPartitionStrategies:
+
+    def test_web_url_strategy_keeps_legacy_keys(self):
+        strategy = get_partition_strategy("webUrl")
+
+        assert strategy({"webUrl": "https://url/1"}, 0) == {
+            "PartitionKey": "https://url/1"
+        }
+
+    def test_web_url_strategy_hashes_long_urls(self):
+        strategy = get_partition_strategy("webUrl")
+
+        key = strategy({"webUrl": "https://url/" + "x" * 300}, 0)["PartitionKey"]
+
+        assert len(key) <= MAX_PARTITION_KEY_LENGTH
+
+    def test_web_url_strategy_fallback_does_not_depend_on_index(self):
+        """
+        Records without webUrl or id must not all share the same key, even if
+        every publish call restarts its index at 0.
+        """
+        strategy = get_partition_strategy("webUrl")
+
+        keys = {strategy({}, 0)["PartitionKey"] for _ in range(10)}
+
+        assert len(keys) == 10
+
+    def test_id_strategy_is_stable_and_short(self):
+        strategy = get_partition_strategy("id")
+        record = {"id": "world/2025/oct/01/" + "long-slug-" * 40}
+
+        first = strategy(record, 0)["PartitionKey"]
+
+        assert first == strategy(record, 99)["PartitionKey"]
+        assert len(first) == 32
+
+    def test_section_strategy_groups_by_section(self):
+        strategy = get_partition_strategy("section")
+
+        assert strategy({"sectionId": "sport"}, 0) == {"PartitionKey": "sport"}
+        assert strategy({}, 0) == {"PartitionKey": "unknown"}
+
+    def test_unknown_strategy_raises(self):
+        with pytest.raises(ValueError):
+            get_partition_strategy("nope")
+
+
+class TestExplicitHashKeyStrategy:
+
+    def test_round_robins_over_open_shards(self):
+        client = MagicMock()
+        client.list_shards.side_effect = [
+            {
+                "Shards": [
+                    {
+                        "HashKeyRange": {"StartingHashKey": "0"},
+                        "SequenceNumberRange": {"EndingSequenceNumber": "9"},
+                    },
+                    {"HashKeyRange": {"StartingHashKey": "10"}},
+                ],
+                "NextToken": "page-2",
+            },
+            {"Shards": [{"HashKeyRange": {"StartingHashKey": "20"}}]},
+        ]
+        strategy = ExplicitHashKeyStrategy(client, "stream")
+
+        keys = [strategy({}, i)["ExplicitHashKey"] for i in range(4)]
+
+        # The closed shard is skipped and both ListShards pages are read
+        assert keys == ["10", "20", "10", "20"]
+        client.list_shards.assert_called_with(NextToken="page-2")
@@ -0,0 +1,171 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import boto3
+from moto import mock_aws
+
+from src.pipeline import Pipeline, Stage
+from src.publisher import KinesisPublisher
+from test.helpers import ok_response
+
+
+def square(n):
+    return n * n
+
+
+def odd_only(n):
+    return n if n % 2 else None
+
+
+class CountingSource:
+    """Yields 0..count-1, remembering how far it got and whether it was closed."""
+
+    def __init__(self, count):
+        self.count = count
+        self.produced = 0
+        self.closed = False
+
+    def __iter__(self):
+        try:
+            for i in range(self.count):
+                self.produced += 1
+                yield i
+        finally:
+            self.closed = True
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_items_flow_through_every_stage_in_order(self):
+        pipeline = Pipeline(
+            range(10), [Stage("odd", odd_only), Stage("square", square)]
+        )
+
+        self.assertEqual(list(pipeline), [1, 9, 25, 49, 81])
+        stats = pipeline.stats()
+        self.assertEqual(list(stats), ["fetch", "odd", "square", "output"])
+        self.assertEqual(stats["odd"]["in"], 10)
+        self.assertEqual(stats["odd"]["out"], 5)
+        self.assertEqual(pipeline.records, 5)
+
+    def test_thread_pool_stages_keep_the_input_order(self):
+        def slow_square(n):
+            # Later items finish first
+            time.sleep(0.001 * (20 - n))
+            return n * n
+
+        pipeline = Pipeline(range(20), [Stage("square", slow_square, workers=8)])
+
+        self.assertEqual(list(pipeline), [n * n for n in range(20)])
+
+    def test_process_pool_stages_run_in_batches(self):
+        stage = Stage("square", square, workers=2, processes=True, batch_size=16)
+
+        self.assertEqual(
+            list(Pipeline(range(100), [stage])), [n * n for n in range(100)]
+        )
+
+    def test_stream_stages_see_every_item(self):
+        def running_total(items):
+            total = 0
+            for item in items:
+                total += item
+                yield total
+
+        pipeline = Pipeline(range(5), [Stage("total", running_total, stream=True)])
+
+        self.assertEqual(list(pipeline), [0, 1, 3, 6, 10])
+
+    def test_stream_stages_cannot_have_workers(self):
+        with self.assertRaises(ValueError):
+            Stage("dedup", iter, workers=4, stream=True)
+
+    def test_a_full_queue_blocks_the_source(self):
+        source = CountingSource(1000)
+        pipeline = Pipeline(source, queue_size=5)
+        items = iter(pipeline)
+
+        next(items)
+        time.sleep(0.2)
+
+        # The queue, plus the item being put and the one consumed
+        self.assertLessEqual(source.produced, 7)
+        self.assertEqual(len(list(items)), 999)
+        self.assertGreater(pipeline.stats()["fetch"]["seconds_blocked"], 0)
+
+    def test_stopping_early_closes_the_source(self):
+        source = CountingSource(1000)
+
+        def first_three(items):
+            for i, item in enumerate(items):
+                if i == 3:
+                    return
+                yield item
+
+        pipeline = Pipeline(
+            source, [Stage("head", first_three, stream=True)], queue_size=2
+        )
+
+        self.assertEqual(list(pipeline), [0, 1, 2])
+        self.assertTrue(source.closed)
+        self.assertLess(source.produced, 1000)
+
+    @patch("builtins.print")
+    def test_stage_errors_stop_the_pipeline(self, mock_print):
+        source = CountingSource(100_000)
+
+        def explode(n):
+            if n == 10:
+                raise ValueError("bad article")
+            return n
+
+        pipeline = Pipeline(source, [Stage("explode", explode)], queue_size=2)
+
+        with self.assertRaises(ValueError):
+            list(pipeline)
+        self.assertTrue(source.closed)
+        self.assertFalse(
+            any(t.name.startswith("pipeline-") for t in threading.enumerate())
+        )
+
+    def test_runs_only_once(self):
+        pipeline = Pipeline(range(3))
+        list(pipeline)
+        with self.assertRaises(RuntimeError):
+            list(pipeline)
+
+
+@patch("builtins.print")
+class TestPipelinePublish(unittest.TestCase):
+
+    def test_other_publishers_receive_the_records(self, mock_print):
+        publisher = MagicMock(spec=["publish"])
+        publisher.publish.side_effect = ok_response
+
+        response = Pipeline(range(4), [Stage("square", square)]).publish(publisher)
+
+        self.assertEqual(len(response["Records"]), 4)
+
+    @mock_aws
+    def test_kinesis_records_are_serialized_in_their_own_stage(self, mock_print):
+        kinesis = boto3.client("kinesis", region_name="eu-west-2")
+        kinesis.create_stream(StreamName="articles", ShardCount=1)
+        publisher = KinesisPublisher("articles", "eu-west-2")
+        articles = [
+            {"id": f"article-{i}", "webUrl": f"https://url/{i}"} for i in range(700)
+        ]
+
+        pipeline = Pipeline(articles, [Stage("parse", lambda a: a)])
+        response = pipeline.publish(publisher)
+
+        self.assertEqual(response["FailedRecordCount"], 0)
+        self.assertEqual(response["UserRecordCount"], 700)
+        self.assertEqual(response["BatchCount"], 2)
+        self.assertEqual(pipeline.stats()["serialize"]["in"], 700)
+        self.assertEqual(pipeline.records, 700)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,262 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from src.aggregation import deaggregate_records
+from src.producer import BufferedKinesisProducer
+from src.publisher import MAX_BYTES_PER_RECORD, KinesisPublisher
+
+
+@pytest.fixture
+def mock_client(mocker):
+    """A Kinesis client mock that accepts every record."""
+    client = MagicMock()
+    client.put_records.side_effect = lambda Records, StreamName: {
+        "FailedRecordCount": 0,
+        "Records": [
+            {"SequenceNumber": str(i), "ShardId": "shardId-0"}
+            for i in range(len(Records))
+        ],
+    }
+    mocker.patch("boto3.client", return_value=client)
+    mocker.patch("builtins.print")
+    return client
+
+
+class TestBufferedKinesisProducer:
+
+    def test_put_returns_immediately(self, mock_client):
+        """
+        Tests that put() does not wait for the Kinesis round trip.
+        """
+        release = threading.Event()
+        original = mock_client.put_records.side_effect
+
+        def slow_put_records(Records, StreamName):
+            release.wait(2)
+            return original(Records, StreamName)
+
+        mock_client.put_records.side_effect = slow_put_records
+        producer = BufferedKinesisProducer(
+            KinesisPublisher("stream"), linger_seconds=0, max_batch_records=1
+        )
+
+        start = time.perf_counter()
+        futures = [producer.put({"id": str(i)}) for i in range(3)]
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.5
+        assert not futures[-1].done()
+        release.set()
+        producer.close()
+        assert all(f.result()["SequenceNumber"] for f in futures)
+
+    def test_flushes_when_record_count_reached(self, mock_client):
+        """
+        Tests that a full batch is sent without waiting for the linger time.
+        """
+        producer = BufferedKinesisProducer(
+            KinesisPublisher("stream"), linger_seconds=60, max_batch_records=2
+        )
+
+        futures = [producer.put({"id": str(i)}) for i in range(2)]
+
+        assert futures[1].result(timeout=2)["ShardId"] == "shardId-0"
+        assert producer.stats["flush_reasons"]["records"] == 1
+        producer.close()
+
+    def test_flushes_when_linger_expires(self, mock_client):
+        """
+        Tests that a partial batch is sent once the linger time has passed.
+        """
+        producer = BufferedKinesisProducer(
+            KinesisPublisher("stream"), linger_seconds=0.05
+        )
+
+        future = producer.put({"id": "a"})
+
+        assert future.result(timeout=2)["SequenceNumber"] == "0"
+        assert producer.stats["flush_reasons"]["linger"] == 1
+        producer.close()
+
+    def test_flushes_when_byte_threshold_reached(self, mock_client):
+        """
+        Tests that a batch is cut before it grows past max_batch_bytes.
+        """
+        producer = BufferedKinesisProducer(
+            KinesisPublisher("stream"), linger_seconds=60, max_batch_bytes=1000
+        )
+
+        producer.put({"body": "x" * 600})
+        producer.put({"body": "x" * 600})
+        producer.close()
+
+        assert mock_client.put_records.call_count == 2
+        assert producer.stats["flush_reasons"]["bytes"] == 1
+
+    def test_flush_sends_partial_batch(self, mock_client):
+        """
+        Tests that flush() sends buffered records and resolves their futures.
+        """
+        producer = BufferedKinesisProducer(
+            KinesisPublisher("stream"), linger_seconds=60
+        )
+        futures = [producer.put({"id": str(i)}) for i in range(3)]
+
+        assert producer.flush(timeout=2)
+        assert all(f.done() for f in futures)
+        mock_client.put_records.assert_called_once()
+        producer.close()
+
+    def test_callbacks_receive_per_record_outcome(self, mock_client):
+        """
+        Tests that callbacks see failures reported for individual records.
+        """
+        mock_client.put_records.side_effect = lambda Records, StreamName: {
+            "FailedRecordCount": 1,
+            "Records": [
+                {"SequenceNumber": "1"},
+                {"ErrorCode": "AccessDeniedException", "ErrorMessage": "denied"},
+            ],
+        }
+        outcomes = []
+        with BufferedKinesisProducer(KinesisPublisher("stream")) as producer:
+            producer.put({"id": "a"}, callback=lambda f: outcomes.append(f.result()))
+            producer.put({"id": "b"}, callback=lambda f: outcomes.append(f.result()))
+
+        assert outcomes[0] == {"SequenceNumber": "1"}
+        assert outcomes[1]["ErrorCode"] == "AccessDeniedException"
+        assert producer.stats["records_failed"] == 1
+
+    def test_request_error_is_set_on_futures(self, mock_client):
+        """
+        Tests that a non-retryable request error reaches every future.
+        """
+        mock_client.put_records.side_effect = ClientError(
+            {"Error": {"Code": "ResourceNotFoundException", "Message": "missing"}},
+            "PutRecords",
+        )
+        with BufferedKinesisProducer(KinesisPublisher("stream")) as producer:
+            future = producer.put({"id": "a"})
+
+        with pytest.raises(ClientError):
+            future.result()
+
+    def test_oversized_record_fails_without_sending(self, mock_client):
+        """
+        Tests that records over the Kinesis limit are rejected locally.
+        """
+        with BufferedKinesisProducer(KinesisPublisher("stream")) as producer:
+            future = producer.put({"body": "x" * MAX_BYTES_PER_RECORD})
+
+        assert future.result()["ErrorCode"] == "RecordTooLarge"
+        mock_client.put_records.assert_not_called()
+
+    def test_bounded_queue_applies_backpressure(self, mock_client):
+        """
+        Tests that put() blocks once max_queue_size records are waiting.
+        """
+        release = threading.Event()
+        original = mock_client.put_records.side_effect
+
+        def blocked_put_records(Records, StreamName):
+            release.wait(2)
+            return original(Records, StreamName)
+
+        mock_client.put_records.side_effect = blocked_put_records
+        producer = BufferedKinesisProducer(
+            KinesisPublisher("stream"),
+            linger_seconds=0,
+            max_batch_records=1,
+            max_queue_size=2,
+        )
+
+        # One record is in flight and two fill the queue, so the fourth blocks
+        for i in range(3):
+            producer.put({"id": str(i)})
+        time.sleep(0.05)
+        blocked = threading.Thread(target=producer.put, args=({"id": "3"},))
+        blocked.start()
+        blocked.join(0.2)
+        assert blocked.is_alive()
+
+        release.set()
+        blocked.join(2)
+        assert not blocked.is_alive()
+        producer.close()
+
+    def test_aggregates_batches_when_the_publisher_does(self, mock_client):
+        """
+        Tests that with aggregate_max_bytes set, a batch is packed into
+        aggregated records and every record gets its aggregate's result.
+        """
+        publisher = KinesisPublisher("stream", aggregate_max_bytes=1024)
+        with BufferedKinesisProducer(publisher, linger_seconds=60) as producer:
+            futures = [producer.put({"id": str(i)}) for i in range(10)]
+            producer.flush()
+
+        sent = mock_client.put_records.call_args.kwargs["Records"]
+        assert len(sent) == 1
+        assert [r["id"] for r in deaggregate_records(sent[0]["Data"])] == [
+            str(i) for i in range(10)
+        ]
+        assert {f.result()["SequenceNumber"] for f in futures} == {"0"}
+        assert producer.stats["records_sent"] == 10
+
+    def test_flush_raises_when_the_thread_has_died(self, mock_client):
+        """
+        Tests that flush() raises the background thread's error instead of
+        waiting forever for a flush that will never happen.
+        """
+        publisher = KinesisPublisher("stream")
+        publisher.entry_size = MagicMock(side_effect=ValueError("bad entry"))
+        producer = BufferedKinesisProducer(publisher)
+
+        producer.put({"id": "a"})
+        with pytest.raises(ValueError):
+            producer.flush()
+        with pytest.raises(ValueError):
+            producer.put({"id": "b"})
+        producer.close()
+
+    def test_put_after_close_raises(self, mock_client):
+        """
+        Tests that a closed producer refuses new records.
+        """
+        producer = BufferedKinesisProducer(KinesisPublisher("stream"))
+        producer.close()
+
+        with pytest.raises(RuntimeError):
+            producer.put({"id": "a"})
+
+
+@mock_aws
+def test_publish_delivers_to_moto_stream(monkeypatch):
+    """
+    Tests that the producer's publish() delivers every record in input order.
+    """
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    client = boto3.client("kinesis", region_name="eu-west-2")
+    client.create_stream(StreamName="producer-stream", ShardCount=1)
+
+    with BufferedKinesisProducer(
+        KinesisPublisher("producer-stream"), linger_seconds=0.01
+    ) as producer:
+        result = producer.publish({"id": str(i)} for i in range(1200))
+
+    assert result["FailedRecordCount"] == 0
+    assert len(result["Records"]) == 1200
+
+    shard_id = client.list_shards(StreamName="producer-stream")["Shards"][0]["ShardId"]
+    iterator = client.get_shard_iterator(
+        StreamName="producer-stream", ShardId=shard_id, ShardIteratorType="TRIM_HORIZON"
+    )["ShardIterator"]
+    records = client.get_records(ShardIterator=iterator, Limit=10)["Records"]
+    assert [json.loads(r["Data"])["id"] for r in records] == [str(i) for i in range(10)]
@@ -7,7 +7,17 @@ import pytest
 from botocore.exceptions import ClientError
 from moto import mock_aws
 
-from src.publisher import KinesisPublisher
+from src.aggregation import deaggregate_records
+from src.models import ArticleProjection
+from src.publisher import (
+    MAX_BYTES_PER_RECORD,
+    MAX_BYTES_PER_REQUEST,
+    MAX_RECORDS_PER_REQUEST,
+    BatchPublisher,
+    KinesisPublisher,
+    chunked,
+)
+from src.serialization import decode_records, get_codec
 
 
 @pytest.fixture(scope="session")
@@ -207,6 +217,400 @@ class TestKinesisPublisher:
             f"Error publishing to Kinesis stream '{stream_name}': {mock_kinesis_client.put_records.side_effect}"
         )
 
+    # --- Streaming input ---
+
+    def test_accepts_generator_input(self, mocker, stream_name, sample_records):
+        """
+        Tests that a generator of records is published exactly like a list.
+        """
+        # Arrange
+        mock_kinesis_client = MagicMock()
+        mock_kinesis_client.put_records.return_value = {
+            "FailedRecordCount": 0,
+            "Records": [{"SequenceNumber": "1"}, {"SequenceNumber": "2"}],
+        }
+        mocker.patch("boto3.client", return_value=mock_kinesis_client)
+        model_instance = KinesisPublisher(stream_name=stream_name)
+
+        # Act
+        result = model_instance.publish(record for record in sample_records)
+
+        # Assert
+        assert result["FailedRecordCount"] == 0
+        assert len(result["Records"]) == 2
+        mock_kinesis_client.put_records.assert_called_once()
+
+    def test_empty_generator_returns_none(self, mocker, stream_name):
+        """
+        Tests that an exhausted generator is treated like an empty list.
+        """
+        mock_kinesis_client = MagicMock()
+        mocker.patch("boto3.client", return_value=mock_kinesis_client)
+        model_instance = KinesisPublisher(stream_name=stream_name)
+        mocker.patch("builtins.print")
+
+        assert model_instance.publish(iter([])) is None
+        mock_kinesis_client.put_records.assert_not_called()
+
+    def test_large_input_is_split_into_batches(self, mocker, stream_name):
+        """
+        Tests that input above the PutRecords record limit is sent in several
+        calls and the responses are merged.
+        """
+        # Arrange
+        total = MAX_RECORDS_PER_REQUEST + 10
+        mock_kinesis_client = MagicMock()
+        mock_kinesis_client.put_records.side_effect = lambda Records, StreamName: {
+            "FailedRecordCount": 0,
+            "Records": [{"SequenceNumber": "x"}] * len(Records),
+        }
+        mocker.patch("boto3.client", return_value=mock_kinesis_client)
+        model_instance = KinesisPublisher(stream_name=stream_name)
+        mocker.patch("builtins.print")
+
+        # Act
+        result = model_instance.publish({"id": str(i)} for i in range(total))
+
+        # Assert
+        assert mock_kinesis_client.put_records.call_count == 2
+        batch_sizes = [
+            len(c.kwargs["Records"])
+            for c in mock_kinesis_client.put_records.call_args_list
+        ]
+        assert batch_sizes == [MAX_RECORDS_PER_REQUEST, 10]
+        assert len(result["Records"]) == total
+        # Records without a webUrl fall back to their id as partition key
+        last_batch = mock_kinesis_client.put_records.call_args.kwargs["Records"]
+        assert last_batch[-1]["PartitionKey"] == str(total - 1)
+
+    def test_batch_limits_are_the_class_attributes(self, mocker, stream_name):
+        """
+        Tests that KinesisPublisher batches by its max_records_per_batch like
+        every other BatchPublisher.
+        """
+        mock_kinesis_client = MagicMock()
+        mock_kinesis_client.put_records.side_effect = lambda Records, StreamName: {
+            "FailedRecordCount": 0,
+            "Records": [{"SequenceNumber": "x", "ShardId": "s-1"}] * len(Records),
+        }
+        mocker.patch("boto3.client", return_value=mock_kinesis_client)
+        mocker.patch("builtins.print")
+        model_instance = KinesisPublisher(stream_name=stream_name)
+        model_instance.max_records_per_batch = 10
+
+        result = model_instance.publish({"id": str(i)} for i in range(25))
+
+        assert isinstance(model_instance, BatchPublisher)
+        assert result["BatchCount"] == 3
+        assert result["ShardStats"]["s-1"]["records"] == 25
+
+    # --- Limits and retries ---
+
+    def test_batches_respect_request_byte_limit(self, mocker, stream_name):
+        """
+        Tests that batches are cut before they exceed the 5 MiB request limit.
+        """
+        # Arrange: ~900 KB records, so only 5 fit in one 5 MiB request
+        mock_kinesis_client = MagicMock()
+        mock_kinesis_client.put_records.side_effect = lambda Records, StreamName: {
+            "FailedRecordCount": 0,
+            "Records": [{"SequenceNumber": "x"}] * len(Records),
+        }
+        mocker.patch("boto3.client", return_value=mock_kinesis_client)
+        model_instance = KinesisPublisher(stream_name=stream_name)
+        mocker.patch("builtins.print")
+        records = [{"id": str(i), "body": "x" * 900_000} for i in range(12)]
+
+        # Act
+        result = model_instance.publish(records)
+
+        # Assert
+        for c in mock_kinesis_client.put_records.call_args_list:
+            sent = c.kwargs["Records"]
+            assert sum(len(r["Data"]) + len(r["PartitionKey"]) for r in sent) <= (
+                MAX_BYTES_PER_REQUEST
+            )
+        assert result["BatchCount"] == 3
+        assert result["FailedRecordCount"] == 0
+
+    def test_oversized_record_is_skipped(self, mocker, stream_name):
+        """
+        Tests that a record over 1 MiB is reported as failed and never sent.
+        """
+        mock_kinesis_client = MagicMock()
+        mock_kinesis_client.put_records.return_value = {
+            "FailedRecordCount": 0,
+            "Records": [{"SequenceNumber": "1"}],
+        }
+        mocker.patch("boto3.client", return_value=mock_kinesis_client)
+        model_instance = KinesisPublisher(stream_name=stream_name)
+        mocker.patch("builtins.print")
+        records = [{"id": "big", "body": "x" * MAX_BYTES_PER_RECORD}, {"id": "ok"}]
+
+        result = model_instance.publish(records)
+
+        assert result["FailedRecordCount"] == 1
+        assert result["Records"][0]["ErrorCode"] == "RecordTooLarge"
+        assert result["Records"][1] == {"SequenceNumber": "1"}
+        sent = mock_kinesis_client.put_records.call_args.kwargs["Records"]
+        assert [json.loads(r["Data"])["id"] for r in sent] == ["ok"]
+
+    def test_resubmits_only_failed_records(self, mocker, stream_name, sample_records):
+        """
+        Tests that entries with a throttling ErrorCode are resent on their own
+        and the final result reflects the successful retry.
+        """
+        # Arrange
+        mock_kinesis_client = MagicMock()
+        mock_kinesis_client.put_records.side_effect = [
+            {
+                "FailedRecordCount": 1,
+                "Records": [
+                    {"SequenceNumber": "1", "ShardId": "shardId-0"},
+                    {
+                        "ErrorCode": "ProvisionedThroughputExceededException",
+                        "ErrorMessage": "Rate exceeded",
+                    },
+                ],
+            },
+            {
+                "FailedRecordCount": 0,
+                "Records": [{"SequenceNumber": "2", "ShardId": "shardId-0"}],
+            },
+        ]
+        mocker.patch("boto3.client", return_value=mock_kinesis_client)
+        mock_sleep = mocker.patch("src.publisher.time.sleep")
+        model_instance = KinesisPublisher(stream_name=stream_name)
+        mocker.patch("builtins.print")
+
+        # Act
+        result = model_instance.publish(sample_records)
+
+        # Assert
+        retry_call = mock_kinesis_client.put_records.call_args_list[1]
+        assert [r["PartitionKey"] for r in retry_call.kwargs["Records"]] == [
+            sample_records[1]["webUrl"]
+        ]
+        mock_sleep.assert_called_once()
+        assert result["FailedRecordCount"] == 0
+        assert result["RetriedRecordCount"] == 1
+        assert [r["SequenceNumber"] for r in result["Records"]] == ["1", "2"]
+
+    def test_reports_records_still_failing_after_max_attempts(
+        self, mocker, stream_name, sample_records
+    ):
+        """
+        Tests that records failing on every attempt are reported, not dropped.
+        """
+        mock_kinesis_client = MagicMock()
+        mock_kinesis_client.put_records.side_effect = lambda Records, StreamName: {
+            "FailedRecordCount": len(Records),
+            "Records": [{"ErrorCode": "InternalFailure"}] * len(Records),
+        }
+        mocker.patch("boto3.client", return_value=mock_kinesis_client)
+        mocker.patch("src.publisher.time.sleep")
+        model_instance = KinesisPublisher(stream_name=stream_name, max_attempts=3)
+        mock_print = mocker.patch("builtins.print")
+
+        result = model_instance.publish(sample_records)
+
+        assert mock_kinesis_client.put_records.call_count == 3
+        assert result["FailedRecordCount"] == 2
+        mock_print.assert_any_call("Warning: 2 records failed to publish.")
+
+    def test_retries_throttled_request(self, mocker, stream_name, sample_records):
+        """
+        Tests that a request-level throttling error is retried.
+        """
+        mock_kinesis_client = MagicMock()
+        mock_kinesis_client.put_records.side_effect = [
+            ClientError(
+                {
+                    "Error": {
+                        "Code": "ProvisionedThroughputExceededException",
+                        "Message": "Rate exceeded",
+                    }
+                },
+                "PutRecords",
+            ),
+            {
+                "FailedRecordCount": 0,
+                "Records": [{"SequenceNumber": "1"}, {"SequenceNumber": "2"}],
+            },
+        ]
+        mocker.patch("boto3.client", return_value=mock_kinesis_client)
+        mocker.patch("src.publisher.time.sleep")
+        model_instance = KinesisPublisher(stream_name=stream_name)
+        mocker.patch("builtins.print")
+
+        result = model_instance.publish(sample_records)
+
+        assert result["FailedRecordCount"] == 0
+        assert mock_kinesis_client.put_records.call_count == 2
+
+
+@mock_aws
+def test_publishes_large_input_to_moto_stream(monkeypatch, stream_name):
+    """
+    Tests the full publish path against a moto Kinesis stream.
+    """
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    client = boto3.client("kinesis", region_name="eu-west-2")
+    client.create_stream(StreamName=stream_name, ShardCount=1)
+    model_instance = KinesisPublisher(stream_name=stream_name)
+
+    result = model_instance.publish(
+        {"webUrl": f"https://url/{i}", "webTitle": f"Article {i}"} for i in range(620)
+    )
+
+    assert result["FailedRecordCount"] == 0
+    assert result["BatchCount"] == 2
+    assert len(result["Records"]) == 620
+
+
+@mock_aws
+def test_aggregated_publish_round_trips_through_moto(monkeypatch, stream_name):
+    """
+    Tests that aggregation packs many articles into few Kinesis records and
+    that a consumer can unpack every article again.
+    """
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    client = boto3.client("kinesis", region_name="eu-west-2")
+    client.create_stream(StreamName=stream_name, ShardCount=1)
+    model_instance = KinesisPublisher(
+        stream_name=stream_name, aggregate_max_bytes=25 * 1024
+    )
+    articles = [
+        {"id": f"article-{i}", "webUrl": f"https://url/{i}", "webTitle": "t" * 200}
+        for i in range(300)
+    ]
+
+    result = model_instance.publish(articles)
+
+    assert result["FailedRecordCount"] == 0
+    assert result["UserRecordCount"] == 300
+    assert len(result["Records"]) < 10
+
+    shard_id = client.list_shards(StreamName=stream_name)["Shards"][0]["ShardId"]
+    iterator = client.get_shard_iterator(
+        StreamName=stream_name, ShardId=shard_id, ShardIteratorType="TRIM_HORIZON"
+    )["ShardIterator"]
+    consumed = [
+        article
+        for record in client.get_records(ShardIterator=iterator)["Records"]
+        for article in deaggregate_records(record["Data"])
+    ]
+    assert consumed == articles
+
+
+@mock_aws
+def test_compressed_aggregated_publish_decodes(monkeypatch, stream_name):
+    """
+    Tests that records published with a compressing codec and aggregation are
+    smaller than plain JSON and decode back to the original articles.
+    """
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    client = boto3.client("kinesis", region_name="eu-west-2")
+    client.create_stream(StreamName=stream_name, ShardCount=1)
+    articles = [
+        {"id": f"article-{i}", "webUrl": f"https://url/{i}", "webTitle": "t" * 200}
+        for i in range(100)
+    ]
+    model_instance = KinesisPublisher(
+        stream_name=stream_name,
+        aggregate_max_bytes=25 * 1024,
+        codec=get_codec("orjson+zstd"),
+    )
+
+    model_instance.publish(articles)
+
+    shard_id = client.list_shards(StreamName=stream_name)["Shards"][0]["ShardId"]
+    iterator = client.get_shard_iterator(
+        StreamName=stream_name, ShardId=shard_id, ShardIteratorType="TRIM_HORIZON"
+    )["ShardIterator"]
+    records = client.get_records(ShardIterator=iterator)["Records"]
+    consumed = [a for r in records for a in decode_records(r["Data"])]
+    assert consumed == articles
+    assert sum(len(r["Data"]) for r in records) < len(json.dumps(articles)) / 4
+
+
+@pytest.mark.parametrize("strategy", ["id", "explicit"])
+@mock_aws
+def test_partition_strategies_spread_across_moto_shards(
+    monkeypatch, stream_name, strategy
+):
+    """
+    Tests that the id-hash and explicit hash key strategies use every shard
+    and that ShardStats reports the records and bytes per shard.
+    """
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    client = boto3.client("kinesis", region_name="eu-west-2")
+    client.create_stream(StreamName=stream_name, ShardCount=4)
+    monkeypatch.setattr("builtins.print", lambda *args: None)
+    model_instance = KinesisPublisher(
+        stream_name=stream_name, partition_strategy=strategy
+    )
+
+    result = model_instance.publish(
+        {"id": f"world/2025/article-{i}", "sectionId": "world"} for i in range(400)
+    )
+
+    shard_stats = result["ShardStats"]
+    assert len(shard_stats) == 4
+    assert sum(counts["records"] for counts in shard_stats.values()) == 400
+    assert all(counts["records"] > 50 for counts in shard_stats.values())
+    assert all(counts["bytes"] > 0 for counts in shard_stats.values())
+    if strategy == "explicit":
+        assert {counts["records"] for counts in shard_stats.values()} == {100}
+
+
+@mock_aws
+def test_projection_publishes_only_selected_fields(monkeypatch, stream_name):
+    """
+    Tests that a projection trims the published data while records are
+    still routed by the full article.
+    """
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    client = boto3.client("kinesis", region_name="eu-west-2")
+    client.create_stream(StreamName=stream_name, ShardCount=1)
+    monkeypatch.setattr("builtins.print", lambda *args: None)
+    article = {
+        "id": "world/2025/article-1",
+        "webUrl": "https://url/1",
+        "webTitle": "Title",
+        "apiUrl": "https://api/1",
+        "isHosted": False,
+    }
+    model_instance = KinesisPublisher(
+        stream_name=stream_name, projection=ArticleProjection(["id", "webTitle"])
+    )
+
+    entry = model_instance.to_entry(article, 0)
+    model_instance.publish([article])
+
+    assert entry["PartitionKey"] == "https://url/1"
+    shard_id = client.list_shards(StreamName=stream_name)["Shards"][0]["ShardId"]
+    iterator = client.get_shard_iterator(
+        StreamName=stream_name, ShardId=shard_id, ShardIteratorType="TRIM_HORIZON"
+    )["ShardIterator"]
+    records = client.get_records(ShardIterator=iterator)["Records"]
+    assert decode_records(records[0]["Data"]) == [
+        {"id": "world/2025/article-1", "webTitle": "Title"}
+    ]
+
+
+def test_chunked_splits_iterables():
+    """
+    Tests that chunked yields lists of at most the given size.
+    """
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
+
 
 if __name__ == "__main__":
     unittest.main()
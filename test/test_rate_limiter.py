@@ -0,0 +1,215 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import patch
+
+import boto3
+from moto import mock_aws
+
+from src.rate_limiter import (
+    BACKOFF_BASE_SECONDS,
+    DynamoQuotaStore,
+    FileQuotaStore,
+    QuotaExceededError,
+    RateLimiter,
+    TokenBucket,
+    retry_after_seconds,
+)
+from test.helpers import FakeClock
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_allows_burst_up_to_capacity(self):
+        """
+        Tests that a full bucket serves `capacity` requests without waiting.
+        """
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=3, clock=clock, sleep=clock.sleep)
+
+        for _ in range(3):
+            bucket.acquire()
+
+        self.assertEqual(clock.sleeps, [])
+
+    def test_waits_for_refill_at_rate(self):
+        """
+        Tests that once empty, requests are spaced 1/rate seconds apart.
+        """
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=1, clock=clock, sleep=clock.sleep)
+
+        bucket.acquire()
+        bucket.acquire()
+        bucket.acquire()
+
+        self.assertEqual(clock.now, 1.0)
+
+
+class TestRetryAfterSeconds(unittest.TestCase):
+
+    def test_uses_numeric_retry_after(self):
+        """
+        Tests that a Retry-After given in seconds is used as is.
+        """
+        self.assertEqual(retry_after_seconds({"Retry-After": "7"}, 0), 7.0)
+
+    def test_uses_http_date_retry_after(self):
+        """
+        Tests that a Retry-After given as an HTTP date is converted to seconds.
+        """
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        delay = retry_after_seconds({"Retry-After": format_datetime(retry_at)}, 0)
+        self.assertTrue(25 <= delay <= 30)
+
+    def test_falls_back_to_exponential_backoff(self):
+        """
+        Tests that without Retry-After the delay is jittered within 2**attempt.
+        """
+        for attempt in range(4):
+            delay = retry_after_seconds({}, attempt)
+            self.assertTrue(0 <= delay <= BACKOFF_BASE_SECONDS * 2**attempt)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "quota.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_limiter(self, daily_quota=3, today=date(2025, 10, 1)):
+        return RateLimiter(
+            bucket=TokenBucket(rate=1000, capacity=1000),
+            store=FileQuotaStore(self.path),
+            daily_quota=daily_quota,
+            today=lambda: today,
+        )
+
+    def test_counts_requests_against_quota(self):
+        """
+        Tests that each acquire uses one request of today's quota.
+        """
+        limiter = self.make_limiter()
+
+        limiter.acquire()
+        limiter.acquire()
+
+        self.assertEqual(limiter.used_quota(), 2)
+        self.assertEqual(limiter.remaining_quota(), 1)
+
+    def test_raises_when_quota_spent(self):
+        """
+        Tests that acquire raises QuotaExceededError past the daily budget.
+        """
+        limiter = self.make_limiter(daily_quota=1)
+        limiter.acquire()
+
+        with self.assertRaises(QuotaExceededError):
+            limiter.acquire()
+
+    def test_concurrent_callers_never_exceed_quota(self):
+        """
+        Tests that threads racing for the last requests cannot overshoot it.
+        """
+        limiter = self.make_limiter(daily_quota=5)
+        granted = []
+
+        def worker():
+            try:
+                limiter.acquire()
+                granted.append(1)
+            except QuotaExceededError:
+                pass
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(granted), 5)
+        self.assertEqual(limiter.used_quota(), 5)
+
+    def test_quota_persists_across_instances(self):
+        """
+        Tests that a new limiter (e.g. the next CLI run) sees earlier usage.
+        """
+        self.make_limiter().acquire()
+
+        self.assertEqual(self.make_limiter().remaining_quota(), 2)
+
+    def test_quota_resets_on_a_new_day(self):
+        """
+        Tests that usage from yesterday does not count against today.
+        """
+        self.make_limiter(today=date(2025, 10, 1)).acquire()
+
+        self.assertEqual(
+            self.make_limiter(today=date(2025, 10, 2)).remaining_quota(), 3
+        )
+
+
+@mock_aws
+class TestDynamoQuotaStore(unittest.TestCase):
+
+    @patch.dict(
+        "os.environ",
+        {
+            "AWS_ACCESS_KEY_ID": "testing",
+            "AWS_SECRET_ACCESS_KEY": "testing",
+            "AWS_DEFAULT_REGION": "eu-west-2",
+        },
+    )
+    def test_increments_shared_counter(self):
+        """
+        Tests that the DynamoDB store counts requests atomically per day.
+        """
+        client = boto3.client("dynamodb", region_name="eu-west-2")
+        client.create_table(
+            TableName="guardian-quota",
+            KeySchema=[{"AttributeName": "day", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "day", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        store = DynamoQuotaStore("guardian-quota", client=client)
+
+        self.assertEqual(store.get("2025-10-01"), 0)
+        self.assertEqual(store.increment("2025-10-01"), 1)
+        self.assertEqual(store.increment("2025-10-01"), 2)
+        self.assertEqual(store.get("2025-10-01"), 2)
+
+    @patch.dict(
+        "os.environ",
+        {
+            "AWS_ACCESS_KEY_ID": "testing",
+            "AWS_SECRET_ACCESS_KEY": "testing",
+            "AWS_DEFAULT_REGION": "eu-west-2",
+        },
+    )
+    def test_conditional_increment_stops_at_limit(self):
+        """
+        Tests that the DynamoDB counter is never moved past the limit.
+        """
+        client = boto3.client("dynamodb", region_name="eu-west-2")
+        client.create_table(
+            TableName="guardian-quota",
+            KeySchema=[{"AttributeName": "day", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "day", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        store = DynamoQuotaStore("guardian-quota", client=client)
+
+        counts = [store.increment("2025-10-01", limit=2) for _ in range(4)]
+
+        self.assertEqual(counts, [1, 2, 3, 3])
+        self.assertEqual(store.get("2025-10-01"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
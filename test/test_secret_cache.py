@@ -0,0 +1,143 @@
+import json
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from botocore.exceptions import ClientError
+
+from src.secret_cache import SecretCache
+from test.helpers import FakeClock
+
+
+def secret_response(api_key, version="v1"):
+    return {
+        "SecretString": json.dumps({"GUARDIAN_API_KEY": api_key}),
+        "VersionId": version,
+    }
+
+
+def client_error():
+    return ClientError(
+        {"Error": {"Code": "InternalServiceError", "Message": "down"}},
+        "GetSecretValue",
+    )
+
+
+@patch("builtins.print")
+class TestSecretCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.client = MagicMock()
+
+    def make_cache(self, **kwargs):
+        return SecretCache(self.client, "guardian/secret", clock=self.clock, **kwargs)
+
+    def test_serves_from_memory_within_ttl(self, mock_print):
+        """
+        Tests that reads within the TTL do not call Secrets Manager.
+        """
+        self.client.get_secret_value.return_value = secret_response("key-1")
+        cache = self.make_cache(ttl=60)
+
+        cache.get()
+        self.clock.now = 59
+        secret = cache.get()
+
+        self.assertEqual(secret, {"GUARDIAN_API_KEY": "key-1"})
+        self.client.get_secret_value.assert_called_once_with(SecretId="guardian/secret")
+
+    def test_expired_secret_is_fetched_again(self, mock_print):
+        """
+        Tests that the first read after the TTL picks up a rotated secret.
+        """
+        self.client.get_secret_value.side_effect = [
+            secret_response("key-1", "v1"),
+            secret_response("key-2", "v2"),
+        ]
+        cache = self.make_cache(ttl=60)
+
+        cache.get()
+        self.clock.now = 61
+        secret = cache.get()
+
+        self.assertEqual(secret["GUARDIAN_API_KEY"], "key-2")
+        self.assertEqual(cache.version_id, "v2")
+        self.assertEqual(cache.stats()["rotations"], 1)
+
+    def test_forced_refreshes_are_spaced_out(self, mock_print):
+        """
+        Tests that refresh() fetches at most once per min_refresh_interval.
+        """
+        self.client.get_secret_value.return_value = secret_response("key-1")
+        cache = self.make_cache(min_refresh_interval=30)
+
+        cache.get()
+        cache.refresh()
+        cache.refresh()
+        self.assertEqual(self.client.get_secret_value.call_count, 2)
+
+        self.clock.now = 31
+        cache.refresh()
+        self.assertEqual(self.client.get_secret_value.call_count, 3)
+
+    def test_failed_refresh_serves_cached_value(self, mock_print):
+        """
+        Tests that a Secrets Manager error after expiry keeps the cached
+        secret and only retries after min_refresh_interval.
+        """
+        self.client.get_secret_value.side_effect = [
+            secret_response("key-1"),
+            client_error(),
+        ]
+        cache = self.make_cache(ttl=60, min_refresh_interval=10)
+
+        cache.get()
+        self.clock.now = 61
+        first = cache.get()
+        self.clock.now = 65
+        second = cache.get()
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.client.get_secret_value.call_count, 2)
+        self.assertEqual(cache.stats()["errors"], 1)
+
+    def test_first_fetch_failure_raises(self, mock_print):
+        """
+        Tests that without a cached value the error reaches the caller.
+        """
+        self.client.get_secret_value.side_effect = client_error()
+
+        with self.assertRaises(ClientError):
+            self.make_cache().get()
+
+    def test_refresh_ahead_refreshes_in_background(self, mock_print):
+        """
+        Tests that a read close to expiry returns the cached value at once
+        while a background thread fetches the new one.
+        """
+        release = threading.Event()
+
+        def slow_get_secret_value(SecretId):
+            if self.client.get_secret_value.call_count > 1:
+                release.wait(5)
+                return secret_response("key-2", "v2")
+            return secret_response("key-1", "v1")
+
+        self.client.get_secret_value.side_effect = slow_get_secret_value
+        cache = self.make_cache(ttl=60, refresh_ahead=10)
+
+        cache.get()
+        self.clock.now = 55
+        self.assertEqual(cache.get()["GUARDIAN_API_KEY"], "key-1")
+        release.set()
+        for thread in threading.enumerate():
+            if thread.name == "secret-refresh":
+                thread.join(5)
+
+        self.assertEqual(cache.get()["GUARDIAN_API_KEY"], "key-2")
+        self.assertEqual(self.client.get_secret_value.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
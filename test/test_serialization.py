@@ -0,0 +1,112 @@
+import json
+import unittest
+
+import pytest
+
+from benchmarks.fake_guardian import make_article
+from src.aggregation import aggregate
+from src.serialization import (
+    MAGIC,
+    Codec,
+    JsonSerializer,
+    decode_records,
+    get_codec,
+)
+
+ALL_CODECS = [
+    "json",
+    "json+gzip",
+    "json+zstd",
+    "orjson",
+    "orjson+gzip",
+    "orjson+zstd",
+    "msgpack",
+    "msgpack+gzip",
+    "msgpack+zstd",
+]
+
+
+@pytest.mark.parametrize("spec", ALL_CODECS)
+def test_every_codec_round_trips(spec):
+    """
+    Tests that decode_records reads back what each codec encodes.
+    """
+    codec = get_codec(spec)
+    article = make_article(1, body_size=500)
+
+    assert decode_records(codec.encode(article)) == [article]
+
+
+@pytest.mark.parametrize("spec", ["json", "orjson+zstd", "msgpack+gzip"])
+def test_aggregated_records_round_trip(spec):
+    """
+    Tests that an aggregate wrapped by a codec decodes to every article.
+    """
+    codec = get_codec(spec)
+    articles = [make_article(i) for i in range(20)]
+    _, blob, _ = next(
+        aggregate(((str(i), codec.serializer.dumps(a)) for i, a in enumerate(articles)))
+    )
+
+    assert decode_records(codec.wrap(blob)) == articles
+
+
+class TestCodec(unittest.TestCase):
+
+    def test_default_codec_is_plain_json(self):
+        """
+        Tests that the default codec publishes exactly json.dumps output, with
+        no header, so existing consumers keep working.
+        """
+        record = {"webTitle": "AI Article", "webUrl": "https://url/1"}
+
+        self.assertEqual(Codec().encode(record), json.dumps(record).encode("utf-8"))
+        self.assertEqual(get_codec().name, "json")
+
+    def test_non_default_codecs_carry_a_header(self):
+        """
+        Tests that every non-plain codec writes the envelope header.
+        """
+        for spec in ("orjson+gzip", "msgpack", "json+zstd"):
+            self.assertTrue(get_codec(spec).encode({"a": 1}).startswith(MAGIC))
+
+    def test_orjson_without_compression_stays_plain_json(self):
+        """
+        Tests that orjson output needs no header, since it is plain JSON.
+        """
+        data = get_codec("orjson").encode({"a": 1})
+
+        self.assertEqual(json.loads(data), {"a": 1})
+
+    def test_compression_shrinks_article_bodies(self):
+        """
+        Tests that compressing a long body produces fewer bytes.
+        """
+        article = make_article(1, body_size=5000)
+
+        plain = len(get_codec("json").encode(article))
+        self.assertLess(len(get_codec("json+zstd").encode(article)), plain)
+        self.assertLess(len(get_codec("json+gzip").encode(article)), plain)
+
+    def test_unknown_names_raise(self):
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+        with self.assertRaises(ValueError):
+            get_codec("json+lz4")
+
+    def test_unknown_header_ids_raise(self):
+        """
+        Tests that a record from a newer, unknown codec is not misread.
+        """
+        with self.assertRaises(ValueError):
+            decode_records(MAGIC + b"\x09\x00{}")
+        with self.assertRaises(ValueError):
+            decode_records(MAGIC + b"\x00\x09{}")
+
+    def test_codec_name(self):
+        self.assertEqual(get_codec("msgpack+zstd").name, "msgpack+zstd")
+        self.assertEqual(Codec(JsonSerializer()).name, "json")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,295 @@
+import base64
+import json
+from unittest.mock import MagicMock, patch
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src.models import ArticleProjection
+from src.publisher import KinesisPublisher, LocalPublisher
+from src.serialization import decode_records, get_codec
+from src.sinks import (
+    FilePublisher,
+    FirehosePublisher,
+    KafkaPublisher,
+    SQSPublisher,
+    publisher_from_env,
+)
+
+REGION = "eu-west-2"
+
+
+def make_records(count, body=""):
+    return [
+        {
+            "id": f"world/2025/oct/{i:05d}",
+            "webTitle": f"Article {i}",
+            "webUrl": f"https://url/{i}",
+            "body": body,
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def quiet():
+    with patch("builtins.print"):
+        yield
+
+
+@pytest.fixture
+def aws_credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", REGION)
+
+
+class TestFirehosePublisher:
+
+    @mock_aws
+    def test_publishes_newline_delimited_records_in_batches(self, aws_credentials):
+        publisher = FirehosePublisher("articles", REGION)
+        publisher.client = MagicMock()
+        publisher.client.put_record_batch.side_effect = lambda **kw: {
+            "FailedPutCount": 0,
+            "RequestResponses": [{"RecordId": "r"} for _ in kw["Records"]],
+        }
+
+        response = publisher.publish(make_records(1200))
+
+        assert response["FailedRecordCount"] == 0
+        assert response["BatchCount"] == 3
+        calls = publisher.client.put_record_batch.call_args_list
+        assert [len(c.kwargs["Records"]) for c in calls] == [500, 500, 200]
+        first = calls[0].kwargs["Records"][0]["Data"]
+        assert first.endswith(b"\n")
+        assert json.loads(first)["webTitle"] == "Article 0"
+
+    @mock_aws
+    def test_batches_respect_the_byte_limit(self, aws_credentials):
+        publisher = FirehosePublisher("articles", REGION)
+        publisher.client = MagicMock()
+        publisher.client.put_record_batch.side_effect = lambda **kw: {
+            "RequestResponses": [{"RecordId": "r"} for _ in kw["Records"]]
+        }
+
+        # ~100 KiB per record: at most 40 fit in 4 MiB
+        publisher.publish(make_records(100, body="x" * 100_000))
+
+        for c in publisher.client.put_record_batch.call_args_list:
+            size = sum(len(r["Data"]) for r in c.kwargs["Records"])
+            assert size <= FirehosePublisher.max_bytes_per_batch
+
+    @mock_aws
+    def test_retries_only_failed_records(self, aws_credentials, mocker):
+        mocker.patch("src.sinks.time.sleep")
+        publisher = FirehosePublisher("articles", REGION)
+        publisher.client = MagicMock()
+        publisher.client.put_record_batch.side_effect = [
+            {
+                "FailedPutCount": 1,
+                "RequestResponses": [
+                    {"RecordId": "r"},
+                    {"ErrorCode": "ServiceUnavailableException"},
+                ],
+            },
+            {"FailedPutCount": 0, "RequestResponses": [{"RecordId": "r"}]},
+        ]
+
+        response = publisher.publish(make_records(2))
+
+        assert response["FailedRecordCount"] == 0
+        assert response["RetriedRecordCount"] == 1
+        retry = publisher.client.put_record_batch.call_args_list[1]
+        assert json.loads(retry.kwargs["Records"][0]["Data"])["webTitle"] == "Article 1"
+
+
+class TestSQSPublisher:
+
+    @mock_aws
+    def test_sends_batches_of_ten(self, aws_credentials):
+        sqs = boto3.client("sqs", region_name=REGION)
+        sqs.create_queue(QueueName="articles")
+
+        response = SQSPublisher("articles", REGION).publish(make_records(25))
+
+        assert response["FailedRecordCount"] == 0
+        assert response["BatchCount"] == 3
+        queue_url = sqs.get_queue_url(QueueName="articles")["QueueUrl"]
+        attributes = sqs.get_queue_attributes(
+            QueueUrl=queue_url, AttributeNames=["ApproximateNumberOfMessages"]
+        )["Attributes"]
+        assert attributes["ApproximateNumberOfMessages"] == "25"
+
+    @mock_aws
+    def test_binary_codecs_are_base64_encoded(self, aws_credentials):
+        sqs = boto3.client("sqs", region_name=REGION)
+        queue_url = sqs.create_queue(QueueName="articles")["QueueUrl"]
+
+        SQSPublisher(queue_url, REGION, codec=get_codec("json+gzip")).publish(
+            make_records(1)
+        )
+
+        message = sqs.receive_message(
+            QueueUrl=queue_url, MessageAttributeNames=["All"]
+        )["Messages"][0]
+        assert message["MessageAttributes"]["codec"]["StringValue"] == "json+gzip"
+        records = decode_records(base64.b64decode(message["Body"]))
+        assert records[0]["webTitle"] == "Article 0"
+
+    @mock_aws
+    def test_sender_faults_are_not_retried(self, aws_credentials):
+        sqs = boto3.client("sqs", region_name=REGION)
+        sqs.create_queue(QueueName="articles")
+        publisher = SQSPublisher("articles", REGION)
+        publisher.client = MagicMock()
+        publisher.client.send_message_batch.return_value = {
+            "Successful": [{"Id": "0"}],
+            "Failed": [
+                {"Id": "1", "Code": "InvalidMessageContents", "SenderFault": True}
+            ],
+        }
+
+        response = publisher.publish(make_records(2))
+
+        assert response["FailedRecordCount"] == 1
+        assert response["Records"][1]["ErrorCode"] == "InvalidMessageContents"
+        publisher.client.send_message_batch.assert_called_once()
+
+
+class FakeKafkaError:
+    def __init__(self, name, retriable):
+        self._name = name
+        self._retriable = retriable
+
+    def name(self):
+        return self._name
+
+    def str(self):
+        return self._name
+
+    def retriable(self):
+        return self._retriable
+
+
+class FakeKafkaProducer:
+    """Delivers every message on flush, failing the ones listed in `fail`."""
+
+    def __init__(self, config):
+        self.config = config
+        self.messages = []
+        self.pending = []
+        self.fail = {}
+
+    def produce(self, topic, value, key=None, on_delivery=None):
+        self.pending.append((topic, value, key, on_delivery))
+
+    def poll(self, timeout):
+        return 0
+
+    def flush(self, timeout=None):
+        for topic, value, key, on_delivery in self.pending:
+            error = self.fail.pop(key, None)
+            if error is None:
+                self.messages.append((topic, value, key))
+            on_delivery(error, None)
+        self.pending = []
+        return 0
+
+
+class TestKafkaPublisher:
+
+    def test_publishes_keyed_messages_and_retries_retriable_errors(self, mocker):
+        mocker.patch("src.sinks.KafkaProducer", FakeKafkaProducer)
+        mocker.patch("src.sinks.time.sleep")
+        publisher = KafkaPublisher("articles", "localhost:9092")
+        records = make_records(3)
+        publisher.producer.fail[records[1]["id"]] = FakeKafkaError(
+            "_MSG_TIMED_OUT", True
+        )
+        publisher.producer.fail[records[2]["id"]] = FakeKafkaError(
+            "MSG_SIZE_TOO_LARGE", False
+        )
+
+        response = publisher.publish(records)
+
+        assert publisher.producer.config == {"bootstrap.servers": "localhost:9092"}
+        assert response["RetriedRecordCount"] == 1
+        assert response["FailedRecordCount"] == 1
+        assert response["Records"][2]["ErrorCode"] == "MSG_SIZE_TOO_LARGE"
+        assert [key for _, _, key in publisher.producer.messages] == [
+            records[0]["id"],
+            records[1]["id"],
+        ]
+
+    def test_requires_confluent_kafka(self, mocker):
+        mocker.patch("src.sinks.KafkaProducer", None)
+        with pytest.raises(ImportError):
+            KafkaPublisher("articles", "localhost:9092")
+
+
+class TestFilePublisher:
+
+    def test_writes_ndjson_and_renames_on_close(self, tmp_path):
+        projection = ArticleProjection(["id", "webTitle"])
+        publisher = FilePublisher(str(tmp_path), projection=projection)
+
+        publisher.publish(make_records(3))
+        publisher.publish(make_records(2))
+        assert list(tmp_path.glob("*.part"))
+        publisher.close()
+
+        assert len(publisher.files) == 1
+        with open(publisher.files[0]) as f:
+            lines = [json.loads(line) for line in f]
+        assert len(lines) == 5
+        assert lines[0] == {"id": "world/2025/oct/00000", "webTitle": "Article 0"}
+        assert not list(tmp_path.glob("*.part"))
+
+    def test_rotates_files_by_size(self, tmp_path):
+        publisher = FilePublisher(str(tmp_path), max_file_bytes=10_000)
+        publisher.max_records_per_batch = 10
+
+        response = publisher.publish(make_records(100, body="x" * 500))
+        publisher.close()
+
+        assert response["FailedRecordCount"] == 0
+        assert len(publisher.files) > 1
+        total = 0
+        for path in publisher.files:
+            with open(path) as f:
+                total += sum(1 for _ in f)
+        assert total == 100
+
+    def test_ndjson_needs_a_json_codec(self, tmp_path):
+        with pytest.raises(ValueError):
+            FilePublisher(str(tmp_path), codec=get_codec("json+gzip"))
+
+
+class TestPublisherFromEnv:
+
+    def test_defaults_to_local(self, monkeypatch):
+        monkeypatch.delenv("GUARDIAN_PUBLISHER", raising=False)
+        assert isinstance(publisher_from_env("stream", REGION), LocalPublisher)
+
+    def test_file_backend(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("GUARDIAN_PUBLISHER", "file")
+        monkeypatch.setenv("GUARDIAN_OUTPUT_DIR", str(tmp_path))
+        monkeypatch.setenv("GUARDIAN_OUTPUT_MAX_BYTES", "1000")
+
+        publisher = publisher_from_env("stream", REGION)
+
+        assert isinstance(publisher, FilePublisher)
+        assert publisher.directory == str(tmp_path)
+        assert publisher.max_file_bytes == 1000
+
+    @mock_aws
+    def test_explicit_backend_overrides_env(self, monkeypatch, aws_credentials):
+        monkeypatch.setenv("GUARDIAN_PUBLISHER", "file")
+        publisher = publisher_from_env("stream", REGION, backend="kinesis")
+        assert isinstance(publisher, KinesisPublisher)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            publisher_from_env("stream", REGION, backend="carrier-pigeon")
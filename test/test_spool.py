@@ -0,0 +1,258 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.spool import Spool, SpooledPublisher, spool_from_env
+
+
+def make_records(count, start=0):
+    return [
+        {"id": f"article-{i}", "webTitle": f"Article {i}"}
+        for i in range(start, start + count)
+    ]
+
+
+class RecordingPublisher:
+    """Accepts records, except those whose id is in `fail`, and remembers them."""
+
+    def __init__(self):
+        self.published = []
+        self.fail = set()
+        self.down = False
+
+    def publish(self, records):
+        records = list(records)
+        if self.down:
+            return None
+        results = []
+        for record in records:
+            if record["id"] in self.fail:
+                results.append({"ErrorCode": "ProvisionedThroughputExceededException"})
+            else:
+                self.published.append(record["id"])
+                results.append({"SequenceNumber": "1"})
+        failed = sum(1 for r in results if r.get("ErrorCode"))
+        return {"FailedRecordCount": failed, "Records": results}
+
+
+@patch("builtins.print")
+class TestSpool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_acknowledged_records_are_not_pending(self, mock_print):
+        spool = Spool(self.directory)
+        positions = spool.append(make_records(3))
+        spool.release(positions)
+
+        spool.ack(positions[:2])
+
+        pending = [record["id"] for _, record in spool.pending()]
+        self.assertEqual(pending, ["article-2"])
+        self.assertEqual(spool.pending_count(), 1)
+
+    def test_in_flight_records_are_not_replayed(self, mock_print):
+        spool = Spool(self.directory)
+        spool.append(make_records(2))
+        self.assertEqual(list(spool.pending()), [])
+        self.assertEqual(spool.pending_count(), 0)
+
+    def test_unacknowledged_records_survive_a_restart(self, mock_print):
+        spool = Spool(self.directory)
+        positions = spool.append(make_records(3))
+        spool.ack(positions[:1])
+        spool.close()
+
+        reopened = Spool(self.directory)
+        pending = [record["id"] for _, record in reopened.pending()]
+        self.assertEqual(pending, ["article-1", "article-2"])
+
+    def test_torn_tail_is_ignored(self, mock_print):
+        spool = Spool(self.directory)
+        spool.append(make_records(2))
+        spool.close()
+        (segment,) = [f for f in os.listdir(self.directory) if f.endswith(".log")]
+        with open(os.path.join(self.directory, segment), "ab") as f:
+            f.write(b"\x00\x00\x01\x00partial")
+
+        pending = [record["id"] for _, record in Spool(self.directory).pending()]
+        self.assertEqual(pending, ["article-0", "article-1"])
+
+    def test_fully_acknowledged_segments_are_deleted(self, mock_print):
+        spool = Spool(self.directory, segment_bytes=200)
+        first = spool.append(make_records(5))
+        spool.append(make_records(1, start=5))  # Rotates to a new segment
+        self.assertEqual(
+            len([f for f in os.listdir(self.directory) if f.endswith(".log")]), 2
+        )
+
+        spool.ack(first)
+
+        self.assertEqual(
+            len([f for f in os.listdir(self.directory) if f.endswith(".log")]), 1
+        )
+        self.assertEqual(spool.stats()["segments"], 1)
+
+    def test_replay_acknowledges_accepted_records(self, mock_print):
+        spool = Spool(self.directory)
+        spool.release(spool.append(make_records(5)))
+        publisher = RecordingPublisher()
+
+        stats = spool.replay(publisher, batch_records=2)
+
+        self.assertEqual(stats, {"replayed": 5, "acked": 5, "pending": 0})
+        self.assertEqual(publisher.published, [f"article-{i}" for i in range(5)])
+
+    def test_replay_stops_at_the_first_batch_with_failures(self, mock_print):
+        spool = Spool(self.directory)
+        spool.release(spool.append(make_records(5)))
+        publisher = RecordingPublisher()
+        publisher.fail = {"article-3"}
+
+        stats = spool.replay(publisher, batch_records=2)
+
+        self.assertEqual(stats, {"replayed": 4, "acked": 3, "pending": 2})
+        pending = [record["id"] for _, record in spool.pending()]
+        self.assertEqual(pending, ["article-3", "article-4"])
+
+    def test_replay_stops_while_the_destination_is_down(self, mock_print):
+        spool = Spool(self.directory)
+        spool.release(spool.append(make_records(5)))
+        publisher = MagicMock()
+        publisher.publish.return_value = None
+
+        stats = spool.replay(publisher, batch_records=2)
+
+        publisher.publish.assert_called_once()
+        self.assertEqual(stats["pending"], 5)
+
+    def test_records_that_can_never_succeed_are_dropped(self, mock_print):
+        spool = Spool(self.directory)
+        positions = spool.append(make_records(2))
+
+        spool.resolve(
+            positions,
+            {
+                "FailedRecordCount": 1,
+                "Records": [{}, {"ErrorCode": "RecordTooLarge"}],
+            },
+        )
+
+        self.assertEqual(spool.pending_count(), 0)
+        self.assertEqual(spool.stats()["dropped"], 1)
+
+    def test_aggregated_responses_ack_all_or_nothing(self, mock_print):
+        spool = Spool(self.directory)
+        positions = spool.append(make_records(4))
+
+        spool.resolve(positions, {"FailedRecordCount": 1, "Records": [{}]})
+        self.assertEqual(spool.pending_count(), 4)
+
+        spool.resolve(positions, {"FailedRecordCount": 0, "Records": [{}]})
+        self.assertEqual(spool.pending_count(), 0)
+
+    def test_rejects_unknown_fsync_policy(self, mock_print):
+        with self.assertRaises(ValueError):
+            Spool(self.directory, fsync="sometimes")
+
+
+@patch("builtins.print")
+class TestSpooledPublisher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.spool = Spool(self.tmp.name)
+        self.publisher = RecordingPublisher()
+
+    def tearDown(self):
+        self.spool.close()
+        self.tmp.cleanup()
+
+    def test_failed_publish_is_replayed_on_the_next_call(self, mock_print):
+        spooled = SpooledPublisher(self.publisher, self.spool, batch_records=2)
+        self.publisher.down = True
+        self.assertIsNone(spooled.publish(iter(make_records(3))))
+        self.assertEqual(self.spool.pending_count(), 3)
+
+        self.publisher.down = False
+        response = spooled.publish(make_records(1, start=3))
+
+        self.assertEqual(response["FailedRecordCount"], 0)
+        self.assertEqual(
+            self.publisher.published,
+            ["article-0", "article-1", "article-2", "article-3"],
+        )
+        self.assertEqual(self.spool.pending_count(), 0)
+
+    def test_records_are_spooled_before_they_are_sent(self, mock_print):
+        spool = self.spool
+
+        class CheckingPublisher(RecordingPublisher):
+            def publish(inner, records):
+                for record in records:
+                    # Every record handed over is already in the log
+                    self.assertGreaterEqual(spool.stats()["appended"], 1)
+                return None
+
+        SpooledPublisher(CheckingPublisher(), spool).publish(make_records(2))
+        self.assertEqual(spool.pending_count(), 2)
+
+    def test_background_replay_never_overlaps_a_publish(self, mock_print):
+        calls = {"active": 0, "overlaps": 0, "count": 0}
+        lock = threading.Lock()
+
+        class SlowPublisher(RecordingPublisher):
+            def publish(inner, records):
+                with lock:
+                    calls["active"] += 1
+                    calls["count"] += 1
+                    calls["overlaps"] += calls["active"] > 1
+                list(records)
+                time.sleep(0.005)
+                with lock:
+                    calls["active"] -= 1
+                # Down: records stay pending, so every replay publishes them
+                return None
+
+        spooled = SpooledPublisher(SlowPublisher(), self.spool, replay_interval=0.001)
+        try:
+            for i in range(20):
+                spooled.publish(make_records(1, start=i))
+        finally:
+            spooled._stop.set()
+            spooled._thread.join()
+
+        self.assertGreater(calls["count"], 20)
+        self.assertEqual(calls["overlaps"], 0)
+
+    def test_exposes_the_wrapped_publisher(self, mock_print):
+        self.publisher.stream_name = "articles"
+        spooled = SpooledPublisher(self.publisher, self.spool)
+        self.assertEqual(spooled.stream_name, "articles")
+
+
+class TestSpoolFromEnv(unittest.TestCase):
+
+    def test_disabled_by_default(self):
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(spool_from_env())
+
+    def test_directory_enables_it(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {"GUARDIAN_SPOOL_DIR": tmp, "GUARDIAN_SPOOL_FSYNC": "never"}
+            with patch.dict(os.environ, env, clear=True):
+                spool = spool_from_env()
+            self.assertEqual(spool.directory, tmp)
+            self.assertEqual(spool.fsync, "never")
+
+
+if __name__ == "__main__":
+    unittest.main()
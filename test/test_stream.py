@@ -0,0 +1,180 @@
+import os
+import signal
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from benchmarks.fake_guardian import GuardianStubServer
+from src import api_client
+from src.api_client import GuardianClient
+from src.dedup import Deduplicator
+from src.stream import (
+    AdaptiveInterval,
+    StreamDaemon,
+    quota_interval,
+    seconds_until_quota_reset,
+)
+from test.helpers import ok_response
+
+API_KEY = "test-key"
+
+
+class TestAdaptiveInterval(unittest.TestCase):
+
+    def test_busy_query_is_polled_more_often(self):
+        interval = AdaptiveInterval(
+            min_interval=10, max_interval=600, target_per_poll=5
+        )
+
+        # 20 new articles in 100s: 0.2/s, so 5 articles arrive every 25s
+        self.assertAlmostEqual(interval.update(20, 100), 25)
+
+    def test_empty_polls_back_off_up_to_max(self):
+        interval = AdaptiveInterval(min_interval=10, max_interval=60)
+
+        intervals = [interval.update(0, 10) for _ in range(4)]
+
+        self.assertEqual(intervals, [20, 40, 60, 60])
+
+    def test_never_polls_faster_than_min(self):
+        interval = AdaptiveInterval(min_interval=30, max_interval=600)
+
+        self.assertEqual(interval.update(1000, 1), 30)
+
+
+class TestQuotaInterval(unittest.TestCase):
+
+    def test_spreads_remaining_quota_over_the_day(self):
+        # 2 queries, 1000 requests left, 10 hours left: one poll each per 72s
+        self.assertAlmostEqual(quota_interval(1000, 2, 36_000), 72)
+
+    def test_waits_for_reset_when_quota_is_spent(self):
+        self.assertEqual(quota_interval(0, 2, 5_000), 5_000)
+
+    def test_seconds_until_midnight(self):
+        self.assertEqual(
+            seconds_until_quota_reset(datetime(2025, 10, 1, 23, 0, 0)), 3600
+        )
+
+
+@patch("builtins.print")
+class TestStreamDaemon(unittest.TestCase):
+
+    def setUp(self):
+        # A client without rate limiting keeps these tests fast and offline
+        api_client.GUARDIAN_CLIENT = GuardianClient()
+        self.publisher = MagicMock()
+        self.publisher.publish.side_effect = ok_response
+
+    def tearDown(self):
+        api_client.GUARDIAN_CLIENT = None
+
+    def test_second_poll_only_publishes_new_articles(self, mock_print):
+        with GuardianStubServer(total_results=12) as stub:
+            daemon = StreamDaemon(["bitcoin"], stub.url, API_KEY, self.publisher)
+
+            first = daemon.poll("bitcoin")
+            second = daemon.poll("bitcoin")
+
+        self.assertEqual((first, second), (12, 0))
+        self.assertEqual(self.publisher.publish.call_count, 1)
+        self.assertEqual(daemon.stats["bitcoin"]["polls"], 2)
+
+    def test_polls_bypass_the_response_cache(self, mock_print):
+        """
+        Tests that when the shared client has a memory cache that outlives
+        the poll interval, every poll still asks the API for new articles.
+        """
+        api_client.GUARDIAN_CLIENT = None
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(
+            "os.environ",
+            {
+                "GUARDIAN_QUOTA_FILE": os.path.join(tmp, "quota.json"),
+                "GUARDIAN_DAILY_QUOTA": "1000",
+                "GUARDIAN_RATE_PER_SECOND": "1000",
+                "GUARDIAN_CACHE": "memory",
+            },
+        ), GuardianStubServer(total_results=3) as stub:
+            self.assertIsNotNone(api_client.get_client().cache)
+            daemon = StreamDaemon(["bitcoin"], stub.url, API_KEY, self.publisher)
+
+            daemon.poll("bitcoin")
+            daemon.poll("bitcoin")
+
+        self.assertEqual(len(stub.requests), 2)
+        self.assertIsNone(daemon.client.cache)
+        self.assertIs(daemon.client.rate_limiter, api_client.get_client().rate_limiter)
+
+    def test_failed_publish_is_retried_next_poll(self, mock_print):
+        """
+        Tests that neither the checkpoint nor the dedup state move forward when
+        a publish fails.
+        """
+        self.publisher.publish.side_effect = [
+            {"FailedRecordCount": 3, "Records": []},
+            {"FailedRecordCount": 0, "Records": []},
+        ]
+        with GuardianStubServer(total_results=5) as stub:
+            daemon = StreamDaemon(
+                ["bitcoin"],
+                stub.url,
+                API_KEY,
+                self.publisher,
+                deduplicator=Deduplicator(),
+            )
+
+            self.assertEqual(daemon.poll("bitcoin"), 0)
+            self.assertEqual(daemon.poll("bitcoin"), 5)
+
+        self.assertEqual(daemon.stats["bitcoin"]["failed_polls"], 1)
+
+    def test_sigterm_stops_loop_and_closes_publisher(self, mock_print):
+        """
+        Tests that SIGTERM ends run_forever after the current poll, and that
+        the publisher is closed so buffered records are flushed.
+        """
+
+        def publish_then_terminate(records):
+            os.kill(os.getpid(), signal.SIGTERM)
+            return ok_response(records)
+
+        self.publisher.publish.side_effect = publish_then_terminate
+        previous_handler = signal.getsignal(signal.SIGTERM)
+
+        with GuardianStubServer(total_results=3) as stub:
+            daemon = StreamDaemon(
+                ["bitcoin", "ethereum"], stub.url, API_KEY, self.publisher
+            )
+            daemon.run_forever()
+
+        self.assertEqual(self.publisher.publish.call_count, 1)
+        self.publisher.close.assert_called_once()
+        self.assertEqual(daemon.stats["bitcoin"]["published"], 3)
+        self.assertIs(signal.getsignal(signal.SIGTERM), previous_handler)
+
+    def test_polls_each_query_and_respects_quota(self, mock_print):
+        """
+        Tests that every query is polled at start-up and a low remaining quota
+        stretches the next interval.
+        """
+        polled = []
+        with GuardianStubServer(total_results=2) as stub:
+            daemon = StreamDaemon(
+                ["a", "b"], stub.url, API_KEY, self.publisher, min_interval=1
+            )
+
+            def poll(query):
+                polled.append(query)
+                if len(polled) == 2:
+                    daemon.stop()
+                return 0
+
+            with patch.object(daemon, "poll", side_effect=poll), patch.object(
+                GuardianClient, "remaining_quota", return_value=1
+            ):
+                daemon.run()
+
+        self.assertEqual(polled, ["a", "b"])
+        # With one request left, the next poll waits for the quota to reset
+        self.assertGreater(daemon.stats["a"]["interval"], 60)
@@ -135,6 +135,76 @@ class TestBuildSearchParams(unittest.TestCase):
         self.assertEqual(result["q"], test_search_term)
         self.assertEqual(result["from-date"], expected_date)
 
+    def test_checkpoint_moves_from_date_to_checkpoint_day(self):
+        """
+        Tests that a checkpoint moves an earlier date_from forward to the day
+        of the newest article already published.
+        """
+        test_dict = {
+            "search_term": "bitcoin",
+            "date_from": datetime.strptime("2025-11-10", "%Y-%m-%d").date(),
+            "checkpoint": {"webPublicationDate": "2025-11-18T09:30:00Z", "id": "x"},
+        }
+
+        result = build_search_params(test_dict)
+
+        self.assertEqual(result["from-date"], "2025-11-18")
+
+    def test_checkpoint_never_moves_from_date_back(self):
+        """
+        Tests that a date_from later than the checkpoint day is kept, since
+        only newer content is asked for.
+        """
+        test_dict = {
+            "search_term": "bitcoin",
+            "date_from": datetime.strptime("2025-11-20", "%Y-%m-%d").date(),
+            "checkpoint": {"webPublicationDate": "2025-11-18T09:30:00Z", "id": "x"},
+        }
+
+        result = build_search_params(test_dict)
+
+        self.assertEqual(result["from-date"], "2025-11-20")
+
+    def test_without_date_from_the_checkpoint_day_is_used(self):
+        """
+        Tests that a missing date_from falls back to the checkpoint day.
+        """
+        test_dict = {
+            "search_term": "bitcoin",
+            "date_from": None,
+            "checkpoint": {"webPublicationDate": "2025-11-18T09:30:00Z", "id": "x"},
+        }
+
+        result = build_search_params(test_dict)
+
+        self.assertEqual(result["from-date"], "2025-11-18")
+
+    def test_date_to_adds_to_date_param(self):
+        """
+        Tests that an optional date_to bounds the search range.
+        """
+        test_dict = {
+            "search_term": "bitcoin",
+            "date_from": datetime.strptime("2025-01-01", "%Y-%m-%d").date(),
+            "date_to": datetime.strptime("2025-01-31", "%Y-%m-%d").date(),
+        }
+
+        result = build_search_params(test_dict)
+
+        self.assertEqual(result["to-date"], "2025-01-31")
+        self.assertNotIn("to-date", build_search_params({**test_dict, "date_to": None}))
+
+    def test_show_fields_adds_show_fields_param(self):
+        test_dict = {
+            "search_term": "bitcoin",
+            "date_from": datetime.strptime("2025-01-01", "%Y-%m-%d").date(),
+            "show_fields": "bodyText,wordcount",
+        }
+
+        result = build_search_params(test_dict)
+
+        self.assertEqual(result["show-fields"], "bodyText,wordcount")
+
     def test_non_datetime_input_raises_attribute_error(self):
         """
         Tests that passing a non-datetime object for the date raises an